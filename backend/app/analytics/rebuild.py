@@ -0,0 +1,33 @@
+"""
+Rebuild the sales rollups from the inventory ledger.
+Run: python -m app.analytics.rebuild
+Rebuild from a date onwards: python -m app.analytics.rebuild --since 2024-12-01
+
+Pause sales while it runs; see rebuild_rollups(). Rebuilt buckets use each
+sweet's current category, so revenue of a sweet that has changed category
+moves to its new one.
+"""
+import argparse
+from datetime import datetime
+
+from app.database import SessionLocal, initialize_database
+from app.analytics.rollups import rebuild_rollups
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Recompute sales rollups from inventory_movements.")
+    parser.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        help="Only rebuild buckets from this UTC date or time onwards (default: everything)"
+    )
+    args = parser.parse_args(argv)
+
+    initialize_database()
+    with SessionLocal() as db:
+        folded = rebuild_rollups(db, since=args.since)
+    print(f"Rebuilt sales rollups from {folded} ledger movements")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Sales reports answered from the rollup tables.
+
+Every report reads sales_rollups over a bucket range, so its cost depends on
+the length of the range and the size of the catalog, not on how many orders
+were placed.
+"""
+import os
+from datetime import datetime, timedelta, timezone
+from typing import List, NamedTuple, Optional
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+from sqlalchemy import Float, case, cast, func, select
+from sqlalchemy.orm import Session
+
+from app.analytics.rollups import bucket_start
+from app.inventory.ledger import as_utc
+from app.models import SalesRollup, SweetProduct
+
+load_dotenv()
+
+ANALYTICS_DEFAULT_DAYS = int(os.getenv("ANALYTICS_DEFAULT_DAYS", "30"))
+ANALYTICS_TOP_DEFAULT = int(os.getenv("ANALYTICS_TOP_DEFAULT", "10"))
+ANALYTICS_TOP_MAX = int(os.getenv("ANALYTICS_TOP_MAX", "100"))
+
+
+class ReportWindow(NamedTuple):
+    """Bucket range of a report: buckets starting in [start, end)."""
+    granularity: str
+    start: datetime
+    end: datetime
+
+
+def report_window(
+    granularity: str = "day",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> ReportWindow:
+    """Resolve optional bounds, defaulting to the last ANALYTICS_DEFAULT_DAYS days.
+
+    Both bounds are widened to whole buckets: ``since`` rounds down, and
+    ``until`` rounds up unless it already falls on a bucket boundary.
+    """
+    now = datetime.now(timezone.utc)
+    end = as_utc(until) if until is not None else now
+    start = bucket_start(since or end - timedelta(days=ANALYTICS_DEFAULT_DAYS), granularity)
+    if until is None or bucket_start(end, granularity) != end:
+        # Round up so the bucket containing ``until`` (or now) is included
+        end = bucket_start(end, granularity) + _bucket_length(granularity)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="since must be earlier than until"
+        )
+    return ReportWindow(granularity, start, end)
+
+
+def _bucket_length(granularity: str) -> timedelta:
+    return timedelta(days=1) if granularity == "day" else timedelta(hours=1)
+
+
+def _in_window(window: ReportWindow) -> list:
+    return [
+        SalesRollup.granularity == window.granularity,
+        SalesRollup.bucket_start >= window.start,
+        SalesRollup.bucket_start < window.end,
+    ]
+
+
+def revenue_by_category(db: Session, window: ReportWindow, category: Optional[str] = None) -> List[dict]:
+    """Revenue, units and orders per category per bucket, oldest bucket first."""
+    query = (
+        select(
+            SalesRollup.bucket_start,
+            SalesRollup.sweet_category,
+            func.sum(SalesRollup.revenue).label("revenue"),
+            func.sum(SalesRollup.units_sold).label("units_sold"),
+            func.sum(SalesRollup.order_count).label("order_count"),
+        )
+        .where(*_in_window(window), SalesRollup.order_count > 0)
+        .group_by(SalesRollup.bucket_start, SalesRollup.sweet_category)
+        .order_by(SalesRollup.bucket_start, SalesRollup.sweet_category)
+    )
+    if category:
+        query = query.where(SalesRollup.sweet_category == category)
+    return [
+        {
+            "bucket_start": bucket_start(row.bucket_start, window.granularity),
+            "sweet_category": row.sweet_category,
+            "revenue": round(row.revenue, 2),
+            "units_sold": row.units_sold,
+            "order_count": row.order_count,
+        }
+        for row in db.execute(query)
+    ]
+
+
+def best_sellers(
+    db: Session,
+    window: ReportWindow,
+    limit: int,
+    rank_by: str = "units",
+    category: Optional[str] = None
+) -> List[dict]:
+    """Top sweets in the window by units sold or by revenue."""
+    units = func.sum(SalesRollup.units_sold).label("units_sold")
+    revenue = func.sum(SalesRollup.revenue).label("revenue")
+    ranking = [units.desc(), revenue.desc()] if rank_by == "units" else [revenue.desc(), units.desc()]
+    query = (
+        select(
+            SalesRollup.sweet_id,
+            func.max(SalesRollup.sweet_category).label("sweet_category"),
+            SweetProduct.sweet_name,
+            units,
+            revenue,
+            func.sum(SalesRollup.order_count).label("order_count"),
+        )
+        .outerjoin(SweetProduct, SweetProduct.sweet_id == SalesRollup.sweet_id)
+        .where(*_in_window(window), SalesRollup.order_count > 0)
+        .group_by(SalesRollup.sweet_id, SweetProduct.sweet_name)
+        .order_by(*ranking, SalesRollup.sweet_id)
+        .limit(limit)
+    )
+    if category:
+        query = query.where(SalesRollup.sweet_category == category)
+    return [
+        {
+            "sweet_id": row.sweet_id,
+            "sweet_name": row.sweet_name,
+            "sweet_category": row.sweet_category,
+            "units_sold": row.units_sold,
+            "revenue": round(row.revenue, 2),
+            "order_count": row.order_count,
+        }
+        for row in db.execute(query)
+    ]
+
+
+def _days_after(db: Session, column, start: datetime):
+    """SQL for the (fractional) days from ``start`` to ``column``; there is no portable date difference."""
+    if db.get_bind().dialect.name == "postgresql":
+        return func.extract("epoch", column - start) / 86400
+    return func.julianday(column) - func.julianday(start)
+
+
+def stock_turn(db: Session, window: ReportWindow, limit: int) -> List[dict]:
+    """Units sold over average stock on hand, per sweet, highest turn first.
+
+    The stock at the end of each day is reconstructed backwards from the
+    current quantity_in_stock using the daily net movements. Stock edits made
+    outside purchases and restocks are not in the ledger, so they shift the
+    estimate.
+
+    Summed over the window's days, the closing stocks are ``days`` times the
+    current stock, less each later day's net movement once for every window
+    day before it. That is one weighted sum per sweet, so the report is a
+    single grouped query and the limit is applied in SQL.
+    """
+    window = ReportWindow("day", bucket_start(window.start, "day"), window.end)
+    days = -(-(window.end - window.start) // timedelta(days=1))
+    # Window days before each bucket: a bucket after the window counts against all of them
+    offset = func.round(_days_after(db, SalesRollup.bucket_start, window.start))
+    weight = case((offset >= days, days), else_=offset)
+    movements = (
+        select(
+            SalesRollup.sweet_id,
+            func.sum(case((SalesRollup.bucket_start < window.end, SalesRollup.units_sold), else_=0)).label("sold"),
+            func.sum((SalesRollup.units_restocked - SalesRollup.units_sold) * weight).label("later_net"),
+        )
+        # Net movements from the window start up to today are needed to walk back from current stock
+        .where(SalesRollup.granularity == "day", SalesRollup.bucket_start >= window.start)
+        .group_by(SalesRollup.sweet_id)
+        .subquery()
+    )
+    sold = func.coalesce(movements.c.sold, 0)
+    average = cast(SweetProduct.quantity_in_stock * days - func.coalesce(movements.c.later_net, 0), Float) / days
+    turn = case((average > 0, cast(sold, Float) / average))
+    rows = db.execute(
+        select(
+            SweetProduct.sweet_id,
+            SweetProduct.sweet_name,
+            SweetProduct.sweet_category,
+            SweetProduct.quantity_in_stock,
+            sold.label("units_sold"),
+            average.label("average_stock"),
+            turn.label("stock_turn"),
+        )
+        .outerjoin(movements, movements.c.sweet_id == SweetProduct.sweet_id)
+        .order_by(case((average > 0, 0), else_=1), turn.desc(), SweetProduct.sweet_id)
+        .limit(limit)
+    ).all()
+    return [
+        {
+            "sweet_id": row.sweet_id,
+            "sweet_name": row.sweet_name,
+            "sweet_category": row.sweet_category,
+            "units_sold": row.units_sold,
+            "quantity_in_stock": row.quantity_in_stock,
+            "average_stock": round(row.average_stock, 2),
+            "stock_turn": round(row.stock_turn, 4) if row.stock_turn is not None else None,
+        }
+        for row in rows
+    ]
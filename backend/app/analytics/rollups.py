@@ -0,0 +1,166 @@
+"""
+Incrementally maintained sales rollups.
+
+Each inventory ledger write also adds its movements to sales_rollups, in the
+same transaction: one row per (granularity, UTC bucket, sweet) for hourly and
+daily buckets. The rows are upserted with ON CONFLICT ... DO UPDATE, so
+concurrent purchases add to a bucket atomically. Reports read the rollups,
+whose size depends on the date range and catalog size, never on order
+volume.
+
+The ledger is the source of truth. rebuild_rollups() recomputes buckets from
+inventory_movements for backfills and repairs; see app.analytics.rebuild.
+The ledger does not record a sweet's category, so a rebuild files all of a
+sweet's history under its current category. Incremental rollups keep the
+category at the time of sale, so a rebuild after a sweet changes category
+moves its past revenue between categories.
+"""
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models import InventoryMovement, SalesRollup, SweetProduct
+
+GRANULARITIES = ("hour", "day")
+GRANULARITY_PATTERN = "^(hour|day)$"
+
+# Category recorded for movements of a sweet that no longer exists
+UNKNOWN_CATEGORY = "(deleted)"
+
+_KEY_COLUMNS = ("granularity", "bucket_start", "sweet_id")
+_COUNTER_COLUMNS = ("units_sold", "units_restocked", "revenue", "order_count")
+
+# (granularity, bucket_start, sweet_id)
+RollupKey = Tuple[str, datetime, int]
+
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    """Start of the UTC hour or day containing ``moment`` (naive means UTC)."""
+    moment = moment.astimezone(timezone.utc) if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+    if granularity == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _categories(db: Session, sweet_ids: Iterable[int]) -> Dict[int, str]:
+    return dict(db.execute(
+        select(SweetProduct.sweet_id, SweetProduct.sweet_category)
+        .where(SweetProduct.sweet_id.in_(set(sweet_ids)))
+    ).all())
+
+
+def aggregate_movements(movements: Iterable[dict], categories: Dict[int, str]) -> Dict[RollupKey, dict]:
+    """Fold ledger movement rows into per-bucket rollup increments."""
+    increments: Dict[RollupKey, dict] = {}
+    for movement in movements:
+        delta = movement["quantity_delta"]
+        for granularity in GRANULARITIES:
+            key = (granularity, bucket_start(movement["created_at"], granularity), movement["sweet_id"])
+            row = increments.get(key)
+            if row is None:
+                row = increments[key] = {
+                    **dict(zip(_KEY_COLUMNS, key)),
+                    "sweet_category": (
+                        movement.get("sweet_category") or categories.get(movement["sweet_id"], UNKNOWN_CATEGORY)
+                    ),
+                    **{name: 0 for name in _COUNTER_COLUMNS},
+                }
+            if delta < 0:
+                row["units_sold"] -= delta
+                row["revenue"] += movement["total_price"] or 0.0
+                row["order_count"] += 1
+            elif movement["total_price"] is not None:
+                # A released sale (ledger.release_movement): units back, charge refunded
+                row["units_sold"] -= delta
+                row["revenue"] += movement["total_price"]
+                row["order_count"] -= 1
+            else:
+                row["units_restocked"] += delta
+    return increments
+
+
+def _add_increments(db: Session, rows: List[dict]) -> None:
+    """Add each row's counters to its bucket, creating the bucket if needed."""
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name in ("sqlite", "postgresql"):
+        insert = sqlite_insert if dialect_name == "sqlite" else postgresql_insert
+        statement = insert(SalesRollup)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(_KEY_COLUMNS),
+            set_={
+                "sweet_category": statement.excluded.sweet_category,
+                **{
+                    name: getattr(SalesRollup, name) + getattr(statement.excluded, name)
+                    for name in _COUNTER_COLUMNS
+                },
+            }
+        )
+        db.execute(statement, rows)
+        return
+
+    # Other backends: update in place, inserting buckets that do not exist yet
+    for row in rows:
+        updated = db.execute(
+            update(SalesRollup)
+            .where(*(getattr(SalesRollup, name) == row[name] for name in _KEY_COLUMNS))
+            .values(**{name: getattr(SalesRollup, name) + row[name] for name in _COUNTER_COLUMNS})
+            .execution_options(synchronize_session=False)
+        )
+        if not updated.rowcount:
+            db.add(SalesRollup(**row))
+    db.flush()
+
+
+def update_rollups(db: Session, movements: List[dict]) -> None:
+    """Add freshly recorded ledger movements to the rollups; the caller owns the commit."""
+    if not movements:
+        return
+    # Writers pass the category they already read with the stock change; look up only the rest
+    unknown = {movement["sweet_id"] for movement in movements if not movement.get("sweet_category")}
+    categories = _categories(db, unknown) if unknown else {}
+    increments = aggregate_movements(movements, categories)
+    # Stable key order keeps concurrent upserts from deadlocking
+    _add_increments(db, [increments[key] for key in sorted(increments)])
+
+
+def rebuild_rollups(db: Session, since: Optional[datetime] = None, batch_size: int = 5000) -> int:
+    """Recompute rollups from the ledger, from the UTC day containing ``since``.
+
+    Run it with sales paused: purchases committed while it runs can be
+    counted twice or missed. Rebuilt buckets take each sweet's current
+    category (UNKNOWN_CATEGORY once it is deleted), not the one it had when
+    the movement was recorded. Returns the number of movements folded in.
+    """
+    start = bucket_start(since, "day") if since is not None else None
+    clear = delete(SalesRollup)
+    query = select(
+        InventoryMovement.sweet_id,
+        InventoryMovement.quantity_delta,
+        InventoryMovement.total_price,
+        InventoryMovement.created_at
+    ).order_by(InventoryMovement.movement_id)
+    if start is not None:
+        clear = clear.where(SalesRollup.bucket_start >= start)
+        query = query.where(InventoryMovement.created_at >= start)
+    db.execute(clear)
+
+    # inventory_movements has no category column: history is re-bucketed under today's categories
+    categories = dict(db.execute(select(SweetProduct.sweet_id, SweetProduct.sweet_category)).all())
+    increments: Dict[RollupKey, dict] = {}
+    folded = 0
+    for batch in db.execute(query.execution_options(yield_per=batch_size)).partitions():
+        folded += len(batch)
+        for key, row in aggregate_movements((dict(movement._mapping) for movement in batch), categories).items():
+            merged = increments.setdefault(key, row)
+            if merged is not row:
+                for name in _COUNTER_COLUMNS:
+                    merged[name] += row[name]
+
+    if increments:
+        _add_increments(db, [increments[key] for key in sorted(increments)])
+    db.commit()
+    return folded
@@ -6,28 +6,38 @@ from sqlalchemy.orm import Session
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
-from app.database import get_db
+from app.database import AnySession, get_db, run_in_session
 from app.models import UserAccount
-from app.auth.password_hasher import verify_password
+from app.auth.hashing_service import password_hashing_service
 from app.auth.token_manager import decode_access_token
+from app.auth.user_cache import UserPrincipal, user_principal_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[UserAccount]:
+def find_user_by_email(db: Session, email: str) -> Optional[UserAccount]:
+    return db.query(UserAccount).filter(UserAccount.email_address == email).first()
+
+
+def load_principal(db: Session, user_id: int) -> Optional[UserPrincipal]:
+    user = db.query(UserAccount).filter(UserAccount.user_id == user_id).first()
+    return UserPrincipal.from_account(user) if user is not None else None
+
+
+async def authenticate_user(db: AnySession, email: str, password: str) -> Optional[UserAccount]:
     """Verify user credentials and return user if valid."""
-    user = db.query(UserAccount).filter(UserAccount.email_address == email).first()
+    user = await run_in_session(db, find_user_by_email, email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await password_hashing_service.verify_password(password, user.hashed_password):
         return None
     return user
 
 
-def get_current_user(
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> UserAccount:
+    db: AnySession = Depends(get_db)
+) -> UserPrincipal:
     """Dependency to get current authenticated user from token."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -43,13 +53,19 @@ def get_current_user(
     if user_id is None:
         raise credentials_exception
     
-    user = db.query(UserAccount).filter(UserAccount.user_id == int(user_id)).first()  # ← Convert to int
-    if user is None:
+    # Serve the principal from cache; only a miss costs a DB round-trip
+    principal = user_principal_cache.get(int(user_id))
+    if principal is not None:
+        return principal
+
+    principal = await run_in_session(db, load_principal, int(user_id))  # ← Convert to int
+    if principal is None:
         raise credentials_exception
     
-    return user
+    user_principal_cache.set(principal.user_id, principal)
+    return principal
 
-def require_admin(current_user: UserAccount = Depends(get_current_user)) -> UserAccount:
+async def require_admin(current_user: UserPrincipal = Depends(get_current_user)) -> UserPrincipal:
     """Dependency to require admin privileges."""
     if not current_user.is_administrator:
         raise HTTPException(
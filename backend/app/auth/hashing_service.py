@@ -0,0 +1,113 @@
+"""
+Async password hashing backed by a dedicated, size-limited process pool.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from app.auth import password_hasher
+from app.metrics.registry import registry
+from app.metrics.timing import record_timing
+from app.stats import LatencyStats
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+# Includes time queued for a worker, which is what a login actually waits
+bcrypt_seconds = registry.histogram(
+    "auth_bcrypt_duration_seconds",
+    "Time to hash or verify a password in the worker pool.",
+    ("operation",),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+
+class PasswordHashingService:
+    """Runs bcrypt off the event loop and sheds load once the queue is full."""
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+        self.latency = {"hash": LatencyStats(), "verify": LatencyStats()}
+
+    async def hash_password(self, plain_password: str) -> str:
+        """Hash a password in the worker pool."""
+        return await self._run("hash", password_hasher.hash_password, plain_password)
+
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password in the worker pool."""
+        return await self._run(
+            "verify", password_hasher.verify_password, plain_password, hashed_password
+        )
+
+    async def _run(self, operation: str, func, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Authentication service is busy, please retry shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+            executor = self._get_executor()
+
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            # A worker died; drop the pool so the next call starts a fresh one
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service is restarting, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._pending -= 1
+                self.latency[operation].observe(elapsed)
+            bcrypt_seconds.observe(elapsed, operation)
+            record_timing("bcrypt", elapsed)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def stats(self) -> dict:
+        """Snapshot of queue depth, rejections and per-call latency."""
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "rejected": self.rejected,
+                "latency": {name: stats.snapshot() for name, stats in self.latency.items()},
+            }
+
+    def shutdown(self) -> None:
+        """Stop the worker processes; a later call lazily starts a new pool."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+password_hashing_service = PasswordHashingService(
+    max_workers=PASSWORD_HASH_WORKERS,
+    max_pending=PASSWORD_HASH_MAX_PENDING
+)
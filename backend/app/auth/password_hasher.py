@@ -1,13 +1,17 @@
 """
 Password hashing utilities using bcrypt directly.
 """
+import os
 import bcrypt
 
+# bcrypt cost factor; test runs lower this (minimum 4) to keep hashing cheap
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
 
 def hash_password(plain_password: str) -> str:
     """Hash a plain text password using bcrypt."""
     password_bytes = plain_password.encode('utf-8')
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
 
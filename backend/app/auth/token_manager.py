@@ -1,17 +1,38 @@
 """
 JWT token generation and validation.
 """
+import hashlib
 import os
+import time
 from datetime import datetime, timedelta, timezone 
 from typing import Optional
 from jose import JWTError, jwt
 from dotenv import load_dotenv
 
+from app.cache import TTLCache
+from app.metrics.registry import registry
+from app.metrics.timing import timed
+
 load_dotenv()
 
 SECRET_KEY = os.getenv("SECRET_KEY", "super-secret-sweet-shop-key-2025")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+
+# Claims of tokens that already passed signature verification, keyed by token digest
+verified_token_cache = TTLCache(
+    max_entries=TOKEN_CACHE_MAX_ENTRIES,
+    ttl_seconds=ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
+
+# Signing and signature checks only; decodes answered by the cache are not timed
+jwt_seconds = registry.histogram(
+    "auth_jwt_duration_seconds",
+    "Time to sign or verify an access token.",
+    ("operation",),
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01),
+)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -22,13 +43,25 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         "exp": expire,
         "iat": datetime.now(timezone.utc)
     })
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    with timed("jwt", jwt_seconds, "encode"):
+        return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
 def decode_access_token(token: str) -> Optional[dict]:
-    """Decode and validate a JWT token."""
+    """Decode and validate a JWT token, reusing the result for repeat tokens."""
+    digest = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = verified_token_cache.get(digest)
+    if payload is not None:
+        return dict(payload)
+
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        with timed("jwt", jwt_seconds, "decode"):
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+
+    # Only cache until the token's own expiry; tokens without exp are never cached
+    expires_at = payload.get("exp")
+    if isinstance(expires_at, (int, float)):
+        verified_token_cache.set(digest, payload, ttl_seconds=expires_at - time.time())
+    return dict(payload)
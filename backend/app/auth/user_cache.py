@@ -0,0 +1,70 @@
+"""
+Cache of authenticated user principals, keyed by user ID.
+"""
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.cache import TTLCache
+from app.models import UserAccount
+
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    """Immutable, session-independent snapshot of an authenticated user."""
+    user_id: int
+    email_address: str
+    full_name: str
+    is_administrator: bool
+    account_created_at: Optional[datetime]
+
+    @classmethod
+    def from_account(cls, user: UserAccount) -> "UserPrincipal":
+        return cls(
+            user_id=user.user_id,
+            email_address=user.email_address,
+            full_name=user.full_name,
+            is_administrator=bool(user.is_administrator),
+            account_created_at=user.account_created_at,
+        )
+
+
+user_principal_cache = TTLCache(
+    max_entries=USER_CACHE_MAX_ENTRIES,
+    ttl_seconds=USER_CACHE_TTL_SECONDS
+)
+
+
+# ==================== Write tracking ====================
+
+_WRITTEN_USERS = "written_user_ids"
+
+
+@event.listens_for(Session, "after_flush")
+def _track_written_users(session: Session, flush_context) -> None:
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, UserAccount):
+            session.info.setdefault(_WRITTEN_USERS, set()).add(instance.user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_cached_principals(session: Session) -> None:
+    """Evict written users' principals once the write is visible to other sessions.
+
+    Evicting at flush time would let a concurrent request re-cache the old row
+    before the commit.
+    """
+    for user_id in session.info.pop(_WRITTEN_USERS, ()):
+        user_principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_written_users(session: Session) -> None:
+    session.info.pop(_WRITTEN_USERS, None)
@@ -0,0 +1,346 @@
+"""
+Streaming bulk import/export of the sweets catalog as NDJSON or CSV, and
+export as a single JSON array.
+
+Import sets the stock of new sweets only. Stock of an existing sweet changes
+through purchases and restocks, which write the ledger, the rollups and the
+stock stream, so an import row that would change it is rejected; an
+unchanged quantity_in_stock (as in a re-imported export) is ignored.
+"""
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from typing import AsyncIterator, Iterator, List, Optional, Tuple, Union
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.catalog.serialization import stream_sweet_rows
+from app.database import AnySession, run_in_session
+from app.inventory.events import stock_events
+from app.models import HotStockSku, SweetProduct
+from app.schemas import SweetImportRow, SweetProductResponse
+
+BULK_IMPORT_CHUNK_SIZE = int(os.getenv("BULK_IMPORT_CHUNK_SIZE", "500"))
+BULK_IMPORT_MAX_REPORTED_ERRORS = int(os.getenv("BULK_IMPORT_MAX_REPORTED_ERRORS", "1000"))
+BULK_EXPORT_BATCH_SIZE = int(os.getenv("BULK_EXPORT_BATCH_SIZE", "500"))
+# Longest line (or quoted CSV record) buffered while streaming an import
+BULK_IMPORT_MAX_LINE_BYTES = int(os.getenv("BULK_IMPORT_MAX_LINE_BYTES", str(1024 * 1024)))
+
+NDJSON_MEDIA_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+CSV_MEDIA_TYPES = {"text/csv"}
+
+EXPORT_FIELDS = list(SweetProductResponse.model_fields)
+
+# (data row number, parsed fields or None, parse error or None)
+ParsedRecord = Tuple[int, Optional[dict], Optional[str]]
+
+
+class BulkImportResult:
+    """Running totals for an import; keeps at most a bounded number of row errors."""
+
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+
+    def add_error(self, row: int, messages: List[str]) -> None:
+        self.failed += 1
+        if len(self.errors) < BULK_IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "errors": messages})
+
+    def as_response(self) -> dict:
+        return {
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+
+INVALID_UTF8 = "Line is not valid UTF-8"
+
+
+def line_too_long() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Import lines must be at most {BULK_IMPORT_MAX_LINE_BYTES} bytes"
+    )
+
+
+def _decode_line(line: bytes) -> Optional[str]:
+    try:
+        return line.decode("utf-8").rstrip("\r")
+    except UnicodeDecodeError:
+        return None
+
+
+async def iter_lines(byte_stream: AsyncIterator[bytes]) -> AsyncIterator[Optional[str]]:
+    """Split a streamed request body into text lines without buffering the whole body.
+
+    A line that is not valid UTF-8 is yielded as None, for the parser to
+    report against its row. A line longer than BULK_IMPORT_MAX_LINE_BYTES
+    rejects the request, so a body without newlines cannot fill memory.
+    """
+    pending = b""
+    async for chunk in byte_stream:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        if len(pending) > BULK_IMPORT_MAX_LINE_BYTES:
+            raise line_too_long()
+        for line in lines:
+            if len(line) > BULK_IMPORT_MAX_LINE_BYTES:
+                raise line_too_long()
+            yield _decode_line(line)
+    if pending:
+        yield _decode_line(pending)
+
+
+async def parse_ndjson(byte_stream: AsyncIterator[bytes]) -> AsyncIterator[ParsedRecord]:
+    """Yield one record per non-blank NDJSON line."""
+    row = 0
+    async for line in iter_lines(byte_stream):
+        if line is None:
+            row += 1
+            yield row, None, INVALID_UTF8
+            continue
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            fields = json.loads(line)
+        except ValueError as error:
+            yield row, None, f"Invalid JSON: {error}"
+            continue
+        if not isinstance(fields, dict):
+            yield row, None, "Each line must be a JSON object"
+            continue
+        yield row, fields, None
+
+
+async def parse_csv(byte_stream: AsyncIterator[bytes]) -> AsyncIterator[ParsedRecord]:
+    """Yield one record per CSV row, using the first row as the header."""
+    header = None
+    row = 0
+    record = None
+    async for line in iter_lines(byte_stream):
+        if line is None:
+            if header is None:
+                yield row, None, "Header line is not valid UTF-8"
+                return
+            # Drop the record it belongs to, whatever came before it
+            record = None
+            row += 1
+            yield row, None, INVALID_UTF8
+            continue
+        # Quoted fields may span lines; an odd quote count means the record continues
+        record = line if record is None else f"{record}\n{line}"
+        if record.count('"') % 2:
+            if len(record) > BULK_IMPORT_MAX_LINE_BYTES:
+                raise line_too_long()
+            continue
+        text, record = record, None
+        if not text.strip():
+            continue
+
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+
+        row += 1
+        if len(values) != len(header):
+            yield row, None, f"Expected {len(header)} columns, found {len(values)}"
+            continue
+        # Empty cells mean "not provided" so schema defaults apply
+        yield row, {name: value for name, value in zip(header, values) if value != ""}, None
+
+    if record is not None:
+        yield row + 1, None, "Unterminated quoted field"
+
+
+def validate_record(fields: dict) -> Tuple[Optional[SweetImportRow], List[str]]:
+    """Validate one record against the import schema."""
+    try:
+        return SweetImportRow.model_validate(fields), []
+    except ValidationError as error:
+        return None, [
+            f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+            for detail in error.errors()
+        ]
+
+
+def write_chunk(db: Session, chunk: List[Tuple[int, SweetImportRow]], result: BulkImportResult) -> None:
+    """Upsert one chunk of validated rows in its own transaction.
+
+    The stock of each inserted sweet is published once its rows commit.
+    """
+    requested_ids = [row.sweet_id for _, row in chunk if row.sweet_id is not None]
+    stock = {}
+    if requested_ids:
+        stock = dict(db.execute(
+            select(SweetProduct.sweet_id, SweetProduct.quantity_in_stock)
+            .where(SweetProduct.sweet_id.in_(requested_ids))
+        ).all())
+    existing_ids = set(stock)
+
+    hot_ids = set()
+    if existing_ids:
+        hot_ids = set(db.scalars(
+            select(HotStockSku.sweet_id).where(HotStockSku.sweet_id.in_(existing_ids))
+        ))
+
+    inserts, updates = [], []
+    for row_number, row in chunk:
+        if row.sweet_id in hot_ids and "quantity_in_stock" in row.model_fields_set:
+            # Hot-SKU stock is owned by the in-memory counter
+            result.add_error(row_number, ["quantity_in_stock: sweet is in flash-sale mode"])
+            continue
+        if row.sweet_id in existing_ids:
+            values = row.model_dump(exclude_unset=True)
+            if values.get("quantity_in_stock", stock[row.sweet_id]) != stock[row.sweet_id]:
+                result.add_error(row_number, ["quantity_in_stock: use purchase or restock to change stock"])
+                continue
+            values.pop("quantity_in_stock", None)
+            updates.append((row_number, values))
+        elif row.sweet_id is None:
+            inserts.append((row_number, row.model_dump(exclude={"sweet_id"})))
+        else:
+            inserts.append((row_number, row.model_dump()))
+
+    try:
+        created = _write_rows(db, [values for _, values in inserts], [values for _, values in updates])
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        # Find the offending rows: write each one on its own
+        for rows, is_update in ((inserts, False), (updates, True)):
+            for row_number, values in rows:
+                try:
+                    created = _write_rows(db, [] if is_update else [values], [values] if is_update else [])
+                    db.commit()
+                except SQLAlchemyError as error:
+                    db.rollback()
+                    result.add_error(row_number, [f"Write failed: {getattr(error, 'orig', None) or error}"])
+                else:
+                    _publish_levels(created)
+                    if is_update:
+                        result.updated += 1
+                    else:
+                        result.inserted += 1
+        return
+
+    _publish_levels(created)
+    result.inserted += len(inserts)
+    result.updated += len(updates)
+
+
+def _publish_levels(created: List[tuple]) -> None:
+    for sweet_id, sweet_name, quantity in created:
+        stock_events.publish_level(sweet_id, sweet_name, quantity)
+
+
+def _write_rows(db: Session, inserts: List[dict], updates: List[dict]) -> List[tuple]:
+    """Write the rows; returns (sweet_id, sweet_name, quantity_in_stock) of each inserted sweet."""
+    created = []
+    # An executemany binds the same columns for every row, so rows that name
+    # their sweet_id go in a separate statement from those that do not
+    for batch in (
+        [values for values in inserts if "sweet_id" in values],
+        [values for values in inserts if "sweet_id" not in values]
+    ):
+        if batch:
+            created.extend(db.execute(
+                insert(SweetProduct).returning(
+                    SweetProduct.sweet_id, SweetProduct.sweet_name, SweetProduct.quantity_in_stock
+                ),
+                batch
+            ).all())
+    if updates:
+        # Updates never change stock, so they have nothing to publish
+        db.execute(update(SweetProduct), updates)
+    return created
+
+
+async def import_catalog(db: AnySession, records: AsyncIterator[ParsedRecord]) -> BulkImportResult:
+    """Validate streamed records in chunks and upsert each chunk as one batch.
+
+    A sweet_id already in the current chunk ends it early, so the repeat is
+    written after the first and updates it: the last row for an id wins.
+    """
+    result = BulkImportResult()
+    chunk: List[Tuple[int, SweetImportRow]] = []
+    chunk_ids = set()
+
+    async for row_number, fields, parse_error in records:
+        if parse_error:
+            result.add_error(row_number, [parse_error])
+            continue
+
+        row, errors = validate_record(fields)
+        if errors:
+            result.add_error(row_number, errors)
+            continue
+
+        if row.sweet_id is not None and row.sweet_id in chunk_ids:
+            await run_in_session(db, write_chunk, chunk, result)
+            chunk, chunk_ids = [], set()
+        chunk.append((row_number, row))
+        if row.sweet_id is not None:
+            chunk_ids.add(row.sweet_id)
+        if len(chunk) >= BULK_IMPORT_CHUNK_SIZE:
+            await run_in_session(db, write_chunk, chunk, result)
+            chunk, chunk_ids = [], set()
+
+    if chunk:
+        await run_in_session(db, write_chunk, chunk, result)
+    return result
+
+
+def _export_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def export_catalog(db: Session, export_format: str) -> Iterator[Union[str, bytes]]:
+    """Stream the catalog in sweet_id order, one DB batch at a time."""
+    columns = [getattr(SweetProduct, name) for name in EXPORT_FIELDS]
+    result = db.execute(
+        select(*columns)
+        .order_by(SweetProduct.sweet_id)
+        .execution_options(yield_per=BULK_EXPORT_BATCH_SIZE)
+    )
+
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(EXPORT_FIELDS)
+        for batch in result.partitions():
+            writer.writerows(
+                ["" if value is None else _export_value(value) for value in row]
+                for row in batch
+            )
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+        return
+
+    if export_format == "json":
+        yield from stream_sweet_rows(result.partitions(), EXPORT_FIELDS)
+        return
+
+    for batch in result.partitions():
+        yield "".join(
+            json.dumps(
+                {name: _export_value(value) for name, value in zip(EXPORT_FIELDS, row)},
+                separators=(",", ":")
+            ) + "\n"
+            for row in batch
+        )
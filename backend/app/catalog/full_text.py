@@ -0,0 +1,170 @@
+"""
+Full-text search over sweet names and descriptions.
+
+SQLite uses an FTS5 external-content table kept in sync with
+sweet_products by triggers. PostgreSQL uses GIN-indexed tsvector
+expressions. Any other backend falls back to ILIKE.
+"""
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Index, column, event, func, literal_column, or_, table
+from sqlalchemy.dialects import postgresql  # noqa: F401 - registers to_tsvector()/to_tsquery()
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Query
+
+from app.models import SweetProduct
+
+FTS_TABLE = "sweet_products_fts"
+
+# bm25 column weights: a hit in the name outranks one in the description
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+SQLITE_FTS_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        sweet_name, sweet_description,
+        content='sweet_products', content_rowid='sweet_id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON sweet_products BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, sweet_name, sweet_description)
+        VALUES (new.sweet_id, new.sweet_name, new.sweet_description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON sweet_products BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, sweet_name, sweet_description)
+        VALUES ('delete', old.sweet_id, old.sweet_name, old.sweet_description);
+    END
+    """,
+    # Stock updates do not touch the indexed columns, so they skip this trigger
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF sweet_name, sweet_description ON sweet_products BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, sweet_name, sweet_description)
+        VALUES ('delete', old.sweet_id, old.sweet_name, old.sweet_description);
+        INSERT INTO {FTS_TABLE}(rowid, sweet_name, sweet_description)
+        VALUES (new.sweet_id, new.sweet_name, new.sweet_description);
+    END
+    """,
+]
+
+fts_table = table(FTS_TABLE, column("rowid"))
+
+# PostgreSQL: queries must repeat these exact expressions for the GIN indexes to apply
+_SIMPLE = literal_column("'simple'")
+PG_NAME_VECTOR = func.to_tsvector(_SIMPLE, SweetProduct.sweet_name)
+PG_DOCUMENT_VECTOR = func.to_tsvector(
+    _SIMPLE,
+    func.coalesce(SweetProduct.sweet_name, literal_column("''"))
+    .op("||")(literal_column("' '"))
+    .op("||")(func.coalesce(SweetProduct.sweet_description, literal_column("''")))
+)
+PG_SEARCH_INDEXES = [
+    Index(
+        "ix_sweet_products_name_tsv", PG_NAME_VECTOR,
+        postgresql_using="gin", info={"dialect": "postgresql"}
+    ).ddl_if(dialect="postgresql"),
+    Index(
+        "ix_sweet_products_document_tsv", PG_DOCUMENT_VECTOR,
+        postgresql_using="gin", info={"dialect": "postgresql"}
+    ).ddl_if(dialect="postgresql"),
+]
+for _index in PG_SEARCH_INDEXES:
+    SweetProduct.__table__.append_constraint(_index)
+
+
+def search_terms(text: Optional[str]) -> List[str]:
+    """Split user input into lower-case word tokens, dropping FTS operators."""
+    return re.findall(r"\w+", text.lower()) if text else []
+
+
+def create_sqlite_full_text_index(connection: Connection) -> None:
+    """Create the FTS5 table and triggers, back-filling rows that predate them."""
+    existed = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE name = ?", (FTS_TABLE,)
+    ).first()
+    for statement in SQLITE_FTS_DDL:
+        connection.exec_driver_sql(statement)
+    if not existed:
+        connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def ensure_full_text_index(connection: Connection) -> None:
+    """Idempotently install the FTS5 table for databases created before it existed.
+
+    The PostgreSQL GIN indexes are ordinary table indexes and are handled by
+    initialize_database along with the others.
+    """
+    if connection.dialect.name == "sqlite":
+        create_sqlite_full_text_index(connection)
+
+
+@event.listens_for(SweetProduct.__table__, "after_create")
+def _create_full_text_index(target, connection, **kwargs) -> None:
+    if connection.dialect.name == "sqlite":
+        create_sqlite_full_text_index(connection)
+
+
+@event.listens_for(SweetProduct.__table__, "before_drop")
+def _drop_full_text_index(target, connection, **kwargs) -> None:
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def _sqlite_match(name_terms: List[str], text_terms: List[str]) -> str:
+    clauses = []
+    if name_terms:
+        clauses.append("sweet_name : (" + " ".join(f'"{term}"*' for term in name_terms) + ")")
+    if text_terms:
+        clauses.append("(" + " ".join(f'"{term}"*' for term in text_terms) + ")")
+    return " AND ".join(clauses)
+
+
+def apply_text_search(
+    query: Query,
+    dialect_name: str,
+    name: Optional[str] = None,
+    text: Optional[str] = None
+) -> Tuple[Query, Optional[object]]:
+    """Filter by prefix-matching words in the name and/or name+description.
+
+    Returns the filtered query and a relevance ordering expression (best
+    match first), or None when no text filter applies.
+    """
+    name_terms, text_terms = search_terms(name), search_terms(text)
+    if not name_terms and not text_terms:
+        return query, None
+
+    if dialect_name == "sqlite":
+        query = query.join(fts_table, fts_table.c.rowid == SweetProduct.sweet_id).filter(
+            literal_column(FTS_TABLE).op("MATCH")(_sqlite_match(name_terms, text_terms))
+        )
+        rank = func.bm25(literal_column(FTS_TABLE), NAME_WEIGHT, DESCRIPTION_WEIGHT)
+        return query, rank
+
+    if dialect_name == "postgresql":
+        rank = None
+        if name_terms:
+            name_query = func.to_tsquery(_SIMPLE, " & ".join(f"{t}:*" for t in name_terms))
+            query = query.filter(PG_NAME_VECTOR.op("@@")(name_query))
+            rank = func.ts_rank(PG_NAME_VECTOR, name_query)
+        if text_terms:
+            text_query = func.to_tsquery(_SIMPLE, " & ".join(f"{t}:*" for t in text_terms))
+            query = query.filter(PG_DOCUMENT_VECTOR.op("@@")(text_query))
+            rank = func.ts_rank(PG_DOCUMENT_VECTOR, text_query)
+        return query, rank.desc()
+
+    # Generic fallback: word-prefix semantics are approximated with substring matches
+    for term in name_terms:
+        query = query.filter(SweetProduct.sweet_name.ilike(f"%{term}%"))
+    for term in text_terms:
+        query = query.filter(or_(
+            SweetProduct.sweet_name.ilike(f"%{term}%"),
+            SweetProduct.sweet_description.ilike(f"%{term}%")
+        ))
+    return query, None
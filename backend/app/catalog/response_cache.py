@@ -0,0 +1,268 @@
+"""
+Conditional (ETag) responses and a serialized-body cache for catalog reads.
+
+The catalog version is read from shared state in one query: the
+catalog_state counter and the newest inventory_movements id. Stock changes
+(purchases, restocks, checkouts, hot-SKU write-backs) always append a
+ledger movement, so they move the version without any extra write. Other
+catalog writes (creating, editing, deleting or bulk-importing sweets) are
+rare, and bump the counter in their own transaction. Either way the new
+version becomes visible together with the data. A read's strong ETag
+hashes the version with the request path and query string, so a matching
+If-None-Match gets a 304. Serialized bodies are cached in an LRU keyed the
+same way.
+
+On databases where transactions can commit out of movement_id order
+(PostgreSQL), a stock change that commits after a higher-numbered one is
+picked up with the next movement, or when its cached body expires.
+
+Each worker keeps the version it last read from each database (the
+primary and every read replica) for CATALOG_VERSION_CHECK_SECONDS, so cache
+hits and 304s run no SQL. The version is always read from the database
+the page is built from, so a lagging replica's page is cached under the
+replica's own, older version. A commit in this process drops those copies
+at once. A write committed by another worker is picked up within one
+check interval. Set it to 0 to read the row on every request.
+"""
+import hashlib
+import os
+import threading
+import time
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from fastapi import Request, Response, status
+from sqlalchemy import Update, event, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.cache import TTLCache
+from app.database import AnySession, run_in_session
+from app.models import CatalogState, InventoryMovement, SweetProduct
+
+CATALOG_CACHE_MAX_ENTRIES = int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", "512"))
+CATALOG_CACHE_TTL_SECONDS = float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "300"))
+# How long a worker trusts the version it last read before reading it again
+CATALOG_VERSION_CHECK_SECONDS = float(os.getenv("CATALOG_VERSION_CHECK_SECONDS", "1"))
+
+# Authenticated responses: browsers may store them but must revalidate every time
+CACHE_CONTROL = "private, no-cache"
+
+CATALOG_STATE_ID = 1
+
+# Session.info key naming the database a read session is on; unset means the primary
+CATALOG_SOURCE_KEY = "catalog_source"
+PRIMARY_SOURCE = "primary"
+
+
+class SharedVersion(NamedTuple):
+    """The catalog version as every worker sees it."""
+    edits: int
+    last_movement_id: int
+
+    def __str__(self) -> str:
+        return f"{self.edits}.{self.last_movement_id}"
+
+
+def read_catalog_version(session: Session) -> SharedVersion:
+    edits, last_movement_id = session.execute(select(
+        select(CatalogState.catalog_version)
+        .where(CatalogState.state_id == CATALOG_STATE_ID)
+        .scalar_subquery(),
+        select(func.max(InventoryMovement.movement_id)).scalar_subquery()
+    )).one()
+    return SharedVersion(edits or 0, last_movement_id or 0)
+
+
+def ensure_catalog_state(connection) -> None:
+    """Create the version row up front, so concurrent first writes only ever update it."""
+    exists = connection.execute(
+        select(CatalogState.state_id).where(CatalogState.state_id == CATALOG_STATE_ID)
+    ).first()
+    if exists is None:
+        connection.execute(insert(CatalogState).values(state_id=CATALOG_STATE_ID, catalog_version=0))
+
+
+def bump_catalog_version(executor) -> None:
+    """Increment the edit counter on ``executor``'s (a Session or Connection) transaction.
+
+    Only for writes that do not append a ledger movement: the single row
+    serializes every transaction that updates it.
+    """
+    bumped = executor.execute(
+        update(CatalogState)
+        .where(CatalogState.state_id == CATALOG_STATE_ID)
+        .values(catalog_version=CatalogState.catalog_version + 1)
+    )
+    if bumped.rowcount == 0:
+        executor.execute(insert(CatalogState).values(state_id=CATALOG_STATE_ID, catalog_version=1))
+
+
+def catalog_source(session: AnySession) -> str:
+    """The database ``session`` reads from: PRIMARY_SOURCE or a replica's name."""
+    return session.info.get(CATALOG_SOURCE_KEY, PRIMARY_SOURCE)
+
+
+class CatalogVersion:
+    """This worker's copy of the shared catalog version, per database it reads from."""
+
+    def __init__(self, check_seconds: float = CATALOG_VERSION_CHECK_SECONDS, clock=time.monotonic):
+        self.check_seconds = check_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        # source -> (version, read_at)
+        self._values: Dict[str, Tuple[SharedVersion, float]] = {}
+        # Counts local commits, so a read that raced one is not kept
+        self._generation = 0
+
+    def cached(self, source: str = PRIMARY_SOURCE) -> Optional[SharedVersion]:
+        """The version last read from ``source``, or None once it is older than ``check_seconds``."""
+        with self._lock:
+            entry = self._values.get(source)
+            if entry is None or self._clock() - entry[1] >= self.check_seconds:
+                return None
+            return entry[0]
+
+    def refresh(self, session: Session, source: str = PRIMARY_SOURCE) -> SharedVersion:
+        """Read the shared version through ``session`` and remember it for ``source``."""
+        with self._lock:
+            generation = self._generation
+        value = read_catalog_version(session)
+        # End the read so the session's connection goes back to the pool
+        session.rollback()
+        with self._lock:
+            if generation == self._generation:
+                self._values[source] = (value, self._clock())
+        return value
+
+    def committed(self) -> None:
+        """A catalog write committed in this process: forget the versions read before it."""
+        with self._lock:
+            self._generation += 1
+            self._values.clear()
+
+    def clear(self) -> None:
+        self.committed()
+
+
+class CachedBody(NamedTuple):
+    body: bytes
+    headers: Dict[str, str]
+
+
+catalog_version = CatalogVersion()
+catalog_response_cache = TTLCache(
+    max_entries=CATALOG_CACHE_MAX_ENTRIES,
+    ttl_seconds=CATALOG_CACHE_TTL_SECONDS
+)
+
+
+def request_key(request: Request) -> str:
+    """Canonical path + query string, independent of parameter order."""
+    params = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{params}"
+
+
+def compute_etag(version: SharedVersion, key: str) -> str:
+    digest = hashlib.sha256(f"{version}|{key}".encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses weak comparison, so W/ prefixes are ignored."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(
+        (tag[2:] if tag.startswith("W/") else tag) == etag for tag in candidates
+    )
+
+
+async def cached_catalog_response(
+    request: Request,
+    db: AnySession,
+    build: Callable[[Session], Tuple[bytes, Dict[str, str]]]
+) -> Response:
+    """Serve a catalog read from validators or cache, building it only on a miss.
+
+    ``build(session)`` runs the query and returns the encoded body plus any
+    extra headers (such as the next-page cursor).
+    """
+    source = catalog_source(db)
+    version = catalog_version.cached(source)
+    if version is None:
+        version = await run_in_session(db, catalog_version.refresh, source)
+    key = request_key(request)
+    etag = compute_etag(version, key)
+    validators = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validators)
+
+    cached = catalog_response_cache.get((version, key))
+    if cached is None:
+        body, headers = await run_in_session(db, build)
+        cached = CachedBody(body, headers)
+        catalog_response_cache.set((version, key), cached)
+
+    return Response(
+        content=cached.body,
+        media_type="application/json",
+        headers={**cached.headers, **validators}
+    )
+
+
+# ==================== Write tracking ====================
+
+# A catalog write that has no ledger movement: bump the edit counter
+_EDIT_FLAG = "catalog_edited"
+# A stock-only UPDATE: its ledger movement moves the version
+_STOCK_FLAG = "catalog_stock_changed"
+
+
+def _is_stock_only_update(orm_execute_state) -> bool:
+    """A single UPDATE that sets nothing but quantity_in_stock (stock_operations, hot-SKU write-back)."""
+    statement = orm_execute_state.statement
+    if not isinstance(statement, Update) or orm_execute_state.parameters:
+        return False
+    # The statement's SET clause; empty for executemany updates, which carry values per row
+    written = {getattr(column, "key", column) for column in statement._values or ()}
+    return written == {SweetProduct.quantity_in_stock.key}
+
+
+@event.listens_for(Session, "after_flush")
+def _track_unit_of_work_writes(session: Session, flush_context) -> None:
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, SweetProduct):
+            session.info[_EDIT_FLAG] = True
+            return
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_writes(orm_execute_state) -> None:
+    is_write = orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert
+    mapper = orm_execute_state.bind_mapper
+    if is_write and mapper is not None and mapper.class_ is SweetProduct:
+        flag = _STOCK_FLAG if _is_stock_only_update(orm_execute_state) else _EDIT_FLAG
+        orm_execute_state.session.info[flag] = True
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_shared_version(session: Session) -> None:
+    if session.new or session.dirty or session.deleted:
+        # Commit's own flush runs after this hook and may be the catalog write
+        session.flush()
+    if session.info.get(_EDIT_FLAG):
+        bump_catalog_version(session)
+
+
+@event.listens_for(Session, "after_commit")
+def _forget_version_after_commit(session: Session) -> None:
+    # Only once the data is visible, so no reader caches pre-commit rows as current
+    edited = session.info.pop(_EDIT_FLAG, False)
+    if session.info.pop(_STOCK_FLAG, False) or edited:
+        catalog_version.committed()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_write_flag(session: Session) -> None:
+    session.info.pop(_EDIT_FLAG, None)
+    session.info.pop(_STOCK_FLAG, None)
@@ -0,0 +1,153 @@
+"""
+Query planning for catalog search: filters, sort order and keyset pages.
+
+Every sort order ends in sweet_id so page boundaries are stable, and each
+one lines up with an index on sweet_products:
+
+- price  -> ix_sweet_products_price_id (or ix_sweet_products_category_price
+            when a category is given)
+- name   -> ix_sweet_products_sweet_name
+- stock  -> ix_sweet_products_quantity_in_stock
+- newest -> primary key, newest first
+"""
+import math
+from typing import Any, Callable, NamedTuple, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Query, Session
+
+from app.models import SweetProduct
+from app.catalog.full_text import apply_text_search
+from app.pagination import decode_cursor, encode_cursor
+
+SORT_COLUMNS = {
+    "price": SweetProduct.sweet_price,
+    "name": SweetProduct.sweet_name,
+    "stock": SweetProduct.quantity_in_stock,
+    "newest": SweetProduct.sweet_id,
+}
+DEFAULT_DESCENDING = {"price": False, "name": False, "stock": True, "newest": True}
+
+SORT_PATTERN = "^(relevance|price|name|stock|newest)$"
+
+# Largest integer a database column can bind; bigger cursor values are forged
+_MAX_INTEGER = 2 ** 63 - 1
+
+
+class SearchCriteria(NamedTuple):
+    """Filters and paging options accepted by GET /api/sweets/search."""
+    name: Optional[str] = None
+    q: Optional[str] = None
+    category: Optional[str] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    in_stock_only: bool = False
+    sort: Optional[str] = None
+    order: Optional[str] = None
+
+
+class SearchPlan(NamedTuple):
+    """A ready-to-run page query plus a function deriving the next cursor."""
+    query: Query
+    next_cursor: Callable[[SweetProduct], str]
+
+
+def invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid pagination cursor"
+    )
+
+
+def _valid_key(column, value: Any) -> bool:
+    """Whether a cursor key value has the type of the column it is compared with."""
+    if column is SweetProduct.sweet_name:
+        return isinstance(value, str)
+    if isinstance(value, bool):
+        return False
+    if column is SweetProduct.sweet_price:
+        return isinstance(value, (int, float)) and math.isfinite(value)
+    # sweet_id and quantity_in_stock
+    return isinstance(value, int) and abs(value) <= _MAX_INTEGER
+
+
+def plan_search(
+    db: Session,
+    criteria: SearchCriteria,
+    page_size: int,
+    cursor: Optional[str] = None,
+    entities: tuple = (SweetProduct,)
+) -> SearchPlan:
+    """Build the filtered, ordered and limited query for one search page.
+
+    Fetches ``page_size + 1`` rows so the caller can tell whether another
+    page exists.
+    """
+    query = db.query(*entities)
+    query, relevance = apply_text_search(
+        query, db.get_bind().dialect.name, name=criteria.name, text=criteria.q
+    )
+
+    if criteria.category:
+        # Case-insensitive equality matches the lower(sweet_category) index
+        query = query.filter(func.lower(SweetProduct.sweet_category) == criteria.category.strip().lower())
+    if criteria.min_price is not None:
+        query = query.filter(SweetProduct.sweet_price >= criteria.min_price)
+    if criteria.max_price is not None:
+        query = query.filter(SweetProduct.sweet_price <= criteria.max_price)
+    if criteria.in_stock_only:
+        query = query.filter(SweetProduct.quantity_in_stock > 0)
+
+    sort = criteria.sort or ("relevance" if relevance is not None else None)
+    position = decode_cursor(cursor) if cursor else None
+    if position is not None and position.get("s") != sort:
+        raise invalid_cursor()
+
+    if sort == "relevance":
+        return _plan_relevance_page(query, relevance, page_size, position)
+
+    if sort is None:
+        column, descending = SweetProduct.sweet_id, False
+    else:
+        column = SORT_COLUMNS[sort]
+        descending = DEFAULT_DESCENDING[sort] if criteria.order is None else criteria.order == "desc"
+
+    keys = [column] if column is SweetProduct.sweet_id else [column, SweetProduct.sweet_id]
+    if position is not None:
+        values = position.get("k")
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise invalid_cursor()
+        if not all(_valid_key(key, value) for key, value in zip(keys, values)):
+            raise invalid_cursor()
+        boundary = tuple_(*keys) if len(keys) > 1 else keys[0]
+        after = tuple_(*values) if len(keys) > 1 else values[0]
+        query = query.filter(boundary < after if descending else boundary > after)
+
+    query = query.order_by(*(key.desc() if descending else key.asc() for key in keys))
+
+    def next_cursor(last_row) -> str:
+        return encode_cursor({"s": sort, "k": [getattr(last_row, key.key) for key in keys]})
+
+    return SearchPlan(query.limit(page_size + 1), next_cursor)
+
+
+def _plan_relevance_page(query: Query, relevance, page_size: int, position: Optional[dict]) -> SearchPlan:
+    """Relevance scores are not stable keys, so relevance pages use an offset."""
+    if relevance is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="sort=relevance requires a name or q search"
+        )
+    offset = 0
+    if position is not None:
+        offset = position.get("o")
+        if not isinstance(offset, int) or isinstance(offset, bool) or not 0 <= offset <= _MAX_INTEGER:
+            raise invalid_cursor()
+
+    query = query.order_by(relevance, SweetProduct.sweet_id).offset(offset).limit(page_size + 1)
+
+    def next_cursor(last_row) -> str:
+        return encode_cursor({"s": "relevance", "o": offset + page_size})
+
+    return SearchPlan(query, next_cursor)
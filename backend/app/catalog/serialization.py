@@ -0,0 +1,57 @@
+"""
+JSON serialization of catalog rows for pre-encoded responses.
+
+Catalog reads select plain column rows rather than ORM entities, and
+encode them in one pass with a compiled pydantic serializer. Nothing is
+validated on the way out: the values come straight from typed columns, so
+building a SweetProductResponse per row would only cost time. The bytes
+are identical to what the List[SweetProductResponse] response model
+produces, and the routes keep that model, so the OpenAPI schema is
+unchanged.
+"""
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from pydantic import TypeAdapter
+# Pydantic rejects typing.TypedDict before Python 3.12; typing_extensions is pinned in requirements.txt
+from typing_extensions import TypedDict
+
+from app.models import SweetProduct
+from app.schemas import SweetProductResponse
+
+# Response field order, which is also the order keys appear in the JSON
+SWEET_FIELDS: Tuple[str, ...] = tuple(SweetProductResponse.model_fields)
+
+# The response model's fields as a TypedDict; total=False lets projections omit keys
+SweetRow = TypedDict(
+    "SweetRow",
+    {name: field.annotation for name, field in SweetProductResponse.model_fields.items()},
+    total=False
+)
+sweet_rows_adapter = TypeAdapter(List[SweetRow])
+
+
+def sweet_columns(fields: Optional[Sequence[str]] = None) -> tuple:
+    """SweetProduct column attributes to select for ``fields`` (default: every response field)."""
+    return tuple(getattr(SweetProduct, name) for name in (fields or SWEET_FIELDS))
+
+
+def serialize_sweet_rows(rows: Iterable[Sequence], fields: Optional[Sequence[str]] = None) -> bytes:
+    """Encode rows selected with sweet_columns(fields) as a JSON array of objects."""
+    names = tuple(fields or SWEET_FIELDS)
+    return sweet_rows_adapter.dump_json([dict(zip(names, row)) for row in rows])
+
+
+def stream_sweet_rows(batches: Iterable[Iterable[Sequence]], fields: Optional[Sequence[str]] = None) -> Iterator[bytes]:
+    """Encode batches of rows as one JSON array, yielding a chunk per batch.
+
+    Each batch goes through serialize_sweet_rows and its brackets are
+    replaced with the array's opening bracket or a separating comma, so
+    the concatenated chunks equal serialize_sweet_rows over every row.
+    """
+    opening = b"["
+    for batch in batches:
+        encoded = serialize_sweet_rows(batch, fields)
+        if len(encoded) > 2:
+            yield opening + encoded[1:-1]
+            opening = b","
+    yield b"[]" if opening == b"[" else b"]"
@@ -0,0 +1,249 @@
+"""
+Negotiated response compression: zstd, brotli or gzip.
+
+The encoding is chosen from the client's Accept-Encoding q-values, ties
+going to the order in COMPRESSION_ALGORITHMS. gzip is always available.
+brotli and zstd are used when the optional ``brotli`` and ``zstandard``
+packages are installed, and are skipped otherwise.
+
+A complete body shorter than COMPRESSION_MIN_SIZE goes out as is. A
+streamed body (the catalog export) is compressed chunk by chunk, and each
+chunk is flushed, so the client gets bytes as soon as the database yields
+rows instead of when the compressor's window fills. Server-Sent Events
+are never compressed, so a proxy cannot hold them back. A compressed
+response's strong ETag is sent as a weak one, because it no longer
+identifies these exact bytes; If-None-Match ignores the W/ prefix either
+way.
+"""
+import os
+import zlib
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+load_dotenv()
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# Server preference between encodings the client rates equally
+COMPRESSION_ALGORITHMS = [
+    name.strip() for name in os.getenv("COMPRESSION_ALGORITHMS", "zstd,br,gzip").split(",") if name.strip()
+]
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+# Brotli's higher qualities are for static assets; 4 keeps dynamic responses cheap
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+}
+UNCOMPRESSIBLE_TYPES = {"text/event-stream"}
+
+
+class StreamCompressor(ABC):
+    """Incremental compressor; ``compress`` returns whatever output is ready."""
+
+    @abstractmethod
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        """Compress ``data``; with ``flush``, also emit everything buffered so far."""
+
+    @abstractmethod
+    def finish(self) -> bytes:
+        """End the stream and return the remaining output."""
+
+
+class GzipCompressor(StreamCompressor):
+    def __init__(self, level: int = COMPRESSION_GZIP_LEVEL):
+        # wbits 16 + MAX_WBITS writes a gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        output = self._compressor.compress(data)
+        return output + self._compressor.flush(zlib.Z_SYNC_FLUSH) if flush else output
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliCompressor(StreamCompressor):
+    def __init__(self, quality: int = COMPRESSION_BROTLI_QUALITY):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        output = self._compressor.process(data)
+        return output + self._compressor.flush() if flush else output
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdCompressor(StreamCompressor):
+    def __init__(self, level: int = COMPRESSION_ZSTD_LEVEL):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        output = self._compressor.compress(data)
+        return output + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK) if flush else output
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def available_encodings(preference: List[str] = COMPRESSION_ALGORITHMS) -> Dict[str, Callable[[], StreamCompressor]]:
+    """Compressor factories by content-coding, in server preference order."""
+    installed = {"gzip": GzipCompressor}
+    if brotli is not None:
+        installed["br"] = BrotliCompressor
+    if zstandard is not None:
+        installed["zstd"] = ZstdCompressor
+    return {name: installed[name] for name in preference if name in installed}
+
+
+def choose_encoding(accept_encoding: str, supported: List[str]) -> Optional[str]:
+    """The supported coding the client rates highest, or None for identity."""
+    ratings: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        ratings[coding] = quality
+
+    best, best_quality = None, 0.0
+    for coding in supported:
+        quality = ratings.get(coding, ratings.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type in UNCOMPRESSIBLE_TYPES:
+        return False
+    return media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES or media_type.endswith("+json")
+
+
+class CompressionMiddleware:
+    """Compresses eligible HTTP responses with the best encoding the client accepts."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        encodings: Optional[Dict[str, Callable[[], StreamCompressor]]] = None
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = available_encodings() if encodings is None else encodings
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), list(self.encodings))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await CompressedResponder(self.app, encoding, self.encodings[encoding], self.minimum_size)(
+            scope, receive, send
+        )
+
+
+class CompressedResponder:
+    """Holds the response start until the first body chunk shows whether to compress."""
+
+    def __init__(self, app: ASGIApp, encoding: str, factory: Callable[[], StreamCompressor], minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.factory = factory
+        self.minimum_size = minimum_size
+        self.send: Send = None
+        self.start: Optional[Message] = None
+        self.compressor: Optional[StreamCompressor] = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            eligible = (
+                message["status"] not in (204, 304)
+                and "content-encoding" not in headers
+                and is_compressible(headers.get("content-type", ""))
+            )
+            if eligible:
+                self.start = message
+            else:
+                self.passthrough = True
+                await self.send(message)
+            return
+        if self.passthrough or message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start is not None:
+            start, self.start = self.start, None
+            headers = MutableHeaders(raw=start["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            self.compressor = self.factory()
+            headers["Content-Encoding"] = self.encoding
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                body = self.compressor.compress(body, flush=False) + self.compressor.finish()
+                headers["Content-Length"] = str(len(body))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            await self.send(start)
+
+        if more_body:
+            await self.send({
+                "type": "http.response.body",
+                "body": self.compressor.compress(body, flush=True),
+                "more_body": True,
+            })
+        else:
+            await self.send({
+                "type": "http.response.body",
+                "body": self.compressor.compress(body, flush=False) + self.compressor.finish(),
+            })
@@ -1,27 +1,62 @@
 """
 Database configuration and session management.
+
+Set DATABASE_ASYNC=true to serve requests from an AsyncEngine (aiosqlite
+for SQLite, asyncpg for PostgreSQL). The sync engine is always created:
+schema setup and streaming export use it in both modes.
 """
 import os
+from typing import Callable, Dict, TypeVar, Union
+
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+
+from app.db_tuning import create_tuned_async_engine, create_tuned_engine
 
 load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./sweetshop.db")
+DATABASE_ASYNC = os.getenv("DATABASE_ASYNC", "false").lower() in ("1", "true", "yes")
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+T = TypeVar("T")
+
+# What get_db yields, depending on DATABASE_ASYNC
+AnySession = Union[Session, AsyncSession]
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}
-)
+
+def async_database_url(url: str) -> str:
+    """Swap a sync driver for its async counterpart, e.g. sqlite:// -> sqlite+aiosqlite://."""
+    scheme, separator, rest = url.partition("://")
+    backend = scheme.split("+")[0]
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}' databases")
+    return f"{ASYNC_DRIVERS[backend]}{separator}{rest}"
+
+
+engine = create_tuned_engine(SQLALCHEMY_DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = None
+AsyncSessionLocal = None
+if DATABASE_ASYNC:
+    async_engine = create_tuned_async_engine(
+        os.getenv("ASYNC_DATABASE_URL") or async_database_url(SQLALCHEMY_DATABASE_URL)
+    )
+    # Objects stay readable after commit: lazy refreshes cannot run outside the greenlet
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 DatabaseBaseModel = declarative_base()
 
 
-def get_db():
-    """Dependency that provides database session."""
+def get_sync_db():
+    """Dependency that provides a sync database session in either mode."""
     db = SessionLocal()
     try:
         yield db
@@ -29,6 +64,58 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Dependency that provides an AsyncSession."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+get_db = get_async_db if DATABASE_ASYNC else get_sync_db
+
+
+async def run_in_session(
+    db: AnySession,
+    operation: Callable[..., T],
+    *args
+) -> T:
+    """Run ``operation(session, *args)`` without blocking the event loop.
+
+    An AsyncSession runs the ORM code on the event loop via run_sync, so no
+    thread is held while waiting on the database. A sync Session runs it in
+    the threadpool.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(operation, *args)
+    return await run_in_threadpool(operation, db, *args)
+
+
 def initialize_database():
-    """Creates all database tables."""
-    DatabaseBaseModel.metadata.create_all(bind=engine)
\ No newline at end of file
+    """Creates all database tables and the catalog search index."""
+    from app.catalog.full_text import ensure_full_text_index
+    from app.catalog.response_cache import ensure_catalog_state
+
+    DatabaseBaseModel.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        # create_all skips existing tables, so add indexes introduced since then.
+        # Dialect-specific indexes declare their dialect in Index.info.
+        for table in DatabaseBaseModel.metadata.sorted_tables:
+            for index in table.indexes:
+                if index.info.get("dialect", connection.dialect.name) == connection.dialect.name:
+                    connection.execute(CreateIndex(index, if_not_exists=True))
+        ensure_full_text_index(connection)
+        ensure_catalog_state(connection)
+
+
+def database_engines() -> Dict[str, Engine]:
+    """Every engine this process serves requests from, by role."""
+    engines = {"primary": engine}
+    if async_engine is not None:
+        engines["primary_async"] = async_engine.sync_engine
+    return engines
+
+
+async def dispose_engines():
+    """Close pooled connections on shutdown."""
+    if async_engine is not None:
+        await async_engine.dispose()
+    engine.dispose()
@@ -0,0 +1,252 @@
+"""
+Idempotency-Key support for purchase, restock and checkout.
+
+A client that may retry a write sends the same Idempotency-Key header on
+every attempt. The first attempt runs normally, and its response is
+inserted into idempotency_keys in the same transaction as the stock
+change. Later attempts replay that response, marked with
+Idempotent-Replayed: true, and never touch inventory.
+
+Keys are scoped per user and expire after IDEMPOTENCY_TTL_SECONDS. Recent
+results are also held in an in-memory LRU, so a burst of retries is
+answered without a query. A duplicate that arrives while the first attempt
+is still running in this process waits for it. In another process the
+duplicate runs, then fails on the primary key at commit and rolls back
+before replaying the winner's result.
+
+Failed attempts store nothing, because they left inventory unchanged; a
+retry runs again. A key reused with a different request gets 422.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional, Tuple, Type
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.cache import TTLCache
+from app.database import AnySession, run_in_session
+from app.models import IdempotencyRecord
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_CACHE_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_CACHE_MAX_ENTRIES", "10000"))
+# How long a duplicate waits for the in-flight attempt before giving up with 409
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "30"))
+# Seconds between purges of expired keys; 0 disables the purger
+IDEMPOTENCY_PURGE_INTERVAL = float(os.getenv("IDEMPOTENCY_PURGE_INTERVAL", "3600"))
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyClaim(NamedTuple):
+    """One request's key, scoped to its user, and the fingerprint of what it asked for."""
+    user_id: int
+    key: str
+    fingerprint: str
+
+    @property
+    def cache_key(self) -> Tuple[int, str]:
+        return self.user_id, self.key
+
+
+class StoredResult(NamedTuple):
+    fingerprint: str
+    status_code: int
+    body: dict
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(moment: datetime) -> datetime:
+    return moment if moment.tzinfo is not None else moment.replace(tzinfo=timezone.utc)
+
+
+def idempotency_claim(
+    key: Optional[str],
+    user_id: int,
+    request: Request,
+    payload: BaseModel
+) -> Optional[IdempotencyClaim]:
+    """The claim for a request, or None when it carries no Idempotency-Key."""
+    if key is None:
+        return None
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{IDEMPOTENCY_KEY_HEADER} must be 1-{MAX_KEY_LENGTH} characters"
+        )
+    digest = hashlib.sha256(
+        f"{request.method} {request.url.path}\n{payload.model_dump_json()}".encode("utf-8")
+    ).hexdigest()
+    return IdempotencyClaim(user_id, key, digest)
+
+
+def stage_result(db: Session, claim: Optional[IdempotencyClaim], body: dict, status_code: int = 200) -> None:
+    """Add the response to the caller's transaction, so it commits with the write it describes."""
+    if claim is None:
+        return
+    db.add(IdempotencyRecord(
+        user_id=claim.user_id,
+        idempotency_key=claim.key,
+        request_fingerprint=claim.fingerprint,
+        status_code=status_code,
+        response_body=json.dumps(body),
+        expires_at=_utc_now() + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS),
+    ))
+
+
+def save_result(db: Session, claim: Optional[IdempotencyClaim], body: dict, status_code: int = 200) -> None:
+    """Store the response in its own transaction, for writes that do not commit through ``db``."""
+    if claim is None:
+        return
+    stage_result(db, claim, body, status_code)
+    db.commit()
+
+
+def load_result(db: Session, claim: IdempotencyClaim) -> Optional[StoredResult]:
+    """The stored result for a claim's key; an expired one is deleted so the key can be reused."""
+    record = db.get(IdempotencyRecord, (claim.user_id, claim.key))
+    if record is None:
+        return None
+    if _as_utc(record.expires_at) <= _utc_now():
+        db.delete(record)
+        db.commit()
+        return None
+    result = StoredResult(record.request_fingerprint, record.status_code, json.loads(record.response_body))
+    # End the read so the session's connection goes back to the pool
+    db.rollback()
+    return result
+
+
+def purge_expired(db: Session) -> int:
+    deleted = db.execute(delete(IdempotencyRecord).where(IdempotencyRecord.expires_at <= _utc_now())).rowcount
+    db.commit()
+    return deleted
+
+
+def key_reused() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail=f"{IDEMPOTENCY_KEY_HEADER} was already used for a different request"
+    )
+
+
+def still_in_progress() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"A request with this {IDEMPOTENCY_KEY_HEADER} is still in progress"
+    )
+
+
+class IdempotencyStore:
+    """Replays stored results and serializes duplicates of in-flight requests."""
+
+    def __init__(
+        self,
+        max_entries: int = IDEMPOTENCY_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = IDEMPOTENCY_TTL_SECONDS,
+        wait_seconds: float = IDEMPOTENCY_WAIT_SECONDS
+    ):
+        self.results = TTLCache(max_entries, ttl_seconds)
+        self.wait_seconds = wait_seconds
+        self._in_flight: Dict[Tuple[int, str], asyncio.Event] = {}
+
+    async def run(
+        self,
+        db: AnySession,
+        claim: Optional[IdempotencyClaim],
+        operation: Callable[[], Awaitable[dict]],
+        response_model: Optional[Type[BaseModel]] = None
+    ):
+        """Run ``operation`` once per claim and replay its result for every duplicate.
+
+        ``operation`` must pass the claim to stage_result (or save_result)
+        with the response body it returns. Replays are shaped by
+        ``response_model`` like the original response was.
+        """
+        if claim is None:
+            return await operation()
+
+        while True:
+            replay = await self._replay(db, claim, response_model)
+            if replay is not None:
+                return replay
+            in_flight = self._in_flight.get(claim.cache_key)
+            if in_flight is None:
+                break
+            try:
+                await asyncio.wait_for(in_flight.wait(), self.wait_seconds)
+            except asyncio.TimeoutError:
+                raise still_in_progress()
+
+        done = asyncio.Event()
+        self._in_flight[claim.cache_key] = done
+        try:
+            body = await operation()
+        except IntegrityError:
+            # Another process committed this key first; our write rolled back
+            await run_in_session(db, Session.rollback)
+            replay = await self._replay(db, claim, response_model)
+            if replay is None:
+                raise
+            return replay
+        finally:
+            del self._in_flight[claim.cache_key]
+            done.set()
+        self.results.set(claim.cache_key, StoredResult(claim.fingerprint, status.HTTP_200_OK, body))
+        return body
+
+    async def _replay(
+        self,
+        db: AnySession,
+        claim: IdempotencyClaim,
+        response_model: Optional[Type[BaseModel]]
+    ) -> Optional[JSONResponse]:
+        stored = self.results.get(claim.cache_key)
+        if stored is None:
+            stored = await run_in_session(db, load_result, claim)
+            if stored is None:
+                return None
+            self.results.set(claim.cache_key, stored)
+        if stored.fingerprint != claim.fingerprint:
+            raise key_reused()
+        body = stored.body if response_model is None else response_model(**stored.body).model_dump(mode="json")
+        return JSONResponse(body, status_code=stored.status_code, headers={REPLAYED_HEADER: "true"})
+
+    def clear(self) -> None:
+        self.results.clear()
+        self._in_flight.clear()
+
+
+idempotency_store = IdempotencyStore()
+
+
+async def run_purger(session_factory: Callable[[], Session], interval: float) -> None:
+    """Background loop deleting expired idempotency keys."""
+    while True:
+        await asyncio.sleep(interval)
+        db = session_factory()
+        try:
+            await run_in_threadpool(purge_expired, db)
+        except Exception:
+            logger.exception("Idempotency key purge failed; will retry")
+        finally:
+            db.close()
@@ -0,0 +1,57 @@
+"""
+Whole-cart checkout: reserve stock for every line or for none of them.
+"""
+from typing import Dict, List
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import SweetProduct
+from app.schemas import CartLineRequest
+from app.inventory.stock_operations import StockChange, insufficient_stock, reserve_stock
+from app.pricing.engine import CartLine
+from app.pricing.money import to_paise
+
+
+def merge_cart_lines(lines: List[CartLineRequest]) -> Dict[int, int]:
+    """Collapse repeated sweet IDs into one quantity per sweet, keeping cart order."""
+    quantities: Dict[int, int] = {}
+    for line in lines:
+        quantities[line.sweet_id] = quantities.get(line.sweet_id, 0) + line.quantity_to_purchase
+    return quantities
+
+
+def cart_line(change: StockChange, quantity: int) -> CartLine:
+    """The pricing-engine line for a reserved quantity, at the price it was reserved at."""
+    return CartLine(change.sweet_id, change.sweet_category, to_paise(change.sweet_price), quantity)
+
+
+def reserve_cart(db: Session, quantities: Dict[int, int]) -> List[StockChange]:
+    """Reserve stock for every line in the caller's transaction.
+
+    Raises before any write when a product is missing or visibly short, and
+    leaves rollback of partial reservations to the caller otherwise.
+    """
+    available = dict(db.execute(
+        select(SweetProduct.sweet_id, SweetProduct.quantity_in_stock)
+        .where(SweetProduct.sweet_id.in_(quantities))
+    ).all())
+
+    missing = [sweet_id for sweet_id in quantities if sweet_id not in available]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Sweet(s) not found: {', '.join(map(str, missing))}"
+        )
+
+    for sweet_id, quantity in quantities.items():
+        if available[sweet_id] < quantity:
+            raise insufficient_stock(available[sweet_id], sweet_id, quantity)
+
+    # Lock rows in a stable order so concurrent carts cannot deadlock
+    changes = {
+        sweet_id: reserve_stock(db, sweet_id, quantities[sweet_id])
+        for sweet_id in sorted(quantities)
+    }
+    return [changes[sweet_id] for sweet_id in quantities]
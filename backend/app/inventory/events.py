@@ -0,0 +1,143 @@
+"""
+In-process bus for committed stock changes.
+
+Routes publish after their transaction commits, from the event loop or a
+threadpool worker. Each subscriber keeps only the latest pending quantity
+per sweet, so a burst of sales on one SKU collapses into a single pending
+event and a subscriber's backlog is bounded by the catalog size. A
+subscriber created with max_pending is dropped once that many distinct
+sweets are waiting, so one slow consumer cannot hold memory.
+
+The bus is per process; run one worker for every subscriber to see every
+change.
+"""
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.inventory.stock_operations import StockChange
+
+
+class StockEvent(NamedTuple):
+    """A sweet's stock level after a committed change, or its deletion."""
+    sweet_id: int
+    sweet_name: str
+    quantity: int
+    changed_at: float
+    removed: bool = False
+
+
+class StockSubscription:
+    """One consumer's pending events, coalesced to the latest per sweet."""
+
+    def __init__(self, max_pending: Optional[int] = None):
+        self.max_pending = max_pending
+        self.dropped = False
+        self._pending: Dict[int, StockEvent] = {}
+        self._lock = threading.Lock()
+        self._wake: Optional[Callable[[], None]] = None
+
+    def offer(self, event: StockEvent) -> bool:
+        """Queue ``event``; False once the subscription has been dropped."""
+        with self._lock:
+            if self.dropped:
+                return False
+            # Re-insert so pending events stay in order of their latest change
+            self._pending.pop(event.sweet_id, None)
+            self._pending[event.sweet_id] = event
+            if self.max_pending is not None and len(self._pending) > self.max_pending:
+                self.dropped = True
+                self._pending.clear()
+            wake = self._wake
+        if wake is not None:
+            wake()
+        return not self.dropped
+
+    def drain(self) -> List[StockEvent]:
+        """Take every pending event without waiting."""
+        with self._lock:
+            events = list(self._pending.values())
+            self._pending.clear()
+        return events
+
+    async def get(self, timeout: Optional[float] = None) -> List[StockEvent]:
+        """Wait up to ``timeout`` seconds for events; empty on timeout or once dropped."""
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+        with self._lock:
+            if self._pending or self.dropped:
+                events = list(self._pending.values())
+                self._pending.clear()
+                return events
+            self._wake = lambda: loop.call_soon_threadsafe(ready.set)
+        try:
+            await asyncio.wait_for(ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                self._wake = None
+        return self.drain()
+
+
+class StockEventBus:
+    """Fans committed stock changes out to every subscription."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Replaced on every (un)subscribe, so publishers iterate without locking
+        self._subscriptions: Tuple[StockSubscription, ...] = ()
+
+    def subscribe(self, max_pending: Optional[int] = None) -> StockSubscription:
+        subscription = StockSubscription(max_pending)
+        with self._lock:
+            self._subscriptions += (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription: StockSubscription) -> None:
+        with self._lock:
+            self._subscriptions = tuple(s for s in self._subscriptions if s is not subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def publish(self, events: Iterable[StockEvent]) -> None:
+        subscriptions = self._subscriptions
+        if not subscriptions:
+            return
+        dropped = []
+        for event in events:
+            for subscription in subscriptions:
+                if not subscription.offer(event):
+                    dropped.append(subscription)
+        for subscription in dropped:
+            self.unsubscribe(subscription)
+
+    def publish_changes(self, changes: Iterable[StockChange]) -> None:
+        """Publish the committed outcome of stock operations."""
+        if not self._subscriptions:
+            return
+        now = time.time()
+        self.publish(
+            StockEvent(change.sweet_id, change.sweet_name, change.new_quantity, now) for change in changes
+        )
+
+    def publish_level(self, sweet_id: int, sweet_name: str, quantity: int) -> None:
+        """Publish a stock level set directly, e.g. by a product edit."""
+        if self._subscriptions:
+            self.publish([StockEvent(sweet_id, sweet_name, quantity, time.time())])
+
+    def publish_removal(self, sweet_id: int, sweet_name: str) -> None:
+        """Publish that a sweet was deleted."""
+        if self._subscriptions:
+            self.publish([StockEvent(sweet_id, sweet_name, 0, time.time(), removed=True)])
+
+    def reset(self) -> None:
+        """Forget every subscription (tests)."""
+        with self._lock:
+            self._subscriptions = ()
+
+
+stock_events = StockEventBus()
@@ -0,0 +1,648 @@
+"""
+Hot-SKU mode: flash-sale stock served from a sharded in-memory counter.
+
+For a product in hot mode, purchases decrement one of HOT_SKU_SHARDS
+independently locked shards instead of updating its sweet_products row.
+Each reservation is appended to a journal before the purchase succeeds.
+A background flusher then writes the accumulated quantities back to
+quantity_in_stock in one transaction per interval.
+
+Invariants:
+
+- A shard never goes below zero, and the counter starts from the
+  committed stock, so the counter can never sell more than exists.
+- quantity_in_stock minus the not-yet-flushed reservations equals the
+  counter total. Restocks update the row first, then the counter.
+- Every reservation is in the journal before the buyer is told it
+  succeeded. Each flush stores the journal sequence it covered in
+  hot_stock_skus.flushed_sequence, so after a crash recover() replays
+  exactly the entries that never reached the database.
+- A flush writes the ledger movements for the sales it covers in the same
+  transaction as the stock update, and recover() writes them for replayed
+  entries, so the ledger matches quantity_in_stock after every commit.
+- A reservation whose purchase fails after it was journaled (its
+  idempotency record could not be saved) is released: a cancel line in
+  the journal makes recover() skip it, and its units go back on sale. If
+  a flush already wrote it back, a release movement puts the units back
+  and reverses the sale in the ledger and rollups.
+
+The counter lives in one process: run a single worker while any SKU is in
+hot mode.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+from contextlib import ExitStack
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models import HotStockSku, SweetProduct
+from app.inventory.ledger import (
+    purchase_movement,
+    record_movements,
+    release_movement,
+    restock_movement,
+    utc_now
+)
+from app.pricing.engine import CartLine, price_cart
+from app.pricing.money import to_paise, to_rupees
+from app.pricing.rules import ActiveRules, pricing_rules
+from app.inventory.stock_operations import (
+    StockChange,
+    add_stock,
+    insufficient_stock,
+    sweet_not_found
+)
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+HOT_SKU_SHARDS = int(os.getenv("HOT_SKU_SHARDS", "8"))
+# Seconds between write-backs; 0 disables the background flusher
+HOT_SKU_FLUSH_INTERVAL = float(os.getenv("HOT_SKU_FLUSH_INTERVAL", "0.5"))
+HOT_SKU_JOURNAL_PATH = os.getenv("HOT_SKU_JOURNAL_PATH", "./hot_sku.journal")
+HOT_SKU_JOURNAL_FSYNC = os.getenv("HOT_SKU_JOURNAL_FSYNC", "false").lower() in ("1", "true", "yes")
+
+
+class JournalEntry(NamedTuple):
+    """One journaled reservation, with what the ledger needs to record the sale."""
+    sequence: int
+    sweet_id: int
+    quantity: int
+    user_id: Optional[int] = None
+    unit_price: float = 0.0
+    charged: float = 0.0
+    coupon: Optional[str] = None
+    created_at: Optional[datetime] = None
+    sweet_category: Optional[str] = None
+    # Set on a cancel line: the sequence of the reservation it releases
+    cancels: Optional[int] = None
+
+    def movement(self) -> dict:
+        return purchase_movement(
+            self.sweet_id, self.quantity, self.unit_price, self.charged,
+            self.user_id, self.coupon, self.created_at, self.sweet_category
+        )
+
+    def release_movement(self) -> dict:
+        return release_movement(
+            self.sweet_id, self.quantity, self.unit_price, self.charged, self.user_id, self.coupon,
+            self.sweet_category
+        )
+
+
+def _parse_journal_line(line: bytes) -> Optional[JournalEntry]:
+    """Decode one journal line; None for a line torn by a crash."""
+    # A torn last line was never acknowledged to the buyer
+    if not line.endswith(b"\n"):
+        return None
+    if not line.startswith(b"{"):
+        # Journals written before the ledger hold "sequence sweet_id quantity"
+        parts = line.split()
+        return JournalEntry(*(int(part) for part in parts)) if len(parts) == 3 else None
+    try:
+        fields = json.loads(line)
+        if "cancels" in fields:
+            return JournalEntry(
+                sequence=fields["seq"], sweet_id=fields["sweet_id"], quantity=0, cancels=fields["cancels"]
+            )
+        return JournalEntry(
+            sequence=fields["seq"],
+            sweet_id=fields["sweet_id"],
+            quantity=fields["qty"],
+            user_id=fields.get("user_id"),
+            unit_price=fields.get("unit_price", 0.0),
+            charged=fields.get("charged", 0.0),
+            coupon=fields.get("coupon"),
+            created_at=datetime.fromisoformat(fields["at"]) if fields.get("at") else None,
+            sweet_category=fields.get("category"),
+        )
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def journal_unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Stock journal unavailable, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+class StockJournal:
+    """Append-only log of hot-SKU reservations, rotated at each flush.
+
+    Lines are written with a single os.write on an O_APPEND descriptor, so
+    they survive a process crash. Set HOT_SKU_JOURNAL_FSYNC to also survive
+    power loss, at the cost of an fsync per purchase.
+    """
+
+    def __init__(self, path: str, fsync: bool = False):
+        self.path = path
+        self.rotated_path = f"{path}.flushing"
+        self.fsync = fsync
+        self.sequence = 0
+        self._fd: Optional[int] = None
+
+    def _open(self) -> int:
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        return self._fd
+
+    def append(self, entry: JournalEntry) -> JournalEntry:
+        """Write ``entry`` under the next sequence number and return it as written."""
+        entry = entry._replace(sequence=self.sequence + 1)
+        line = json.dumps({
+            "seq": entry.sequence,
+            "sweet_id": entry.sweet_id,
+            "qty": entry.quantity,
+            "user_id": entry.user_id,
+            "unit_price": entry.unit_price,
+            "charged": entry.charged,
+            "coupon": entry.coupon,
+            "at": entry.created_at.isoformat() if entry.created_at else None,
+            "category": entry.sweet_category,
+        }, separators=(",", ":"))
+        fd = self._open()
+        os.write(fd, (line + "\n").encode("utf-8"))
+        if self.fsync:
+            os.fsync(fd)
+        self.sequence += 1
+        return entry
+
+    def append_cancel(self, entry: JournalEntry) -> None:
+        """Record that ``entry`` was released and must not be replayed."""
+        line = json.dumps(
+            {"seq": self.sequence + 1, "sweet_id": entry.sweet_id, "cancels": entry.sequence},
+            separators=(",", ":")
+        )
+        fd = self._open()
+        os.write(fd, (line + "\n").encode("utf-8"))
+        if self.fsync:
+            os.fsync(fd)
+        self.sequence += 1
+
+    def rotate(self) -> bool:
+        """Move the live file aside for a flush, unless an unflushed one is still there.
+
+        Returns whether a file was moved.
+        """
+        if os.path.exists(self.rotated_path) or not os.path.exists(self.path):
+            return False
+        self.close()
+        os.replace(self.path, self.rotated_path)
+        return True
+
+    def discard_rotated(self) -> None:
+        if os.path.exists(self.rotated_path):
+            os.remove(self.rotated_path)
+
+    def read(self) -> List[JournalEntry]:
+        """Journaled reservations, without the released ones or the cancel lines."""
+        entries = []
+        for path in (self.rotated_path, self.path):
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as journal_file:
+                for line in journal_file:
+                    entry = _parse_journal_line(line)
+                    if entry is not None:
+                        entries.append(entry)
+        cancelled = {entry.cancels for entry in entries if entry.cancels is not None}
+        return [entry for entry in entries if entry.cancels is None and entry.sequence not in cancelled]
+
+    def reset(self, sequence: int) -> None:
+        """Drop every entry (all are reflected in the database) and continue from ``sequence``."""
+        self.close()
+        for path in (self.rotated_path, self.path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.sequence = sequence
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class StockShard:
+    __slots__ = ("lock", "available")
+
+    def __init__(self, available: int):
+        self.lock = threading.Lock()
+        self.available = available
+
+
+class HotSku:
+    """In-memory stock for one product, split across independently locked shards."""
+
+    def __init__(
+        self,
+        sweet_id: int,
+        sweet_name: str,
+        sweet_category: str,
+        sweet_price: float,
+        stock: int,
+        shard_count: int
+    ):
+        self.sweet_id = sweet_id
+        self.sweet_name = sweet_name
+        self.sweet_category = sweet_category
+        self.sweet_price = sweet_price
+        base, extra = divmod(stock, shard_count)
+        self.shards = [StockShard(base + (1 if index < extra else 0)) for index in range(shard_count)]
+        self.closed = False
+
+    @property
+    def available(self) -> int:
+        """Total across shards; unlocked, so only a snapshot under concurrency."""
+        return sum(shard.available for shard in self.shards)
+
+    def take(self, quantity: int, record: Callable[[], None]) -> Optional[bool]:
+        """Reserve ``quantity`` and run ``record`` while still holding the shard lock(s).
+
+        Returns True when reserved, False when there is not enough stock and
+        None once the SKU has left hot mode. If ``record`` raises, the units
+        are returned to their shards.
+        """
+        count = len(self.shards)
+        start = random.randrange(count)
+        for offset in range(count):
+            shard = self.shards[(start + offset) % count]
+            with shard.lock:
+                if self.closed:
+                    return None
+                if shard.available >= quantity:
+                    shard.available -= quantity
+                    try:
+                        record()
+                    except BaseException:
+                        shard.available += quantity
+                        raise
+                    return True
+
+        # No single shard holds enough: lock all of them, in order, and gather
+        with ExitStack() as stack:
+            for shard in self.shards:
+                stack.enter_context(shard.lock)
+            if self.closed:
+                return None
+            if sum(shard.available for shard in self.shards) < quantity:
+                return False
+
+            taken, remaining = [], quantity
+            for shard in self.shards:
+                part = min(shard.available, remaining)
+                shard.available -= part
+                taken.append((shard, part))
+                remaining -= part
+                if not remaining:
+                    break
+            try:
+                record()
+            except BaseException:
+                for shard, part in taken:
+                    shard.available += part
+                raise
+            return True
+
+    def put(self, quantity: int) -> None:
+        shard = random.choice(self.shards)
+        with shard.lock:
+            if not self.closed:
+                shard.available += quantity
+
+    def lock_all(self) -> ExitStack:
+        stack = ExitStack()
+        for shard in self.shards:
+            stack.enter_context(shard.lock)
+        return stack
+
+
+class HotReservation(NamedTuple):
+    """A hot-SKU sale and the journal entry that records it."""
+    change: StockChange
+    entry: JournalEntry
+
+
+class HotStockManager:
+    """Registry of hot SKUs plus their journal and write-behind state."""
+
+    def __init__(self, journal: StockJournal, shard_count: int = HOT_SKU_SHARDS):
+        self.journal = journal
+        self.shard_count = shard_count
+        self._skus: Dict[int, HotSku] = {}
+        # Guards the journal and pending reservations, which must change together
+        self._lock = threading.Lock()
+        self._pending: Dict[int, List[JournalEntry]] = {}
+        self._admin_lock = threading.Lock()
+
+    def is_hot(self, sweet_id: int) -> bool:
+        return sweet_id in self._skus
+
+    def pending_quantity(self, sweet_id: int) -> int:
+        return sum(entry.quantity for entry in self._pending.get(sweet_id, ()))
+
+    def reserve(
+        self,
+        sweet_id: int,
+        quantity: int,
+        user_id: Optional[int] = None,
+        rules: Optional[ActiveRules] = None
+    ) -> Optional[StockChange]:
+        """Reserve from the counter; None means the product is not in hot mode.
+
+        The sale is priced with ``rules`` for the ledger; callers pricing the
+        response with the same rules and returned StockChange get the same
+        charge.
+        """
+        reservation = self.hold(sweet_id, quantity, user_id, rules)
+        return None if reservation is None else reservation.change
+
+    def hold(
+        self,
+        sweet_id: int,
+        quantity: int,
+        user_id: Optional[int] = None,
+        rules: Optional[ActiveRules] = None
+    ) -> Optional["HotReservation"]:
+        """reserve(), also returning the journal entry so the caller can release() it."""
+        sku = self._skus.get(sweet_id)
+        if sku is None:
+            return None
+        # Read once, so the journal and the returned change agree on a concurrent edit
+        sweet_name, sweet_category, unit_price = sku.sweet_name, sku.sweet_category, sku.sweet_price
+
+        def record() -> None:
+            priced = price_cart(
+                [CartLine(sweet_id, sweet_category, to_paise(unit_price), quantity)],
+                rules or pricing_rules.cached().active()
+            )
+            entry = JournalEntry(
+                sequence=0,
+                sweet_id=sweet_id,
+                quantity=quantity,
+                user_id=user_id,
+                unit_price=unit_price,
+                charged=to_rupees(priced.charged_paise),
+                coupon=priced.coupon,
+                created_at=utc_now(),
+                sweet_category=sweet_category,
+            )
+            with self._lock:
+                try:
+                    entry = self.journal.append(entry)
+                except OSError:
+                    logger.exception("Failed to journal hot-SKU reservation")
+                    raise journal_unavailable()
+                self._pending.setdefault(sweet_id, []).append(entry)
+            journaled.append(entry)
+
+        journaled: List[JournalEntry] = []
+        outcome = sku.take(quantity, record)
+        if outcome is None:
+            return None
+        available = sku.available
+        if not outcome:
+            raise insufficient_stock(available)
+        change = StockChange(
+            sweet_id=sweet_id,
+            sweet_name=sweet_name,
+            sweet_category=sweet_category,
+            sweet_price=unit_price,
+            previous_quantity=available + quantity,
+            new_quantity=available,
+        )
+        return HotReservation(change, journaled[0])
+
+    def release(self, db: Session, reservation: "HotReservation") -> None:
+        """Undo a reservation whose purchase failed after it was journaled."""
+        entry = reservation.entry
+        with self._lock:
+            pending = self._pending.get(entry.sweet_id, [])
+            released = entry in pending
+            if released:
+                pending.remove(entry)
+                try:
+                    self.journal.append_cancel(entry)
+                except OSError:
+                    # Without the cancel line a restart would replay the sale; keep it pending
+                    pending.append(entry)
+                    logger.exception("Failed to journal hot-SKU release")
+                    raise journal_unavailable()
+        if released:
+            sku = self._skus.get(entry.sweet_id)
+            if sku is not None:
+                sku.put(entry.quantity)
+            return
+        # A flush has taken it: the sale is (or is about to be) in the row and the ledger, so reverse it
+        db.rollback()
+        self._put_back(db, add_stock(db, entry.sweet_id, entry.quantity), entry.release_movement())
+
+    def restock(self, db: Session, sweet_id: int, quantity: int, user_id: Optional[int] = None) -> StockChange:
+        """Commit a restock to the row, then make the units sellable from the counter."""
+        change = add_stock(db, sweet_id, quantity)
+        movement = restock_movement(sweet_id, quantity, change.sweet_price, user_id, change.sweet_category)
+        return self._put_back(db, change, movement)
+
+    def _put_back(self, db: Session, change: StockChange, movement: dict) -> StockChange:
+        """Commit units added to the row with their movement, then add them to the counter."""
+        record_movements(db, [movement])
+        db.commit()
+        quantity = change.new_quantity - change.previous_quantity
+        sku = self._skus.get(change.sweet_id)
+        if sku is None:
+            return change
+        sku.put(quantity)
+        available = sku.available
+        return change._replace(previous_quantity=available - quantity, new_quantity=available)
+
+    def refresh_details(self, sweet_id: int, sweet_name: str, sweet_category: str, sweet_price: float) -> None:
+        """Keep purchase pricing and responses in step with product edits."""
+        sku = self._skus.get(sweet_id)
+        if sku is not None:
+            sku.sweet_name, sku.sweet_category, sku.sweet_price = sweet_name, sweet_category, sweet_price
+
+    def _restore_pending(self, pending: Dict[int, List[JournalEntry]]) -> None:
+        """Put reservations back after a failed write-back, ahead of newer ones."""
+        with self._lock:
+            for sweet_id, entries in pending.items():
+                self._pending[sweet_id] = entries + self._pending.get(sweet_id, [])
+
+    @staticmethod
+    def _write_back(db: Session, sweet_id: int, entries: List[JournalEntry]) -> None:
+        """Apply journaled sales to the row and append their ledger movements."""
+        quantity = sum(entry.quantity for entry in entries)
+        if not quantity:
+            return
+        db.execute(
+            update(SweetProduct)
+            .where(SweetProduct.sweet_id == sweet_id)
+            .values(quantity_in_stock=SweetProduct.quantity_in_stock - quantity)
+            .execution_options(synchronize_session=False)
+        )
+        record_movements(db, [entry.movement() for entry in entries])
+
+    def flush(self, db: Session) -> int:
+        """Write pending reservations back to quantity_in_stock; returns units written."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            sequence = self.journal.sequence
+            rotated = self.journal.rotate()
+        if not pending and not rotated:
+            return 0
+
+        try:
+            for sweet_id, entries in pending.items():
+                self._write_back(db, sweet_id, entries)
+            db.execute(
+                update(HotStockSku)
+                .values(flushed_sequence=sequence)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            self._restore_pending(pending)
+            raise
+
+        # Everything in the rotated file is now at or below flushed_sequence
+        self.journal.discard_rotated()
+        return sum(entry.quantity for entries in pending.values() for entry in entries)
+
+    def enable(self, db: Session, sweet_id: int) -> dict:
+        """Put a product in hot mode, loading the counter from its committed stock."""
+        with self._admin_lock:
+            if sweet_id not in self._skus:
+                # A no-op UPDATE takes the row's write lock, so the stock read
+                # cannot miss a DB-path purchase committing at the same moment
+                product = db.execute(
+                    update(SweetProduct)
+                    .where(SweetProduct.sweet_id == sweet_id)
+                    .values(quantity_in_stock=SweetProduct.quantity_in_stock)
+                    .returning(
+                        SweetProduct.sweet_name,
+                        SweetProduct.sweet_category,
+                        SweetProduct.sweet_price,
+                        SweetProduct.quantity_in_stock
+                    )
+                    .execution_options(synchronize_session=False)
+                ).first()
+                if product is None:
+                    db.rollback()
+                    raise sweet_not_found()
+                db.add(HotStockSku(sweet_id=sweet_id, flushed_sequence=self.journal.sequence))
+                db.commit()
+                self._skus[sweet_id] = HotSku(
+                    sweet_id, product.sweet_name, product.sweet_category, product.sweet_price,
+                    product.quantity_in_stock, self.shard_count
+                )
+            return self.sku_status(sweet_id)
+
+    def disable(self, db: Session, sweet_id: int) -> None:
+        """Write back this product's pending units and return it to the row-update path."""
+        with self._admin_lock:
+            sku = self._skus.get(sweet_id)
+            if sku is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Sweet is not in hot-SKU mode"
+                )
+            with sku.lock_all():
+                sku.closed = True
+                with self._lock:
+                    entries = self._pending.pop(sweet_id, [])
+                try:
+                    self._write_back(db, sweet_id, entries)
+                    db.query(HotStockSku).filter(HotStockSku.sweet_id == sweet_id).delete()
+                    db.commit()
+                except Exception:
+                    db.rollback()
+                    self._restore_pending({sweet_id: entries})
+                    sku.closed = False
+                    raise
+                del self._skus[sweet_id]
+
+    def recover(self, db: Session) -> int:
+        """Replay journaled reservations missing from the database and reload counters.
+
+        Run once at startup, before serving purchases. Returns the number of
+        units replayed.
+        """
+        with self._admin_lock:
+            entries = self.journal.read()
+            rows = db.query(HotStockSku).all()
+            last_sequence = max(
+                [entry.sequence for entry in entries] + [row.flushed_sequence for row in rows] + [0]
+            )
+
+            replayed = 0
+            for row in rows:
+                missing = [
+                    entry for entry in entries
+                    if entry.sweet_id == row.sweet_id and entry.sequence > row.flushed_sequence
+                ]
+                self._write_back(db, row.sweet_id, missing)
+                replayed += sum(entry.quantity for entry in missing)
+                row.flushed_sequence = last_sequence
+            db.commit()
+            self.journal.reset(last_sequence)
+
+            self._skus.clear()
+            self._pending.clear()
+            for row in rows:
+                product = db.get(SweetProduct, row.sweet_id)
+                if product is None:
+                    continue
+                self._skus[row.sweet_id] = HotSku(
+                    row.sweet_id, product.sweet_name, product.sweet_category, product.sweet_price,
+                    product.quantity_in_stock, self.shard_count
+                )
+            if replayed:
+                logger.warning("Replayed %d journaled hot-SKU units after restart", replayed)
+            return replayed
+
+    def sku_status(self, sweet_id: int) -> dict:
+        sku = self._skus[sweet_id]
+        return {
+            "sweet_id": sweet_id,
+            "sweet_name": sku.sweet_name,
+            "available": sku.available,
+            "pending_writeback": self.pending_quantity(sweet_id),
+            "shards": len(sku.shards),
+        }
+
+    def status(self) -> List[dict]:
+        return [self.sku_status(sweet_id) for sweet_id in sorted(self._skus)]
+
+    async def run_flusher(self, session_factory: Callable[[], Session], interval: float) -> None:
+        """Background write-behind loop; failed flushes keep their units pending."""
+        while True:
+            await asyncio.sleep(interval)
+            db = session_factory()
+            try:
+                await run_in_threadpool(self.flush, db)
+            except Exception:
+                logger.exception("Hot-SKU write-back failed; will retry")
+            finally:
+                db.close()
+
+    def reset(self) -> None:
+        """Forget all hot SKUs and journal entries (tests)."""
+        with self._admin_lock, self._lock:
+            self._skus.clear()
+            self._pending.clear()
+            self.journal.reset(0)
+
+
+hot_stock = HotStockManager(StockJournal(HOT_SKU_JOURNAL_PATH, fsync=HOT_SKU_JOURNAL_FSYNC))
@@ -0,0 +1,354 @@
+"""
+Append-only inventory ledger and its per-sweet snapshots.
+
+Every purchase and restock appends one inventory_movements row in the same
+transaction as the stock change, so the ledger and quantity_in_stock
+commit or roll back together. Whole carts are written with a single
+multi-row INSERT, and hot-SKU sales are buffered and inserted by each
+write-back flush. The same write adds the movements to the sales rollups
+(app.analytics.rollups).
+
+Compaction folds movements into one inventory_snapshots row per sweet, up to
+a movement_id high-water mark kept in ledger_compaction_state and copied to
+each snapshot it touches. Ids below the mark that were not visible when a
+pass ran (a transaction that took its id early and commits late) are kept
+as open gaps and folded by the first pass that sees them. A sweet's totals
+are its snapshot plus the short tail of newer or late movements, read
+through the (sweet_id, movement_id) index, so the summary cost does not
+grow with the length of the history. Movement rows are never updated or
+deleted.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, case, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.analytics.rollups import update_rollups
+from app.models import InventoryMovement, LedgerCompactionState, StockSnapshot, SweetProduct
+from app.pagination import decode_cursor, encode_cursor
+from app.pricing.engine import PricedCart
+from app.pricing.money import to_rupees
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Seconds between background compactions; 0 disables the compactor
+LEDGER_COMPACTION_INTERVAL = float(os.getenv("LEDGER_COMPACTION_INTERVAL", "60"))
+# Seconds a movement_id missing below the high-water mark is waited for; an id
+# still missing after that belongs to a rolled-back transaction and is dropped
+LEDGER_GAP_RETENTION_SECONDS = float(os.getenv("LEDGER_GAP_RETENTION_SECONDS", "3600"))
+
+COMPACTION_STATE_ID = 1
+
+MOVEMENT_PURCHASE = "purchase"
+MOVEMENT_RESTOCK = "restock"
+# Reverses a sale that was already written: the units come back and the charge is refunded
+MOVEMENT_RELEASE = "release"
+MOVEMENT_TYPE_PATTERN = f"^({MOVEMENT_PURCHASE}|{MOVEMENT_RESTOCK}|{MOVEMENT_RELEASE})$"
+
+_TOTAL_COLUMNS = ("net_quantity_delta", "units_sold", "units_restocked", "revenue", "movement_count")
+
+
+class MovementFilter(NamedTuple):
+    """Filters accepted by the movement history endpoints."""
+    sweet_id: Optional[int] = None
+    user_id: Optional[int] = None
+    movement_type: Optional[str] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def as_utc(moment: datetime) -> datetime:
+    """Normalise a timestamp to UTC; naive values are taken to be UTC already."""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def purchase_movement(
+    sweet_id: int,
+    quantity: int,
+    unit_price: float,
+    charged: float,
+    user_id: Optional[int],
+    coupon: Optional[str] = None,
+    created_at: Optional[datetime] = None,
+    sweet_category: Optional[str] = None
+) -> dict:
+    """Ledger row for a sale of ``quantity`` units, charged ``charged`` in total.
+
+    ``sweet_category`` is not stored; it saves the rollups looking it up.
+    """
+    return {
+        "sweet_id": sweet_id,
+        "user_id": user_id,
+        "movement_type": MOVEMENT_PURCHASE,
+        "quantity_delta": -quantity,
+        "unit_price": unit_price,
+        "total_price": charged,
+        "coupon": coupon,
+        "created_at": created_at or utc_now(),
+        "sweet_category": sweet_category,
+    }
+
+
+def sale_movements(priced: PricedCart, user_id: Optional[int], created_at: Optional[datetime] = None) -> List[dict]:
+    """Ledger rows for every line of a priced order, each charged its exact share."""
+    return [
+        purchase_movement(
+            line.sweet_id, line.quantity, to_rupees(line.unit_price_paise), to_rupees(line.charged_paise),
+            user_id, priced.coupon, created_at, line.sweet_category
+        )
+        for line in priced.lines
+    ]
+
+
+def release_movement(
+    sweet_id: int,
+    quantity: int,
+    unit_price: float,
+    refunded: float,
+    user_id: Optional[int],
+    coupon: Optional[str] = None,
+    sweet_category: Optional[str] = None
+) -> dict:
+    """Ledger row reversing a sale: ``quantity`` units back in stock and ``refunded`` taken off revenue."""
+    return {
+        "sweet_id": sweet_id,
+        "user_id": user_id,
+        "movement_type": MOVEMENT_RELEASE,
+        "quantity_delta": quantity,
+        "unit_price": unit_price,
+        "total_price": -refunded,
+        "coupon": coupon,
+        "created_at": utc_now(),
+        "sweet_category": sweet_category,
+    }
+
+
+def restock_movement(
+    sweet_id: int,
+    quantity: int,
+    unit_price: float,
+    user_id: Optional[int],
+    sweet_category: Optional[str] = None
+) -> dict:
+    """Ledger row for ``quantity`` units added to stock."""
+    return {
+        "sweet_id": sweet_id,
+        "user_id": user_id,
+        "movement_type": MOVEMENT_RESTOCK,
+        "quantity_delta": quantity,
+        "unit_price": unit_price,
+        "total_price": None,
+        "coupon": None,
+        "created_at": utc_now(),
+        "sweet_category": sweet_category,
+    }
+
+
+def record_movements(db: Session, rows: List[dict]) -> None:
+    """Append movements in the caller's transaction as one multi-row INSERT.
+
+    The sales rollups are brought up to date in the same transaction, filed
+    under each row's sweet_category where the caller supplied it.
+    """
+    if rows:
+        db.execute(insert(InventoryMovement), [_stored(row) for row in rows])
+        update_rollups(db, rows)
+
+
+def _stored(row: dict) -> dict:
+    """The columns of a movement row; its sweet_category is only for the rollups."""
+    return {name: value for name, value in row.items() if name != "sweet_category"}
+
+
+def _movement_totals() -> list:
+    """Aggregate columns summarising a set of movements."""
+    delta = InventoryMovement.quantity_delta
+    # A release gives units back but counts as fewer units sold, not as a restock
+    released = InventoryMovement.movement_type == MOVEMENT_RELEASE
+    return [
+        func.coalesce(func.sum(delta), 0).label("net_quantity_delta"),
+        func.coalesce(func.sum(case((delta < 0, -delta), (released, -delta), else_=0)), 0).label("units_sold"),
+        func.coalesce(func.sum(case((released, 0), (delta > 0, delta), else_=0)), 0).label("units_restocked"),
+        func.coalesce(func.sum(InventoryMovement.total_price), 0).label("revenue"),
+        func.count(InventoryMovement.movement_id).label("movement_count"),
+        func.max(InventoryMovement.movement_id).label("last_movement_id"),
+    ]
+
+
+def _open_gaps(state: Optional[LedgerCompactionState]) -> Dict[int, float]:
+    """Missing movement ids below the high-water mark, with when each was first missed."""
+    if state is None:
+        return {}
+    return {int(movement_id): seen_at for movement_id, seen_at in json.loads(state.open_gaps).items()}
+
+
+def _missing_ids(db: Session, after: int, through: int) -> set:
+    """Ids in (after, through] with no visible movement."""
+    in_range = and_(InventoryMovement.movement_id > after, InventoryMovement.movement_id <= through)
+    if db.scalar(select(func.count()).where(in_range)) == through - after:
+        return set()
+    missing, previous = set(), after
+    for movement_id in db.scalars(
+        select(InventoryMovement.movement_id).where(in_range).order_by(InventoryMovement.movement_id)
+    ):
+        missing.update(range(previous + 1, movement_id))
+        previous = movement_id
+    return missing
+
+
+def compact_ledger(db: Session, gap_retention_seconds: float = LEDGER_GAP_RETENTION_SECONDS) -> int:
+    """Fold committed movements into the per-sweet snapshots; returns movements folded.
+
+    A pass folds every visible movement above the high-water mark plus any
+    open gap that has become visible, then moves the mark to the highest
+    visible movement_id. Ids under it that are still missing become gaps.
+    """
+    state = db.get(LedgerCompactionState, COMPACTION_STATE_ID, with_for_update=True)
+    if state is None:
+        state = LedgerCompactionState(state_id=COMPACTION_STATE_ID, compacted_through=0, open_gaps="{}")
+        db.add(state)
+    mark, gaps = state.compacted_through, _open_gaps(state)
+    high = max(db.scalar(select(func.max(InventoryMovement.movement_id))) or 0, mark)
+
+    movement_id = InventoryMovement.movement_id
+    missing = _missing_ids(db, mark, high) if high > mark else set()
+    late = set(db.scalars(select(movement_id).where(movement_id.in_(gaps)))) if gaps else set()
+    # Only ids seen above, so a row committing meanwhile stays a gap rather than being skipped
+    folded = and_(movement_id > mark, movement_id <= high)
+    if missing:
+        folded = and_(folded, movement_id.notin_(missing))
+    if late:
+        folded = or_(folded, movement_id.in_(late))
+
+    totals = db.execute(
+        select(InventoryMovement.sweet_id, *_movement_totals())
+        .where(folded)
+        .group_by(InventoryMovement.sweet_id)
+    ).all()
+    snapshots = {
+        snapshot.sweet_id: snapshot
+        for snapshot in db.scalars(
+            select(StockSnapshot).where(StockSnapshot.sweet_id.in_([row.sweet_id for row in totals]))
+        )
+    } if totals else {}
+    for row in totals:
+        snapshot = snapshots.get(row.sweet_id)
+        if snapshot is None:
+            snapshot = StockSnapshot(sweet_id=row.sweet_id, **{name: 0 for name in _TOTAL_COLUMNS})
+            db.add(snapshot)
+        for name in _TOTAL_COLUMNS:
+            setattr(snapshot, name, getattr(snapshot, name) + getattr(row, name))
+        snapshot.revenue = round(snapshot.revenue, 2)
+        snapshot.last_movement_id = high
+
+    now = time.time()
+    gaps = {
+        gap: seen_at for gap, seen_at in gaps.items()
+        if gap not in late and now - seen_at < gap_retention_seconds
+    }
+    gaps.update(dict.fromkeys(missing, now))
+    state.compacted_through = high
+    state.open_gaps = json.dumps(gaps)
+    db.commit()
+    return sum(row.movement_count for row in totals)
+
+
+def stock_summary(db: Session, sweet_id: int) -> dict:
+    """Current stock plus lifetime ledger totals: the snapshot and the tail after it."""
+    snapshot = db.get(StockSnapshot, sweet_id)
+    compacted_through = snapshot.last_movement_id if snapshot else 0
+    in_tail = InventoryMovement.movement_id > compacted_through
+    gaps = _open_gaps(db.get(LedgerCompactionState, COMPACTION_STATE_ID))
+    if gaps:
+        # Late commits under the mark are not in the snapshot yet
+        in_tail = or_(in_tail, InventoryMovement.movement_id.in_(gaps))
+    tail = db.execute(
+        select(*_movement_totals())
+        .where(InventoryMovement.sweet_id == sweet_id, in_tail)
+    ).one()
+    quantity_in_stock = db.scalar(
+        select(SweetProduct.quantity_in_stock).where(SweetProduct.sweet_id == sweet_id)
+    )
+    if snapshot is None and not tail.movement_count and quantity_in_stock is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sweet not found"
+        )
+
+    summary = {"sweet_id": sweet_id, "quantity_in_stock": quantity_in_stock}
+    for name in _TOTAL_COLUMNS:
+        summary[name] = (getattr(snapshot, name) if snapshot else 0) + getattr(tail, name)
+    summary["revenue"] = round(summary["revenue"], 2)
+    summary["compacted_through"] = compacted_through
+    summary["uncompacted_movements"] = tail.movement_count
+    return summary
+
+
+def invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid pagination cursor"
+    )
+
+
+def list_movements(
+    db: Session,
+    criteria: MovementFilter,
+    page_size: int,
+    cursor: Optional[str] = None
+) -> Tuple[List[InventoryMovement], Optional[str]]:
+    """One newest-first page of movements and the cursor of the next page, if any."""
+    query = db.query(InventoryMovement)
+    if criteria.sweet_id is not None:
+        query = query.filter(InventoryMovement.sweet_id == criteria.sweet_id)
+    if criteria.user_id is not None:
+        query = query.filter(InventoryMovement.user_id == criteria.user_id)
+    if criteria.movement_type is not None:
+        query = query.filter(InventoryMovement.movement_type == criteria.movement_type)
+    if criteria.since is not None:
+        query = query.filter(InventoryMovement.created_at >= as_utc(criteria.since))
+    if criteria.until is not None:
+        query = query.filter(InventoryMovement.created_at < as_utc(criteria.until))
+
+    if cursor:
+        before_id = decode_cursor(cursor).get("before")
+        if not isinstance(before_id, int):
+            raise invalid_cursor()
+        query = query.filter(InventoryMovement.movement_id < before_id)
+
+    # Fetch one extra row to learn whether another page exists
+    rows = query.order_by(InventoryMovement.movement_id.desc()).limit(page_size + 1).all()
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        return rows, encode_cursor({"before": rows[-1].movement_id})
+    return rows, None
+
+
+async def run_compactor(session_factory: Callable[[], Session], interval: float) -> None:
+    """Background compaction loop; a failed pass is retried on the next tick."""
+    while True:
+        await asyncio.sleep(interval)
+        db = session_factory()
+        try:
+            await run_in_threadpool(compact_ledger, db)
+        except Exception:
+            logger.exception("Ledger compaction failed; will retry")
+        finally:
+            db.close()
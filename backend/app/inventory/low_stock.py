@@ -0,0 +1,269 @@
+"""
+Low-stock alerting driven by committed stock changes.
+
+The watcher runs as a background task and consumes the stock event bus
+(app.inventory.events). It tracks each sweet's level: in stock, low
+(below its threshold) or out of stock. It raises an alert when that level
+changes. Thresholds default to LOW_STOCK_THRESHOLD and can be overridden
+per sweet in low_stock_thresholds.
+
+Alerts are debounced per sweet. After an alert, later level changes for
+that sweet wait until LOW_STOCK_ALERT_DEBOUNCE_SECONDS have passed, and
+then only the latest level is sent, if it still differs from the last one
+reported. A sale spike therefore sends at most one alert per sweet per
+window, and a level that flaps back within the window sends nothing.
+
+Alerts go to every sink named in LOW_STOCK_ALERT_SINKS:
+- "log": the application log
+- "webhook": a JSON POST to LOW_STOCK_WEBHOOK_URL
+- "stream": admin Server-Sent Events clients and the recent-alerts list
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import httpx
+from dotenv import load_dotenv
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import LowStockThreshold
+from app.inventory.events import StockEvent, StockEventBus
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+LOW_STOCK_ALERTS_ENABLED = os.getenv("LOW_STOCK_ALERTS_ENABLED", "true").lower() in ("1", "true", "yes")
+# Default alert level; matches the storefront's "Low Stock" badge
+LOW_STOCK_THRESHOLD = int(os.getenv("LOW_STOCK_THRESHOLD", "10"))
+LOW_STOCK_ALERT_DEBOUNCE_SECONDS = float(os.getenv("LOW_STOCK_ALERT_DEBOUNCE_SECONDS", "60"))
+LOW_STOCK_ALERT_SINKS = os.getenv("LOW_STOCK_ALERT_SINKS", "log,stream")
+LOW_STOCK_WEBHOOK_URL = os.getenv("LOW_STOCK_WEBHOOK_URL", "")
+LOW_STOCK_WEBHOOK_TIMEOUT = float(os.getenv("LOW_STOCK_WEBHOOK_TIMEOUT", "5"))
+# Alerts buffered per stream client before it is disconnected as too slow
+LOW_STOCK_STREAM_QUEUE_SIZE = int(os.getenv("LOW_STOCK_STREAM_QUEUE_SIZE", "100"))
+
+LEVEL_IN_STOCK = "in_stock"
+LEVEL_LOW = "low_stock"
+LEVEL_OUT = "out_of_stock"
+
+
+class StockAlert(NamedTuple):
+    """A change in a sweet's stock level worth telling an admin about."""
+    sweet_id: int
+    sweet_name: str
+    level: str
+    quantity: int
+    threshold: int
+    raised_at: datetime
+
+    def as_json(self) -> dict:
+        return {**self._asdict(), "raised_at": self.raised_at.isoformat()}
+
+
+def stock_level(quantity: int, threshold: int) -> str:
+    if quantity <= 0:
+        return LEVEL_OUT
+    if quantity < threshold:
+        return LEVEL_LOW
+    return LEVEL_IN_STOCK
+
+
+# ==================== Sinks ====================
+
+class LogAlertSink:
+    """Writes alerts to the application log."""
+
+    async def send(self, alert: StockAlert) -> None:
+        log = logger.info if alert.level == LEVEL_IN_STOCK else logger.warning
+        log("Stock alert: %s (#%d) is %s with %d left (threshold %d)",
+            alert.sweet_name, alert.sweet_id, alert.level, alert.quantity, alert.threshold)
+
+
+class WebhookAlertSink:
+    """POSTs each alert as JSON; delivery failures are logged, not retried."""
+
+    def __init__(self, url: str, timeout: float = LOW_STOCK_WEBHOOK_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+
+    async def send(self, alert: StockAlert) -> None:
+        try:
+            async with httpx.AsyncClient(timeout=self.timeout) as http:
+                response = await http.post(self.url, json=alert.as_json())
+                response.raise_for_status()
+        except httpx.HTTPError as error:
+            logger.warning("Stock alert webhook failed for sweet %d: %s", alert.sweet_id, error)
+
+
+class AlertStream:
+    """Fans alerts out to connected admin clients and keeps the most recent ones.
+
+    Each client has a bounded queue; a client that falls that far behind is
+    disconnected rather than buffered without limit.
+    """
+
+    def __init__(self, queue_size: int = LOW_STOCK_STREAM_QUEUE_SIZE, history: int = 100):
+        self.queue_size = queue_size
+        self.recent: deque = deque(maxlen=history)
+        self._clients: Set[asyncio.Queue] = set()
+
+    def connect(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._clients.add(queue)
+        return queue
+
+    def disconnect(self, queue: asyncio.Queue) -> None:
+        self._clients.discard(queue)
+
+    async def send(self, alert: StockAlert) -> None:
+        self.recent.append(alert)
+        for queue in list(self._clients):
+            try:
+                queue.put_nowait(alert)
+            except asyncio.QueueFull:
+                # Replace the backlog with the end-of-stream marker
+                self.disconnect(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    def reset(self) -> None:
+        self.recent.clear()
+        self._clients.clear()
+
+
+alert_stream = AlertStream()
+
+
+def configured_sinks(names: str = LOW_STOCK_ALERT_SINKS) -> list:
+    sinks = []
+    for name in filter(None, (part.strip().lower() for part in names.split(","))):
+        if name == "log":
+            sinks.append(LogAlertSink())
+        elif name == "stream":
+            sinks.append(alert_stream)
+        elif name == "webhook" and LOW_STOCK_WEBHOOK_URL:
+            sinks.append(WebhookAlertSink(LOW_STOCK_WEBHOOK_URL))
+        else:
+            logger.warning("Ignoring stock alert sink %r (unknown, or webhook without LOW_STOCK_WEBHOOK_URL)", name)
+    return sinks
+
+
+# ==================== Watcher ====================
+
+class LowStockWatcher:
+    """Turns stock events into debounced level-change alerts."""
+
+    def __init__(
+        self,
+        sinks: list,
+        default_threshold: int = LOW_STOCK_THRESHOLD,
+        debounce: float = LOW_STOCK_ALERT_DEBOUNCE_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.sinks = sinks
+        self.default_threshold = default_threshold
+        self.debounce = debounce
+        self._clock = clock
+        self._thresholds: Dict[int, int] = {}
+        self._reported: Dict[int, str] = {}
+        self._last_sent: Dict[int, float] = {}
+        # Sweets whose latest change is waiting out the debounce window
+        self._held: Dict[int, Tuple[float, StockEvent]] = {}
+
+    def threshold_for(self, sweet_id: int) -> int:
+        return self._thresholds.get(sweet_id, self.default_threshold)
+
+    def set_threshold(self, sweet_id: int, threshold: Optional[int]) -> None:
+        """Override a sweet's threshold; None restores the default."""
+        if threshold is None:
+            self._thresholds.pop(sweet_id, None)
+        else:
+            self._thresholds[sweet_id] = threshold
+
+    def load_thresholds(self, db: Session) -> None:
+        self._thresholds = dict(db.execute(select(LowStockThreshold.sweet_id, LowStockThreshold.threshold)).all())
+
+    def observe(self, event: StockEvent, now: float) -> List[StockAlert]:
+        """Alerts due immediately for ``event``; later ones are held for the debounce window."""
+        if event.removed:
+            # A deleted sweet is not out of stock: drop what is known about it
+            for state in (self._reported, self._last_sent, self._held):
+                state.pop(event.sweet_id, None)
+            return []
+        threshold = self.threshold_for(event.sweet_id)
+        level = stock_level(event.quantity, threshold)
+        if level == self._reported.get(event.sweet_id, LEVEL_IN_STOCK):
+            # Back where the last alert left it: nothing new to say
+            self._held.pop(event.sweet_id, None)
+            return []
+        last_sent = self._last_sent.get(event.sweet_id)
+        if last_sent is not None and now - last_sent < self.debounce:
+            self._held[event.sweet_id] = (last_sent + self.debounce, event)
+            return []
+        self._held.pop(event.sweet_id, None)
+        return [self._raise(event, level, threshold, now)]
+
+    def due(self, now: float) -> List[StockAlert]:
+        """Alerts for held sweets whose debounce window has closed."""
+        alerts = []
+        for sweet_id, (deadline, event) in list(self._held.items()):
+            if deadline <= now:
+                del self._held[sweet_id]
+                alerts.extend(self.observe(event, now))
+        return alerts
+
+    def next_deadline(self) -> Optional[float]:
+        return min((deadline for deadline, _ in self._held.values()), default=None)
+
+    def _raise(self, event: StockEvent, level: str, threshold: int, now: float) -> StockAlert:
+        self._reported[event.sweet_id] = level
+        self._last_sent[event.sweet_id] = now
+        return StockAlert(
+            event.sweet_id, event.sweet_name, level, event.quantity, threshold, datetime.now(timezone.utc)
+        )
+
+    async def deliver(self, alerts: List[StockAlert]) -> None:
+        for alert in alerts:
+            for sink in self.sinks:
+                try:
+                    await sink.send(alert)
+                except Exception:
+                    logger.exception("Stock alert sink %s failed", type(sink).__name__)
+
+    async def run(self, bus: StockEventBus, session_factory: Callable[[], Session]) -> None:
+        """Background loop: load thresholds, then alert on every change the bus carries."""
+        db = session_factory()
+        try:
+            await run_in_threadpool(self.load_thresholds, db)
+        finally:
+            db.close()
+
+        subscription = bus.subscribe()
+        try:
+            while True:
+                deadline = self.next_deadline()
+                timeout = None if deadline is None else max(0.0, deadline - self._clock())
+                events = await subscription.get(timeout)
+                now = self._clock()
+                alerts = [alert for event in events for alert in self.observe(event, now)]
+                await self.deliver(alerts + self.due(now))
+        finally:
+            bus.unsubscribe(subscription)
+
+    def reset(self) -> None:
+        """Forget thresholds and alert history (tests)."""
+        self._thresholds.clear()
+        self._reported.clear()
+        self._last_sent.clear()
+        self._held.clear()
+
+
+low_stock_watcher = LowStockWatcher(configured_sinks())
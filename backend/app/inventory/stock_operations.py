@@ -0,0 +1,126 @@
+"""
+Atomic stock operations on sweet products.
+
+Each operation is a single conditional UPDATE ... RETURNING, so the stock
+check and the write happen in one round-trip and concurrent buyers can
+never drive quantity_in_stock below zero.
+"""
+from typing import NamedTuple, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import exists, select, update
+from sqlalchemy.orm import Session
+
+from app.models import HotStockSku, SweetProduct
+
+
+class StockChange(NamedTuple):
+    """Outcome of an atomic stock update."""
+    sweet_id: int
+    sweet_name: str
+    sweet_category: str
+    sweet_price: float
+    previous_quantity: int
+    new_quantity: int
+
+
+def sweet_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Sweet not found"
+    )
+
+
+def insufficient_stock(
+    available: int,
+    sweet_id: Optional[int] = None,
+    requested: Optional[int] = None
+) -> HTTPException:
+    """400 for a short sweet; pass ``sweet_id`` and ``requested`` when the request names several sweets."""
+    if sweet_id is None:
+        detail = f"Insufficient stock. Only {available} items available."
+    else:
+        detail = f"Insufficient stock for sweet {sweet_id}: requested {requested}, only {available} items available."
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def hot_sku_conflict(remedy: str = "purchase it on its own") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Sweet is in flash-sale mode; {remedy}"
+    )
+
+
+def reserve_stock(db: Session, sweet_id: int, quantity: int) -> StockChange:
+    """Decrement stock if enough is available; the caller owns the commit.
+
+    Hot SKUs are excluded: their stock belongs to the in-memory counter.
+    """
+    row = db.execute(
+        update(SweetProduct)
+        .where(
+            SweetProduct.sweet_id == sweet_id,
+            SweetProduct.quantity_in_stock >= quantity,
+            ~exists().where(HotStockSku.sweet_id == SweetProduct.sweet_id)
+        )
+        .values(quantity_in_stock=SweetProduct.quantity_in_stock - quantity)
+        .returning(
+            SweetProduct.sweet_id,
+            SweetProduct.sweet_name,
+            SweetProduct.sweet_category,
+            SweetProduct.sweet_price,
+            SweetProduct.quantity_in_stock
+        )
+        .execution_options(synchronize_session=False)
+    ).first()
+
+    if row is None:
+        # Only the failure path pays for a second query, to pick the right error
+        available, hot_sku = db.execute(
+            select(SweetProduct.quantity_in_stock, HotStockSku.sweet_id)
+            .outerjoin(HotStockSku, HotStockSku.sweet_id == SweetProduct.sweet_id)
+            .where(SweetProduct.sweet_id == sweet_id)
+        ).first() or (None, None)
+        if available is None:
+            raise sweet_not_found()
+        if hot_sku is not None:
+            raise hot_sku_conflict()
+        raise insufficient_stock(available)
+
+    return StockChange(
+        sweet_id=row.sweet_id,
+        sweet_name=row.sweet_name,
+        sweet_category=row.sweet_category,
+        sweet_price=row.sweet_price,
+        previous_quantity=row.quantity_in_stock + quantity,
+        new_quantity=row.quantity_in_stock,
+    )
+
+
+def add_stock(db: Session, sweet_id: int, quantity: int) -> StockChange:
+    """Increment stock atomically; the caller owns the commit."""
+    row = db.execute(
+        update(SweetProduct)
+        .where(SweetProduct.sweet_id == sweet_id)
+        .values(quantity_in_stock=SweetProduct.quantity_in_stock + quantity)
+        .returning(
+            SweetProduct.sweet_id,
+            SweetProduct.sweet_name,
+            SweetProduct.sweet_category,
+            SweetProduct.sweet_price,
+            SweetProduct.quantity_in_stock
+        )
+        .execution_options(synchronize_session=False)
+    ).first()
+
+    if row is None:
+        raise sweet_not_found()
+
+    return StockChange(
+        sweet_id=row.sweet_id,
+        sweet_name=row.sweet_name,
+        sweet_category=row.sweet_category,
+        sweet_price=row.sweet_price,
+        previous_quantity=row.quantity_in_stock - quantity,
+        new_quantity=row.quantity_in_stock,
+    )
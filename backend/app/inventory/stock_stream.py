@@ -0,0 +1,79 @@
+"""
+Live stock deltas for storefront clients.
+
+Each connected client subscribes to the stock event bus
+(app.inventory.events) and receives {sweet_id, quantity} for every
+committed change, instead of re-fetching the catalog. A deleted sweet is
+sent as {sweet_id, quantity: 0, removed: true}. A client's pending
+changes coalesce per sweet, so a busy SKU costs one delta per send,
+however many sales it saw. A client that leaves more than
+STOCK_STREAM_MAX_PENDING sweets unsent is disconnected. Server-Sent Events
+clients get a final "reset" event first; WebSocket clients get close code
+1013. Either way the client should re-fetch /api/sweets and reconnect.
+"""
+import asyncio
+import os
+from typing import AsyncIterator, Awaitable, Callable
+
+from dotenv import load_dotenv
+from fastapi import WebSocket, WebSocketDisconnect, status
+
+from app.inventory.events import StockEvent, StockSubscription
+from app.sse import KEEPALIVE_COMMENT, SSE_KEEPALIVE_SECONDS, format_event
+
+load_dotenv()
+
+STOCK_STREAM_MAX_PENDING = int(os.getenv("STOCK_STREAM_MAX_PENDING", "256"))
+
+
+def stock_delta(event: StockEvent) -> dict:
+    if event.removed:
+        return {"sweet_id": event.sweet_id, "quantity": 0, "removed": True}
+    return {"sweet_id": event.sweet_id, "quantity": event.quantity}
+
+
+async def sse_stock_events(
+    subscription: StockSubscription,
+    is_disconnected: Callable[[], Awaitable[bool]],
+    keepalive: float = SSE_KEEPALIVE_SECONDS
+) -> AsyncIterator[str]:
+    """SSE chunks for a subscription: one "stock" event per delta, batched per write."""
+    while not await is_disconnected():
+        events = await subscription.get(keepalive)
+        if subscription.dropped:
+            yield format_event("reset", {})
+            return
+        if events:
+            yield "".join(format_event("stock", stock_delta(event)) for event in events)
+        else:
+            yield KEEPALIVE_COMMENT
+
+
+async def _until_disconnected(websocket: WebSocket) -> None:
+    # Clients do not send anything; reading only notices when they leave
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+
+
+async def websocket_stock_events(websocket: WebSocket, subscription: StockSubscription) -> None:
+    """Send deltas as JSON text frames until the client leaves or falls behind."""
+    disconnected = asyncio.create_task(_until_disconnected(websocket))
+    try:
+        while True:
+            pending = asyncio.ensure_future(subscription.get())
+            await asyncio.wait({pending, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected.done():
+                pending.cancel()
+                return
+            if subscription.dropped:
+                await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+                return
+            for event in pending.result():
+                await websocket.send_json(stock_delta(event))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        disconnected.cancel()
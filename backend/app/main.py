@@ -1,14 +1,35 @@
 """
 Main FastAPI application entry point.
 """
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.database import initialize_database
+from app.compression import COMPRESSION_ENABLED, CompressionMiddleware
+from app.database import SessionLocal, dispose_engines, initialize_database
+from app.auth.hashing_service import password_hashing_service
+from app.pagination import NEXT_CURSOR_HEADER
+from app.read_replicas import replica_router
+from app.idempotency import IDEMPOTENCY_PURGE_INTERVAL, REPLAYED_HEADER, run_purger
+from app.inventory.hot_stock import HOT_SKU_FLUSH_INTERVAL, hot_stock
+from app.inventory.events import stock_events
+from app.inventory.ledger import LEDGER_COMPACTION_INTERVAL, run_compactor
+from app.inventory.low_stock import LOW_STOCK_ALERTS_ENABLED, low_stock_watcher
+from app.metrics.middleware import METRICS_ENABLED, MetricsMiddleware
+from app.metrics.sql import install_query_hooks
 from app.routes.authentication_routes import router as auth_router
 from app.routes.sweets_routes import router as sweets_router
 from app.routes.inventory_routes import router as inventory_router
+from app.routes.cart_routes import router as cart_router
+from app.routes.bulk_routes import router as bulk_router
+from app.routes.admin_routes import router as admin_router
+from app.routes.movement_routes import router as movement_router
+from app.routes.analytics_routes import router as analytics_router
+from app.routes.pricing_routes import router as pricing_router
+from app.routes.alert_routes import router as alert_router
+from app.routes.stock_stream_routes import router as stock_stream_router
+from app.routes.metrics_routes import router as metrics_router
 
 
 @asynccontextmanager
@@ -16,8 +37,35 @@ async def lifespan(app: FastAPI):
     """Lifespan event handler - runs on startup and shutdown."""
     # Startup
     initialize_database()
+    background_tasks = []
+    if replica_router.replicas:
+        background_tasks.append(asyncio.create_task(replica_router.run_health_checks()))
+    with SessionLocal() as db:
+        hot_stock.recover(db)
+    if HOT_SKU_FLUSH_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(
+            hot_stock.run_flusher(SessionLocal, HOT_SKU_FLUSH_INTERVAL)
+        ))
+    if LEDGER_COMPACTION_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(
+            run_compactor(SessionLocal, LEDGER_COMPACTION_INTERVAL)
+        ))
+    if IDEMPOTENCY_PURGE_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(
+            run_purger(SessionLocal, IDEMPOTENCY_PURGE_INTERVAL)
+        ))
+    if LOW_STOCK_ALERTS_ENABLED:
+        background_tasks.append(asyncio.create_task(low_stock_watcher.run(stock_events, SessionLocal)))
     yield
-    # Shutdown (cleanup if needed)
+    # Shutdown
+    for task in background_tasks:
+        task.cancel()
+    if HOT_SKU_FLUSH_INTERVAL > 0:
+        with SessionLocal() as db:
+            hot_stock.flush(db)
+    password_hashing_service.shutdown()
+    await replica_router.dispose()
+    await dispose_engines()
 
 
 app = FastAPI(
@@ -27,6 +75,10 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Response compression; added first so it sits innermost, next to the routes
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
 # CORS middleware for frontend
 app.add_middleware(
     CORSMiddleware,
@@ -34,12 +86,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", REPLAYED_HEADER, "Server-Timing", "Retry-After"],
 )
 
+# Request metrics; added last so it wraps CORS and times the whole response
+if METRICS_ENABLED:
+    install_query_hooks()
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(sweets_router)
 app.include_router(inventory_router)
+app.include_router(cart_router)
+app.include_router(bulk_router)
+app.include_router(admin_router)
+app.include_router(movement_router)
+app.include_router(analytics_router)
+app.include_router(pricing_router)
+app.include_router(alert_router)
+app.include_router(stock_stream_router)
+if METRICS_ENABLED:
+    app.include_router(metrics_router)
 
 
 @app.get("/")
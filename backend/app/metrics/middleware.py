@@ -0,0 +1,122 @@
+"""
+ASGI middleware recording per-route request metrics.
+
+Requests are labelled by route template ("/api/sweets/{sweet_id}/purchase"),
+never by raw path, so series stay bounded; paths that match no route share
+the "unmatched" label. Besides latency, requests in flight and status
+counts, each request's SQL statement count and database time are recorded,
+which is where N+1 queries and extra round-trips show up.
+
+With METRICS_SERVER_TIMING=true every response also carries a
+Server-Timing header (app, db and any auth timings), which browser dev
+tools display per request. It reveals internals, so it is off by default.
+"""
+import os
+import time
+
+from dotenv import load_dotenv
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.metrics.registry import registry
+from app.metrics.sql import DB_TIMING
+from app.metrics.timing import RequestTimings, current_timings
+
+load_dotenv()
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+METRICS_SERVER_TIMING = os.getenv("METRICS_SERVER_TIMING", "false").lower() in ("1", "true", "yes")
+
+UNMATCHED_ROUTE = "unmatched"
+
+request_seconds = registry.histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the end of its response.",
+    ("method", "route"),
+)
+requests_total = registry.counter(
+    "http_requests_total",
+    "Completed HTTP requests.",
+    ("method", "route", "status"),
+)
+requests_in_progress = registry.gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served.",
+    ("method", "route"),
+)
+request_db_queries = registry.histogram(
+    "http_request_db_queries",
+    "SQL statements executed while serving one request.",
+    ("method", "route"),
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12, 16, 24, 32, 64),
+)
+request_db_seconds = registry.histogram(
+    "http_request_db_duration_seconds",
+    "Time spent executing SQL while serving one request.",
+    ("method", "route"),
+)
+
+
+def route_template(scope: Scope) -> str:
+    """The path template of the route that will serve ``scope``."""
+    app = scope.get("app")
+    partial = None
+    for route in getattr(getattr(app, "router", None), "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or UNMATCHED_ROUTE
+
+
+def server_timing(timings: RequestTimings, total_seconds: float) -> str:
+    """A Server-Timing header value, durations in milliseconds."""
+    entries = [f"app;dur={total_seconds * 1000:.2f}"]
+    for name, seconds in timings.seconds.items():
+        calls = timings.calls[name]
+        description = f"{calls} queries" if name == DB_TIMING else f"{calls} calls"
+        entries.append(f'{name};dur={seconds * 1000:.2f};desc="{description}"')
+    return ", ".join(entries)
+
+
+class MetricsMiddleware:
+    """Times HTTP requests and counts their SQL; other ASGI scopes pass straight through."""
+
+    def __init__(self, app: ASGIApp, server_timing: bool = METRICS_SERVER_TIMING):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(scope)
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", server_timing(timings, time.perf_counter() - started))
+            await send(message)
+
+        requests_in_progress.inc(method, route)
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_timings.reset(token)
+            requests_in_progress.dec(method, route)
+            request_seconds.observe(elapsed, method, route)
+            requests_total.inc(method, route, str(status_code))
+            request_db_queries.observe(timings.calls.get(DB_TIMING, 0), method, route)
+            request_db_seconds.observe(timings.seconds.get(DB_TIMING, 0.0), method, route)
@@ -0,0 +1,46 @@
+"""
+Query counting for every SQLAlchemy engine in the process.
+
+Cursor-execute hooks are attached to the Engine class, so the primary,
+async, replica and test engines are all covered without registering each
+one. Each statement's time goes to a process-wide histogram and to the
+current request's "db" timing, which the metrics middleware turns into
+per-request query counts.
+"""
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.metrics.registry import registry
+from app.metrics.timing import record_timing
+
+DB_TIMING = "db"
+_STARTED = "metrics_query_started"
+
+db_query_seconds = registry.histogram(
+    "db_query_duration_seconds",
+    "Time spent executing one SQL statement.",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # A connection runs one statement at a time; a failed one is simply overwritten
+    conn.info[_STARTED] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop(_STARTED, None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    db_query_seconds.observe(elapsed)
+    record_timing(DB_TIMING, elapsed)
+
+
+def install_query_hooks() -> None:
+    """Attach the hooks to every engine; safe to call more than once."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,50 @@
+"""
+Per-request timing breakdown shared by the metrics middleware and the code it times.
+
+The middleware puts a fresh RequestTimings in a context variable for each
+request. Anything running on the request's behalf, including threadpool
+workers (which inherit a copy of the context), adds its time under a short
+name such as "db", "bcrypt" or "jwt". Outside a request the timings are
+dropped, but histograms still record them.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from app.metrics.registry import Histogram
+
+
+class RequestTimings:
+    """Seconds and call counts per timing name for one request."""
+    __slots__ = ("seconds", "calls")
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_timings", default=None)
+
+
+def record_timing(name: str, seconds: float) -> None:
+    """Add ``seconds`` to the current request's ``name`` timing, if there is a request."""
+    timings = current_timings.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def timed(name: str, histogram: Histogram, *labels: str) -> Iterator[None]:
+    """Time the block into ``histogram`` and the current request's ``name`` timing."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        histogram.observe(elapsed, *labels)
+        record_timing(name, elapsed)
@@ -1,7 +1,8 @@
 """
-Database models - User only for now.
+Database models: accounts, the sweet catalog, the inventory ledger and its
+rollups, pricing rules, hot-SKU and low-stock settings, and idempotency keys.
 """
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.database import DatabaseBaseModel
 
@@ -27,7 +28,177 @@ class SweetProduct(DatabaseBaseModel):
     sweet_name = Column(String, nullable=False, index=True)
     sweet_category = Column(String, nullable=False, index=True)
     sweet_price = Column(Float, nullable=False)
-    quantity_in_stock = Column(Integer, nullable=False, default=0)
+    quantity_in_stock = Column(Integer, nullable=False, default=0, index=True)
     sweet_description = Column(String, nullable=True)
     product_created_at = Column(DateTime(timezone=True), server_default=func.now())
-    product_updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    product_updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+class CatalogState(DatabaseBaseModel):
+    """The shared catalog version, bumped in the same transaction as every catalog write."""
+    __tablename__ = "catalog_state"
+
+    state_id = Column(Integer, primary_key=True)
+    catalog_version = Column(Integer, nullable=False, default=0)
+
+
+class HotStockSku(DatabaseBaseModel):
+    """A sweet whose stock is served from the in-memory sharded counter."""
+    __tablename__ = "hot_stock_skus"
+
+    sweet_id = Column(
+        Integer,
+        ForeignKey("sweet_products.sweet_id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    # Journal sequence already written back to quantity_in_stock
+    flushed_sequence = Column(Integer, nullable=False, default=0)
+    enabled_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class LowStockThreshold(DatabaseBaseModel):
+    """A per-sweet low-stock alert level overriding LOW_STOCK_THRESHOLD."""
+    __tablename__ = "low_stock_thresholds"
+
+    sweet_id = Column(
+        Integer,
+        ForeignKey("sweet_products.sweet_id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    # Alert once stock falls below this many units
+    threshold = Column(Integer, nullable=False)
+    threshold_updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class PricingRule(DatabaseBaseModel):
+    """A coupon or automatic promotion applied by the pricing engine.
+
+    percentage rules take percent_off_bps (basis points) off each matching
+    line, bogo rules make free_quantity of every buy_quantity + free_quantity
+    units free, and fixed rules take amount_off_paise off the matching part
+    of the order once. A rule with a coupon_code only applies when that
+    code is supplied; without one it applies automatically.
+    """
+    __tablename__ = "pricing_rules"
+
+    rule_id = Column(Integer, primary_key=True)
+    rule_name = Column(String, nullable=False)
+    rule_type = Column(String, nullable=False)  # "percentage", "fixed" or "bogo"
+    coupon_code = Column(String, nullable=True, index=True)
+    percent_off_bps = Column(Integer, nullable=True)
+    amount_off_paise = Column(Integer, nullable=True)
+    buy_quantity = Column(Integer, nullable=True)
+    free_quantity = Column(Integer, nullable=True)
+    # Optional scope; a rule with neither applies to every sweet
+    sweet_category = Column(String, nullable=True)
+    sweet_id = Column(Integer, nullable=True)
+    starts_at = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+    is_active = Column(Boolean, nullable=False, default=True)
+    rule_created_at = Column(DateTime(timezone=True), server_default=func.now())
+    rule_updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+class IdempotencyRecord(DatabaseBaseModel):
+    """The stored result of a write sent with an Idempotency-Key header."""
+    __tablename__ = "idempotency_keys"
+
+    # Keys are scoped to the user who sent them
+    user_id = Column(Integer, ForeignKey("user_accounts.user_id", ondelete="CASCADE"), primary_key=True)
+    idempotency_key = Column(String, primary_key=True)
+    # Hash of method, path and body; a reused key with a different request is rejected
+    request_fingerprint = Column(String, nullable=False)
+    status_code = Column(Integer, nullable=False)
+    response_body = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
+class InventoryMovement(DatabaseBaseModel):
+    """One append-only ledger entry for a change to a sweet's stock."""
+    __tablename__ = "inventory_movements"
+
+    movement_id = Column(Integer, primary_key=True)
+    # No foreign key: history outlives a deleted sweet
+    sweet_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, ForeignKey("user_accounts.user_id"), nullable=True)
+    movement_type = Column(String, nullable=False)
+    # Signed change to quantity_in_stock: negative for sales, positive for restocks and releases
+    quantity_delta = Column(Integer, nullable=False)
+    unit_price = Column(Float, nullable=False)
+    # Amount charged for sales (after any coupon), negated for releases; NULL for restocks
+    total_price = Column(Float, nullable=True)
+    coupon = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class StockSnapshot(DatabaseBaseModel):
+    """Per-sweet ledger totals folded in by compaction up to last_movement_id.
+
+    Movements at or below last_movement_id that were still open gaps when
+    it was set are not in the totals yet.
+
+    Like the ledger itself, snapshots are kept after a sweet is deleted.
+    """
+    __tablename__ = "inventory_snapshots"
+
+    sweet_id = Column(Integer, primary_key=True)
+    last_movement_id = Column(Integer, nullable=False, default=0)
+    net_quantity_delta = Column(Integer, nullable=False, default=0)
+    units_sold = Column(Integer, nullable=False, default=0)
+    units_restocked = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+    movement_count = Column(Integer, nullable=False, default=0)
+    compacted_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class LedgerCompactionState(DatabaseBaseModel):
+    """How far compaction has got through the ledger, as a movement_id high-water mark.
+
+    open_gaps holds the ids at or below the mark that were not visible when
+    their pass ran (a transaction still in flight, or one that rolled back),
+    as JSON {movement_id: epoch seconds first seen missing}.
+    """
+    __tablename__ = "ledger_compaction_state"
+
+    state_id = Column(Integer, primary_key=True)
+    compacted_through = Column(Integer, nullable=False, default=0)
+    open_gaps = Column(Text, nullable=False, default="{}")
+
+
+class SalesRollup(DatabaseBaseModel):
+    """Sales and restock totals for one sweet over one UTC hour or day."""
+    __tablename__ = "sales_rollups"
+
+    granularity = Column(String, primary_key=True)  # "hour" or "day"
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    sweet_id = Column(Integer, primary_key=True)
+    # Category at the time of sale, so reports survive later recategorisation
+    sweet_category = Column(String, nullable=False)
+    units_sold = Column(Integer, nullable=False, default=0)
+    units_restocked = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+    order_count = Column(Integer, nullable=False, default=0)
+
+
+# Ledger history indexes: newest-first keyset pages per sweet, per user and by time
+Index("ix_inventory_movements_sweet_id_movement_id", InventoryMovement.sweet_id, InventoryMovement.movement_id)
+Index("ix_inventory_movements_user_id_movement_id", InventoryMovement.user_id, InventoryMovement.movement_id)
+Index("ix_inventory_movements_created_at_movement_id", InventoryMovement.created_at, InventoryMovement.movement_id)
+
+# Analytics: per-category reports over a bucket range
+Index(
+    "ix_sales_rollups_granularity_category_bucket",
+    SalesRollup.granularity,
+    SalesRollup.sweet_category,
+    SalesRollup.bucket_start
+)
+
+# Search indexes: category filter + price range/sort, and price-ordered keyset pages
+Index(
+    "ix_sweet_products_category_price",
+    func.lower(SweetProduct.sweet_category),
+    SweetProduct.sweet_price,
+    SweetProduct.sweet_id
+)
+Index("ix_sweet_products_price_id", SweetProduct.sweet_price, SweetProduct.sweet_id)
\ No newline at end of file
@@ -0,0 +1,45 @@
+"""
+Keyset (cursor) pagination helpers for catalog listings.
+"""
+import base64
+import binascii
+import json
+import os
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+SWEETS_PAGE_SIZE_DEFAULT = int(os.getenv("SWEETS_PAGE_SIZE_DEFAULT", "50"))
+SWEETS_PAGE_SIZE_MAX = int(os.getenv("SWEETS_PAGE_SIZE_MAX", "200"))
+
+# Response header carrying the cursor of the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    """Apply the default page size and the configured upper bound."""
+    if limit is None:
+        return SWEETS_PAGE_SIZE_DEFAULT
+    return max(1, min(limit, SWEETS_PAGE_SIZE_MAX))
+
+
+def encode_cursor(position: dict) -> str:
+    """Encode a keyset position as an opaque, URL-safe cursor."""
+    raw = json.dumps(position, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Decode a cursor produced by encode_cursor, rejecting tampered values."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, ValueError, UnicodeError):
+        position = None
+
+    if not isinstance(position, dict):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+    return position
@@ -0,0 +1,166 @@
+"""
+Cart pricing in one batched pass over integer paise.
+
+Each line gets the single best line discount among the percentage and BOGO
+rules matching its sweet, its category or everything; line rules do not
+stack. The best fixed-amount rule then comes off the discounted subtotal of
+the lines it covers. It is capped at that subtotal and split across those
+lines by largest remainder, so per-line charges always add up to the order
+total.
+"""
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.pricing.money import apportion, percent_of, to_rupees
+from app.pricing.rules import BOGO, ActiveRules, Rule
+
+
+class CartLine(NamedTuple):
+    """One line to price; unit prices are integer paise."""
+    sweet_id: int
+    sweet_category: str
+    unit_price_paise: int
+    quantity: int
+
+
+class PricedLine(NamedTuple):
+    sweet_id: int
+    sweet_category: str
+    quantity: int
+    unit_price_paise: int
+    list_paise: int
+    discount_paise: int
+    charged_paise: int
+    rule_ids: Tuple[int, ...]
+
+
+class PricedCart(NamedTuple):
+    lines: List[PricedLine]
+    list_paise: int
+    discount_paise: int
+    charged_paise: int
+    applied_rules: List[str]
+    # The coupon code, when a rule it unlocked gave a discount
+    coupon: Optional[str]
+
+
+def _line_discount(rule: Rule, unit_price: int, quantity: int, list_paise: int) -> int:
+    if rule.rule_type == BOGO:
+        bundle = rule.buy_quantity + rule.free_quantity
+        return (quantity // bundle) * rule.free_quantity * unit_price if bundle else 0
+    return percent_of(list_paise, rule.percent_off_bps)
+
+
+def price_cart(lines: Sequence[CartLine], rules: ActiveRules) -> PricedCart:
+    """Price every line of a cart and apply order-level rules."""
+    list_totals: List[int] = []
+    discounts: List[int] = []
+    line_rules: List[Optional[Rule]] = []
+    category_keys: List[str] = []
+    by_sweet, by_category, everywhere = rules.by_sweet, rules.by_category, rules.everywhere
+
+    for line in lines:
+        unit_price, quantity = line.unit_price_paise, line.quantity
+        list_paise = unit_price * quantity
+        category_key = line.sweet_category.lower()
+        best, best_rule = 0, None
+        for scoped in (by_sweet.get(line.sweet_id), by_category.get(category_key), everywhere):
+            if scoped:
+                for rule in scoped:
+                    discount = _line_discount(rule, unit_price, quantity, list_paise)
+                    if discount > best:
+                        best, best_rule = discount, rule
+        list_totals.append(list_paise)
+        discounts.append(min(best, list_paise))
+        line_rules.append(best_rule)
+        category_keys.append(category_key)
+
+    order_rule, order_share = None, []
+    if rules.has_fixed:
+        order_rule, order_share = _best_order_discount(lines, category_keys, list_totals, discounts, rules)
+
+    priced, applied = [], {}
+    for index, line in enumerate(lines):
+        rule_ids = ()
+        if line_rules[index] is not None:
+            rule_ids = (line_rules[index].rule_id,)
+            applied[line_rules[index].rule_id] = line_rules[index]
+        if order_share and order_share[index]:
+            discounts[index] += order_share[index]
+            rule_ids += (order_rule.rule_id,)
+            applied[order_rule.rule_id] = order_rule
+        priced.append(PricedLine(
+            line.sweet_id, line.sweet_category, line.quantity, line.unit_price_paise,
+            list_totals[index], discounts[index], list_totals[index] - discounts[index], rule_ids
+        ))
+
+    list_paise, discount_paise = sum(list_totals), sum(discounts)
+    coupon = None
+    if rules.coupon is not None and any(rule.coupon_code == rules.coupon for rule in applied.values()):
+        coupon = rules.coupon
+    return PricedCart(
+        priced, list_paise, discount_paise, list_paise - discount_paise,
+        [rule.rule_name for rule in applied.values()], coupon
+    )
+
+
+def _best_order_discount(
+    lines: Sequence[CartLine],
+    category_keys: List[str],
+    list_totals: List[int],
+    discounts: List[int],
+    rules: ActiveRules
+) -> Tuple[Optional[Rule], List[int]]:
+    """Pick the fixed-amount rule worth most and split it over the lines it covers."""
+    by_sweet: Dict[int, int] = {}
+    by_category: Dict[str, int] = {}
+    for index, line in enumerate(lines):
+        net = list_totals[index] - discounts[index]
+        by_sweet[line.sweet_id] = by_sweet.get(line.sweet_id, 0) + net
+        by_category[category_keys[index]] = by_category.get(category_keys[index], 0) + net
+
+    # Each candidate is capped at the discounted subtotal of its scope
+    candidates = []
+    if rules.fixed_everywhere is not None:
+        candidates.append((rules.fixed_everywhere, sum(by_sweet.values())))
+    for sweet_id, subtotal in by_sweet.items():
+        rule = rules.fixed_by_sweet.get(sweet_id)
+        if rule is not None:
+            candidates.append((rule, subtotal))
+    for category_key, subtotal in by_category.items():
+        rule = rules.fixed_by_category.get(category_key)
+        if rule is not None:
+            candidates.append((rule, subtotal))
+
+    best, best_rule = 0, None
+    for rule, subtotal in candidates:
+        amount = min(rule.amount_off_paise, subtotal)
+        if amount > best or (amount == best and best_rule is not None and rule.rule_id < best_rule.rule_id):
+            best, best_rule = amount, rule
+    if best_rule is None:
+        return None, []
+
+    if best_rule.sweet_id is not None:
+        weights = [
+            list_totals[index] - discounts[index] if line.sweet_id == best_rule.sweet_id else 0
+            for index, line in enumerate(lines)
+        ]
+    elif best_rule.sweet_category is not None:
+        weights = [
+            list_totals[index] - discounts[index] if category_keys[index] == best_rule.sweet_category else 0
+            for index in range(len(lines))
+        ]
+    else:
+        weights = [list_totals[index] - discounts[index] for index in range(len(lines))]
+    return best_rule, apportion(best, weights)
+
+
+def order_prices(priced: PricedCart) -> dict:
+    """Response fields for an order: list total, discounted total and the rules applied.
+
+    discounted_price stays 0 when no discount applies, as it always has.
+    """
+    return {
+        "total_price": to_rupees(priced.list_paise),
+        "discounted_price": to_rupees(priced.charged_paise) if priced.discount_paise else 0,
+        "applied_rules": priced.applied_rules,
+    }
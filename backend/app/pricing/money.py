@@ -0,0 +1,45 @@
+"""
+Exact money arithmetic in integer paise.
+
+Prices are stored as floats on sweet_products, so they are converted once,
+through their decimal representation, and every later sum and discount is
+integer arithmetic. Rupee floats only reappear at the API boundary.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+from typing import List
+
+PAISE_PER_RUPEE = 100
+BASIS_POINTS = 10000
+
+
+def to_paise(amount) -> int:
+    """Rupees (float, str or Decimal) to paise, rounding half up."""
+    return int((Decimal(str(amount)) * PAISE_PER_RUPEE).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def to_rupees(paise: int) -> float:
+    """Paise to the rupee float used in API responses."""
+    return float(Decimal(paise) / PAISE_PER_RUPEE)
+
+
+def percent_of(paise: int, basis_points: int) -> int:
+    """``basis_points`` / 10000 of a non-negative amount, rounding half up."""
+    return (paise * basis_points + BASIS_POINTS // 2) // BASIS_POINTS
+
+
+def apportion(amount: int, weights: List[int]) -> List[int]:
+    """Split ``amount`` in proportion to ``weights`` so the parts sum exactly.
+
+    Uses the largest-remainder method; ties go to the earlier weight.
+    """
+    total = sum(weights)
+    if not total:
+        return [0] * len(weights)
+    shares = [amount * weight // total for weight in weights]
+    remainders = sorted(
+        range(len(weights)),
+        key=lambda index: (-(amount * weights[index] % total), index)
+    )
+    for index in remainders[:amount - sum(shares)]:
+        shares[index] += 1
+    return shares
@@ -0,0 +1,294 @@
+"""
+Pricing rules: an indexed in-memory table loaded from pricing_rules.
+
+The table is built once per load and indexed by coupon code, then by scope
+(sweet, category or everything). Pricing a cart asks the table for the
+rules active for one coupon at one moment. That view is cached until the
+next starts_at/expires_at boundary, so each cart line only does a few
+dictionary lookups.
+
+A commit that writes pricing_rules invalidates the table in this process.
+Other processes pick up changes after PRICING_RULES_TTL_SECONDS.
+
+The legacy COUPON code (10% off everything) is a built-in rule, kept unless
+PRICING_LEGACY_COUPON is set to an empty string or a stored rule uses the
+same code.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.database import AnySession, run_in_session
+from app.models import PricingRule
+
+load_dotenv()
+
+PRICING_RULES_TTL_SECONDS = float(os.getenv("PRICING_RULES_TTL_SECONDS", "60"))
+PRICING_LEGACY_COUPON = os.getenv("PRICING_LEGACY_COUPON", "COUPON")
+PRICING_LEGACY_COUPON_BPS = int(os.getenv("PRICING_LEGACY_COUPON_BPS", "1000"))
+
+PERCENTAGE = "percentage"
+FIXED = "fixed"
+BOGO = "bogo"
+RULE_TYPE_PATTERN = f"^({PERCENTAGE}|{FIXED}|{BOGO})$"
+
+# Session.info flag: this transaction wrote pricing rules
+_DIRTY_FLAG = "pricing_rules_changed"
+
+_FAR_FUTURE = datetime.max.replace(tzinfo=timezone.utc)
+
+
+def rule_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Pricing rule not found"
+    )
+
+
+def _utc(moment: Optional[datetime]) -> Optional[datetime]:
+    if moment is None or moment.tzinfo is not None:
+        return moment
+    return moment.replace(tzinfo=timezone.utc)
+
+
+class Rule(NamedTuple):
+    """Immutable, load-time copy of a pricing rule."""
+    rule_id: int
+    rule_name: str
+    rule_type: str
+    coupon_code: Optional[str] = None
+    percent_off_bps: int = 0
+    amount_off_paise: int = 0
+    buy_quantity: int = 0
+    free_quantity: int = 0
+    sweet_category: Optional[str] = None
+    sweet_id: Optional[int] = None
+    starts_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+
+    @classmethod
+    def from_model(cls, row: PricingRule) -> "Rule":
+        return cls(
+            rule_id=row.rule_id,
+            rule_name=row.rule_name,
+            rule_type=row.rule_type,
+            coupon_code=row.coupon_code,
+            percent_off_bps=row.percent_off_bps or 0,
+            amount_off_paise=row.amount_off_paise or 0,
+            buy_quantity=row.buy_quantity or 0,
+            free_quantity=row.free_quantity or 0,
+            sweet_category=row.sweet_category.strip().lower() if row.sweet_category else None,
+            sweet_id=row.sweet_id,
+            starts_at=_utc(row.starts_at),
+            expires_at=_utc(row.expires_at),
+        )
+
+    def is_live(self, now: datetime) -> bool:
+        return (self.starts_at is None or self.starts_at <= now) and (
+            self.expires_at is None or now < self.expires_at
+        )
+
+
+def legacy_rules() -> List[Rule]:
+    if not PRICING_LEGACY_COUPON:
+        return []
+    return [Rule(
+        rule_id=0,
+        rule_name=f"{PRICING_LEGACY_COUPON} coupon",
+        rule_type=PERCENTAGE,
+        coupon_code=PRICING_LEGACY_COUPON,
+        percent_off_bps=PRICING_LEGACY_COUPON_BPS,
+    )]
+
+
+def _line_candidates(rules: List[Rule]) -> List[Rule]:
+    """The rules in one scope that can still win a line.
+
+    Only the deepest percentage cut matters, and BOGO rules with the same
+    buy/free shape give identical discounts, so each scope keeps one of each.
+    """
+    best_percentage = None
+    bogo: Dict[Tuple[int, int], Rule] = {}
+    for rule in rules:
+        if rule.rule_type == BOGO:
+            bogo.setdefault((rule.buy_quantity, rule.free_quantity), rule)
+        elif best_percentage is None or rule.percent_off_bps > best_percentage.percent_off_bps:
+            best_percentage = rule
+    return ([best_percentage] if best_percentage else []) + list(bogo.values())
+
+
+def _larger_fixed(current: Optional[Rule], rule: Rule) -> Rule:
+    return rule if current is None or rule.amount_off_paise > current.amount_off_paise else current
+
+
+class ActiveRules:
+    """Rules in force for one coupon at one moment, indexed for line lookups.
+
+    Line rules (percentage and BOGO) are split by scope and trimmed to the
+    ones that can win. Fixed-amount rules apply to the order as a whole;
+    the largest per scope always gives the most, so only it is kept.
+    """
+
+    __slots__ = (
+        "by_sweet", "by_category", "everywhere",
+        "fixed_by_sweet", "fixed_by_category", "fixed_everywhere",
+        "coupon", "built_at", "valid_until"
+    )
+
+    def __init__(self, rules: Iterable[Rule], coupon: Optional[str], built_at: datetime, valid_until: datetime):
+        by_sweet: Dict[int, List[Rule]] = {}
+        by_category: Dict[str, List[Rule]] = {}
+        everywhere: List[Rule] = []
+        self.fixed_by_sweet: Dict[int, Rule] = {}
+        self.fixed_by_category: Dict[str, Rule] = {}
+        self.fixed_everywhere: Optional[Rule] = None
+        self.coupon = coupon
+        # The view holds for moments in [built_at, valid_until)
+        self.built_at = built_at
+        self.valid_until = valid_until
+        for rule in rules:
+            if rule.rule_type == FIXED:
+                if rule.sweet_id is not None:
+                    self.fixed_by_sweet[rule.sweet_id] = _larger_fixed(self.fixed_by_sweet.get(rule.sweet_id), rule)
+                elif rule.sweet_category is not None:
+                    self.fixed_by_category[rule.sweet_category] = _larger_fixed(
+                        self.fixed_by_category.get(rule.sweet_category), rule
+                    )
+                else:
+                    self.fixed_everywhere = _larger_fixed(self.fixed_everywhere, rule)
+            elif rule.sweet_id is not None:
+                by_sweet.setdefault(rule.sweet_id, []).append(rule)
+            elif rule.sweet_category is not None:
+                by_category.setdefault(rule.sweet_category, []).append(rule)
+            else:
+                everywhere.append(rule)
+        self.by_sweet = {key: _line_candidates(scoped) for key, scoped in by_sweet.items()}
+        self.by_category = {key: _line_candidates(scoped) for key, scoped in by_category.items()}
+        self.everywhere = _line_candidates(everywhere)
+
+    @property
+    def has_fixed(self) -> bool:
+        return bool(self.fixed_by_sweet or self.fixed_by_category or self.fixed_everywhere)
+
+
+class RuleTable:
+    """All loaded rules, grouped by coupon code (None for automatic promotions)."""
+
+    def __init__(self, rules: Iterable[Rule]):
+        self.rules = list(rules)
+        self._by_code: Dict[Optional[str], List[Rule]] = {}
+        for rule in self.rules:
+            self._by_code.setdefault(rule.coupon_code, []).append(rule)
+        self._views: Dict[Optional[str], ActiveRules] = {}
+
+    def has_coupon(self, coupon: Optional[str]) -> bool:
+        return coupon is not None and coupon in self._by_code
+
+    def active(self, coupon: Optional[str] = None, now: Optional[datetime] = None) -> ActiveRules:
+        """Rules in force at ``now`` for an order carrying ``coupon``.
+
+        Unknown codes share the automatic-promotions view, so arbitrary
+        client input cannot grow the view cache.
+        """
+        now = _utc(now) or datetime.now(timezone.utc)
+        code = coupon if self.has_coupon(coupon) else None
+        view = self._views.get(code)
+        if view is None or not view.built_at <= now < view.valid_until:
+            view = self._build_view(code, now)
+            self._views[code] = view
+        return view
+
+    def _build_view(self, code: Optional[str], now: datetime) -> ActiveRules:
+        candidates = self._by_code.get(None, []) + (self._by_code.get(code, []) if code else [])
+        valid_until = _FAR_FUTURE
+        for rule in candidates:
+            for boundary in (rule.starts_at, rule.expires_at):
+                if boundary is not None and boundary > now:
+                    valid_until = min(valid_until, boundary)
+        return ActiveRules((rule for rule in candidates if rule.is_live(now)), code, now, valid_until)
+
+
+class PricingRuleCache:
+    """Process-wide rule table, reloaded after rule writes or when it ages out."""
+
+    def __init__(self, ttl: float = PRICING_RULES_TTL_SECONDS, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._table: Optional[RuleTable] = None
+        self._loaded_at = 0.0
+        self._generation = 0
+
+    def is_fresh(self) -> bool:
+        return self._table is not None and self._clock() - self._loaded_at < self.ttl
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._table = None
+
+    def table(self, db: Session) -> RuleTable:
+        """The current table, loading it with ``db`` when missing or expired."""
+        table = self._table
+        if table is not None and self.is_fresh():
+            return table
+
+        generation = self._generation
+        stored = [Rule.from_model(row) for row in db.scalars(
+            select(PricingRule).where(PricingRule.is_active.is_(True)).order_by(PricingRule.rule_id)
+        )]
+        codes = {rule.coupon_code for rule in stored}
+        table = RuleTable([rule for rule in legacy_rules() if rule.coupon_code not in codes] + stored)
+        with self._lock:
+            # A rule write committed during the load invalidated this result
+            if generation == self._generation:
+                self._table, self._loaded_at = table, self._clock()
+        return table
+
+    def cached(self) -> RuleTable:
+        """The last loaded table, without touching the database."""
+        return self._table or RuleTable(legacy_rules())
+
+
+pricing_rules = PricingRuleCache()
+
+
+async def current_rules(db: AnySession) -> RuleTable:
+    """The rule table, touching the database only when it needs reloading."""
+    if pricing_rules.is_fresh():
+        return pricing_rules.cached()
+    return await run_in_session(db, pricing_rules.table)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_rule_writes(session: Session, flush_context) -> None:
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, PricingRule):
+            session.info[_DIRTY_FLAG] = True
+            return
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_rule_writes(orm_execute_state) -> None:
+    is_write = orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert
+    mapper = orm_execute_state.bind_mapper
+    if is_write and mapper is not None and mapper.class_ is PricingRule:
+        orm_execute_state.session.info[_DIRTY_FLAG] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    if session.info.pop(_DIRTY_FLAG, False):
+        pricing_rules.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_write_flag(session: Session) -> None:
+    session.info.pop(_DIRTY_FLAG, None)
@@ -0,0 +1,189 @@
+"""
+Token-bucket rate limiting for expensive and abusable routes.
+
+Each budget is a bucket of ``capacity`` tokens that refills continuously at
+``capacity`` per period ("20/minute"). A request takes one token. With no
+token left it gets 429 and a Retry-After header saying when the next token
+arrives. A rejected request takes nothing, so a client that waits that long
+is let through.
+
+Anonymous routes (login, register) are keyed by client IP. Authenticated
+routes (purchase, checkout) are keyed by the user_id of the current user,
+and are charged from inside the operation idempotency_store.run executes:
+a retry answered with the stored result, or one that waits for the
+in-flight original, takes no token.
+
+Behind a reverse proxy, run uvicorn with --proxy-headers so the client IP
+is the caller's, not the proxy's.
+
+Buckets live in a RateLimitBackend. InMemoryBackend splits them across
+RATE_LIMIT_SHARDS independently locked shards, each an LRU of at most
+RATE_LIMIT_MAX_KEYS / RATE_LIMIT_SHARDS buckets. A check is one dict lookup
+and a little arithmetic under one shard's lock. The in-memory buckets are
+per process, so with N workers a client can get up to N times its budget.
+A shared backend (e.g. Redis running the same refill-and-take as a Lua
+script) removes that by implementing consume().
+"""
+import math
+import os
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, List, NamedTuple
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, Request, status
+
+from app.metrics.registry import registry
+
+load_dotenv()
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+RATE_LIMIT_SHARDS = int(os.getenv("RATE_LIMIT_SHARDS", "16"))
+# Buckets kept across all shards; the least recently used are dropped first
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+PERIOD_SECONDS = {"second": 1, "minute": 60, "hour": 3600}
+
+rate_limited_total = registry.counter(
+    "rate_limited_requests_total",
+    "Requests rejected with 429 by a rate limit.",
+    ("limit",),
+)
+
+
+class Rate(NamedTuple):
+    """A bucket of ``capacity`` tokens refilling at ``per_second``."""
+    capacity: float
+    per_second: float
+
+
+def parse_rate(spec: str) -> Rate:
+    """Parse "<count>/<second|minute|hour>", e.g. "20/minute"."""
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(second|minute|hour)\s*", spec)
+    if match is None or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid rate {spec!r}; expected e.g. '20/minute'")
+    count = int(match.group(1))
+    return Rate(capacity=count, per_second=count / PERIOD_SECONDS[match.group(2)])
+
+
+# Per-route budgets
+RATE_LIMIT_LOGIN = parse_rate(os.getenv("RATE_LIMIT_LOGIN", "20/minute"))
+RATE_LIMIT_REGISTER = parse_rate(os.getenv("RATE_LIMIT_REGISTER", "10/minute"))
+RATE_LIMIT_PURCHASE = parse_rate(os.getenv("RATE_LIMIT_PURCHASE", "60/minute"))
+RATE_LIMIT_CHECKOUT = parse_rate(os.getenv("RATE_LIMIT_CHECKOUT", "30/minute"))
+
+
+def rate_limited(retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many requests. Try again later.",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+
+
+class RateLimitBackend(ABC):
+    """Where buckets are kept. ``consume`` must be atomic per key."""
+
+    @abstractmethod
+    def consume(self, key: str, rate: Rate, cost: float = 1.0) -> float:
+        """Take ``cost`` tokens from ``key``'s bucket.
+
+        Returns 0.0 when they were taken, otherwise the seconds until they
+        will be available (and takes nothing).
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Forget every bucket."""
+
+
+class _Shard:
+    __slots__ = ("lock", "buckets")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # key -> [tokens, updated_at], least recently used first
+        self.buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+
+
+class InMemoryBackend(RateLimitBackend):
+    """Buckets in this process, split across independently locked LRU shards."""
+
+    def __init__(
+        self,
+        shards: int = RATE_LIMIT_SHARDS,
+        max_keys: int = RATE_LIMIT_MAX_KEYS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self._keys_per_shard = max(1, max_keys // len(self._shards))
+        self._clock = clock
+
+    def consume(self, key: str, rate: Rate, cost: float = 1.0) -> float:
+        shard = self._shards[hash(key) % len(self._shards)]
+        with shard.lock:
+            now = self._clock()
+            bucket = shard.buckets.get(key)
+            if bucket is None:
+                bucket = shard.buckets[key] = [rate.capacity, now]
+                if len(shard.buckets) > self._keys_per_shard:
+                    # The longest-idle bucket is the one most likely to be full again
+                    shard.buckets.popitem(last=False)
+            else:
+                shard.buckets.move_to_end(key)
+                bucket[0] = min(rate.capacity, bucket[0] + (now - bucket[1]) * rate.per_second)
+                bucket[1] = now
+
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                return 0.0
+            return (cost - bucket[0]) / rate.per_second
+
+    def clear(self) -> None:
+        for shard in self._shards:
+            with shard.lock:
+                shard.buckets.clear()
+
+    def __len__(self) -> int:
+        return sum(len(shard.buckets) for shard in self._shards)
+
+
+class RateLimiter:
+    """Checks budgets against a backend and turns an empty bucket into 429."""
+
+    def __init__(self, backend: RateLimitBackend, enabled: bool = RATE_LIMIT_ENABLED):
+        self.backend = backend
+        self.enabled = enabled
+
+    def check(self, name: str, identity: str, rate: Rate) -> None:
+        if not self.enabled:
+            return
+        retry_after = self.backend.consume(f"{name}:{identity}", rate)
+        if retry_after > 0:
+            rate_limited_total.inc(name)
+            raise rate_limited(retry_after)
+
+    def reset(self) -> None:
+        self.backend.clear()
+
+
+rate_limiter = RateLimiter(InMemoryBackend())
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def limit_by_ip(name: str, rate: Rate):
+    """Route dependency spending ``rate`` per client IP under the budget ``name``."""
+    async def dependency(request: Request) -> None:
+        rate_limiter.check(name, f"ip:{client_ip(request)}", rate)
+    return dependency
+
+
+def charge_user(name: str, user_id: int, rate: Rate) -> None:
+    """Spend ``rate`` for ``user_id`` under the budget ``name``; raises 429 when it is exhausted."""
+    rate_limiter.check(name, f"user:{user_id}", rate)
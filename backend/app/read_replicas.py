@@ -0,0 +1,195 @@
+"""
+Read-replica routing for catalog reads.
+
+Handlers that only read the catalog depend on get_read_db, which hands out
+a session on a healthy replica. Writers depend on get_write_db, which is
+always the primary. A request is served by the primary instead of a
+replica when:
+
+- no replica is configured or healthy,
+- the user committed a write in the last REPLICA_STICKY_SECONDS
+  (read-your-writes). Other users keep reading from replicas.
+
+A replica session is tagged with the replica's name, so catalog reads take
+the catalog version from that replica. A lagging replica's page is
+therefore cached, and given an ETag, under its own older version, never
+under a newer version read from the primary.
+"""
+import asyncio
+import itertools
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+from fastapi import Depends
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.cache import TTLCache
+from app.database import DATABASE_ASYNC, AnySession, async_database_url, get_db
+from app.db_tuning import create_tuned_async_engine, create_tuned_engine
+from app.auth.authentication_service import get_current_user
+from app.auth.user_cache import UserPrincipal
+from app.catalog.response_cache import CATALOG_SOURCE_KEY
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+REPLICA_HEALTH_CHECK_INTERVAL = float(os.getenv("REPLICA_HEALTH_CHECK_INTERVAL", "10"))
+REPLICA_STICKY_MAX_USERS = int(os.getenv("REPLICA_STICKY_MAX_USERS", "10000"))
+
+# Session.info key naming the user whose commits make them sticky
+_WRITER_KEY = "writer_user_id"
+
+
+class Replica:
+    """One read replica: its engine, session factory and health."""
+
+    def __init__(self, name: str, url: str, is_async: bool = False):
+        self.name = name
+        self.healthy = True
+        self.failures = 0
+        if is_async:
+            self.async_engine = create_tuned_async_engine(async_database_url(url))
+            self.engine: Engine = self.async_engine.sync_engine
+            self.session_factory = async_sessionmaker(
+                self.async_engine, autoflush=False, expire_on_commit=False
+            )
+        else:
+            self.async_engine = None
+            self.engine = create_tuned_engine(url)
+            self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+    async def ping(self) -> None:
+        if self.async_engine is not None:
+            async with self.async_engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+        else:
+            await run_in_threadpool(self._ping_sync)
+
+    def _ping_sync(self) -> None:
+        with self.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    def status(self) -> dict:
+        return {"name": self.name, "healthy": self.healthy, "failures": self.failures}
+
+
+class ReplicaRouter:
+    """Chooses a healthy replica per request and tracks read-your-writes users."""
+
+    def __init__(self, replicas: List[Replica]):
+        self.replicas = replicas
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+        self.sticky_users = TTLCache(
+            max_entries=REPLICA_STICKY_MAX_USERS,
+            ttl_seconds=REPLICA_STICKY_SECONDS
+        )
+
+    @classmethod
+    def from_urls(cls, urls: List[str], is_async: bool = False) -> "ReplicaRouter":
+        return cls([Replica(f"replica-{index}", url, is_async) for index, url in enumerate(urls, 1)])
+
+    def choose(self, user_id: Optional[int] = None) -> Optional[Replica]:
+        """A healthy replica in round-robin order, or None to use the primary."""
+        if user_id is not None and self.sticky_users.get(user_id):
+            return None
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        with self._lock:
+            turn = next(self._turn)
+        return healthy[turn % len(healthy)]
+
+    def record_write(self, user_id: int) -> None:
+        self.sticky_users.set(user_id, True)
+
+    def mark_unhealthy(self, replica: Replica) -> None:
+        if replica.healthy:
+            logger.warning("Read replica %s marked unhealthy", replica.name)
+        replica.healthy = False
+        replica.failures += 1
+
+    async def check_health(self) -> None:
+        """Ping every replica, taking failed ones out of rotation until they recover."""
+        for replica in self.replicas:
+            try:
+                await replica.ping()
+            except Exception:
+                self.mark_unhealthy(replica)
+            else:
+                if not replica.healthy:
+                    logger.info("Read replica %s is healthy again", replica.name)
+                replica.healthy = True
+
+    async def run_health_checks(self, interval: float = REPLICA_HEALTH_CHECK_INTERVAL) -> None:
+        while True:
+            await self.check_health()
+            await asyncio.sleep(interval)
+
+    def engines(self) -> Dict[str, Engine]:
+        return {replica.name: replica.engine for replica in self.replicas}
+
+    def status(self) -> List[dict]:
+        return [replica.status() for replica in self.replicas]
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            if replica.async_engine is not None:
+                await replica.async_engine.dispose()
+            else:
+                replica.engine.dispose()
+
+
+replica_router = ReplicaRouter.from_urls(REPLICA_URLS, is_async=DATABASE_ASYNC)
+
+
+async def get_read_db(
+    primary: AnySession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """Dependency that provides a session for read-only handlers."""
+    replica = replica_router.choose(current_user.user_id)
+    if replica is None:
+        yield primary
+        return
+
+    db = replica.session_factory()
+    db.info[CATALOG_SOURCE_KEY] = replica.name
+    try:
+        yield db
+    except DBAPIError:
+        replica_router.mark_unhealthy(replica)
+        raise
+    finally:
+        if replica.async_engine is not None:
+            await db.close()
+        else:
+            await run_in_threadpool(db.close)
+
+
+async def get_write_db(
+    db: AnySession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """Dependency that provides a primary session whose commits make the user sticky."""
+    db.info[_WRITER_KEY] = current_user.user_id
+    yield db
+
+
+@event.listens_for(Session, "after_commit")
+def _make_writer_sticky(session: Session) -> None:
+    # Recorded at commit time, before the response is sent, so the user's next read sees it
+    user_id = session.info.get(_WRITER_KEY)
+    if user_id is not None:
+        replica_router.record_write(user_id)
@@ -0,0 +1,72 @@
+"""
+Administrative diagnostics routes (Admin only).
+"""
+from fastapi import APIRouter, Depends, status
+
+from app.database import AnySession, database_engines, run_in_session
+from app.db_tuning import pool_status
+from app.read_replicas import get_write_db, replica_router
+from app.inventory.hot_stock import hot_stock
+from app.inventory.ledger import compact_ledger
+from app.auth.authentication_service import require_admin
+from app.auth.user_cache import UserPrincipal
+
+router = APIRouter(prefix="/api/admin", tags=["Admin"])
+
+
+@router.get("/db/pool")
+async def get_pool_statistics(current_user: UserPrincipal = Depends(require_admin)):
+    """Connection pool occupancy and checkout wait times per engine (Admin only)."""
+    engines = {**database_engines(), **replica_router.engines()}
+    return {name: pool_status(engine) for name, engine in engines.items()}
+
+
+@router.get("/db/replicas")
+async def get_replica_health(current_user: UserPrincipal = Depends(require_admin)):
+    """Health of each configured read replica (Admin only)."""
+    return replica_router.status()
+
+
+@router.get("/hot-skus")
+async def list_hot_skus(current_user: UserPrincipal = Depends(require_admin)):
+    """Sweets in flash-sale mode with their in-memory stock (Admin only)."""
+    return hot_stock.status()
+
+
+@router.put("/hot-skus/{sweet_id}")
+async def enable_hot_sku(
+    sweet_id: int,
+    db: AnySession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(require_admin)
+):
+    """Serve a sweet's purchases from the sharded in-memory counter (Admin only)."""
+    return await run_in_session(db, hot_stock.enable, sweet_id)
+
+
+@router.delete("/hot-skus/{sweet_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def disable_hot_sku(
+    sweet_id: int,
+    db: AnySession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(require_admin)
+):
+    """Write back pending units and return the sweet to row updates (Admin only)."""
+    await run_in_session(db, hot_stock.disable, sweet_id)
+    return None
+
+
+@router.post("/hot-skus/flush")
+async def flush_hot_skus(
+    db: AnySession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(require_admin)
+):
+    """Write pending hot-SKU reservations back to the database now (Admin only)."""
+    return {"flushed_units": await run_in_session(db, hot_stock.flush)}
+
+
+@router.post("/ledger/compact")
+async def compact_inventory_ledger(
+    db: AnySession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(require_admin)
+):
+    """Fold committed ledger movements into the per-sweet snapshots now (Admin only)."""
+    return {"compacted_movements": await run_in_session(db, compact_ledger)}
@@ -0,0 +1,109 @@
+"""
+Low-stock alert routes: per-sweet thresholds and the live alert feed (Admin only).
+"""
+import asyncio
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.database import AnySession, run_in_session
+from app.read_replicas import get_write_db
+from app.models import LowStockThreshold, SweetProduct
+from app.schemas import LowStockThresholdRequest, LowStockThresholdResponse, StockAlertResponse
+from app.auth.authentication_service import require_admin
+from app.auth.user_cache import UserPrincipal
+from app.inventory.low_stock import alert_stream, low_stock_watcher
+from app.inventory.stock_operations import sweet_not_found
+from app.sse import KEEPALIVE_COMMENT, SSE_HEADERS, SSE_KEEPALIVE_SECONDS, SSE_MEDIA_TYPE, format_event
+
+router = APIRouter(prefix="/api/admin/alerts", tags=["Stock Alerts"])
+
+
+@router.get("/thresholds", response_model=List[LowStockThresholdResponse])
+async def list_thresholds(
+    db: AnySession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(require_admin)
+):
+    """Sweets with a threshold other than LOW_STOCK_THRESHOLD (Admin only)."""
+    def load(session: Session) -> List[LowStockThreshold]:
+        return session.query(LowStockThreshold).order_by(LowStockThreshold.sweet_id).all()
+
+    return await run_in_session(db, load)
+
+
+@router.put("/thresholds/{sweet_id}", response_model=LowStockThresholdResponse)
+async def set_threshold(
+    sweet_id: int,
+    threshold_data: LowStockThresholdRequest,
+    db: AnySession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(require_admin)
+):
+    """Set the stock level below which a sweet raises a low-stock alert (Admin only)."""
+    def upsert(session: Session) -> LowStockThreshold:
+        if session.get(SweetProduct, sweet_id) is None:
+            raise sweet_not_found()
+        row = session.get(LowStockThreshold, sweet_id)
+        if row is None:
+            row = LowStockThreshold(sweet_id=sweet_id)
+            session.add(row)
+        row.threshold = threshold_data.threshold
+        session.commit()
+        session.refresh(row)
+        return row
+
+    row = await run_in_session(db, upsert)
+    low_stock_watcher.set_threshold(sweet_id, row.threshold)
+    return row
+
+
+@router.delete("/thresholds/{sweet_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_threshold(
+    sweet_id: int,
+    db: AnySession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(require_admin)
+):
+    """Return a sweet to the default threshold (Admin only)."""
+    def remove(session: Session) -> None:
+        row = session.get(LowStockThreshold, sweet_id)
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No threshold override for this sweet"
+            )
+        session.delete(row)
+        session.commit()
+
+    await run_in_session(db, remove)
+    low_stock_watcher.set_threshold(sweet_id, None)
+    return None
+
+
+@router.get("/recent", response_model=List[StockAlertResponse])
+async def recent_alerts(current_user: UserPrincipal = Depends(require_admin)):
+    """The latest alerts raised by this process, newest first (Admin only)."""
+    return [alert._asdict() for alert in reversed(alert_stream.recent)]
+
+
+@router.get("/stream")
+async def stream_alerts(request: Request, current_user: UserPrincipal = Depends(require_admin)):
+    """Server-Sent Events feed of stock alerts as they are raised (Admin only)."""
+    queue = alert_stream.connect()
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    alert = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield KEEPALIVE_COMMENT
+                    continue
+                if alert is None:
+                    # Fell too far behind; the client reconnects and reads /recent
+                    break
+                yield format_event(alert.level, alert.as_json())
+        finally:
+            alert_stream.disconnect(queue)
+
+    return StreamingResponse(events(), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
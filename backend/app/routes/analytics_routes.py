@@ -0,0 +1,67 @@
+"""
+Sales analytics routes answered from the rollup tables (Admin only).
+"""
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+
+from app.database import AnySession, run_in_session
+from app.read_replicas import get_read_db
+from app.schemas import BestSellerResponse, CategoryRevenueResponse, StockTurnResponse
+from app.auth.authentication_service import require_admin
+from app.auth.user_cache import UserPrincipal
+from app.analytics.rollups import GRANULARITY_PATTERN
+from app.analytics.reports import (
+    ANALYTICS_TOP_DEFAULT,
+    ANALYTICS_TOP_MAX,
+    best_sellers,
+    report_window,
+    revenue_by_category,
+    stock_turn
+)
+
+router = APIRouter(prefix="/api/admin/analytics", tags=["Analytics"])
+
+
+@router.get("/revenue-by-category", response_model=List[CategoryRevenueResponse])
+async def get_revenue_by_category(
+    granularity: str = Query("day", pattern=GRANULARITY_PATTERN, description="hour or day (UTC)"),
+    since: Optional[datetime] = Query(None, description="Start of the report (default: 30 days ago)"),
+    until: Optional[datetime] = Query(None, description="End of the report (default: now)"),
+    category: Optional[str] = Query(None, description="Only this category"),
+    db: AnySession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(require_admin)
+):
+    """Revenue, units sold and orders per category per hour or day (Admin only)."""
+    window = report_window(granularity, since, until)
+    return await run_in_session(db, revenue_by_category, window, category)
+
+
+@router.get("/best-sellers", response_model=List[BestSellerResponse])
+async def get_best_sellers(
+    granularity: str = Query("day", pattern=GRANULARITY_PATTERN, description="Round the window to hours or days"),
+    since: Optional[datetime] = Query(None, description="Start of the report (default: 30 days ago)"),
+    until: Optional[datetime] = Query(None, description="End of the report (default: now)"),
+    rank_by: str = Query("units", pattern="^(units|revenue)$", description="units or revenue"),
+    category: Optional[str] = Query(None, description="Only this category"),
+    limit: int = Query(ANALYTICS_TOP_DEFAULT, ge=1, le=ANALYTICS_TOP_MAX),
+    db: AnySession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(require_admin)
+):
+    """Top-selling sweets by units or revenue (Admin only)."""
+    window = report_window(granularity, since, until)
+    return await run_in_session(db, best_sellers, window, limit, rank_by, category)
+
+
+@router.get("/stock-turn", response_model=List[StockTurnResponse])
+async def get_stock_turn(
+    since: Optional[datetime] = Query(None, description="Start of the report (default: 30 days ago)"),
+    until: Optional[datetime] = Query(None, description="End of the report (default: now)"),
+    limit: int = Query(ANALYTICS_TOP_DEFAULT, ge=1, le=ANALYTICS_TOP_MAX),
+    db: AnySession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(require_admin)
+):
+    """Units sold over average daily stock per sweet, fastest-moving first (Admin only)."""
+    window = report_window("day", since, until)
+    return await run_in_session(db, stock_turn, window, limit)
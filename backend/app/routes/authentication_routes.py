@@ -6,7 +6,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
-from app.database import get_db
+from app.database import AnySession, get_db, run_in_session
 from app.models import UserAccount
 from app.schemas import (
     UserRegistrationRequest,
@@ -14,23 +14,43 @@ from app.schemas import (
     UserProfileResponse,
     AuthenticationToken
 )
-from app.auth.password_hasher import hash_password
+from app.auth.hashing_service import password_hashing_service
 from app.auth.token_manager import create_access_token
-from app.auth.authentication_service import authenticate_user, get_current_user
+from app.auth.authentication_service import authenticate_user, find_user_by_email, get_current_user
+from app.auth.user_cache import UserPrincipal
+from app.rate_limit import RATE_LIMIT_LOGIN, RATE_LIMIT_REGISTER, limit_by_ip
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
 
-@router.post("/register", response_model=UserProfileResponse, status_code=status.HTTP_201_CREATED)
-def register_user(
+def insert_user(db: Session, new_user: UserAccount) -> UserAccount:
+    """Persist a new account, mapping a duplicate email race to 409."""
+    try:
+        db.add(new_user)
+        db.commit()
+        db.refresh(new_user)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Email address already registered"
+        )
+    return new_user
+
+
+@router.post(
+    "/register",
+    response_model=UserProfileResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_by_ip("register", RATE_LIMIT_REGISTER))]
+)
+async def register_user(
     registration_data: UserRegistrationRequest,
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_db)
 ):
     """Register a new user account."""
     # Check if email already exists
-    existing_user = db.query(UserAccount).filter(
-        UserAccount.email_address == registration_data.email_address
-    ).first()
+    existing_user = await run_in_session(db, find_user_by_email, registration_data.email_address)
     
     if existing_user:
         raise HTTPException(
@@ -42,33 +62,26 @@ def register_user(
     new_user = UserAccount(
         email_address=registration_data.email_address,
         full_name=registration_data.full_name,
-        hashed_password=hash_password(registration_data.password),
+        hashed_password=await password_hashing_service.hash_password(registration_data.password),
         is_administrator=registration_data.is_administrator
     )
     
-    try:
-        db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
-    except IntegrityError:
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Email address already registered"
-        )
-    
-    return new_user
+    return await run_in_session(db, insert_user, new_user)
 
 
 
-@router.post("/login", response_model=AuthenticationToken)
-def login_user(
+@router.post(
+    "/login",
+    response_model=AuthenticationToken,
+    dependencies=[Depends(limit_by_ip("login", RATE_LIMIT_LOGIN))]
+)
+async def login_user(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_db)
 ):
     """Authenticate user and return access token - OAuth2 compatible."""
     # OAuth2 spec uses 'username' field for email
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     
     if not user:
         raise HTTPException(
@@ -82,6 +95,6 @@ def login_user(
 
 
 @router.get("/me", response_model=UserProfileResponse)
-def get_current_user_profile(current_user: UserAccount = Depends(get_current_user)):
+async def get_current_user_profile(current_user: UserPrincipal = Depends(get_current_user)):
     """Get current authenticated user's profile."""
     return current_user
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""
+Bulk catalog routes for streaming import and export (Admin only).
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.database import AnySession, get_sync_db
+from app.read_replicas import get_write_db
+from app.schemas import BulkImportResponse
+from app.auth.authentication_service import require_admin
+from app.auth.user_cache import UserPrincipal
+from app.catalog.bulk_io import (
+    CSV_MEDIA_TYPES,
+    NDJSON_MEDIA_TYPES,
+    export_catalog,
+    import_catalog,
+    parse_csv,
+    parse_ndjson
+)
+
+router = APIRouter(prefix="/api/sweets", tags=["Catalog Bulk"])
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv", "json": "application/json"}
+
+
+@router.post("/bulk", response_model=BulkImportResponse)
+async def bulk_import_sweets(
+    request: Request,
+    db: AnySession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(require_admin)
+):
+    """Upsert sweets from a streamed NDJSON or CSV body (Admin only).
+
+    Rows carrying an existing ``sweet_id`` update that sweet; all other rows
+    are inserted. Invalid rows are reported individually and skipped.
+    """
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if media_type in NDJSON_MEDIA_TYPES:
+        records = parse_ndjson(request.stream())
+    elif media_type in CSV_MEDIA_TYPES:
+        records = parse_csv(request.stream())
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send application/x-ndjson or text/csv"
+        )
+
+    result = await import_catalog(db, records)
+    return result.as_response()
+
+
+@router.get("/export")
+def export_sweets(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|json)$", description="ndjson, csv or json"),
+    db: Session = Depends(get_sync_db),
+    current_user: UserPrincipal = Depends(require_admin)
+):
+    """Stream the whole catalog with constant memory (Admin only).
+
+    ``json`` is one array of the same objects ``/api/sweets`` returns,
+    written a batch at a time, so the first bytes leave after the first
+    batch however large the catalog is.
+
+    Always uses a sync session: the response iterates the cursor from the
+    threadpool after the handler has returned.
+    """
+    media_type = EXPORT_MEDIA_TYPES[format]
+    return StreamingResponse(
+        export_catalog(db, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="sweets.{format}"'}
+    )
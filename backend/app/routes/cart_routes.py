@@ -0,0 +1,102 @@
+"""
+Cart routes for purchasing several sweets in one order.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from sqlalchemy.orm import Session
+
+from app.database import AnySession, run_in_session
+from app.read_replicas import get_write_db
+from app.idempotency import (
+    IDEMPOTENCY_KEY_HEADER,
+    IdempotencyClaim,
+    idempotency_claim,
+    idempotency_store,
+    stage_result
+)
+from app.schemas import CartCheckoutRequest, CartCheckoutResponse
+from app.auth.authentication_service import get_current_user
+from app.auth.user_cache import UserPrincipal
+from app.inventory.checkout import cart_line, merge_cart_lines, reserve_cart
+from app.inventory.events import stock_events
+from app.inventory.ledger import record_movements, sale_movements
+from app.inventory.stock_operations import StockChange
+from app.pricing.engine import PricedCart, order_prices, price_cart
+from app.pricing.money import to_rupees
+from app.pricing.rules import pricing_rules
+from app.rate_limit import RATE_LIMIT_CHECKOUT, charge_user
+
+router = APIRouter(prefix="/api/cart", tags=["Cart"])
+
+
+def checkout_response(changes: List[StockChange], priced: PricedCart) -> dict:
+    lines = [
+        {
+            "message": "Purchase successful",
+            "sweet_id": change.sweet_id,
+            "sweet_name": change.sweet_name,
+            "previous_quantity": change.previous_quantity,
+            "new_quantity": change.new_quantity,
+            "quantity_purchased": line.quantity,
+            "total_price": to_rupees(line.list_paise)
+        }
+        for change, line in zip(changes, priced.lines)
+    ]
+    return {
+        "message": "Checkout successful",
+        "lines": lines,
+        **order_prices(priced)
+    }
+
+
+def commit_cart(
+    db: Session,
+    quantities: Dict[int, int],
+    user_id: Optional[int] = None,
+    coupon: Optional[str] = None,
+    claim: Optional[IdempotencyClaim] = None
+) -> Tuple[List[StockChange], dict]:
+    """Reserve and price every line and record it in the ledger, then commit, or roll the whole cart back."""
+    try:
+        changes = reserve_cart(db, quantities)
+    except HTTPException:
+        db.rollback()
+        raise
+    # Order-level discounts are apportioned to each line's ledger movement
+    priced = price_cart(
+        [cart_line(change, quantities[change.sweet_id]) for change in changes],
+        pricing_rules.table(db).active(coupon)
+    )
+    record_movements(db, sale_movements(priced, user_id))
+    body = checkout_response(changes, priced)
+    stage_result(db, claim, body)
+    db.commit()
+    return changes, body
+
+
+@router.post("/checkout", response_model=CartCheckoutResponse)
+async def checkout_cart(
+    checkout_data: CartCheckoutRequest,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
+    db: AnySession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """Purchase every line of a cart atomically - all lines succeed or none do.
+
+    Retries carrying the same Idempotency-Key replay the first result.
+    """
+    quantities = merge_cart_lines(checkout_data.lines)
+    claim = idempotency_claim(idempotency_key, current_user.user_id, request, checkout_data)
+
+    async def checkout() -> dict:
+        # Charged here, not as a dependency, so a replayed retry costs nothing
+        charge_user("checkout", current_user.user_id, RATE_LIMIT_CHECKOUT)
+        changes, body = await run_in_session(
+            db, commit_cart, quantities, current_user.user_id, checkout_data.coupon, claim
+        )
+        stock_events.publish_changes(changes)
+        return body
+
+    return await idempotency_store.run(db, claim, checkout, CartCheckoutResponse)
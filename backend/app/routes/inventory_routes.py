@@ -1,101 +1,168 @@
 """
 Inventory management routes for purchase and restock operations.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, Depends, Header, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.models import SweetProduct, UserAccount
+from app.database import AnySession, run_in_session
+from app.read_replicas import get_write_db
+from app.idempotency import (
+    IDEMPOTENCY_KEY_HEADER,
+    IdempotencyClaim,
+    idempotency_claim,
+    idempotency_store,
+    save_result,
+    stage_result
+)
 from app.schemas import (
     PurchaseRequest,
     RestockRequest,
     InventoryOperationResponse
 )
 from app.auth.authentication_service import get_current_user, require_admin
+from app.auth.user_cache import UserPrincipal
+from app.inventory.checkout import cart_line
+from app.inventory.events import stock_events
+from app.inventory.hot_stock import hot_stock
+from app.inventory.ledger import record_movements, restock_movement, sale_movements
+from app.inventory.stock_operations import StockChange, add_stock, reserve_stock
+from app.pricing.engine import PricedCart, order_prices, price_cart
+from app.pricing.rules import current_rules, pricing_rules
+from app.rate_limit import RATE_LIMIT_PURCHASE, charge_user
 
 router = APIRouter(prefix="/api/sweets", tags=["Inventory"])
 
 
+def purchase_response(change: StockChange, quantity: int, priced: PricedCart) -> dict:
+    return {
+        "message": "Purchase successful",
+        "sweet_id": change.sweet_id,
+        "sweet_name": change.sweet_name,
+        "previous_quantity": change.previous_quantity,
+        "new_quantity": change.new_quantity,
+        "quantity_purchased": quantity,
+        **order_prices(priced)
+    }
+
+
+def restock_response(change: StockChange, quantity: int) -> dict:
+    return {
+        "message": "Restock successful",
+        "sweet_id": change.sweet_id,
+        "sweet_name": change.sweet_name,
+        "previous_quantity": change.previous_quantity,
+        "new_quantity": change.new_quantity,
+        "quantity_added": quantity
+    }
+
+
+def commit_purchase(
+    db: Session,
+    sweet_id: int,
+    quantity: int,
+    user_id: int,
+    coupon: Optional[str],
+    claim: Optional[IdempotencyClaim] = None
+) -> Tuple[StockChange, dict]:
+    """Reserve stock, price the sale and append it to the ledger in one transaction."""
+    change = reserve_stock(db, sweet_id, quantity)
+    priced = price_cart([cart_line(change, quantity)], pricing_rules.table(db).active(coupon))
+    record_movements(db, sale_movements(priced, user_id))
+    body = purchase_response(change, quantity, priced)
+    stage_result(db, claim, body)
+    db.commit()
+    return change, body
+
+
+def commit_restock(
+    db: Session,
+    sweet_id: int,
+    quantity: int,
+    user_id: int,
+    claim: Optional[IdempotencyClaim] = None
+) -> Tuple[StockChange, dict]:
+    """Add stock and append the restock to the ledger in one transaction."""
+    change = add_stock(db, sweet_id, quantity)
+    record_movements(db, [restock_movement(sweet_id, quantity, change.sweet_price, user_id, change.sweet_category)])
+    body = restock_response(change, quantity)
+    stage_result(db, claim, body)
+    db.commit()
+    return change, body
+
+
 @router.post("/{sweet_id}/purchase", response_model=InventoryOperationResponse)
-def purchase_sweet(
+async def purchase_sweet(
     sweet_id: int,
     purchase_data: PurchaseRequest,
-    db: Session = Depends(get_db),
-    current_user: UserAccount = Depends(get_current_user)
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
+    db: AnySession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
-    """Purchase a sweet, decreasing its quantity."""
-    sweet = db.query(SweetProduct).filter(SweetProduct.sweet_id == sweet_id).first()
-    
-    if not sweet:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Sweet not found"
-        )
-    
-    # Check if enough stock available
-    if sweet.quantity_in_stock < purchase_data.quantity_to_purchase:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Insufficient stock. Only {sweet.quantity_in_stock} items available."
-        )
-    
-    # Store previous quantity
-    previous_quantity = sweet.quantity_in_stock
-    
-    # Decrease stock
-    sweet.quantity_in_stock -= purchase_data.quantity_to_purchase
-    
-    total_price = float(sweet.sweet_price * purchase_data.quantity_to_purchase).__round__(2)
-
-    discounted_price=0
-    if(purchase_data.coupon=='COUPON'):
-        discounted_price= float(0.9 * total_price).__round__(2)
+    """Purchase a sweet, decreasing its quantity.
 
-    db.commit()
-    db.refresh(sweet)
-    
-    return {
-        "message": "Purchase successful",
-        "sweet_id": sweet.sweet_id,
-        "sweet_name": sweet.sweet_name,
-        "previous_quantity": previous_quantity,
-        "new_quantity": sweet.quantity_in_stock,
-        "quantity_purchased": purchase_data.quantity_to_purchase,
-        "total_price":total_price,
-        "discounted_price":discounted_price
-    }
+    Retries carrying the same Idempotency-Key replay the first result.
+    """
+    quantity = purchase_data.quantity_to_purchase
+    claim = idempotency_claim(idempotency_key, current_user.user_id, request, purchase_data)
+
+    async def purchase() -> dict:
+        # Charged here, not as a dependency, so a replayed retry costs nothing
+        charge_user("purchase", current_user.user_id, RATE_LIMIT_PURCHASE)
+        change = None
+        if hot_stock.is_hot(sweet_id):
+            # Flash-sale SKUs reserve from the sharded in-memory counter
+            rules = (await current_rules(db)).active(purchase_data.coupon)
+            reservation = await run_in_threadpool(hot_stock.hold, sweet_id, quantity, current_user.user_id, rules)
+            if reservation is not None:
+                change = reservation.change
+                body = purchase_response(change, quantity, price_cart([cart_line(change, quantity)], rules))
+                try:
+                    await run_in_session(db, save_result, claim, body)
+                except Exception:
+                    # The purchase did not happen (or a retry replays another's): give the units back
+                    await run_in_session(db, hot_stock.release, reservation)
+                    raise
+        if change is None:
+            # Stock check and decrement happen in one conditional UPDATE
+            change, body = await run_in_session(
+                db, commit_purchase, sweet_id, quantity, current_user.user_id, purchase_data.coupon, claim
+            )
+        stock_events.publish_changes([change])
+        return body
+
+    return await idempotency_store.run(db, claim, purchase, InventoryOperationResponse)
 
 
 @router.post("/{sweet_id}/restock", response_model=InventoryOperationResponse)
-def restock_sweet(
+async def restock_sweet(
     sweet_id: int,
     restock_data: RestockRequest,
-    db: Session = Depends(get_db),
-    current_user: UserAccount = Depends(require_admin)  # Admin only!
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
+    db: AnySession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(require_admin)  # Admin only!
 ):
-    """Restock a sweet, increasing its quantity (Admin only)."""
-    sweet = db.query(SweetProduct).filter(SweetProduct.sweet_id == sweet_id).first()
-    
-    if not sweet:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Sweet not found"
-        )
-    
-    # Store previous quantity
-    previous_quantity = sweet.quantity_in_stock
-    
-    # Increase stock
-    sweet.quantity_in_stock += restock_data.quantity_to_add
-    
-    db.commit()
-    db.refresh(sweet)
-    
-    return {
-        "message": "Restock successful",
-        "sweet_id": sweet.sweet_id,
-        "sweet_name": sweet.sweet_name,
-        "previous_quantity": previous_quantity,
-        "new_quantity": sweet.quantity_in_stock,
-        "quantity_added": restock_data.quantity_to_add
-    }
\ No newline at end of file
+    """Restock a sweet, increasing its quantity (Admin only).
+
+    Retries carrying the same Idempotency-Key replay the first result.
+    """
+    quantity = restock_data.quantity_to_add
+    claim = idempotency_claim(idempotency_key, current_user.user_id, request, restock_data)
+
+    async def restock() -> dict:
+        if hot_stock.is_hot(sweet_id):
+            change = await run_in_session(db, hot_stock.restock, sweet_id, quantity, current_user.user_id)
+            body = restock_response(change, quantity)
+            await run_in_session(db, save_result, claim, body)
+        else:
+            change, body = await run_in_session(
+                db, commit_restock, sweet_id, quantity, current_user.user_id, claim
+            )
+        stock_events.publish_changes([change])
+        return body
+
+    return await idempotency_store.run(db, claim, restock, InventoryOperationResponse)
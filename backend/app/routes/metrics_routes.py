@@ -0,0 +1,36 @@
+"""
+Prometheus scrape endpoint.
+
+Not public: a scraper sends ``Authorization: Bearer <METRICS_TOKEN>``, and
+without a configured token only administrators may read it.
+"""
+import hmac
+import os
+
+from dotenv import load_dotenv
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.auth.authentication_service import get_current_user, oauth2_scheme, require_admin
+from app.database import AnySession, get_db
+from app.metrics.registry import EXPOSITION_CONTENT_TYPE, registry
+
+load_dotenv()
+
+# Shared secret for scrapers; unset means administrators only
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+router = APIRouter(tags=["Metrics"])
+
+
+async def authorize_scrape(token: str = Depends(oauth2_scheme), db: AnySession = Depends(get_db)) -> None:
+    """Accept the scrape token, or else an administrator's access token."""
+    if METRICS_TOKEN and hmac.compare_digest(token.encode("utf-8"), METRICS_TOKEN.encode("utf-8")):
+        return
+    await require_admin(await get_current_user(token, db))
+
+
+@router.get("/metrics", include_in_schema=False, dependencies=[Depends(authorize_scrape)])
+async def get_metrics():
+    """Every metric in the text exposition format, for Prometheus to scrape."""
+    return PlainTextResponse(registry.render(), media_type=EXPOSITION_CONTENT_TYPE)
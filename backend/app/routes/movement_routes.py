@@ -0,0 +1,115 @@
+"""
+Inventory ledger routes: movement history and per-sweet stock summaries.
+"""
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, Response
+
+from app.database import AnySession, run_in_session
+from app.read_replicas import get_read_db
+from app.schemas import InventoryMovementResponse, StockSummaryResponse
+from app.auth.authentication_service import get_current_user, require_admin
+from app.auth.user_cache import UserPrincipal
+from app.inventory.hot_stock import hot_stock
+from app.inventory.ledger import (
+    MOVEMENT_TYPE_PATTERN,
+    MovementFilter,
+    list_movements,
+    stock_summary
+)
+from app.pagination import NEXT_CURSOR_HEADER, clamp_page_size
+
+router = APIRouter(prefix="/api/movements", tags=["Inventory Ledger"])
+
+
+async def movement_page(
+    db: AnySession,
+    response: Response,
+    criteria: MovementFilter,
+    limit: Optional[int],
+    cursor: Optional[str]
+):
+    """Run one history page and expose its continuation in X-Next-Cursor."""
+    rows, next_cursor = await run_in_session(db, list_movements, criteria, clamp_page_size(limit), cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return rows
+
+
+@router.get("", response_model=List[InventoryMovementResponse])
+async def get_movements(
+    response: Response,
+    since: Optional[datetime] = Query(None, description="Only movements at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only movements before this time"),
+    movement_type: Optional[str] = Query(None, pattern=MOVEMENT_TYPE_PATTERN, description="purchase, restock or release"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped by the server)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    db: AnySession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(require_admin)
+):
+    """All stock movements in a time range, newest first (Admin only)."""
+    criteria = MovementFilter(movement_type=movement_type, since=since, until=until)
+    return await movement_page(db, response, criteria, limit, cursor)
+
+
+@router.get("/me", response_model=List[InventoryMovementResponse])
+async def get_my_movements(
+    response: Response,
+    since: Optional[datetime] = Query(None, description="Only movements at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only movements before this time"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped by the server)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    db: AnySession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """The current user's purchase history, newest first."""
+    criteria = MovementFilter(user_id=current_user.user_id, since=since, until=until)
+    return await movement_page(db, response, criteria, limit, cursor)
+
+
+@router.get("/users/{user_id}", response_model=List[InventoryMovementResponse])
+async def get_user_movements(
+    user_id: int,
+    response: Response,
+    since: Optional[datetime] = Query(None, description="Only movements at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only movements before this time"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped by the server)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    db: AnySession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(require_admin)
+):
+    """One user's stock movements, newest first (Admin only)."""
+    criteria = MovementFilter(user_id=user_id, since=since, until=until)
+    return await movement_page(db, response, criteria, limit, cursor)
+
+
+@router.get("/sweets/{sweet_id}", response_model=List[InventoryMovementResponse])
+async def get_sweet_movements(
+    sweet_id: int,
+    response: Response,
+    since: Optional[datetime] = Query(None, description="Only movements at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only movements before this time"),
+    movement_type: Optional[str] = Query(None, pattern=MOVEMENT_TYPE_PATTERN, description="purchase, restock or release"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped by the server)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    db: AnySession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(require_admin)
+):
+    """One sweet's stock movements, newest first (Admin only)."""
+    criteria = MovementFilter(sweet_id=sweet_id, movement_type=movement_type, since=since, until=until)
+    return await movement_page(db, response, criteria, limit, cursor)
+
+
+@router.get("/sweets/{sweet_id}/summary", response_model=StockSummaryResponse)
+async def get_sweet_stock_summary(
+    sweet_id: int,
+    db: AnySession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(require_admin)
+):
+    """Current stock plus lifetime sales and restock totals for a sweet (Admin only)."""
+    summary = await run_in_session(db, stock_summary, sweet_id)
+    if hot_stock.is_hot(sweet_id):
+        # The row lags the in-memory counter until the next write-back
+        summary["quantity_in_stock"] = hot_stock.sku_status(sweet_id)["available"]
+    return summary
@@ -0,0 +1,92 @@
+"""
+Coupon and promotion rule management routes (Admin only).
+
+Writes here invalidate the in-process rule table on commit; see
+app.pricing.rules.
+"""
+from typing import List
+
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.orm import Session
+
+from app.database import AnySession, run_in_session
+from app.read_replicas import get_write_db
+from app.models import PricingRule
+from app.schemas import PricingRuleRequest, PricingRuleResponse
+from app.auth.authentication_service import require_admin
+from app.auth.user_cache import UserPrincipal
+from app.pricing.rules import rule_not_found
+
+router = APIRouter(prefix="/api/admin/pricing", tags=["Pricing"])
+
+
+@router.get("/rules", response_model=List[PricingRuleResponse])
+async def list_pricing_rules(
+    db: AnySession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(require_admin)
+):
+    """List every pricing rule, including inactive and expired ones (Admin only)."""
+    def load(session: Session) -> List[PricingRule]:
+        return session.query(PricingRule).order_by(PricingRule.rule_id).all()
+
+    return await run_in_session(db, load)
+
+
+@router.post("/rules", response_model=PricingRuleResponse, status_code=status.HTTP_201_CREATED)
+async def create_pricing_rule(
+    rule_data: PricingRuleRequest,
+    db: AnySession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(require_admin)
+):
+    """Create a coupon or automatic promotion (Admin only)."""
+    new_rule = PricingRule(**rule_data.model_dump())
+
+    def insert(session: Session) -> PricingRule:
+        session.add(new_rule)
+        session.commit()
+        session.refresh(new_rule)
+        return new_rule
+
+    return await run_in_session(db, insert)
+
+
+@router.put("/rules/{rule_id}", response_model=PricingRuleResponse)
+async def replace_pricing_rule(
+    rule_id: int,
+    rule_data: PricingRuleRequest,
+    db: AnySession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(require_admin)
+):
+    """Replace a pricing rule's terms (Admin only)."""
+    def apply_update(session: Session) -> PricingRule:
+        rule = session.get(PricingRule, rule_id)
+        if not rule:
+            raise rule_not_found()
+
+        for field, value in rule_data.model_dump().items():
+            setattr(rule, field, value)
+
+        session.commit()
+        session.refresh(rule)
+        return rule
+
+    return await run_in_session(db, apply_update)
+
+
+@router.delete("/rules/{rule_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_pricing_rule(
+    rule_id: int,
+    db: AnySession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(require_admin)
+):
+    """Delete a pricing rule; past sales keep the prices they were charged (Admin only)."""
+    def remove(session: Session) -> None:
+        rule = session.get(PricingRule, rule_id)
+        if not rule:
+            raise rule_not_found()
+
+        session.delete(rule)
+        session.commit()
+
+    await run_in_session(db, remove)
+    return None
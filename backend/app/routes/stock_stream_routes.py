@@ -0,0 +1,69 @@
+"""
+Live stock delta routes: Server-Sent Events and a WebSocket alternative.
+"""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, status
+from fastapi.responses import StreamingResponse
+from fastapi.security.utils import get_authorization_scheme_param
+from sqlalchemy.orm import Session
+
+from app.database import AnySession, get_db, run_in_session
+from app.auth.authentication_service import get_current_user
+from app.auth.user_cache import UserPrincipal
+from app.inventory.events import stock_events
+from app.inventory.stock_stream import STOCK_STREAM_MAX_PENDING, sse_stock_events, websocket_stock_events
+from app.sse import SSE_HEADERS, SSE_MEDIA_TYPE
+
+router = APIRouter(prefix="/api/sweets", tags=["Stock Stream"])
+
+
+async def release_connection(db: AnySession) -> None:
+    """End the request session's transaction so a long-lived stream does not hold a pooled connection."""
+    await run_in_session(db, Session.rollback)
+
+
+@router.get("/stream")
+async def stream_stock(
+    request: Request,
+    db: AnySession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """Server-Sent Events feed of {sweet_id, quantity} for every committed stock change."""
+    await release_connection(db)
+    subscription = stock_events.subscribe(STOCK_STREAM_MAX_PENDING)
+
+    async def events():
+        try:
+            async for chunk in sse_stock_events(subscription, request.is_disconnected):
+                yield chunk
+        finally:
+            stock_events.unsubscribe(subscription)
+
+    return StreamingResponse(events(), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+
+
+@router.websocket("/stream/ws")
+async def stream_stock_websocket(
+    websocket: WebSocket,
+    token: Optional[str] = Query(None, description="Access token, for clients that cannot send headers"),
+    db: AnySession = Depends(get_db)
+):
+    """WebSocket feed of the same deltas; authenticate with a Bearer header or ?token=."""
+    scheme, header_token = get_authorization_scheme_param(websocket.headers.get("Authorization"))
+    access_token = header_token if scheme.lower() == "bearer" else token
+    try:
+        if not access_token:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+        await get_current_user(access_token, db)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await release_connection(db)
+
+    await websocket.accept()
+    subscription = stock_events.subscribe(STOCK_STREAM_MAX_PENDING)
+    try:
+        await websocket_stock_events(websocket, subscription)
+    finally:
+        stock_events.unsubscribe(subscription)
@@ -2,26 +2,40 @@
 Sweet product routes for CRUD operations.
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.models import SweetProduct, UserAccount
+from app.database import AnySession, run_in_session
+from app.read_replicas import get_read_db, get_write_db
+from app.models import SweetProduct
 from app.schemas import (
     SweetCreationRequest,
     SweetUpdateRequest,
     SweetProductResponse
 )
 from app.auth.authentication_service import get_current_user, require_admin
+from app.auth.user_cache import UserPrincipal
+from app.inventory.events import stock_events
+from app.inventory.hot_stock import hot_stock
+from app.inventory.stock_operations import hot_sku_conflict, sweet_not_found
+from app.catalog.response_cache import cached_catalog_response
+from app.catalog.serialization import serialize_sweet_rows, sweet_columns
+from app.catalog.search_planner import SORT_PATTERN, SearchCriteria, plan_search
+from app.pagination import (
+    NEXT_CURSOR_HEADER,
+    clamp_page_size,
+    decode_cursor,
+    encode_cursor
+)
 
 router = APIRouter(prefix="/api/sweets", tags=["Sweets"])
 
 
 @router.post("", response_model=SweetProductResponse, status_code=status.HTTP_201_CREATED)
-def create_sweet(
+async def create_sweet(
     sweet_data: SweetCreationRequest,
-    db: Session = Depends(get_db),
-    current_user: UserAccount = Depends(require_admin)
+    db: AnySession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(require_admin)
 ):
     """Create a new sweet product."""
     new_sweet = SweetProduct(
@@ -31,94 +45,166 @@ def create_sweet(
         quantity_in_stock=sweet_data.quantity_in_stock,
         sweet_description=sweet_data.sweet_description
     )
-    
-    db.add(new_sweet)
-    db.commit()
-    db.refresh(new_sweet)
-    
-    return new_sweet
+
+    def insert(session: Session) -> SweetProduct:
+        session.add(new_sweet)
+        session.commit()
+        session.refresh(new_sweet)
+        return new_sweet
+
+    sweet = await run_in_session(db, insert)
+    stock_events.publish_level(sweet.sweet_id, sweet.sweet_name, sweet.quantity_in_stock)
+    return sweet
+
+
+def parse_field_projection(fields: Optional[str]) -> Optional[List[str]]:
+    """Validate a comma-separated ``fields`` projection against the response schema."""
+    if not fields:
+        return None
+
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in SweetProductResponse.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown field(s): {', '.join(unknown)}"
+        )
+
+    # sweet_id is always returned so clients can page and address rows
+    return ["sweet_id"] + [name for name in dict.fromkeys(requested) if name != "sweet_id"]
 
 
 @router.get("", response_model=List[SweetProductResponse])
-def get_all_sweets(
-    db: Session = Depends(get_db),
-    current_user: UserAccount = Depends(get_current_user)
+async def get_all_sweets(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped by the server)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return"),
+    db: AnySession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
-    """Get all sweet products."""
-    sweets = db.query(SweetProduct).all()
-    return sweets
+    """Get one page of sweet products, ordered by ID."""
+    page_size = clamp_page_size(limit)
+    projection = parse_field_projection(fields)
+
+    def build_page(session: Session):
+        query = session.query(*sweet_columns(projection))
+
+        if cursor:
+            position = decode_cursor(cursor)
+            after_id = position.get("after")
+            if not isinstance(after_id, int):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid pagination cursor"
+                )
+            query = query.filter(SweetProduct.sweet_id > after_id)
+
+        # Fetch one extra row to learn whether another page exists
+        rows = query.order_by(SweetProduct.sweet_id).limit(page_size + 1).all()
+        headers = {}
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            headers[NEXT_CURSOR_HEADER] = encode_cursor({"after": rows[-1].sweet_id})
+
+        return serialize_sweet_rows(rows, projection), headers
+
+    return await cached_catalog_response(request, db, build_page)
 
 
 @router.get("/search", response_model=List[SweetProductResponse])
-def search_sweets(
-    name: Optional[str] = Query(None, description="Search by sweet name"),
-    category: Optional[str] = Query(None, description="Filter by category"),
+async def search_sweets(
+    request: Request,
+    name: Optional[str] = Query(None, description="Search by words (or word prefixes) in the sweet name"),
+    q: Optional[str] = Query(None, description="Full-text search over name and description"),
+    category: Optional[str] = Query(None, description="Exact category, case-insensitive"),
     min_price: Optional[float] = Query(None, ge=0, description="Minimum price"),
     max_price: Optional[float] = Query(None, ge=0, description="Maximum price"),
-    db: Session = Depends(get_db),
-    current_user: UserAccount = Depends(get_current_user)
+    in_stock_only: bool = Query(False, description="Only sweets with stock available"),
+    sort: Optional[str] = Query(None, pattern=SORT_PATTERN, description="relevance, price, name, stock or newest"),
+    order: Optional[str] = Query(None, pattern="^(asc|desc)$", description="Override the sort direction"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped by the server)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    db: AnySession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
-    """Search sweets by name, category, or price range."""
-    query = db.query(SweetProduct)
-    
-    if name:
-        query = query.filter(SweetProduct.sweet_name.ilike(f"%{name}%"))
-    
-    if category:
-        query = query.filter(SweetProduct.sweet_category.ilike(f"%{category}%"))
-    
-    if min_price is not None:
-        query = query.filter(SweetProduct.sweet_price >= min_price)
-    
-    if max_price is not None:
-        query = query.filter(SweetProduct.sweet_price <= max_price)
-    
-    return query.all()
+    """Search sweets by name, description, category, price range or availability."""
+    criteria = SearchCriteria(
+        name=name,
+        q=q,
+        category=category,
+        min_price=min_price,
+        max_price=max_price,
+        in_stock_only=in_stock_only,
+        sort=sort,
+        order=order
+    )
+    page_size = clamp_page_size(limit)
+
+    def build_page(session: Session):
+        plan = plan_search(session, criteria, page_size, cursor, entities=sweet_columns())
+        rows = plan.query.all()
+        headers = {}
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            headers[NEXT_CURSOR_HEADER] = plan.next_cursor(rows[-1])
+        return serialize_sweet_rows(rows), headers
+
+    return await cached_catalog_response(request, db, build_page)
 
 
 @router.put("/{sweet_id}", response_model=SweetProductResponse)
-def update_sweet(
+async def update_sweet(
     sweet_id: int,
     sweet_data: SweetUpdateRequest,
-    db: Session = Depends(get_db),
-    current_user: UserAccount = Depends(require_admin)
+    db: AnySession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(require_admin)
 ):
     """Update an existing sweet product."""
-    sweet = db.query(SweetProduct).filter(SweetProduct.sweet_id == sweet_id).first()
-    
-    if not sweet:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Sweet not found"
-        )
-    
     # Update only provided fields
     update_data = sweet_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(sweet, field, value)
-    
-    db.commit()
-    db.refresh(sweet)
-    
+    if "quantity_in_stock" in update_data and hot_stock.is_hot(sweet_id):
+        raise hot_sku_conflict("disable hot-SKU mode first")
+
+    def apply_update(session: Session) -> SweetProduct:
+        sweet = session.query(SweetProduct).filter(SweetProduct.sweet_id == sweet_id).first()
+        if not sweet:
+            raise sweet_not_found()
+
+        for field, value in update_data.items():
+            setattr(sweet, field, value)
+
+        session.commit()
+        session.refresh(sweet)
+        hot_stock.refresh_details(sweet.sweet_id, sweet.sweet_name, sweet.sweet_category, sweet.sweet_price)
+        return sweet
+
+    sweet = await run_in_session(db, apply_update)
+    if "quantity_in_stock" in update_data:
+        stock_events.publish_level(sweet.sweet_id, sweet.sweet_name, sweet.quantity_in_stock)
     return sweet
 
 
 @router.delete("/{sweet_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_sweet(
+async def delete_sweet(
     sweet_id: int,
-    db: Session = Depends(get_db),
-    current_user: UserAccount = Depends(require_admin)  # Admin only!
+    db: AnySession = Depends(get_write_db),
+    current_user: UserPrincipal = Depends(require_admin)  # Admin only!
 ):
     """Delete a sweet product (Admin only)."""
-    sweet = db.query(SweetProduct).filter(SweetProduct.sweet_id == sweet_id).first()
-    
-    if not sweet:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Sweet not found"
-        )
-    
-    db.delete(sweet)
-    db.commit()
-    
-    return None
\ No newline at end of file
+    if hot_stock.is_hot(sweet_id):
+        raise hot_sku_conflict("disable hot-SKU mode first")
+
+    def remove(session: Session) -> str:
+        sweet = session.query(SweetProduct).filter(SweetProduct.sweet_id == sweet_id).first()
+        if not sweet:
+            raise sweet_not_found()
+
+        sweet_name = sweet.sweet_name
+        session.delete(sweet)
+        session.commit()
+        return sweet_name
+
+    sweet_name = await run_in_session(db, remove)
+    stock_events.publish_removal(sweet_id, sweet_name)
+    return None
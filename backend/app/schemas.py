@@ -1,8 +1,8 @@
 """
 Pydantic schemas for request/response validation.
 """
-from pydantic import BaseModel, EmailStr, Field, field_validator, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator, ConfigDict
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -87,12 +87,31 @@ class SweetProductResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class SweetImportRow(SweetCreationRequest):
+    """Schema for one row of a bulk catalog import; sweet_id selects an upsert target."""
+    sweet_id: Optional[int] = Field(None, gt=0)
+
+
+class BulkImportRowError(BaseModel):
+    """Validation or write failure for one imported row (1-based data row number)."""
+    row: int
+    errors: List[str]
+
+
+class BulkImportResponse(BaseModel):
+    """Schema for bulk catalog import results."""
+    inserted: int
+    updated: int
+    failed: int
+    errors: List[BulkImportRowError]
+
+
 # ==================== Inventory Management Schemas ====================
 
 class PurchaseRequest(BaseModel):
     """Schema for purchasing sweets."""
     quantity_to_purchase: int = Field(gt=0, description="Must purchase at least 1 item")
-    coupon: Optional[str]
+    coupon: Optional[str] = None
 
 
 class RestockRequest(BaseModel):
@@ -107,7 +126,173 @@ class InventoryOperationResponse(BaseModel):
     sweet_name: str
     previous_quantity: int
     new_quantity: int
-    total_price: Optional[float]
-    discounted_price: Optional[float]
+    total_price: Optional[float] = None
+    discounted_price: Optional[float] = None
     quantity_purchased: Optional[int] = None
-    quantity_added: Optional[int] = None
\ No newline at end of file
+    quantity_added: Optional[int] = None
+    applied_rules: Optional[List[str]] = None
+
+
+# ==================== Stock Alert Schemas ====================
+
+class LowStockThresholdRequest(BaseModel):
+    """Schema for overriding a sweet's low-stock alert level."""
+    threshold: int = Field(gt=0, description="Alert once stock falls below this many units")
+
+
+class LowStockThresholdResponse(BaseModel):
+    """Schema for a sweet's low-stock alert level."""
+    sweet_id: int
+    threshold: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class StockAlertResponse(BaseModel):
+    """Schema for one low-stock, out-of-stock or back-in-stock alert."""
+    sweet_id: int
+    sweet_name: str
+    level: str
+    quantity: int
+    threshold: int
+    raised_at: datetime
+
+
+# ==================== Inventory Ledger Schemas ====================
+
+class InventoryMovementResponse(BaseModel):
+    """Schema for one inventory ledger entry."""
+    movement_id: int
+    sweet_id: int
+    user_id: Optional[int]
+    movement_type: str
+    quantity_delta: int
+    unit_price: float
+    total_price: Optional[float]
+    coupon: Optional[str]
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class StockSummaryResponse(BaseModel):
+    """Schema for a sweet's current stock and lifetime ledger totals."""
+    sweet_id: int
+    quantity_in_stock: Optional[int]
+    net_quantity_delta: int
+    units_sold: int
+    units_restocked: int
+    revenue: float
+    movement_count: int
+    compacted_through: int
+    uncompacted_movements: int
+
+
+# ==================== Analytics Schemas ====================
+
+class CategoryRevenueResponse(BaseModel):
+    """Schema for one category's sales in one hourly or daily bucket."""
+    bucket_start: datetime
+    sweet_category: str
+    revenue: float
+    units_sold: int
+    order_count: int
+
+
+class BestSellerResponse(BaseModel):
+    """Schema for one sweet's sales over a report window."""
+    sweet_id: int
+    sweet_name: Optional[str]
+    sweet_category: str
+    units_sold: int
+    revenue: float
+    order_count: int
+
+
+class StockTurnResponse(BaseModel):
+    """Schema for one sweet's stock turn over a report window."""
+    sweet_id: int
+    sweet_name: str
+    sweet_category: str
+    units_sold: int
+    quantity_in_stock: int
+    average_stock: float
+    stock_turn: Optional[float]
+
+
+# ==================== Pricing Rule Schemas ====================
+
+class PricingRuleRequest(BaseModel):
+    """Schema for creating or replacing a coupon or promotion rule."""
+    rule_name: str = Field(min_length=1, max_length=200)
+    rule_type: str = Field(pattern="^(percentage|fixed|bogo)$")
+    coupon_code: Optional[str] = Field(None, min_length=1, max_length=50)
+    percent_off_bps: Optional[int] = Field(None, gt=0, le=10000, description="Basis points, 1000 = 10%")
+    amount_off_paise: Optional[int] = Field(None, gt=0)
+    buy_quantity: Optional[int] = Field(None, gt=0)
+    free_quantity: Optional[int] = Field(None, gt=0)
+    sweet_category: Optional[str] = Field(None, min_length=1, max_length=100)
+    sweet_id: Optional[int] = Field(None, gt=0)
+    starts_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    is_active: bool = True
+
+    @model_validator(mode='after')
+    def validate_rule_terms(self) -> 'PricingRuleRequest':
+        required = {
+            "percentage": ["percent_off_bps"],
+            "fixed": ["amount_off_paise"],
+            "bogo": ["buy_quantity", "free_quantity"],
+        }[self.rule_type]
+        missing = [field for field in required if getattr(self, field) is None]
+        if missing:
+            raise ValueError(f"{self.rule_type} rules need {', '.join(missing)}")
+        if self.sweet_id is not None and self.sweet_category is not None:
+            raise ValueError('Scope a rule to a sweet or a category, not both')
+        if self.starts_at and self.expires_at and self.starts_at >= self.expires_at:
+            raise ValueError('starts_at must be before expires_at')
+        return self
+
+
+class PricingRuleResponse(BaseModel):
+    """Schema for a stored pricing rule."""
+    rule_id: int
+    rule_name: str
+    rule_type: str
+    coupon_code: Optional[str]
+    percent_off_bps: Optional[int]
+    amount_off_paise: Optional[int]
+    buy_quantity: Optional[int]
+    free_quantity: Optional[int]
+    sweet_category: Optional[str]
+    sweet_id: Optional[int]
+    starts_at: Optional[datetime]
+    expires_at: Optional[datetime]
+    is_active: bool
+    rule_created_at: datetime
+    rule_updated_at: Optional[datetime]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# ==================== Cart Schemas ====================
+
+class CartLineRequest(BaseModel):
+    """Schema for one line of a cart checkout."""
+    sweet_id: int
+    quantity_to_purchase: int = Field(gt=0, description="Must purchase at least 1 item")
+
+
+class CartCheckoutRequest(BaseModel):
+    """Schema for checking out a whole cart in one order."""
+    lines: List[CartLineRequest] = Field(min_length=1, max_length=100)
+    coupon: Optional[str] = None
+
+
+class CartCheckoutResponse(BaseModel):
+    """Schema for cart checkout results."""
+    message: str
+    lines: List[InventoryOperationResponse]
+    total_price: float
+    discounted_price: float
+    applied_rules: List[str] = []
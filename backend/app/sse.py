@@ -0,0 +1,18 @@
+"""
+Server-Sent Events framing helpers.
+"""
+import json
+import os
+
+# Seconds of silence before a comment line keeps proxies from closing the stream
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+
+SSE_MEDIA_TYPE = "text/event-stream"
+# Disable caching and proxy buffering so each event reaches the client as it is sent
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+KEEPALIVE_COMMENT = ": keep-alive\n\n"
+
+
+def format_event(event: str, data) -> str:
+    """One SSE message carrying ``data`` as compact JSON."""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
@@ -0,0 +1,27 @@
+"""
+Small in-process statistics helpers for admin diagnostics.
+"""
+
+
+class LatencyStats:
+    """Running latency summary for one kind of operation (not thread-safe; callers lock)."""
+
+    def __init__(self):
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_seconds = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.calls += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.last_seconds = seconds
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls,
+            "avg_ms": round(self.total_seconds / self.calls * 1000, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "last_ms": round(self.last_seconds * 1000, 3),
+        }
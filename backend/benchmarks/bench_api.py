@@ -0,0 +1,337 @@
+"""
+Load-test suite for the API's hot paths.
+Run: python -m benchmarks.bench_api [--sizes 1000,100000,1000000] [--concurrency 1,16,64]
+                                    [--seconds 5] [--transports asgi,uvicorn]
+Save a baseline: python -m benchmarks.bench_api --save-baseline
+Compare against it: python -m benchmarks.bench_api (exits 1 on a regression)
+
+For each catalog size a seeded SQLite database (benchmarks.seeding) is
+served two ways: in-process through httpx's ASGI transport, which measures
+the application alone, and by a local single-worker uvicorn, which adds
+HTTP parsing and the socket round-trip. Each scenario below runs at every
+concurrency level and records req/s, p50/p95/p99 latency and the server's
+peak RSS. Results are written as JSON to --output. When --baseline exists
+they are compared with it, and a run is a regression when its req/s drops,
+or its p99 rises, by more than --threshold.
+
+The in-process transport runs the client on the server's event loop, so
+its numbers include the client's own cost; compare like with like.
+Server settings come from the environment as usual, for example
+CATALOG_CACHE_TTL_SECONDS=0 to measure catalog reads without the cache.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import httpx
+
+from app.auth.password_hasher import BCRYPT_ROUNDS
+from app.auth.token_manager import create_access_token
+from app.pagination import encode_cursor
+from benchmarks.bench_async_db import free_port, wait_until_ready
+from benchmarks.loadgen import WARMUP_SECONDS, RequestFactory, RunResult, measure
+from benchmarks.seeding import BENCH_PASSWORD, bench_email, prepare_database
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+DEFAULT_CONCURRENCY = [1, 16, 64]
+TRANSPORTS = ["asgi", "uvicorn"]
+SEARCH_TERMS = ["choc", "mango", "saffron", "rose", "kesar", "honey"]
+PAGE_SIZE = 20
+
+BENCH_DIR = Path(__file__).parent
+DEFAULT_OUTPUT = BENCH_DIR / "results" / "latest.json"
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+DEFAULT_THRESHOLD = 0.15
+# p99 changes smaller than this are timer noise, whatever the percentage
+P99_NOISE_FLOOR_MS = 1.0
+
+
+def build_scenarios(products: int, users: int) -> Dict[str, RequestFactory]:
+    """The request each scenario's workers send, keyed by scenario name.
+
+    Workers act as bench user ``index % users`` and use a token signed up
+    front, so only the login scenario pays for bcrypt.
+    """
+    headers = [
+        {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+        for user_id in range(1, users + 1)
+    ]
+
+    async def catalog(client, rng, index):
+        # Start at a random depth so pages are spread over the whole catalog
+        cursor = encode_cursor({"after": rng.randrange(products)})
+        return await client.get(
+            "/api/sweets", params={"limit": PAGE_SIZE, "cursor": cursor}, headers=headers[index % users]
+        )
+
+    async def search(client, rng, index):
+        return await client.get("/api/sweets/search", params={
+            "q": rng.choice(SEARCH_TERMS), "min_price": rng.randint(0, 500), "limit": PAGE_SIZE
+        }, headers=headers[index % users])
+
+    async def purchase(client, rng, index):
+        return await client.post(
+            f"/api/sweets/{rng.randint(1, products)}/purchase",
+            json={"quantity_to_purchase": 1}, headers=headers[index % users]
+        )
+
+    async def login(client, rng, index):
+        return await client.post("/api/auth/login", data={
+            "username": bench_email(index % users), "password": BENCH_PASSWORD
+        })
+
+    async def profile(client, rng, index):
+        return await client.get("/api/auth/me", headers=headers[index % users])
+
+    return {"catalog": catalog, "search": search, "profile": profile, "purchase": purchase, "login": login}
+
+
+async def run_scenarios(
+    client: httpx.AsyncClient,
+    server_pid: int,
+    transport: str,
+    products: int,
+    users: int,
+    scenarios: List[str],
+    concurrency: List[int],
+    seconds: float
+) -> List[RunResult]:
+    available = build_scenarios(products, users)
+    results = []
+    for scenario in scenarios:
+        for clients in concurrency:
+            result = await measure(
+                client, available[scenario], server_pid, transport, scenario, products, clients, seconds
+            )
+            print_result(result)
+            results.append(result)
+    return results
+
+
+@contextmanager
+def server_environment(work_dir: Path) -> Iterator[Dict[str, str]]:
+    """Point this process's environment at the work database while a server starts from it."""
+    overrides = {
+        "DATABASE_URL": f"sqlite:///{work_dir / 'bench.db'}",
+        "HOT_SKU_JOURNAL_PATH": str(work_dir / "hot_sku.journal"),
+        # One client IP and a few users drive every request; the limits would cap the run
+        "RATE_LIMIT_ENABLED": "false",
+    }
+    saved = {name: os.environ.get(name) for name in overrides}
+    os.environ.update(overrides)
+    try:
+        yield dict(os.environ)
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def _asgi_worker(products: int, users: int, scenarios, concurrency, seconds) -> List[dict]:
+    """Serve and drive the app in a fresh process, so each size starts from clean module state."""
+    from app.main import app
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+                return await run_scenarios(
+                    client, os.getpid(), "asgi", products, users, scenarios, concurrency, seconds
+                )
+
+    return [result.as_json() for result in asyncio.run(run())]
+
+
+def run_asgi(work_dir: Path, products: int, users: int, scenarios, concurrency, seconds) -> List[dict]:
+    # The child imports app.database while unpickling the worker, so it must inherit the settings
+    with server_environment(work_dir), \
+            ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(_asgi_worker, products, users, scenarios, concurrency, seconds).result()
+
+
+def run_uvicorn(work_dir: Path, products: int, users: int, scenarios, concurrency, seconds) -> List[dict]:
+    port = free_port()
+    with server_environment(work_dir) as environment:
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+            env=environment
+        )
+    peak = max(concurrency)
+    limits = httpx.Limits(max_connections=peak, max_keepalive_connections=peak)
+
+    async def run():
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            await wait_until_ready(client)
+            return await run_scenarios(
+                client, server.pid, "uvicorn", products, users, scenarios, concurrency, seconds
+            )
+
+    try:
+        return [result.as_json() for result in asyncio.run(run())]
+    finally:
+        server.terminate()
+        server.wait()
+
+
+RUNNERS = {"asgi": run_asgi, "uvicorn": run_uvicorn}
+
+
+def print_result(result: RunResult) -> None:
+    rss = f"{result.peak_rss_mb:>7.1f} MiB" if result.peak_rss_mb is not None else "      n/a"
+    print(
+        f"   {result.transport:<7} {result.scenario:<8} c={result.concurrency:<3}"
+        f" {result.req_per_s:>8.0f} req/s"
+        f"  p50 {result.p50_ms:>7.1f} ms  p95 {result.p95_ms:>7.1f} ms  p99 {result.p99_ms:>7.1f} ms"
+        f"  rss {rss}  ({result.errors} errors)"
+    )
+
+
+def compare_to_baseline(results: List[dict], baseline: List[dict], threshold: float) -> List[str]:
+    """Describe every run that regressed against the baseline run with the same key."""
+    def key(run: dict) -> str:
+        return f"{run['transport']}/{run['scenario']}/{run['products']}/c{run['concurrency']}"
+
+    previous = {key(run): run for run in baseline}
+    regressions = []
+    for run in results:
+        base = previous.get(key(run))
+        if base is None:
+            continue
+        if run["errors"] and not base["errors"]:
+            regressions.append(f"{key(run)}: {run['errors']} errors {run['status_counts']}, was none")
+        if base["req_per_s"] and run["req_per_s"] < base["req_per_s"] * (1 - threshold):
+            regressions.append(
+                f"{key(run)}: {run['req_per_s']:.0f} req/s, was {base['req_per_s']:.0f}"
+            )
+        p99_rise = run["p99_ms"] - base["p99_ms"]
+        if p99_rise > P99_NOISE_FLOOR_MS and run["p99_ms"] > base["p99_ms"] * (1 + threshold):
+            regressions.append(f"{key(run)}: p99 {run['p99_ms']:.1f} ms, was {base['p99_ms']:.1f} ms")
+    return regressions
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(
+    sizes: List[int] = DEFAULT_SIZES,
+    concurrency: List[int] = DEFAULT_CONCURRENCY,
+    seconds: float = 5.0,
+    transports: List[str] = TRANSPORTS,
+    scenarios: Optional[List[str]] = None,
+    data_dir: Optional[Path] = None
+) -> dict:
+    """Run every size x transport x scenario x concurrency combination; returns the JSON report."""
+    scenarios = scenarios or list(build_scenarios(1, 1))
+    users = max(concurrency)
+    data_dir = data_dir or Path(tempfile.gettempdir()) / "sweetshop-bench"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    report = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "bcrypt_rounds": BCRYPT_ROUNDS,
+            "seconds": seconds,
+            "warmup_seconds": WARMUP_SECONDS,
+        },
+        "seeding_seconds": {},
+        "results": [],
+    }
+
+    for products in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            work_dir = Path(directory)
+            seeding = prepare_database(data_dir, work_dir / "bench.db", products, users)
+            report["seeding_seconds"][str(products)] = round(seeding, 2)
+            print(f"🍬 {products} products, {users} users" + (f" (seeded in {seeding:.1f}s)" if seeding else ""))
+            for transport in transports:
+                if transport != transports[0]:
+                    prepare_database(data_dir, work_dir / "bench.db", products, users)
+                report["results"].extend(
+                    RUNNERS[transport](work_dir, products, users, scenarios, concurrency, seconds)
+                )
+    return report
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item]
+
+
+def _name_list(choices: List[str]):
+    def parse(value: str) -> List[str]:
+        names = [item for item in value.split(",") if item]
+        unknown = [name for name in names if name not in choices]
+        if unknown:
+            raise argparse.ArgumentTypeError(f"unknown: {', '.join(unknown)} (choose from {', '.join(choices)})")
+        return names
+    return parse
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the API's hot paths and compare with a baseline.")
+    parser.add_argument("--sizes", type=_int_list, default=DEFAULT_SIZES, help="Catalog sizes (default: %(default)s)")
+    parser.add_argument(
+        "--concurrency", type=_int_list, default=DEFAULT_CONCURRENCY, help="Client counts (default: %(default)s)"
+    )
+    parser.add_argument("--seconds", type=float, default=5.0, help="Measured seconds per run (default: 5)")
+    parser.add_argument("--transports", type=_name_list(TRANSPORTS), default=TRANSPORTS, help="asgi and/or uvicorn")
+    parser.add_argument(
+        "--scenarios", type=_name_list(list(build_scenarios(1, 1))), default=None,
+        help="Scenarios to run (default: all)"
+    )
+    parser.add_argument("--data-dir", type=Path, default=None, help="Where seeded templates are kept between runs")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="JSON results (default: %(default)s)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON (default: %(default)s)")
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD,
+        help="Allowed fractional req/s drop or p99 rise (default: %(default)s)"
+    )
+    parser.add_argument("--save-baseline", action="store_true", help="Also write the results to --baseline")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.sizes, args.concurrency, args.seconds, args.transports, args.scenarios, args.data_dir)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {args.output}")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    regressions = compare_to_baseline(report["results"], baseline["results"], args.threshold)
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) beyond {args.threshold:.0%} of {args.baseline}:")
+        for regression in regressions:
+            print(f"   {regression}")
+        return 1
+    print(f"✅ No regressions beyond {args.threshold:.0%} of {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+Load benchmark: sync (threadpool) vs async (AsyncEngine) database mode.
+Run: python -m benchmarks.bench_async_db [concurrency] [seconds]
+
+Starts uvicorn once per mode against the same seeded SQLite file and
+drives a read-mostly mix (searches plus purchases) with N concurrent
+clients, reporting requests/sec and latency percentiles.
+"""
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+from sqlalchemy import create_engine
+
+from app.database import DatabaseBaseModel
+from benchmarks.bench_search import seed_products
+
+PRODUCTS = 20000
+PURCHASE_SHARE = 0.1
+SEARCH_TERMS = ["choc", "mango", "saffron", "rose", "kesar", "honey"]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(database_url: str, async_mode: bool, port: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "DATABASE_ASYNC": "true" if async_mode else "false",
+        "BCRYPT_ROUNDS": "4",
+        # Measure the database path, not the response cache
+        "CATALOG_CACHE_TTL_SECONDS": "0",
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env
+    )
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            await client.get("/docs")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+async def login(client: httpx.AsyncClient) -> dict:
+    credentials = {"email_address": "bench@sweetshop.com", "password": "BenchPass123", "full_name": "Bench"}
+    await client.post("/api/auth/register", json=credentials)
+    response = await client.post("/api/auth/login", data={
+        "username": credentials["email_address"], "password": credentials["password"]
+    })
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def drive(client: httpx.AsyncClient, headers: dict, concurrency: int, seconds: float):
+    latencies, errors = [], 0
+    deadline = time.monotonic() + seconds
+
+    async def worker(seed: int):
+        nonlocal errors
+        rng = random.Random(seed)
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            if rng.random() < PURCHASE_SHARE:
+                response = await client.post(
+                    f"/api/sweets/{rng.randint(1, PRODUCTS)}/purchase",
+                    json={"quantity_to_purchase": 1}, headers=headers
+                )
+            else:
+                response = await client.get("/api/sweets/search", params={
+                    "q": rng.choice(SEARCH_TERMS), "min_price": rng.randint(0, 500), "limit": 20
+                }, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 500:
+                errors += 1
+
+    await asyncio.gather(*(worker(seed) for seed in range(concurrency)))
+    return latencies, errors
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000
+
+
+async def measure(database_url: str, async_mode: bool, concurrency: int, seconds: float) -> None:
+    port = free_port()
+    server = start_server(database_url, async_mode, port)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            await wait_until_ready(client)
+            headers = await login(client)
+            latencies, errors = await drive(client, headers, concurrency, seconds)
+    finally:
+        server.terminate()
+        server.wait()
+
+    label = "async" if async_mode else "sync"
+    print(
+        f"   {label:<5} {len(latencies) / seconds:>8.0f} req/s"
+        f"  p50 {percentile(latencies, 0.50):>7.1f} ms"
+        f"  p99 {percentile(latencies, 0.99):>7.1f} ms"
+        f"  ({errors} errors)"
+    )
+
+
+def run_benchmark(concurrency: int = 64, seconds: float = 10.0):
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        engine = create_engine(database_url)
+        DatabaseBaseModel.metadata.create_all(bind=engine)
+        seed_products(engine, PRODUCTS)
+        engine.dispose()
+
+        print(f"🍬 {PRODUCTS} products, {concurrency} clients, {seconds:.0f}s per mode")
+        for async_mode in (False, True):
+            asyncio.run(measure(database_url, async_mode, concurrency, seconds))
+
+
+if __name__ == "__main__":
+    run_benchmark(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 64,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+    )
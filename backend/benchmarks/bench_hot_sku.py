@@ -0,0 +1,107 @@
+"""
+Benchmark: flash-sale purchases on one SKU, row UPDATE path vs hot-SKU counter.
+Run: python -m benchmarks.bench_hot_sku [threads] [purchases]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+from sqlalchemy.orm import sessionmaker
+
+from app.database import DatabaseBaseModel
+from app.db_tuning import create_tuned_engine
+from app.models import SweetProduct
+from app.inventory.hot_stock import HotStockManager, StockJournal
+from app.inventory.stock_operations import reserve_stock
+
+FLUSH_INTERVAL = 0.5
+
+
+def seed(factory, stock: int) -> int:
+    db = factory()
+    sweet = SweetProduct(sweet_name="Flash Sale Ladoo", sweet_category="Indian", sweet_price=10.0, quantity_in_stock=stock)
+    db.add(sweet)
+    db.commit()
+    sweet_id = sweet.sweet_id
+    db.close()
+    return sweet_id
+
+
+def row_purchase(factory, sweet_id: int) -> bool:
+    db = factory()
+    try:
+        reserve_stock(db, sweet_id, 1)
+        db.commit()
+        return True
+    except HTTPException:
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+
+def hot_purchase(manager: HotStockManager, sweet_id: int) -> bool:
+    try:
+        manager.reserve(sweet_id, 1)
+        return True
+    except HTTPException:
+        return False
+
+
+def measure(label: str, purchase, threads: int, purchases: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        sold = sum(pool.map(lambda _: purchase(), range(purchases)))
+    elapsed = time.perf_counter() - start
+    print(f"   {label:<4} {purchases / elapsed:>10.0f} purchases/s  ({sold} sold)")
+    return elapsed
+
+
+def run_benchmark(threads: int = 32, purchases: int = 5000):
+    # Stock for 80% of the attempts, so the sale also sells out
+    stock = purchases * 4 // 5
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_tuned_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        DatabaseBaseModel.metadata.create_all(bind=engine)
+        factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        print(f"🍬 {purchases} purchase attempts, {threads} threads, stock {stock}")
+
+        row_id = seed(factory, stock)
+        row_time = measure("row", lambda: row_purchase(factory, row_id), threads, purchases)
+
+        hot_id = seed(factory, stock)
+        manager = HotStockManager(StockJournal(os.path.join(directory, "hot.journal")))
+        with factory() as db:
+            manager.enable(db, hot_id)
+
+        stop = threading.Event()
+
+        def flusher():
+            while not stop.wait(FLUSH_INTERVAL):
+                with factory() as db:
+                    manager.flush(db)
+
+        flush_thread = threading.Thread(target=flusher)
+        flush_thread.start()
+        hot_time = measure("hot", lambda: hot_purchase(manager, hot_id), threads, purchases)
+        stop.set()
+        flush_thread.join()
+
+        with factory() as db:
+            manager.flush(db)
+            remaining = db.get(SweetProduct, hot_id).quantity_in_stock
+        manager.journal.close()
+        engine.dispose()
+
+        print(f"   speedup {row_time / hot_time:.1f}x, hot SKU stock after write-back: {remaining}")
+
+
+if __name__ == "__main__":
+    run_benchmark(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 32,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    )
@@ -0,0 +1,74 @@
+"""
+Benchmark: pricing cart lines against a loaded rule table.
+Run: python -m benchmarks.bench_pricing [lines] [lines_per_cart]
+"""
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.pricing.engine import CartLine, price_cart
+from app.pricing.rules import BOGO, FIXED, PERCENTAGE, Rule, RuleTable
+
+TARGET_LINES_PER_SECOND = 100_000
+CATEGORIES = [f"category-{index}" for index in range(50)]
+SWEETS = 5000
+
+
+def build_rules(now: datetime) -> RuleTable:
+    """A promotion calendar: sweet and category rules, coupons, BOGO and expired offers."""
+    rng = random.Random(7)
+    rules = []
+    for rule_id in range(1, 1001):
+        kind = rng.choice((PERCENTAGE, PERCENTAGE, BOGO, FIXED))
+        scope = rng.random()
+        rules.append(Rule(
+            rule_id=rule_id,
+            rule_name=f"promo-{rule_id}",
+            rule_type=kind,
+            coupon_code=f"CODE{rule_id % 20}" if rule_id % 3 == 0 else None,
+            percent_off_bps=rng.randrange(500, 3000),
+            amount_off_paise=rng.randrange(1000, 50000),
+            buy_quantity=rng.randrange(1, 4),
+            free_quantity=1,
+            sweet_id=rng.randrange(1, SWEETS) if scope < 0.6 else None,
+            sweet_category=rng.choice(CATEGORIES) if 0.6 <= scope < 0.95 else None,
+            expires_at=now - timedelta(days=1) if rule_id % 10 == 0 else None,
+        ))
+    return RuleTable(rules)
+
+
+def build_carts(lines: int, lines_per_cart: int):
+    rng = random.Random(11)
+    carts = []
+    for start in range(0, lines, lines_per_cart):
+        carts.append(([
+            CartLine(sweet_id, CATEGORIES[sweet_id % len(CATEGORIES)], rng.randrange(500, 100000), rng.randrange(1, 10))
+            for sweet_id in (rng.randrange(1, SWEETS) for _ in range(min(lines_per_cart, lines - start)))
+        ], f"CODE{rng.randrange(40)}" if rng.random() < 0.5 else None))
+    return carts
+
+
+def run_benchmark(lines: int = 200_000, lines_per_cart: int = 10):
+    now = datetime.now(timezone.utc)
+    table = build_rules(now)
+    carts = build_carts(lines, lines_per_cart)
+    print(f"🏷️  Pricing {lines} lines in carts of {lines_per_cart} against {len(table.rules)} rules")
+
+    start = time.perf_counter()
+    charged = 0
+    for cart, coupon in carts:
+        charged += price_cart(cart, table.active(coupon, now)).charged_paise
+    elapsed = time.perf_counter() - start
+
+    rate = lines / elapsed
+    verdict = "meets" if rate >= TARGET_LINES_PER_SECOND else "misses"
+    print(f"   {rate:>12,.0f} lines/s  ({elapsed * 1e6 / lines:.2f} µs/line, {verdict} the {TARGET_LINES_PER_SECOND:,}/s target)")
+    print(f"   charged {charged} paise in total")
+
+
+if __name__ == "__main__":
+    run_benchmark(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    )
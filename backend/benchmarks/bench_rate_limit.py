@@ -0,0 +1,60 @@
+"""
+Benchmark: cost of one rate-limit check as the number of tracked clients grows.
+Run: python -m benchmarks.bench_rate_limit [checks] [threads]
+
+Each row spreads ``checks`` consume() calls over a different number of
+keys, so the per-check time shows whether the cost depends on how many
+buckets are live. It should stay flat, even once the LRU is evicting. The
+second table runs the same load from several threads against one shard
+and against the default shard count.
+"""
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.rate_limit import RATE_LIMIT_SHARDS, InMemoryBackend, parse_rate
+
+RATE = parse_rate("60/minute")
+
+
+def keys_for(count: int, checks: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [f"purchase:user:{rng.randrange(count)}" for _ in range(checks)]
+
+
+def time_checks(backend: InMemoryBackend, keys) -> float:
+    """Nanoseconds per consume() over ``keys``."""
+    consume = backend.consume
+    start = time.perf_counter()
+    for key in keys:
+        consume(key, RATE)
+    return (time.perf_counter() - start) * 1e9 / len(keys)
+
+
+def run_benchmark(checks: int = 500_000, threads: int = 8):
+    print(f"🍬 Rate-limit check cost ({checks} checks)")
+    print(f"   {'keys':>9} {'live buckets':>13} {'ns/check':>9}")
+    for key_count in (1_000, 100_000, 1_000_000):
+        backend = InMemoryBackend()
+        keys = keys_for(key_count, checks)
+        time_checks(backend, keys[: checks // 10])
+        nanoseconds = time_checks(backend, keys)
+        print(f"   {key_count:>9} {len(backend):>13} {nanoseconds:>9.0f}")
+
+    print(f"\n   {threads} threads, 10k keys")
+    for shards in (1, RATE_LIMIT_SHARDS):
+        backend = InMemoryBackend(shards=shards)
+        batches = [keys_for(10_000, checks // threads, seed) for seed in range(threads)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(lambda batch: time_checks(backend, batch), batches))
+        elapsed = time.perf_counter() - start
+        print(f"   {shards:>3} shard(s) {checks / elapsed:>12,.0f} checks/s")
+
+
+if __name__ == "__main__":
+    run_benchmark(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 500_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    )
@@ -0,0 +1,87 @@
+"""
+Benchmark: full-text search vs the old leading-wildcard ILIKE path.
+Run: python -m benchmarks.bench_search [product_count]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import DatabaseBaseModel
+from app.models import SweetProduct
+from app.catalog.full_text import apply_text_search
+
+FLAVOURS = ["Chocolate", "Vanilla", "Pista", "Kesar", "Mango", "Rose", "Coconut", "Badam",
+            "Strawberry", "Caramel", "Cardamom", "Saffron", "Honey", "Hazelnut", "Lemon"]
+KINDS = ["Barfi", "Ladoo", "Fudge", "Truffle", "Peda", "Halwa", "Toffee", "Candy", "Cake", "Roll"]
+WORDS = ["rich", "creamy", "crunchy", "festive", "classic", "premium", "soft", "roasted",
+         "glazed", "spiced", "silver", "layered", "smooth", "crispy", "golden"]
+QUERIES = ["choc", "mango barfi", "saffron", "hazelnut truffle", "rose", "kesar peda"]
+
+
+def seed_products(engine, count: int, batch_size: int = 10000) -> None:
+    """Bulk-insert synthetic products with executemany batches."""
+    rng = random.Random(42)
+    with engine.begin() as connection:
+        for start in range(0, count, batch_size):
+            connection.execute(insert(SweetProduct), [
+                {
+                    "sweet_name": f"{rng.choice(FLAVOURS)} {rng.choice(KINDS)} {index}",
+                    "sweet_category": rng.choice(KINDS),
+                    "sweet_price": round(rng.uniform(10, 900), 2),
+                    "quantity_in_stock": rng.randint(0, 500),
+                    "sweet_description": " ".join(rng.sample(WORDS, 5)),
+                }
+                for index in range(start, min(start + batch_size, count))
+            ])
+
+
+def ilike_search(db, text: str):
+    query = db.query(SweetProduct)
+    for term in text.split():
+        query = query.filter(SweetProduct.sweet_name.ilike(f"%{term}%"))
+    return query.all()
+
+
+def fts_search(db, text: str):
+    query, relevance = apply_text_search(db.query(SweetProduct), "sqlite", name=text)
+    return query.order_by(relevance).all()
+
+
+def measure(label: str, db, search, rounds: int) -> float:
+    start = time.perf_counter()
+    matched = 0
+    for _ in range(rounds):
+        for text in QUERIES:
+            matched += len(search(db, text))
+    elapsed = time.perf_counter() - start
+    per_query = elapsed / (rounds * len(QUERIES)) * 1000
+    print(f"   {label:<6} {per_query:>9.2f} ms/query  ({matched // rounds} rows per round)")
+    return per_query
+
+
+def run_benchmark(count: int = 100000, rounds: int = 3):
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        DatabaseBaseModel.metadata.create_all(bind=engine)
+
+        start = time.perf_counter()
+        seed_products(engine, count)
+        print(f"🍬 Seeded {count} products in {time.perf_counter() - start:.1f}s")
+
+        db = sessionmaker(bind=engine)()
+        try:
+            ilike = measure("ilike", db, ilike_search, rounds)
+            fts = measure("fts5", db, fts_search, rounds)
+            print(f"   speedup {ilike / fts:.1f}x")
+        finally:
+            db.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
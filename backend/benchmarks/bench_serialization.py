@@ -0,0 +1,78 @@
+"""
+Benchmark: encoding a catalog page from ORM entities vs plain column rows.
+Run: python -m benchmarks.bench_serialization [rows] [rounds]
+
+"orm" is the response-model path: load SweetProduct entities, validate
+them into SweetProductResponse with from_attributes, then dump. "rows" is
+the catalog fast path: select the columns and dump them in one pass.
+Each is timed with and without the query, so the encoding cost shows on
+its own.
+"""
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.catalog.serialization import serialize_sweet_rows, sweet_columns
+from app.database import DatabaseBaseModel
+from app.models import SweetProduct
+from app.schemas import SweetProductResponse
+from benchmarks.bench_search import seed_products
+
+response_adapter = TypeAdapter(List[SweetProductResponse])
+
+
+def encode_entities(sweets) -> bytes:
+    return response_adapter.dump_json(response_adapter.validate_python(sweets, from_attributes=True))
+
+
+def best_of(rounds: int, operation) -> float:
+    """Fastest of ``rounds`` timings, in milliseconds."""
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        operation()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def run_benchmark(rows: int = 10_000, rounds: int = 10):
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        DatabaseBaseModel.metadata.create_all(bind=engine)
+        seed_products(engine, rows)
+        db = sessionmaker(bind=engine)()
+        try:
+            def load_entities():
+                db.expunge_all()
+                return db.query(SweetProduct).order_by(SweetProduct.sweet_id).all()
+
+            def load_rows():
+                return db.query(*sweet_columns()).order_by(SweetProduct.sweet_id).all()
+
+            sweets, plain_rows = load_entities(), load_rows()
+            assert encode_entities(sweets) == serialize_sweet_rows(plain_rows), "encodings differ"
+
+            print(f"🍬 Encoding {rows} catalog rows (best of {rounds})")
+            orm_total = best_of(rounds, lambda: encode_entities(load_entities()))
+            rows_total = best_of(rounds, lambda: serialize_sweet_rows(load_rows()))
+            orm_encode = best_of(rounds, lambda: encode_entities(sweets))
+            rows_encode = best_of(rounds, lambda: serialize_sweet_rows(plain_rows))
+            print(f"   orm   {orm_total:>8.1f} ms query+encode  {orm_encode:>8.1f} ms encode only")
+            print(f"   rows  {rows_total:>8.1f} ms query+encode  {rows_encode:>8.1f} ms encode only")
+            print(f"   speedup {orm_total / rows_total:.1f}x end to end, {orm_encode / rows_encode:.1f}x encoding")
+        finally:
+            db.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    run_benchmark(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    )
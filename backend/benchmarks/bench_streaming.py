@@ -0,0 +1,82 @@
+"""
+Benchmark: time to first byte and peak memory of the full-catalog JSON export.
+Run: python -m benchmarks.bench_streaming [sizes]   (e.g. 10000,100000,1000000)
+
+"buffered" selects every row and encodes one array, which is what building
+the response in memory costs. "streamed" is the export path: yield_per
+batches encoded as they arrive, gzipped chunk by chunk with a sync flush
+as the compression middleware does. Peak memory is the tracemalloc peak of
+Python allocations while the body is produced. The streamed numbers should
+stay flat as the catalog grows; the buffered ones grow with it.
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.catalog.bulk_io import export_catalog
+from app.catalog.serialization import serialize_sweet_rows, sweet_columns
+from app.compression import GzipCompressor
+from app.models import SweetProduct
+from benchmarks.seeding import seed_catalog
+
+
+def buffered(db):
+    yield serialize_sweet_rows(db.query(*sweet_columns()).order_by(SweetProduct.sweet_id).all())
+
+
+def streamed(db):
+    compressor = GzipCompressor()
+    for chunk in export_catalog(db, "json"):
+        yield compressor.compress(chunk, flush=True)
+    yield compressor.finish()
+
+
+def measure(db, produce):
+    """(ms to first chunk, ms total, bytes, peak MiB) for one pass over ``produce(db)``."""
+    db.expunge_all()
+    tracemalloc.start()
+    start = time.perf_counter()
+    first_byte = None
+    size = 0
+    for chunk in produce(db):
+        if first_byte is None:
+            first_byte = time.perf_counter() - start
+        size += len(chunk)
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return first_byte * 1000, total * 1000, size, peak / (1024 * 1024)
+
+
+def run_benchmark(sizes=(10_000, 100_000)):
+    print("🍬 Full-catalog JSON: time to first byte and peak memory")
+    print(f"   {'rows':>9} {'mode':>9} {'ttfb ms':>9} {'total ms':>9} {'MiB out':>8} {'peak MiB':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            path = Path(directory) / f"catalog-{size}.db"
+            seed_catalog(path, size, 0)
+            engine = create_engine(f"sqlite:///{path}")
+            db = sessionmaker(bind=engine)()
+            try:
+                for mode, produce in (("buffered", buffered), ("streamed", streamed)):
+                    ttfb, total, out, peak = measure(db, produce)
+                    print(
+                        f"   {size:>9} {mode:>9} {ttfb:>9.1f} {total:>9.1f} "
+                        f"{out / (1024 * 1024):>8.1f} {peak:>9.1f}"
+                    )
+            finally:
+                db.close()
+                engine.dispose()
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    run_benchmark(
+        tuple(int(size) for size in sys.argv[1].split(",")) if len(sys.argv) > 1 else (10_000, 100_000)
+    )
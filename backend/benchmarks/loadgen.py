@@ -0,0 +1,157 @@
+"""
+Closed-loop load generation and the numbers recorded for each run.
+
+N workers share one httpx client and each sends its next request as soon
+as the previous one answers, for a fixed duration after a short warm-up.
+Peak RSS is read from /proc (VmHWM) and reset between runs where the
+kernel allows it, so each run reports its own peak. Elsewhere it falls back
+to getrusage, which only reports the peak of this process so far.
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+import httpx
+
+# One request: (client, rng, worker index) -> response
+RequestFactory = Callable[[httpx.AsyncClient, random.Random, int], Awaitable[httpx.Response]]
+
+WARMUP_SECONDS = 1.0
+
+
+class RunResult(NamedTuple):
+    """Throughput, latency percentiles and memory of one scenario at one concurrency."""
+    transport: str
+    scenario: str
+    products: int
+    concurrency: int
+    seconds: float
+    requests: int
+    errors: int
+    req_per_s: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    peak_rss_mb: Optional[float]
+    status_counts: Dict[str, int]
+
+    @property
+    def key(self) -> str:
+        return f"{self.transport}/{self.scenario}/{self.products}/c{self.concurrency}"
+
+    def as_json(self) -> dict:
+        return self._asdict()
+
+
+def percentile(latencies: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of ``latencies`` (seconds), in milliseconds."""
+    if not latencies:
+        return 0.0
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000
+
+
+def _proc_status(pid: int) -> Optional[str]:
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            return status.read()
+    except OSError:
+        return None
+
+
+def reset_peak_rss(pid: int) -> None:
+    """Reset the kernel's high-water mark for ``pid`` (Linux only; a no-op elsewhere)."""
+    try:
+        with open(f"/proc/{pid}/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb(pid: int) -> Optional[float]:
+    """Peak resident set size of ``pid`` in MiB, or None where it cannot be read."""
+    status = _proc_status(pid)
+    if status is not None:
+        for line in status.splitlines():
+            if line.startswith("VmHWM:"):
+                return round(int(line.split()[1]) / 1024, 1)
+    if pid == os.getpid():
+        try:
+            import resource
+        except ImportError:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    return None
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    send: RequestFactory,
+    concurrency: int,
+    seconds: float,
+    warmup: float = WARMUP_SECONDS
+):
+    """Run ``concurrency`` workers for ``warmup + seconds``; returns (latencies, status counts).
+
+    Only requests that start after the warm-up are recorded.
+    """
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    measure_from = time.monotonic() + warmup
+    deadline = measure_from + seconds
+
+    async def worker(index: int):
+        rng = random.Random(index)
+        while True:
+            started_at = time.monotonic()
+            if started_at >= deadline:
+                return
+            started = time.perf_counter()
+            try:
+                response = await send(client, rng, index)
+                outcome = str(response.status_code)
+            except httpx.HTTPError as exc:
+                outcome = type(exc).__name__
+            elapsed = time.perf_counter() - started
+            if started_at >= measure_from:
+                latencies.append(elapsed)
+                statuses[outcome] = statuses.get(outcome, 0) + 1
+
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    return latencies, statuses
+
+
+async def measure(
+    client: httpx.AsyncClient,
+    send: RequestFactory,
+    server_pid: int,
+    transport: str,
+    scenario: str,
+    products: int,
+    concurrency: int,
+    seconds: float
+) -> RunResult:
+    """Drive one scenario and summarise it; non-2xx responses and transport failures count as errors."""
+    reset_peak_rss(server_pid)
+    latencies, statuses = await drive(client, send, concurrency, seconds)
+    errors = sum(count for outcome, count in statuses.items() if not outcome.startswith("2"))
+    return RunResult(
+        transport=transport,
+        scenario=scenario,
+        products=products,
+        concurrency=concurrency,
+        seconds=seconds,
+        requests=len(latencies),
+        errors=errors,
+        req_per_s=round(len(latencies) / seconds, 1),
+        p50_ms=round(percentile(latencies, 0.50), 2),
+        p95_ms=round(percentile(latencies, 0.95), 2),
+        p99_ms=round(percentile(latencies, 0.99), 2),
+        peak_rss_mb=peak_rss_mb(server_pid),
+        status_counts=dict(sorted(statuses.items())),
+    )
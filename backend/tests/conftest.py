@@ -2,9 +2,22 @@
 Pytest configuration and fixtures.
 """
 
+import os
 import sys
+import tempfile
 from pathlib import Path
 
+# Cheap bcrypt cost for tests; must be set before the app is imported
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# Tests flush hot-SKU write-backs explicitly and keep the journal out of the tree
+os.environ.setdefault("HOT_SKU_FLUSH_INTERVAL", "0")
+os.environ.setdefault("HOT_SKU_JOURNAL_PATH", os.path.join(tempfile.mkdtemp(), "hot_sku.journal"))
+# Tests compact the ledger explicitly
+os.environ.setdefault("LEDGER_COMPACTION_INTERVAL", "0")
+# Tests drive the low-stock watcher directly against the test database
+os.environ.setdefault("LOW_STOCK_ALERTS_ENABLED", "false")
+os.environ.setdefault("IDEMPOTENCY_PURGE_INTERVAL", "0")
+
 # Add backend directory to Python path
 backend_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_dir))
@@ -18,6 +31,18 @@ from sqlalchemy.pool import StaticPool
 
 from app.database import DatabaseBaseModel, get_db
 from app.main import app
+from app.models import SweetProduct
+from app.auth.user_cache import user_principal_cache
+from app.auth.token_manager import verified_token_cache
+from app.catalog.response_cache import catalog_response_cache, catalog_version
+from app.read_replicas import replica_router
+from app.inventory.hot_stock import hot_stock
+from app.pricing.rules import pricing_rules
+from app.inventory.events import stock_events
+from app.idempotency import idempotency_store
+from app.inventory.low_stock import alert_stream, low_stock_watcher
+from app.metrics.registry import registry
+from app.rate_limit import rate_limiter
 
 # Test database - in-memory SQLite for speed
 TEST_DATABASE_URL = "sqlite:///:memory:"
@@ -49,10 +74,89 @@ def setup_test_database():
     DatabaseBaseModel.metadata.drop_all(bind=test_engine)
 
 
+@pytest.fixture(autouse=True)
+def reset_in_process_caches():
+    """Start every test with empty in-process caches."""
+    caches = [
+        user_principal_cache, verified_token_cache, catalog_response_cache, catalog_version,
+        replica_router.sticky_users, idempotency_store
+    ]
+    for cache in caches:
+        cache.clear()
+    hot_stock.reset()
+    pricing_rules.invalidate()
+    stock_events.reset()
+    low_stock_watcher.reset()
+    alert_stream.reset()
+    registry.reset()
+    rate_limiter.reset()
+    yield
+    for cache in caches:
+        cache.clear()
+    hot_stock.reset()
+    pricing_rules.invalidate()
+    stock_events.reset()
+    low_stock_watcher.reset()
+    alert_stream.reset()
+
+
+@pytest.fixture
+def db_session():
+    """Provides a session on the test database for direct assertions."""
+    db = TestSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 @pytest.fixture
 def client():
     """Provides a test client for the FastAPI app."""
     app.dependency_overrides[get_db] = override_get_db
     with TestClient(app) as test_client:
         yield test_client
-    app.dependency_overrides.clear()
\ No newline at end of file
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Register and log in a user, returning its Authorization header.
+
+    Call it once per user: ``auth_headers("buyer@example.com")``.
+    """
+    def login(email="customer@sweetshop.com", password="CustomerPass123", is_admin=False):
+        client.post("/api/auth/register", json={
+            "email_address": email,
+            "password": password,
+            "full_name": "Test User",
+            "is_administrator": is_admin
+        })
+        response = client.post("/api/auth/login", data={
+            "username": email,
+            "password": password
+        })
+        token = response.json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+    return login
+
+
+@pytest.fixture
+def admin_headers(auth_headers):
+    """Authorization header of a logged-in administrator."""
+    return auth_headers("admin@sweetshop.com", "AdminPass123", is_admin=True)
+
+
+@pytest.fixture
+def add_sweet(db_session):
+    """Insert a sweet directly into the database and return its sweet_id.
+
+    Pass ``db`` to write through another session, e.g. a file-backed one.
+    """
+    def add(name="Ladoo", category="Indian", price=10.0, stock=100, db=None):
+        db = db_session if db is None else db
+        sweet = SweetProduct(sweet_name=name, sweet_category=category, sweet_price=price, quantity_in_stock=stock)
+        db.add(sweet)
+        db.commit()
+        return sweet.sweet_id
+    return add
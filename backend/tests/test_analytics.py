@@ -0,0 +1,224 @@
+"""
+Sales analytics: incrementally maintained rollups and the reports built on them.
+"""
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event
+
+from app.analytics.rollups import rebuild_rollups
+from app.inventory.ledger import purchase_movement, record_movements, restock_movement
+from app.models import SalesRollup, SweetProduct
+
+
+# ==================== HELPER FUNCTIONS ====================
+
+def buy(client, headers, sweet_id, quantity, coupon=None):
+    return client.post(
+        f"/api/sweets/{sweet_id}/purchase",
+        json={"quantity_to_purchase": quantity, "coupon": coupon},
+        headers=headers
+    )
+
+
+def rollups(db, granularity):
+    db.expire_all()
+    return [
+        (row.bucket_start.replace(tzinfo=None), row.sweet_id, row.units_sold, row.units_restocked, row.revenue)
+        for row in db.query(SalesRollup)
+        .filter(SalesRollup.granularity == granularity)
+        .order_by(SalesRollup.bucket_start, SalesRollup.sweet_id)
+    ]
+
+
+# ==================== ROLLUP MAINTENANCE TESTS ====================
+
+def test_movements_are_added_to_hourly_and_daily_buckets(db_session, add_sweet):
+    sweet_id = add_sweet(name="Barfi")
+    morning = datetime(2024, 12, 1, 9, 15, tzinfo=timezone.utc)
+    record_movements(db_session, [
+        purchase_movement(sweet_id, 2, 10.0, 20.0, None, created_at=morning),
+        purchase_movement(sweet_id, 1, 10.0, 9.0, None, coupon="COUPON", created_at=morning + timedelta(minutes=30)),
+        purchase_movement(sweet_id, 4, 10.0, 40.0, None, created_at=morning + timedelta(hours=3)),
+    ])
+    record_movements(db_session, [restock_movement(sweet_id, 5, 10.0, None)])
+    db_session.commit()
+
+    hourly = [row for row in rollups(db_session, "hour") if row[0].date() == morning.date()]
+    assert hourly == [
+        (datetime(2024, 12, 1, 9), sweet_id, 3, 0, 29.0),
+        (datetime(2024, 12, 1, 12), sweet_id, 4, 0, 40.0),
+    ]
+    daily = rollups(db_session, "day")
+    assert daily[0] == (datetime(2024, 12, 1), sweet_id, 7, 0, 69.0)
+    assert daily[-1][3] == 5
+
+
+def test_purchase_endpoint_updates_rollups(client, db_session, admin_headers, add_sweet):
+    sweet_id = add_sweet(name="Barfi")
+
+    buy(client, admin_headers, sweet_id, 3, coupon="COUPON")
+    buy(client, admin_headers, sweet_id, 1)
+
+    ((_, rolled_id, units, _, revenue),) = rollups(db_session, "day")
+    assert (rolled_id, units, revenue) == (sweet_id, 4, 37.0)
+
+
+def test_purchase_files_rollups_without_looking_up_the_category(client, db_session, admin_headers, add_sweet):
+    sweet_id = add_sweet(name="Brownie", category="Western")
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db_session.get_bind(), "before_cursor_execute", record)
+    try:
+        buy(client, admin_headers, sweet_id, 2)
+        client.post(f"/api/sweets/{sweet_id}/restock", json={"quantity_to_add": 1}, headers=admin_headers)
+    finally:
+        event.remove(db_session.get_bind(), "before_cursor_execute", record)
+
+    lookup = "SELECT sweet_products.sweet_id, sweet_products.sweet_category \nFROM"
+    assert not [statement for statement in statements if statement.startswith(lookup)]
+    db_session.expire_all()
+    assert {row.sweet_category for row in db_session.query(SalesRollup)} == {"Western"}
+
+
+def test_failed_purchase_leaves_rollups_untouched(client, db_session, admin_headers, add_sweet):
+    sweet_id = add_sweet(name="Barfi", stock=1)
+
+    assert buy(client, admin_headers, sweet_id, 2).status_code == 400
+    assert rollups(db_session, "day") == []
+
+
+def test_rebuild_matches_incremental_rollups(client, db_session, admin_headers, add_sweet):
+    first = add_sweet(name="Barfi")
+    second = add_sweet(name="Brownie", category="Western", price=4.0)
+    buy(client, admin_headers, first, 2)
+    buy(client, admin_headers, second, 5, coupon="COUPON")
+    client.post(f"/api/sweets/{first}/restock", json={"quantity_to_add": 10}, headers=admin_headers)
+    incremental = rollups(db_session, "hour"), rollups(db_session, "day")
+
+    db_session.query(SalesRollup).delete()
+    db_session.commit()
+
+    assert rebuild_rollups(db_session) == 3
+    assert (rollups(db_session, "hour"), rollups(db_session, "day")) == incremental
+
+
+def test_rebuild_files_history_under_the_current_category(client, db_session, admin_headers, add_sweet):
+    sweet_id = add_sweet(name="Brownie", category="Western")
+    buy(client, admin_headers, sweet_id, 2)
+    db_session.get(SweetProduct, sweet_id).sweet_category = "Fusion"
+    db_session.commit()
+
+    def categories():
+        db_session.expire_all()
+        return {row.sweet_category for row in db_session.query(SalesRollup)}
+
+    assert categories() == {"Western"}
+    rebuild_rollups(db_session)
+    assert categories() == {"Fusion"}
+
+
+# ==================== REPORT ENDPOINT TESTS ====================
+
+def test_revenue_by_category(client, admin_headers, add_sweet):
+    barfi = add_sweet(name="Barfi")
+    ladoo = add_sweet()
+    brownie = add_sweet(name="Brownie", category="Western", price=4.0)
+    buy(client, admin_headers, barfi, 2)
+    buy(client, admin_headers, ladoo, 1)
+    buy(client, admin_headers, brownie, 5, coupon="COUPON")
+
+    response = client.get("/api/admin/analytics/revenue-by-category", headers=admin_headers)
+
+    assert response.status_code == 200
+    assert [(row["sweet_category"], row["revenue"], row["units_sold"], row["order_count"])
+            for row in response.json()] == [("Indian", 30.0, 3, 2), ("Western", 18.0, 5, 1)]
+
+    hourly = client.get(
+        "/api/admin/analytics/revenue-by-category?granularity=hour&category=Western", headers=admin_headers
+    ).json()
+    assert [row["revenue"] for row in hourly] == [18.0]
+
+
+def test_best_sellers_by_units_and_revenue(client, admin_headers, add_sweet):
+    cheap = add_sweet(name="Toffee", price=1.0)
+    dear = add_sweet(name="Truffle", price=50.0)
+    buy(client, admin_headers, cheap, 10)
+    buy(client, admin_headers, dear, 1)
+
+    by_units = client.get("/api/admin/analytics/best-sellers", headers=admin_headers).json()
+    assert [row["sweet_name"] for row in by_units] == ["Toffee", "Truffle"]
+
+    by_revenue = client.get("/api/admin/analytics/best-sellers?rank_by=revenue&limit=1", headers=admin_headers).json()
+    assert [(row["sweet_name"], row["revenue"]) for row in by_revenue] == [("Truffle", 50.0)]
+
+
+def test_stock_turn(client, admin_headers, add_sweet):
+    fast = add_sweet(name="Jalebi")
+    slow = add_sweet(name="Halwa")
+    buy(client, admin_headers, fast, 20)
+    buy(client, admin_headers, slow, 1)
+    today = datetime.now(timezone.utc).date().isoformat() + "T00:00:00"
+
+    response = client.get(f"/api/admin/analytics/stock-turn?since={today}", headers=admin_headers)
+
+    assert response.status_code == 200
+    report = {row["sweet_name"]: row for row in response.json()}
+    assert (report["Jalebi"]["average_stock"], report["Jalebi"]["stock_turn"]) == (80, 0.25)
+    assert report["Halwa"]["units_sold"] == 1
+    assert [row["sweet_name"] for row in response.json()] == ["Jalebi", "Halwa"]
+
+
+def test_stock_turn_walks_back_from_current_stock(client, admin_headers, add_sweet):
+    sweet_id = add_sweet(name="Jalebi")
+    buy(client, admin_headers, sweet_id, 50)
+    yesterday = (datetime.now(timezone.utc) - timedelta(days=1)).date().isoformat() + "T00:00:00"
+
+    row = client.get(f"/api/admin/analytics/stock-turn?since={yesterday}", headers=admin_headers).json()[0]
+
+    # Closing stock was 100 yesterday and 50 today
+    assert row["average_stock"] == 75
+
+
+def test_stock_turn_of_a_past_window_walks_back_over_later_days(client, admin_headers, add_sweet):
+    sweet_id = add_sweet(name="Jalebi")
+    buy(client, admin_headers, sweet_id, 49)
+    today = datetime.now(timezone.utc).date()
+    since = (today - timedelta(days=2)).isoformat() + "T00:00:00"
+    until = today.isoformat() + "T00:00:00"
+
+    row = client.get(
+        f"/api/admin/analytics/stock-turn?since={since}&until={until}", headers=admin_headers
+    ).json()[0]
+
+    # Today's sale happened after the window, so both window days closed at 100
+    assert (row["units_sold"], row["average_stock"], row["stock_turn"]) == (0, 100, 0)
+
+
+def test_stock_turn_limit(client, admin_headers, add_sweet):
+    ids = [add_sweet(name=name, stock=stock) for name, stock in (("Jalebi", 9), ("Halwa", 100), ("Empty", 0))]
+    buy(client, admin_headers, ids[0], 3)
+
+    rows = client.get("/api/admin/analytics/stock-turn?limit=2", headers=admin_headers).json()
+
+    assert [(row["sweet_name"], row["stock_turn"]) for row in rows] == [("Jalebi", 0.337), ("Halwa", 0.0)]
+
+
+def test_invalid_report_window(client, admin_headers):
+
+    response = client.get(
+        "/api/admin/analytics/best-sellers?since=2024-12-02T00:00:00&until=2024-12-01T00:00:00",
+        headers=admin_headers
+    )
+
+    assert response.status_code == 400
+
+
+def test_analytics_require_admin(client, auth_headers):
+    headers = auth_headers("customer@example.com")
+
+    response = client.get("/api/admin/analytics/best-sellers", headers=headers)
+
+    assert response.status_code == 403
@@ -0,0 +1,130 @@
+"""
+The async session mode (DATABASE_ASYNC) against a file-backed aiosqlite database.
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database import DatabaseBaseModel, async_database_url, get_db, run_in_session
+from app.main import app
+from app.models import SweetProduct
+
+
+@pytest.fixture
+def async_client(client, tmp_path):
+    """The test client with get_db yielding AsyncSessions."""
+    path = tmp_path / "async.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    DatabaseBaseModel.metadata.create_all(bind=sync_engine)
+    sync_engine.dispose()
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    factory = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_async_db
+    yield client
+    asyncio.run(engine.dispose())
+
+
+# ==================== CONFIGURATION TESTS ====================
+
+@pytest.mark.parametrize("url, expected", [
+    ("sqlite:///./sweetshop.db", "sqlite+aiosqlite:///./sweetshop.db"),
+    ("postgresql://shop@db/sweets", "postgresql+asyncpg://shop@db/sweets"),
+    ("postgresql+psycopg2://shop@db/sweets", "postgresql+asyncpg://shop@db/sweets"),
+])
+def test_async_database_url(url, expected):
+    assert async_database_url(url) == expected
+
+
+def test_async_database_url_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        async_database_url("mssql+pyodbc://shop@db/sweets")
+
+
+def test_run_in_session_accepts_sync_session(db_session):
+    db_session.add(SweetProduct(sweet_name="Peda", sweet_category="Indian", sweet_price=1.0, quantity_in_stock=1))
+    db_session.commit()
+
+    count = asyncio.run(run_in_session(db_session, lambda session: session.query(SweetProduct).count()))
+
+    assert count == 1
+
+
+# ==================== ASYNC MODE ROUTE TESTS ====================
+
+def test_auth_flow_in_async_mode(async_client, admin_headers):
+
+    response = async_client.get("/api/auth/me", headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.json()["email_address"] == "admin@sweetshop.com"
+
+    duplicate = async_client.post("/api/auth/register", json={
+        "email_address": "admin@sweetshop.com",
+        "password": "AdminPass123",
+        "full_name": "Again"
+    })
+    assert duplicate.status_code == 409
+
+
+def test_catalog_and_inventory_in_async_mode(async_client, admin_headers):
+    created = async_client.post("/api/sweets", json={
+        "sweet_name": "Kaju Katli",
+        "sweet_category": "Indian",
+        "sweet_price": 4.5,
+        "quantity_in_stock": 10
+    }, headers=admin_headers)
+    assert created.status_code == 201
+    sweet_id = created.json()["sweet_id"]
+
+    updated = async_client.put(f"/api/sweets/{sweet_id}", json={"sweet_price": 5.0}, headers=admin_headers)
+    assert updated.json()["sweet_price"] == 5.0
+
+    purchase = async_client.post(
+        f"/api/sweets/{sweet_id}/purchase", json={"quantity_to_purchase": 3}, headers=admin_headers
+    )
+    assert purchase.json()["new_quantity"] == 7
+
+    oversell = async_client.post(
+        f"/api/sweets/{sweet_id}/purchase", json={"quantity_to_purchase": 30}, headers=admin_headers
+    )
+    assert oversell.status_code == 400
+
+    restock = async_client.post(f"/api/sweets/{sweet_id}/restock", json={"quantity_to_add": 5}, headers=admin_headers)
+    assert restock.json()["new_quantity"] == 12
+
+    listing = async_client.get("/api/sweets", headers=admin_headers)
+    assert [sweet["quantity_in_stock"] for sweet in listing.json()] == [12]
+
+    search = async_client.get("/api/sweets/search", params={"name": "kaju"}, headers=admin_headers)
+    assert [sweet["sweet_id"] for sweet in search.json()] == [sweet_id]
+
+    assert async_client.delete(f"/api/sweets/{sweet_id}", headers=admin_headers).status_code == 204
+    assert async_client.delete(f"/api/sweets/{sweet_id}", headers=admin_headers).status_code == 404
+
+
+def test_cart_checkout_in_async_mode(async_client, admin_headers):
+    ids = [
+        async_client.post("/api/sweets", json={
+            "sweet_name": name,
+            "sweet_category": "Indian",
+            "sweet_price": 2.0,
+            "quantity_in_stock": 5
+        }, headers=admin_headers).json()["sweet_id"]
+        for name in ("Barfi", "Jalebi")
+    ]
+
+    response = async_client.post("/api/cart/checkout", json={
+        "lines": [{"sweet_id": ids[0], "quantity_to_purchase": 2}, {"sweet_id": ids[1], "quantity_to_purchase": 9}]
+    }, headers=admin_headers)
+    assert response.status_code == 400
+
+    listing = async_client.get("/api/sweets", headers=admin_headers)
+    assert [sweet["quantity_in_stock"] for sweet in listing.json()] == [5, 5]
@@ -125,3 +125,190 @@ def test_protected_me_returns_current_user(client):
     assert data["is_administrator"] is False
     assert "user_id" in data
 
+
+
+# ==================== USER PRINCIPAL CACHE TESTS ====================
+
+def login_headers(client, email="cached@test.com", password="CachedPass123", is_admin=False):
+    client.post("/api/auth/register", json={
+        "email_address": email,
+        "password": password,
+        "full_name": "Cached User",
+        "is_administrator": is_admin
+    })
+    response = client.post("/api/auth/login", data={"username": email, "password": password})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_current_user_is_served_from_cache(client):
+    from app.auth.user_cache import user_principal_cache
+
+    headers = login_headers(client)
+    client.get("/api/auth/me", headers=headers)
+    misses = user_principal_cache.stats()["misses"]
+
+    response = client.get("/api/auth/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["email_address"] == "cached@test.com"
+    assert user_principal_cache.stats()["misses"] == misses
+    assert user_principal_cache.stats()["hits"] >= 1
+
+
+def test_cached_principal_invalidated_on_user_update(client, db_session):
+    from app.models import UserAccount
+
+    headers = login_headers(client)
+    assert client.get("/api/auth/me", headers=headers).json()["full_name"] == "Cached User"
+
+    user = db_session.query(UserAccount).filter(UserAccount.email_address == "cached@test.com").first()
+    user.full_name = "Renamed User"
+    db_session.commit()
+
+    assert client.get("/api/auth/me", headers=headers).json()["full_name"] == "Renamed User"
+
+
+def test_cached_principal_evicted_at_commit_not_flush(client, db_session):
+    from app.auth.user_cache import user_principal_cache
+    from app.models import UserAccount
+
+    headers = login_headers(client)
+    client.get("/api/auth/me", headers=headers)
+    user = db_session.query(UserAccount).filter(UserAccount.email_address == "cached@test.com").first()
+    stale = user_principal_cache.get(user.user_id)
+
+    user.full_name = "Renamed User"
+    db_session.flush()
+    # A concurrent request re-caches the row it still sees as committed
+    user_principal_cache.set(user.user_id, stale)
+    db_session.commit()
+
+    assert client.get("/api/auth/me", headers=headers).json()["full_name"] == "Renamed User"
+
+
+def test_rolled_back_user_write_keeps_cached_principal(client, db_session):
+    from app.auth.user_cache import user_principal_cache
+    from app.models import UserAccount
+
+    headers = login_headers(client)
+    client.get("/api/auth/me", headers=headers)
+    user = db_session.query(UserAccount).filter(UserAccount.email_address == "cached@test.com").first()
+    user_id = user.user_id
+
+    user.full_name = "Renamed User"
+    db_session.flush()
+    db_session.rollback()
+    db_session.commit()
+
+    assert user_principal_cache.get(user_id).full_name == "Cached User"
+
+
+def test_cached_principal_invalidated_on_user_delete(client, db_session):
+    from app.models import UserAccount
+
+    headers = login_headers(client)
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+    db_session.delete(
+        db_session.query(UserAccount).filter(UserAccount.email_address == "cached@test.com").first()
+    )
+    db_session.commit()
+
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+
+
+def test_user_cache_evicts_least_recently_used():
+    from app.cache import TTLCache
+
+    cache = TTLCache(max_entries=2, ttl_seconds=60)
+    cache.set(1, "a")
+    cache.set(2, "b")
+    cache.get(1)
+    cache.set(3, "c")
+
+    assert cache.get(2) is None
+    assert cache.get(1) == "a"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_user_cache_entries_expire():
+    from app.cache import TTLCache
+
+    now = [100.0]
+    cache = TTLCache(max_entries=10, ttl_seconds=5, clock=lambda: now[0])
+    cache.set("user", "principal")
+    assert cache.get("user") == "principal"
+
+    now[0] += 6
+    assert cache.get("user") is None
+
+
+# ==================== VERIFIED TOKEN CACHE TESTS ====================
+
+def test_decode_access_token_caches_verified_claims(monkeypatch):
+    from app.auth import token_manager
+
+    token = token_manager.create_access_token(data={"sub": "42"})
+    assert token_manager.decode_access_token(token)["sub"] == "42"
+
+    def fail_decode(*args, **kwargs):
+        raise AssertionError("signature should not be re-verified")
+
+    monkeypatch.setattr(token_manager.jwt, "decode", fail_decode)
+    assert token_manager.decode_access_token(token)["sub"] == "42"
+    assert token_manager.verified_token_cache.stats()["hits"] == 1
+
+
+def test_decode_access_token_does_not_cache_invalid_tokens():
+    from app.auth import token_manager
+
+    assert token_manager.decode_access_token("invalid-token") is None
+    assert len(token_manager.verified_token_cache) == 0
+
+
+def test_decode_access_token_expired_token_is_rejected():
+    from datetime import timedelta
+    from app.auth import token_manager
+
+    token = token_manager.create_access_token(data={"sub": "1"}, expires_delta=timedelta(seconds=-1))
+    assert token_manager.decode_access_token(token) is None
+    assert len(token_manager.verified_token_cache) == 0
+
+
+# ==================== PASSWORD HASHING SERVICE TESTS ====================
+
+def test_password_hashes_use_configured_cost_factor():
+    from app.auth.password_hasher import hash_password, verify_password
+
+    hashed = hash_password("SweetPass123!")
+    assert hashed.startswith("$2b$04$")
+    assert verify_password("SweetPass123!", hashed)
+
+
+def test_login_records_hashing_latency(client):
+    from app.auth.hashing_service import password_hashing_service
+
+    before = password_hashing_service.stats()["latency"]
+    login_headers(client, email="latency@test.com")
+    after = password_hashing_service.stats()["latency"]
+
+    assert after["hash"]["calls"] == before["hash"]["calls"] + 1
+    assert after["verify"]["calls"] == before["verify"]["calls"] + 1
+    assert after["verify"]["max_ms"] > 0
+
+
+def test_login_returns_503_when_hashing_queue_is_full(client, monkeypatch):
+    from app.auth.hashing_service import password_hashing_service
+
+    client.post("/api/auth/register", json={
+        "email_address": "busy@test.com",
+        "password": "BusyPass123",
+        "full_name": "Busy User"
+    })
+    monkeypatch.setattr(password_hashing_service, "max_pending", 0)
+
+    response = client.post("/api/auth/login", data={
+        "username": "busy@test.com",
+        "password": "BusyPass123"
+    })
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
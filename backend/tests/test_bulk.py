@@ -0,0 +1,281 @@
+import csv
+import io
+import json
+
+import pytest
+from sqlalchemy import text
+
+
+# ==================== HELPER FUNCTION ====================
+
+def ndjson(rows):
+    return "\n".join(json.dumps(row) for row in rows) + "\n"
+
+
+def all_sweets(client, headers):
+    return client.get("/api/sweets?limit=200", headers=headers).json()
+
+
+# ==================== IMPORT TESTS ====================
+
+def test_bulk_import_ndjson_inserts_rows(client, admin_headers):
+    body = ndjson([
+        {"sweet_name": "Ladoo", "sweet_category": "Traditional", "sweet_price": 10, "quantity_in_stock": 5},
+        {"sweet_name": "Barfi", "sweet_category": "Traditional", "sweet_price": 12.5,
+         "quantity_in_stock": 3, "sweet_description": "Milk fudge"},
+    ])
+
+    response = client.post("/api/sweets/bulk", content=body, headers={
+        **admin_headers, "Content-Type": "application/x-ndjson"
+    })
+
+    assert response.status_code == 200
+    assert response.json() == {"inserted": 2, "updated": 0, "failed": 0, "errors": []}
+    assert [s["sweet_name"] for s in all_sweets(client, admin_headers)] == ["Ladoo", "Barfi"]
+
+
+def test_bulk_import_reports_invalid_rows(client, admin_headers):
+    body = "\n".join([
+        json.dumps({"sweet_name": "Good", "sweet_category": "Test", "sweet_price": 1, "quantity_in_stock": 1}),
+        json.dumps({"sweet_name": "Bad Price", "sweet_category": "Test", "sweet_price": -1, "quantity_in_stock": 1}),
+        "{not json",
+        "",
+        json.dumps(["not", "an", "object"]),
+    ])
+
+    response = client.post("/api/sweets/bulk", content=body, headers={
+        **admin_headers, "Content-Type": "application/x-ndjson"
+    })
+
+    data = response.json()
+    assert data["inserted"] == 1
+    assert data["failed"] == 3
+    assert [error["row"] for error in data["errors"]] == [2, 3, 4]
+    assert "sweet_price" in data["errors"][0]["errors"][0]
+
+
+def test_bulk_import_upserts_by_sweet_id(client, admin_headers):
+    created = client.post("/api/sweets", json={
+        "sweet_name": "Old Name",
+        "sweet_category": "Test",
+        "sweet_price": 5,
+        "quantity_in_stock": 1
+    }, headers=admin_headers).json()
+
+    body = ndjson([
+        {"sweet_id": created["sweet_id"], "sweet_name": "New Name", "sweet_category": "Test",
+         "sweet_price": 6, "quantity_in_stock": 1},
+        {"sweet_name": "Brand New", "sweet_category": "Test", "sweet_price": 2, "quantity_in_stock": 2},
+    ])
+    response = client.post("/api/sweets/bulk", content=body, headers={
+        **admin_headers, "Content-Type": "application/x-ndjson"
+    })
+
+    assert response.json()["updated"] == 1
+    assert response.json()["inserted"] == 1
+    sweets = {s["sweet_id"]: s for s in all_sweets(client, admin_headers)}
+    assert sweets[created["sweet_id"]]["sweet_name"] == "New Name"
+    assert sweets[created["sweet_id"]]["sweet_price"] == 6
+    assert len(sweets) == 2
+
+
+def test_bulk_import_rejects_stock_changes_to_existing_sweets(client, db_session, admin_headers):
+    created = client.post("/api/sweets", json={
+        "sweet_name": "Ladoo", "sweet_category": "Test", "sweet_price": 5, "quantity_in_stock": 1
+    }, headers=admin_headers).json()
+
+    body = ndjson([{"sweet_id": created["sweet_id"], "sweet_name": "Renamed", "sweet_category": "Test",
+                    "sweet_price": 5, "quantity_in_stock": 9}])
+    response = client.post("/api/sweets/bulk", content=body, headers={
+        **admin_headers, "Content-Type": "application/x-ndjson"
+    })
+
+    assert response.json()["errors"] == [
+        {"row": 1, "errors": ["quantity_in_stock: use purchase or restock to change stock"]}
+    ]
+    assert all_sweets(client, admin_headers)[0]["sweet_name"] == "Ladoo"
+    assert all_sweets(client, admin_headers)[0]["quantity_in_stock"] == 1
+
+
+def test_bulk_import_csv_in_chunks(client, monkeypatch, admin_headers):
+    monkeypatch.setattr("app.catalog.bulk_io.BULK_IMPORT_CHUNK_SIZE", 2)
+    body = (
+        "sweet_name,sweet_category,sweet_price,quantity_in_stock,sweet_description\n"
+        "Jalebi,Traditional,140,10,\"Crispy, syrupy\"\n"
+        "Rasgulla,Traditional,220,5,\"Spongy\nand sweet\"\n"
+        "Peda,Traditional,200,7,\n"
+        "Broken,Traditional,abc,1,\n"
+    )
+
+    response = client.post("/api/sweets/bulk", content=body, headers={
+        **admin_headers, "Content-Type": "text/csv"
+    })
+
+    data = response.json()
+    assert data["inserted"] == 3
+    assert data["failed"] == 1
+    assert data["errors"][0]["row"] == 4
+    sweets = all_sweets(client, admin_headers)
+    assert sweets[0]["sweet_description"] == "Crispy, syrupy"
+    assert sweets[1]["sweet_description"] == "Spongy\nand sweet"
+    assert sweets[2]["sweet_description"] is None
+
+
+def test_bulk_import_reports_undecodable_lines(client, admin_headers):
+    body = (
+        b'{"sweet_name":"\xff\xfe"}\n'
+        + ndjson([{"sweet_name": "Ladoo", "sweet_category": "Test", "sweet_price": 1, "quantity_in_stock": 1}]).encode()
+    )
+
+    response = client.post("/api/sweets/bulk", content=body, headers={
+        **admin_headers, "Content-Type": "application/x-ndjson"
+    })
+
+    assert response.status_code == 200
+    assert response.json()["inserted"] == 1
+    assert response.json()["errors"] == [{"row": 1, "errors": ["Line is not valid UTF-8"]}]
+
+
+def test_bulk_import_csv_reports_undecodable_lines(client, admin_headers):
+    body = (
+        b"sweet_name,sweet_category,sweet_price,quantity_in_stock\n"
+        b"Bad\xff,Test,1,1\n"
+        b"Peda,Test,2,2\n"
+    )
+
+    response = client.post("/api/sweets/bulk", content=body, headers={
+        **admin_headers, "Content-Type": "text/csv"
+    })
+
+    assert response.json()["inserted"] == 1
+    assert response.json()["errors"] == [{"row": 1, "errors": ["Line is not valid UTF-8"]}]
+
+
+def test_bulk_import_repeated_sweet_id_keeps_the_last_row(client, admin_headers):
+    body = ndjson([
+        {"sweet_id": 50, "sweet_name": "First", "sweet_category": "Test", "sweet_price": 1, "quantity_in_stock": 1},
+        {"sweet_name": "Other", "sweet_category": "Test", "sweet_price": 2, "quantity_in_stock": 2},
+        {"sweet_id": 50, "sweet_name": "Second", "sweet_category": "Test", "sweet_price": 3, "quantity_in_stock": 1},
+    ])
+
+    response = client.post("/api/sweets/bulk", content=body, headers={
+        **admin_headers, "Content-Type": "application/x-ndjson"
+    })
+
+    assert response.json() == {"inserted": 2, "updated": 1, "failed": 0, "errors": []}
+    sweets = {s["sweet_id"]: s["sweet_name"] for s in all_sweets(client, admin_headers)}
+    assert sweets[50] == "Second"
+    assert sorted(sweets.values()) == ["Other", "Second"]
+
+
+def test_bulk_import_failed_batch_reports_only_the_offending_row(client, db_session, admin_headers):
+    # A constraint the validator does not know about, so the whole batch fails in the database
+    db_session.execute(text(
+        "CREATE TRIGGER reject_poison BEFORE INSERT ON sweet_products "
+        "WHEN NEW.sweet_name = 'Poison' BEGIN SELECT RAISE(ABORT, 'poisoned row'); END"
+    ))
+    db_session.commit()
+    body = ndjson([
+        {"sweet_name": name, "sweet_category": "Test", "sweet_price": 1, "quantity_in_stock": 1}
+        for name in ("Ladoo", "Poison", "Barfi")
+    ])
+
+    response = client.post("/api/sweets/bulk", content=body, headers={
+        **admin_headers, "Content-Type": "application/x-ndjson"
+    })
+
+    data = response.json()
+    assert (data["inserted"], data["failed"]) == (2, 1)
+    assert data["errors"] == [{"row": 2, "errors": ["Write failed: poisoned row"]}]
+    assert [s["sweet_name"] for s in all_sweets(client, admin_headers)] == ["Ladoo", "Barfi"]
+
+
+@pytest.mark.parametrize("media_type, body", [
+    ("application/x-ndjson", b'{"sweet_name": "' + b"x" * 64),
+    ("text/csv", b'sweet_name,sweet_category\n"' + b"x\n" * 32),
+])
+def test_bulk_import_rejects_overlong_lines(client, monkeypatch, admin_headers, media_type, body):
+    monkeypatch.setattr("app.catalog.bulk_io.BULK_IMPORT_MAX_LINE_BYTES", 32)
+
+    response = client.post("/api/sweets/bulk", content=body, headers={**admin_headers, "Content-Type": media_type})
+
+    assert response.status_code == 413
+    assert all_sweets(client, admin_headers) == []
+
+
+def test_bulk_import_rejects_unknown_media_type(client, admin_headers):
+    response = client.post("/api/sweets/bulk", content="<xml/>", headers={
+        **admin_headers, "Content-Type": "application/xml"
+    })
+    assert response.status_code == 415
+
+
+def test_bulk_import_non_admin_forbidden(client, auth_headers):
+    headers = auth_headers("user@bulk.com")
+    response = client.post("/api/sweets/bulk", content="", headers={
+        **headers, "Content-Type": "application/x-ndjson"
+    })
+    assert response.status_code == 403
+
+
+# ==================== EXPORT TESTS ====================
+
+def seed_catalog(client, headers, count):
+    body = ndjson([
+        {"sweet_name": f"Sweet {i}", "sweet_category": "Export", "sweet_price": i + 1,
+         "quantity_in_stock": i, "sweet_description": f"Row, {i}"}
+        for i in range(count)
+    ])
+    client.post("/api/sweets/bulk", content=body, headers={
+        **headers, "Content-Type": "application/x-ndjson"
+    })
+
+
+def test_export_ndjson_streams_whole_catalog(client, monkeypatch, admin_headers):
+    monkeypatch.setattr("app.catalog.bulk_io.BULK_EXPORT_BATCH_SIZE", 3)
+    seed_catalog(client, admin_headers, 7)
+
+    response = client.get("/api/sweets/export", headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["sweet_name"] for row in rows] == [f"Sweet {i}" for i in range(7)]
+    assert set(rows[0]) == {
+        "sweet_id", "sweet_name", "sweet_category", "sweet_price", "quantity_in_stock",
+        "sweet_description", "product_created_at", "product_updated_at"
+    }
+
+
+def test_export_json_streams_one_array_matching_the_listing(client, monkeypatch, admin_headers):
+    monkeypatch.setattr("app.catalog.bulk_io.BULK_EXPORT_BATCH_SIZE", 3)
+    seed_catalog(client, admin_headers, 7)
+
+    response = client.get("/api/sweets/export?format=json", headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == all_sweets(client, admin_headers)
+
+
+def test_export_json_of_empty_catalog_is_empty_array(client, admin_headers):
+    assert client.get("/api/sweets/export?format=json", headers=admin_headers).json() == []
+
+
+def test_export_csv_round_trips_through_import(client, admin_headers):
+    seed_catalog(client, admin_headers, 3)
+
+    exported = client.get("/api/sweets/export?format=csv", headers=admin_headers)
+    rows = list(csv.DictReader(io.StringIO(exported.text)))
+    assert [row["sweet_description"] for row in rows] == ["Row, 0", "Row, 1", "Row, 2"]
+
+    response = client.post("/api/sweets/bulk", content=exported.text, headers={
+        **admin_headers, "Content-Type": "text/csv"
+    })
+    assert response.json()["updated"] == 3
+    assert response.json()["failed"] == 0
+
+
+def test_export_requires_admin(client, auth_headers):
+    headers = auth_headers("user@bulk.com")
+    assert client.get("/api/sweets/export", headers=headers).status_code == 403
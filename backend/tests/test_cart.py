@@ -0,0 +1,152 @@
+# ==================== HELPER FUNCTION ====================
+
+def create_sweet(client, headers, name="Test Sweet", price=5.99, quantity=100):
+    """Helper to create a sweet and return its ID."""
+    response = client.post("/api/sweets", json={
+        "sweet_name": name,
+        "sweet_category": "Test",
+        "sweet_price": price,
+        "quantity_in_stock": quantity,
+        "sweet_description": "Test sweet"
+    }, headers=headers)
+    return response.json()["sweet_id"]
+
+
+def stock_levels(client, headers):
+    response = client.get("/api/sweets", headers=headers)
+    return {s["sweet_id"]: s["quantity_in_stock"] for s in response.json()}
+
+
+# ==================== CHECKOUT TESTS ====================
+
+def test_checkout_cart_success(client, admin_headers):
+    ladoo = create_sweet(client, admin_headers, name="Ladoo", price=10.00, quantity=20)
+    barfi = create_sweet(client, admin_headers, name="Barfi", price=2.50, quantity=5)
+
+    response = client.post("/api/cart/checkout", json={
+        "lines": [
+            {"sweet_id": ladoo, "quantity_to_purchase": 3},
+            {"sweet_id": barfi, "quantity_to_purchase": 4}
+        ]
+    }, headers=admin_headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["message"] == "Checkout successful"
+    assert [line["sweet_id"] for line in data["lines"]] == [ladoo, barfi]
+    assert data["lines"][0]["previous_quantity"] == 20
+    assert data["lines"][0]["new_quantity"] == 17
+    assert data["lines"][0]["total_price"] == 30.0
+    assert data["lines"][1]["new_quantity"] == 1
+    assert data["lines"][1]["total_price"] == 10.0
+    assert data["total_price"] == 40.0
+    assert data["discounted_price"] == 0
+    assert stock_levels(client, admin_headers) == {ladoo: 17, barfi: 1}
+
+
+def test_checkout_applies_coupon_once_per_order(client, admin_headers):
+    ladoo = create_sweet(client, admin_headers, name="Ladoo", price=10.00)
+    barfi = create_sweet(client, admin_headers, name="Barfi", price=5.99)
+
+    response = client.post("/api/cart/checkout", json={
+        "lines": [
+            {"sweet_id": ladoo, "quantity_to_purchase": 1},
+            {"sweet_id": barfi, "quantity_to_purchase": 10}
+        ],
+        "coupon": "COUPON"
+    }, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.json()["total_price"] == 69.9
+    assert response.json()["discounted_price"] == 62.91
+
+
+def test_checkout_merges_duplicate_lines(client, admin_headers):
+    ladoo = create_sweet(client, admin_headers, quantity=10)
+
+    response = client.post("/api/cart/checkout", json={
+        "lines": [
+            {"sweet_id": ladoo, "quantity_to_purchase": 2},
+            {"sweet_id": ladoo, "quantity_to_purchase": 3}
+        ]
+    }, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert len(response.json()["lines"]) == 1
+    assert response.json()["lines"][0]["quantity_purchased"] == 5
+    assert stock_levels(client, admin_headers) == {ladoo: 5}
+
+
+def test_checkout_rejects_whole_cart_on_insufficient_stock(client, admin_headers):
+    plenty = create_sweet(client, admin_headers, name="Plenty", quantity=50)
+    scarce = create_sweet(client, admin_headers, name="Scarce", quantity=2)
+
+    response = client.post("/api/cart/checkout", json={
+        "lines": [
+            {"sweet_id": plenty, "quantity_to_purchase": 10},
+            {"sweet_id": scarce, "quantity_to_purchase": 3}
+        ]
+    }, headers=admin_headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == (
+        f"Insufficient stock for sweet {scarce}: requested 3, only 2 items available."
+    )
+    assert stock_levels(client, admin_headers) == {plenty: 50, scarce: 2}
+
+
+def test_checkout_rolls_back_when_stock_changes_mid_cart(client, monkeypatch, admin_headers):
+    from app.inventory import checkout
+    from app.models import SweetProduct
+
+    first = create_sweet(client, admin_headers, name="First", quantity=10)
+    second = create_sweet(client, admin_headers, name="Second", quantity=10)
+
+    original_reserve = checkout.reserve_stock
+
+    def reserve_after_competitor(db, sweet_id, quantity):
+        if sweet_id == second:
+            # A competing buyer empties the second sweet after the snapshot was read
+            db.query(SweetProduct).filter(SweetProduct.sweet_id == second).update(
+                {"quantity_in_stock": 0}
+            )
+        return original_reserve(db, sweet_id, quantity)
+
+    monkeypatch.setattr(checkout, "reserve_stock", reserve_after_competitor)
+
+    response = client.post("/api/cart/checkout", json={
+        "lines": [
+            {"sweet_id": first, "quantity_to_purchase": 4},
+            {"sweet_id": second, "quantity_to_purchase": 4}
+        ]
+    }, headers=admin_headers)
+
+    assert response.status_code == 400
+    assert stock_levels(client, admin_headers) == {first: 10, second: 10}
+
+
+def test_checkout_unknown_sweet(client, admin_headers):
+    ladoo = create_sweet(client, admin_headers, quantity=10)
+
+    response = client.post("/api/cart/checkout", json={
+        "lines": [
+            {"sweet_id": ladoo, "quantity_to_purchase": 1},
+            {"sweet_id": 9999, "quantity_to_purchase": 1}
+        ]
+    }, headers=admin_headers)
+
+    assert response.status_code == 404
+    assert "9999" in response.json()["detail"]
+    assert stock_levels(client, admin_headers) == {ladoo: 10}
+
+
+def test_checkout_empty_cart(client, admin_headers):
+    response = client.post("/api/cart/checkout", json={"lines": []}, headers=admin_headers)
+    assert response.status_code == 422
+
+
+def test_checkout_requires_authentication(client):
+    response = client.post("/api/cart/checkout", json={
+        "lines": [{"sweet_id": 1, "quantity_to_purchase": 1}]
+    })
+    assert response.status_code == 401
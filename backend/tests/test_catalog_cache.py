@@ -0,0 +1,238 @@
+from sqlalchemy import event, text
+
+from app.catalog.response_cache import (
+    bump_catalog_version,
+    catalog_response_cache,
+    catalog_version,
+    read_catalog_version
+)
+
+
+# ==================== HELPER FUNCTIONS ====================
+
+def create_sweet(client, headers, name="Ladoo", price=2.5, quantity=10):
+    response = client.post("/api/sweets", json={
+        "sweet_name": name,
+        "sweet_category": "Indian",
+        "sweet_price": price,
+        "quantity_in_stock": quantity
+    }, headers=headers)
+    return response.json()
+
+
+class StatementCounter:
+    """Counts SQL statements sent to an engine while attached."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _count(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._count)
+
+
+# ==================== ETAG TESTS ====================
+
+def test_listing_carries_strong_etag(client, admin_headers):
+    create_sweet(client, admin_headers)
+
+    response = client.get("/api/sweets", headers=admin_headers)
+
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert etag.startswith('"') and not etag.startswith("W/")
+    assert response.headers["cache-control"] == "private, no-cache"
+    assert response.json()[0]["sweet_name"] == "Ladoo"
+
+
+def test_matching_if_none_match_returns_304_without_sql(client, db_session, admin_headers):
+    create_sweet(client, admin_headers)
+    etag = client.get("/api/sweets/search", params={"q": "ladoo"}, headers=admin_headers).headers["etag"]
+
+    with StatementCounter(db_session.get_bind()) as counter:
+        response = client.get(
+            "/api/sweets/search",
+            params={"q": "ladoo"},
+            headers={**admin_headers, "If-None-Match": etag}
+        )
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert counter.count == 0
+
+
+def test_etag_depends_on_query_parameters_not_their_order(client, admin_headers):
+    create_sweet(client, admin_headers)
+
+    first = client.get("/api/sweets/search?category=indian&sort=price", headers=admin_headers)
+    reordered = client.get("/api/sweets/search?sort=price&category=indian", headers=admin_headers)
+    other = client.get("/api/sweets/search?sort=name&category=indian", headers=admin_headers)
+
+    assert first.headers["etag"] == reordered.headers["etag"]
+    assert first.headers["etag"] != other.headers["etag"]
+
+
+def test_weak_and_listed_validators_match(client, admin_headers):
+    etag = client.get("/api/sweets", headers=admin_headers).headers["etag"]
+
+    response = client.get("/api/sweets", headers={**admin_headers, "If-None-Match": f'"stale", W/{etag}'})
+
+    assert response.status_code == 304
+
+
+# ==================== INVALIDATION TESTS ====================
+
+def test_writes_change_the_etag(client, admin_headers):
+    sweet = create_sweet(client, admin_headers)
+    etags = [client.get("/api/sweets", headers=admin_headers).headers["etag"]]
+
+    client.post(f"/api/sweets/{sweet['sweet_id']}/purchase", json={"quantity_to_purchase": 1}, headers=admin_headers)
+    etags.append(client.get("/api/sweets", headers=admin_headers).headers["etag"])
+
+    client.post(f"/api/sweets/{sweet['sweet_id']}/restock", json={"quantity_to_add": 5}, headers=admin_headers)
+    etags.append(client.get("/api/sweets", headers=admin_headers).headers["etag"])
+
+    client.put(f"/api/sweets/{sweet['sweet_id']}", json={"sweet_price": 3.0}, headers=admin_headers)
+    etags.append(client.get("/api/sweets", headers=admin_headers).headers["etag"])
+
+    client.delete(f"/api/sweets/{sweet['sweet_id']}", headers=admin_headers)
+    etags.append(client.get("/api/sweets", headers=admin_headers).headers["etag"])
+
+    assert len(set(etags)) == len(etags)
+
+
+def test_stale_etag_gets_fresh_body(client, admin_headers):
+    sweet = create_sweet(client, admin_headers, quantity=10)
+    etag = client.get("/api/sweets", headers=admin_headers).headers["etag"]
+
+    client.post(f"/api/sweets/{sweet['sweet_id']}/purchase", json={"quantity_to_purchase": 4}, headers=admin_headers)
+    response = client.get("/api/sweets", headers={**admin_headers, "If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.json()[0]["quantity_in_stock"] == 6
+
+
+def test_failed_write_does_not_bump_version(client, db_session, admin_headers):
+    sweet = create_sweet(client, admin_headers, quantity=1)
+    before = read_catalog_version(db_session)
+
+    response = client.post(
+        f"/api/sweets/{sweet['sweet_id']}/purchase",
+        json={"quantity_to_purchase": 5},
+        headers=admin_headers
+    )
+
+    assert response.status_code == 400
+    db_session.rollback()
+    assert read_catalog_version(db_session) == before
+
+
+def test_write_from_another_worker_invalidates_etag_and_body(client, db_session, monkeypatch, admin_headers):
+    monkeypatch.setattr(catalog_version, "check_seconds", 0)
+    create_sweet(client, admin_headers, quantity=10)
+    etag = client.get("/api/sweets", headers=admin_headers).headers["etag"]
+
+    # Another process commits a write: it bumps the shared row, not this process's copy
+    with db_session.get_bind().begin() as connection:
+        connection.execute(text("UPDATE sweet_products SET quantity_in_stock = 3"))
+        bump_catalog_version(connection)
+    response = client.get("/api/sweets", headers={**admin_headers, "If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.json()[0]["quantity_in_stock"] == 3
+    assert response.headers["etag"] != etag
+
+
+def test_stock_changes_move_the_version_without_updating_catalog_state(client, db_session, admin_headers):
+    sweet = create_sweet(client, admin_headers, quantity=10)
+    before = read_catalog_version(db_session)
+    db_session.rollback()
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db_session.get_bind(), "before_cursor_execute", record)
+    try:
+        for path, body in (("purchase", {"quantity_to_purchase": 1}), ("restock", {"quantity_to_add": 1})):
+            client.post(f"/api/sweets/{sweet['sweet_id']}/{path}", json=body, headers=admin_headers)
+    finally:
+        event.remove(db_session.get_bind(), "before_cursor_execute", record)
+
+    assert not [statement for statement in statements if statement.startswith("UPDATE catalog_state")]
+    after = read_catalog_version(db_session)
+    assert after.edits == before.edits
+    assert after.last_movement_id > before.last_movement_id
+
+
+def test_catalog_edits_bump_the_edit_counter(client, db_session, admin_headers):
+    sweet = create_sweet(client, admin_headers)
+    before = read_catalog_version(db_session)
+    db_session.rollback()
+
+    client.put(f"/api/sweets/{sweet['sweet_id']}", json={"sweet_price": 3.0}, headers=admin_headers)
+
+    assert read_catalog_version(db_session).edits == before.edits + 1
+
+
+def test_stock_change_from_another_worker_invalidates_etag(client, db_session, monkeypatch, admin_headers):
+    monkeypatch.setattr(catalog_version, "check_seconds", 0)
+    sweet = create_sweet(client, admin_headers, quantity=10)
+    etag = client.get("/api/sweets", headers=admin_headers).headers["etag"]
+
+    # Another process sells two: a stock UPDATE plus its ledger movement, no catalog_state write
+    with db_session.get_bind().begin() as connection:
+        connection.execute(text("UPDATE sweet_products SET quantity_in_stock = 8"))
+        connection.execute(text(
+            "INSERT INTO inventory_movements (sweet_id, movement_type, quantity_delta, unit_price, total_price) "
+            f"VALUES ({sweet['sweet_id']}, 'purchase', -2, 2.5, 5.0)"
+        ))
+    response = client.get("/api/sweets", headers={**admin_headers, "If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.json()[0]["quantity_in_stock"] == 8
+
+
+def test_version_read_is_reused_within_check_interval(client, db_session, admin_headers):
+    create_sweet(client, admin_headers)
+    client.get("/api/sweets", headers=admin_headers)
+
+    with StatementCounter(db_session.get_bind()) as counter:
+        response = client.get("/api/sweets", headers={**admin_headers, "If-None-Match": "\"stale\""})
+
+    assert response.status_code == 200
+    assert counter.count == 0
+
+
+# ==================== BODY CACHE TESTS ====================
+
+def test_repeat_reads_are_served_from_body_cache(client, db_session, admin_headers):
+    for index in range(3):
+        create_sweet(client, admin_headers, name=f"Sweet {index}")
+
+    first = client.get("/api/sweets", params={"limit": 2}, headers=admin_headers)
+    with StatementCounter(db_session.get_bind()) as counter:
+        second = client.get("/api/sweets", params={"limit": 2}, headers=admin_headers)
+
+    assert counter.count == 0
+    assert second.content == first.content
+    assert second.headers["x-next-cursor"] == first.headers["x-next-cursor"]
+    assert catalog_response_cache.stats()["hits"] >= 1
+
+
+def test_projection_is_cached_separately(client, admin_headers):
+    create_sweet(client, admin_headers)
+
+    full = client.get("/api/sweets", headers=admin_headers)
+    projected = client.get("/api/sweets", params={"fields": "sweet_name"}, headers=admin_headers)
+
+    assert set(full.json()[0]) > {"sweet_id", "sweet_name"}
+    assert projected.json() == [{"sweet_id": full.json()[0]["sweet_id"], "sweet_name": "Ladoo"}]
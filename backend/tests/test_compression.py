@@ -0,0 +1,166 @@
+import gzip
+import zlib
+
+import anyio
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.compression import CompressionMiddleware, GzipCompressor, choose_encoding
+
+
+# ==================== HELPER FUNCTIONS ====================
+
+def seed_catalog(client, headers, count):
+    for i in range(count):
+        client.post("/api/sweets", json={
+            "sweet_name": f"Sweet {i}",
+            "sweet_category": "Compression",
+            "sweet_price": i + 1,
+            "quantity_in_stock": i,
+            "sweet_description": "A sweet long enough to make the page worth compressing"
+        }, headers=headers)
+
+
+def raw_get(client, url, headers):
+    """GET without letting httpx decode the body, so the wire bytes can be checked."""
+    with client.stream("GET", url, headers=headers) as response:
+        return response, b"".join(response.iter_raw())
+
+
+def make_app(routes):
+    return TestClient(CompressionMiddleware(Starlette(routes=routes), minimum_size=100))
+
+
+# ==================== NEGOTIATION TESTS ====================
+
+def test_choose_encoding_uses_q_values_then_server_preference():
+    supported = ["zstd", "br", "gzip"]
+    assert choose_encoding("gzip, br", supported) == "br"
+    assert choose_encoding("gzip;q=1.0, br;q=0.5", supported) == "gzip"
+    assert choose_encoding("br;q=0, *;q=0.1", supported) == "zstd"
+    assert choose_encoding("identity", supported) is None
+    assert choose_encoding("gzip;q=0", supported) is None
+    assert choose_encoding("", supported) is None
+
+
+def test_unavailable_encodings_are_never_chosen():
+    assert choose_encoding("br, zstd, gzip;q=0.1", ["gzip"]) == "gzip"
+
+
+# ==================== CATALOG TESTS ====================
+
+def test_catalog_page_is_gzipped_with_weak_etag(client, admin_headers):
+    seed_catalog(client, admin_headers, 20)
+
+    response, body = raw_get(client, "/api/sweets", {**admin_headers, "Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"].startswith('W/"')
+    assert int(response.headers["content-length"]) == len(body)
+    plain = client.get("/api/sweets", headers={**admin_headers, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert gzip.decompress(body) == plain.content
+
+
+def test_weak_etag_still_revalidates(client, admin_headers):
+    seed_catalog(client, admin_headers, 20)
+    etag = client.get("/api/sweets", headers={**admin_headers, "Accept-Encoding": "gzip"}).headers["etag"]
+
+    response = client.get("/api/sweets", headers={**admin_headers, "Accept-Encoding": "gzip", "If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert "content-encoding" not in response.headers
+
+
+def test_small_responses_are_not_compressed(client):
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_export_streams_compressed(client, admin_headers):
+    seed_catalog(client, admin_headers, 20)
+
+    response, body = raw_get(client, "/api/sweets/export?format=json", {**admin_headers, "Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert gzip.decompress(body) == client.get(
+        "/api/sweets/export?format=json", headers={**admin_headers, "Accept-Encoding": "identity"}
+    ).content
+
+
+# ==================== MIDDLEWARE TESTS ====================
+
+def test_each_streamed_chunk_is_flushed():
+    chunks = [b"[" + b"1," * 200, b"2," * 200, b"3]"]
+
+    async def stream(request):
+        async def body():
+            for chunk in chunks:
+                yield chunk
+        return StreamingResponse(body(), media_type="application/json")
+
+    middleware = CompressionMiddleware(Starlette(routes=[Route("/", stream)]), minimum_size=100)
+    scope = {
+        "type": "http", "method": "GET", "path": "/", "raw_path": b"/", "root_path": "",
+        "scheme": "http", "query_string": b"", "server": ("test", 80), "client": ("test", 1),
+        "http_version": "1.1", "headers": [(b"accept-encoding", b"gzip")],
+    }
+    messages = []
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        # No disconnect: block like a connected client until the response is done
+        await anyio.sleep_forever()
+
+    async def send(message):
+        messages.append(message)
+
+    anyio.run(middleware, scope, receive, send)
+
+    assert (b"content-encoding", b"gzip") in messages[0]["headers"]
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    received = [decoder.decompress(message.get("body", b"")) for message in messages[1:]]
+    # Every chunk decodes as it arrives: nothing waits in the compressor's window
+    assert received[:2] == chunks[:2]
+    assert b"".join(received) == b"".join(chunks)
+    assert decoder.eof
+
+
+def test_event_streams_and_encoded_bodies_pass_through():
+    async def events(request):
+        return Response(b"data: x\n\n" * 50, media_type="text/event-stream")
+
+    async def encoded(request):
+        return Response(gzip.compress(b"x" * 500), headers={"Content-Encoding": "gzip"}, media_type="text/plain")
+
+    client = make_app([Route("/events", events), Route("/encoded", encoded)])
+    response = client.get("/events", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.content == b"data: x\n\n" * 50
+
+    response, body = raw_get(client, "/encoded", {"Accept-Encoding": "gzip"})
+    assert gzip.decompress(body) == b"x" * 500
+
+
+def test_gzip_compressor_output_is_one_gzip_member():
+    compressor = GzipCompressor(level=1)
+    data = compressor.compress(b"a" * 1000, flush=True) + compressor.compress(b"b", flush=False) + compressor.finish()
+    assert gzip.decompress(data) == b"a" * 1000 + b"b"
+
+
+def test_identity_requests_are_untouched():
+    async def text(request):
+        return PlainTextResponse("x" * 500)
+
+    response = make_app([Route("/", text)]).get("/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
@@ -0,0 +1,146 @@
+"""
+Connection pool configuration, checkout statistics and SQLite pragmas.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.db_tuning import (
+    DB_POOL_SIZE,
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    create_tuned_async_engine,
+    create_tuned_engine,
+    engine_options,
+    pool_status
+)
+
+
+@pytest.fixture
+def tuned_engine(tmp_path):
+    engine = create_tuned_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    yield engine
+    engine.dispose()
+
+
+def read_pragma(connection, name):
+    return connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+# ==================== ENGINE OPTIONS TESTS ====================
+
+def test_file_databases_get_an_instrumented_queue_pool():
+    options = engine_options("sqlite:///./sweetshop.db")
+
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["pool_size"] == DB_POOL_SIZE
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == {"check_same_thread": False}
+
+
+def test_memory_databases_keep_the_default_pool():
+    assert engine_options("sqlite:///:memory:") == {"connect_args": {"check_same_thread": False}}
+
+
+def test_other_backends_skip_sqlite_connect_args():
+    options = engine_options("postgresql+asyncpg://shop@db/sweets", is_async=True)
+
+    assert "connect_args" not in options
+    assert options["poolclass"] is InstrumentedAsyncQueuePool
+
+
+# ==================== SQLITE PRAGMA TESTS ====================
+
+def test_sqlite_connections_use_wal_and_tuned_pragmas(tuned_engine):
+    with tuned_engine.connect() as connection:
+        assert read_pragma(connection, "journal_mode") == "wal"
+        assert read_pragma(connection, "synchronous") == 1  # NORMAL
+        assert read_pragma(connection, "busy_timeout") == 5000
+        assert read_pragma(connection, "temp_store") == 2  # MEMORY
+        assert read_pragma(connection, "cache_size") == -65536
+
+
+def test_async_sqlite_connections_get_the_same_pragmas(tmp_path):
+    async def check():
+        engine = create_tuned_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'tuned.db'}")
+        try:
+            async with engine.connect() as connection:
+                mode = (await connection.execute(text("PRAGMA journal_mode"))).scalar()
+                timeout = (await connection.execute(text("PRAGMA busy_timeout"))).scalar()
+        finally:
+            await engine.dispose()
+        return mode, timeout
+
+    assert asyncio.run(check()) == ("wal", 5000)
+
+
+def test_concurrent_writers_wait_instead_of_failing(tuned_engine):
+    with tuned_engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE hits (worker INTEGER)")
+
+    def write(worker):
+        for _ in range(25):
+            with tuned_engine.begin() as connection:
+                connection.exec_driver_sql("INSERT INTO hits VALUES (?)", (worker,))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(write, range(8)))
+
+    with tuned_engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT COUNT(*) FROM hits").scalar() == 200
+
+
+# ==================== POOL STATISTICS TESTS ====================
+
+def test_checkouts_are_counted_and_survive_dispose(tuned_engine):
+    for _ in range(3):
+        with tuned_engine.connect():
+            pass
+    tuned_engine.dispose()
+    with tuned_engine.connect():
+        pass
+
+    status = pool_status(tuned_engine)
+
+    assert status["pool_class"] == "InstrumentedQueuePool"
+    assert status["checkout_wait"]["calls"] == 4
+    assert status["checked_out"] == 0
+    assert status["timeouts"] == 0
+
+
+def test_pool_timeouts_are_counted(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'small.db'}",
+        poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    try:
+        with engine.connect():
+            with pytest.raises(PoolTimeoutError):
+                engine.connect()
+            assert pool_status(engine)["checked_out"] == 1
+        assert pool_status(engine)["timeouts"] == 1
+    finally:
+        engine.dispose()
+
+
+# ==================== ADMIN ENDPOINT TESTS ====================
+
+def test_pool_statistics_endpoint_requires_admin(client, auth_headers):
+    headers = auth_headers("user@sweetshop.com")
+
+    response = client.get("/api/admin/db/pool", headers=headers)
+
+    assert response.status_code == 403
+
+
+def test_pool_statistics_endpoint_reports_primary_engine(client, admin_headers):
+
+    response = client.get("/api/admin/db/pool", headers=admin_headers)
+
+    assert response.status_code == 200
+    primary = response.json()["primary"]
+    assert primary["pool_class"] == "InstrumentedQueuePool"
+    assert "checkout_wait" in primary
@@ -0,0 +1,256 @@
+"""
+Hot-SKU mode: sharded in-memory stock with journaled write-behind.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+
+from app.inventory.hot_stock import HotStockManager, StockJournal
+from app.inventory.stock_operations import reserve_stock
+from app.models import HotStockSku, SweetProduct
+
+
+# ==================== HELPER FUNCTIONS ====================
+
+def stored_stock(db, sweet_id):
+    db.expire_all()
+    return db.get(SweetProduct, sweet_id).quantity_in_stock
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = HotStockManager(StockJournal(str(tmp_path / "hot.journal")), shard_count=4)
+    yield manager
+    manager.journal.close()
+
+
+def buy(client, headers, sweet_id, quantity):
+    return client.post(f"/api/sweets/{sweet_id}/purchase", json={"quantity_to_purchase": quantity}, headers=headers)
+
+
+# ==================== API TESTS ====================
+
+def test_hot_purchases_are_written_back_on_flush(client, db_session, admin_headers, add_sweet):
+    sweet_id = add_sweet(name="Festival Ladoo", stock=20)
+
+    enabled = client.put(f"/api/admin/hot-skus/{sweet_id}", headers=admin_headers)
+    assert enabled.json()["available"] == 20
+
+    response = buy(client, admin_headers, sweet_id, 3)
+    assert response.status_code == 200
+    assert response.json()["new_quantity"] == 17
+    assert response.json()["total_price"] == 30.0
+    assert stored_stock(db_session, sweet_id) == 20
+
+    status = client.get("/api/admin/hot-skus", headers=admin_headers).json()
+    assert status == [{"sweet_id": sweet_id, "sweet_name": "Festival Ladoo", "available": 17,
+                       "pending_writeback": 3, "shards": 8}]
+
+    assert client.post("/api/admin/hot-skus/flush", headers=admin_headers).json() == {"flushed_units": 3}
+    assert stored_stock(db_session, sweet_id) == 17
+
+
+def test_hot_purchase_cannot_oversell(client, admin_headers, add_sweet):
+    sweet_id = add_sweet(stock=5)
+    client.put(f"/api/admin/hot-skus/{sweet_id}", headers=admin_headers)
+
+    assert buy(client, admin_headers, sweet_id, 5).status_code == 200
+    response = buy(client, admin_headers, sweet_id, 1)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Insufficient stock. Only 0 items available."
+
+
+def test_hot_restock_updates_row_and_counter(client, db_session, admin_headers, add_sweet):
+    sweet_id = add_sweet(stock=2)
+    client.put(f"/api/admin/hot-skus/{sweet_id}", headers=admin_headers)
+
+    response = client.post(f"/api/sweets/{sweet_id}/restock", json={"quantity_to_add": 10}, headers=admin_headers)
+
+    assert response.json()["new_quantity"] == 12
+    assert stored_stock(db_session, sweet_id) == 12
+    assert buy(client, admin_headers, sweet_id, 12).status_code == 200
+
+
+def test_disable_writes_back_and_restores_row_updates(client, db_session, admin_headers, add_sweet):
+    sweet_id = add_sweet(stock=10)
+    client.put(f"/api/admin/hot-skus/{sweet_id}", headers=admin_headers)
+    buy(client, admin_headers, sweet_id, 4)
+
+    assert client.delete(f"/api/admin/hot-skus/{sweet_id}", headers=admin_headers).status_code == 204
+    assert stored_stock(db_session, sweet_id) == 6
+    assert db_session.query(HotStockSku).count() == 0
+
+    assert buy(client, admin_headers, sweet_id, 1).json()["new_quantity"] == 5
+    assert client.delete(f"/api/admin/hot-skus/{sweet_id}", headers=admin_headers).status_code == 404
+
+
+def test_hot_sku_admin_api_requires_admin(client, auth_headers, add_sweet):
+    headers = auth_headers("user@sweetshop.com")
+    sweet_id = add_sweet(stock=1)
+
+    assert client.put(f"/api/admin/hot-skus/{sweet_id}", headers=headers).status_code == 403
+    assert client.get("/api/admin/hot-skus", headers=headers).status_code == 403
+
+
+def test_enable_unknown_sweet_returns_404(client, admin_headers):
+
+    assert client.put("/api/admin/hot-skus/999", headers=admin_headers).status_code == 404
+
+
+def test_other_stock_writers_are_blocked_for_hot_skus(client, db_session, admin_headers, add_sweet):
+    sweet_id = add_sweet(stock=10)
+    client.put(f"/api/admin/hot-skus/{sweet_id}", headers=admin_headers)
+
+    cart = client.post("/api/cart/checkout", json={
+        "lines": [{"sweet_id": sweet_id, "quantity_to_purchase": 1}]
+    }, headers=admin_headers)
+    edit = client.put(f"/api/sweets/{sweet_id}", json={"quantity_in_stock": 50}, headers=admin_headers)
+    delete = client.delete(f"/api/sweets/{sweet_id}", headers=admin_headers)
+    bulk = client.post(
+        "/api/sweets/bulk",
+        content=f'{{"sweet_id": {sweet_id}, "sweet_name": "Ladoo", "sweet_category": "Indian", '
+                f'"sweet_price": 10.0, "quantity_in_stock": 50}}\n',
+        headers={**admin_headers, "Content-Type": "application/x-ndjson"}
+    )
+
+    assert cart.status_code == 409
+    assert edit.status_code == 409
+    assert delete.status_code == 409
+    assert bulk.json()["failed"] == 1
+    assert stored_stock(db_session, sweet_id) == 10
+
+
+def test_price_edits_reach_hot_purchase_responses(client, admin_headers, add_sweet):
+    sweet_id = add_sweet(stock=10)
+    client.put(f"/api/admin/hot-skus/{sweet_id}", headers=admin_headers)
+
+    client.put(f"/api/sweets/{sweet_id}", json={"sweet_price": 20.0}, headers=admin_headers)
+
+    assert buy(client, admin_headers, sweet_id, 2).json()["total_price"] == 40.0
+
+
+# ==================== COUNTER TESTS ====================
+
+def test_row_update_path_refuses_hot_skus(manager, db_session, add_sweet):
+    sweet_id = add_sweet(stock=10)
+    manager.enable(db_session, sweet_id)
+
+    with pytest.raises(HTTPException) as error:
+        reserve_stock(db_session, sweet_id, 1)
+
+    assert error.value.status_code == 409
+
+
+def test_purchase_spanning_several_shards(manager, db_session, add_sweet):
+    sweet_id = add_sweet(stock=4)  # one unit per shard
+    manager.enable(db_session, sweet_id)
+
+    change = manager.reserve(sweet_id, 3)
+
+    assert (change.previous_quantity, change.new_quantity) == (4, 1)
+    assert sorted(shard.available for shard in manager._skus[sweet_id].shards) == [0, 0, 0, 1]
+
+
+def test_parallel_hot_purchases_never_oversell(manager, db_session, add_sweet):
+    sweet_id = add_sweet(stock=500)
+    manager.enable(db_session, sweet_id)
+
+    def attempt(_):
+        try:
+            manager.reserve(sweet_id, 1)
+            return True
+        except HTTPException:
+            return False
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        results = list(pool.map(attempt, range(1000)))
+
+    assert results.count(True) == 500
+    manager.flush(db_session)
+    assert stored_stock(db_session, sweet_id) == 0
+
+
+def test_journal_failure_returns_units_and_503(manager, db_session, monkeypatch, add_sweet):
+    sweet_id = add_sweet(stock=3)
+    manager.enable(db_session, sweet_id)
+
+    def broken_append(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(manager.journal, "append", broken_append)
+    with pytest.raises(HTTPException) as error:
+        manager.reserve(sweet_id, 2)
+
+    assert error.value.status_code == 503
+    assert manager.sku_status(sweet_id)["available"] == 3
+
+
+# ==================== CRASH RECOVERY TESTS ====================
+
+def test_recovery_replays_unflushed_reservations(manager, db_session, tmp_path, add_sweet):
+    sweet_id = add_sweet()
+    manager.enable(db_session, sweet_id)
+    manager.reserve(sweet_id, 10)
+    manager.flush(db_session)
+    manager.reserve(sweet_id, 5)
+    manager.reserve(sweet_id, 2)
+
+    # Simulated crash: the 7 unflushed units exist only in the journal
+    restarted = HotStockManager(StockJournal(str(tmp_path / "hot.journal")), shard_count=4)
+    replayed = restarted.recover(db_session)
+
+    assert replayed == 7
+    assert stored_stock(db_session, sweet_id) == 83
+    assert restarted.sku_status(sweet_id)["available"] == 83
+    restarted.journal.close()
+
+
+def test_recovery_after_interrupted_flush(manager, db_session, tmp_path, monkeypatch, add_sweet):
+    sweet_id = add_sweet(stock=50)
+    manager.enable(db_session, sweet_id)
+    manager.reserve(sweet_id, 4)
+
+    def failing_commit():
+        raise RuntimeError("connection lost")
+
+    monkeypatch.setattr(db_session, "commit", failing_commit)
+    with pytest.raises(RuntimeError):
+        manager.flush(db_session)
+    monkeypatch.undo()
+    manager.reserve(sweet_id, 1)
+
+    restarted = HotStockManager(StockJournal(str(tmp_path / "hot.journal")), shard_count=4)
+
+    assert restarted.recover(db_session) == 5
+    assert stored_stock(db_session, sweet_id) == 45
+    restarted.journal.close()
+
+
+def test_recovery_ignores_torn_last_line(manager, db_session, tmp_path, add_sweet):
+    sweet_id = add_sweet(stock=50)
+    manager.enable(db_session, sweet_id)
+    manager.reserve(sweet_id, 2)
+    with open(tmp_path / "hot.journal", "ab") as journal_file:
+        journal_file.write(f"2 {sweet_id} 9".encode())
+
+    restarted = HotStockManager(StockJournal(str(tmp_path / "hot.journal")), shard_count=4)
+
+    assert restarted.recover(db_session) == 2
+    restarted.journal.close()
+
+
+def test_recovery_is_idempotent(manager, db_session, tmp_path, add_sweet):
+    sweet_id = add_sweet(stock=50)
+    manager.enable(db_session, sweet_id)
+    manager.reserve(sweet_id, 6)
+
+    first = HotStockManager(StockJournal(str(tmp_path / "hot.journal")), shard_count=4)
+    first.recover(db_session)
+    second = HotStockManager(StockJournal(str(tmp_path / "hot.journal")), shard_count=4)
+
+    assert second.recover(db_session) == 0
+    assert stored_stock(db_session, sweet_id) == 44
+    first.journal.close()
+    second.journal.close()
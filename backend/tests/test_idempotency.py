@@ -0,0 +1,292 @@
+"""
+Idempotency keys on purchase, restock and checkout, including retry storms.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+import app.idempotency as idempotency
+from app.database import DatabaseBaseModel, get_db
+from app.idempotency import idempotency_store
+from app.inventory.hot_stock import hot_stock
+from app.main import app
+from app.models import IdempotencyRecord, InventoryMovement, SalesRollup, SweetProduct
+
+RETRIES = 50
+WORKERS = 16
+
+
+@pytest.fixture
+def file_db(client, tmp_path):
+    """Serve the app from a file-backed SQLite database so concurrent requests get their own connections."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'storm.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+        pool_size=WORKERS,
+    )
+    DatabaseBaseModel.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_file_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = get_file_db
+    db = factory()
+    yield db
+    db.close()
+    engine.dispose()
+
+
+# ==================== HELPER FUNCTIONS ====================
+
+def stock_of(db, sweet_id):
+    db.expire_all()
+    return db.get(SweetProduct, sweet_id).quantity_in_stock
+
+
+def purchase(client, headers, sweet_id, key, quantity=2, coupon=None):
+    return client.post(
+        f"/api/sweets/{sweet_id}/purchase",
+        json={"quantity_to_purchase": quantity, "coupon": coupon},
+        headers={**headers, "Idempotency-Key": key}
+    )
+
+
+# ==================== REPLAY TESTS ====================
+
+def test_retried_purchase_is_replayed(client, db_session, admin_headers, add_sweet):
+    sweet_id = add_sweet()
+
+    first = purchase(client, admin_headers, sweet_id, "order-1", coupon="COUPON")
+    retry = purchase(client, admin_headers, sweet_id, "order-1", coupon="COUPON")
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert stock_of(db_session, sweet_id) == 98
+    assert db_session.query(InventoryMovement).count() == 1
+
+
+def test_replay_survives_losing_the_memory_cache(client, db_session, admin_headers, add_sweet):
+    sweet_id = add_sweet()
+    first = purchase(client, admin_headers, sweet_id, "order-1")
+
+    idempotency_store.clear()
+    retry = purchase(client, admin_headers, sweet_id, "order-1")
+
+    assert retry.json() == first.json()
+    assert stock_of(db_session, sweet_id) == 98
+
+
+def test_requests_without_a_key_are_not_deduplicated(client, db_session, admin_headers, add_sweet):
+    sweet_id = add_sweet()
+
+    for _ in range(2):
+        client.post(f"/api/sweets/{sweet_id}/purchase", json={"quantity_to_purchase": 1}, headers=admin_headers)
+
+    assert stock_of(db_session, sweet_id) == 98
+
+
+def test_reusing_a_key_for_another_request_is_rejected(client, db_session, admin_headers, add_sweet):
+    sweet_id = add_sweet()
+    purchase(client, admin_headers, sweet_id, "order-1", quantity=2)
+
+    response = purchase(client, admin_headers, sweet_id, "order-1", quantity=3)
+
+    assert response.status_code == 422
+    assert stock_of(db_session, sweet_id) == 98
+
+
+def test_keys_are_scoped_per_user(client, db_session, admin_headers, auth_headers, add_sweet):
+    customer = auth_headers("customer@example.com")
+    sweet_id = add_sweet()
+
+    purchase(client, admin_headers, sweet_id, "order-1")
+    response = purchase(client, customer, sweet_id, "order-1")
+
+    assert "Idempotent-Replayed" not in response.headers
+    assert stock_of(db_session, sweet_id) == 96
+
+
+def test_failed_attempts_are_not_stored(client, db_session, admin_headers, add_sweet):
+    sweet_id = add_sweet(stock=1)
+
+    assert purchase(client, admin_headers, sweet_id, "order-1").status_code == 400
+    client.post(f"/api/sweets/{sweet_id}/restock", json={"quantity_to_add": 5}, headers=admin_headers)
+
+    assert purchase(client, admin_headers, sweet_id, "order-1").status_code == 200
+    assert stock_of(db_session, sweet_id) == 4
+
+
+def test_expired_keys_run_again(client, db_session, admin_headers, add_sweet):
+    sweet_id = add_sweet()
+    purchase(client, admin_headers, sweet_id, "order-1")
+    record = db_session.query(IdempotencyRecord).one()
+    record.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db_session.commit()
+    idempotency_store.clear()
+
+    response = purchase(client, admin_headers, sweet_id, "order-1")
+
+    assert "Idempotent-Replayed" not in response.headers
+    assert stock_of(db_session, sweet_id) == 96
+    assert idempotency.purge_expired(db_session) == 0
+
+
+def test_restock_and_checkout_are_idempotent(client, db_session, admin_headers, add_sweet):
+    sweet_id = add_sweet()
+    restock = {"json": {"quantity_to_add": 10}, "headers": {**admin_headers, "Idempotency-Key": "restock-1"}}
+    checkout = {
+        "json": {"lines": [{"sweet_id": sweet_id, "quantity_to_purchase": 3}]},
+        "headers": {**admin_headers, "Idempotency-Key": "cart-1"}
+    }
+
+    restocked = [client.post(f"/api/sweets/{sweet_id}/restock", **restock) for _ in range(3)]
+    checked_out = [client.post("/api/cart/checkout", **checkout) for _ in range(3)]
+
+    assert len({str(r.json()) for r in restocked}) == 1
+    assert len({str(r.json()) for r in checked_out}) == 1
+    assert stock_of(db_session, sweet_id) == 107
+
+
+def test_hot_sku_purchase_is_idempotent(client, admin_headers, add_sweet):
+    sweet_id = add_sweet()
+    client.put(f"/api/admin/hot-skus/{sweet_id}", headers=admin_headers)
+
+    responses = [purchase(client, admin_headers, sweet_id, "flash-1") for _ in range(3)]
+
+    assert [r.json()["new_quantity"] for r in responses] == [98, 98, 98]
+    assert client.get("/api/admin/hot-skus", headers=admin_headers).json()[0]["available"] == 98
+
+
+def test_commit_race_with_another_process_replays_the_winner(client, db_session, monkeypatch, admin_headers, add_sweet):
+    sweet_id = add_sweet()
+    first = purchase(client, admin_headers, sweet_id, "order-1")
+    idempotency_store.clear()
+
+    # The duplicate misses the stored key, as if the winner had not committed yet
+    real_load = idempotency.load_result
+    misses = []
+
+    def racing_load(db, claim):
+        if not misses:
+            misses.append(claim)
+            return None
+        return real_load(db, claim)
+
+    monkeypatch.setattr(idempotency, "load_result", racing_load)
+    retry = purchase(client, admin_headers, sweet_id, "order-1")
+
+    assert misses and retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert stock_of(db_session, sweet_id) == 98
+
+
+def test_hot_sku_commit_race_releases_the_losing_reservation(client, monkeypatch, admin_headers, add_sweet):
+    sweet_id = add_sweet()
+    client.put(f"/api/admin/hot-skus/{sweet_id}", headers=admin_headers)
+    first = purchase(client, admin_headers, sweet_id, "flash-1")
+    idempotency_store.clear()
+
+    real_load = idempotency.load_result
+    misses = []
+
+    def racing_load(db, claim):
+        if not misses:
+            misses.append(claim)
+            return None
+        return real_load(db, claim)
+
+    monkeypatch.setattr(idempotency, "load_result", racing_load)
+    retry = purchase(client, admin_headers, sweet_id, "flash-1")
+
+    assert misses and retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    status = client.get("/api/admin/hot-skus", headers=admin_headers).json()[0]
+    assert (status["available"], status["pending_writeback"]) == (98, 2)
+    assert [entry.quantity for entry in hot_stock.journal.read()] == [2]
+
+
+def test_hot_sku_reservation_is_released_when_result_cannot_be_saved(
+    client, db_session, monkeypatch, admin_headers, add_sweet
+):
+    sweet_id = add_sweet()
+    client.put(f"/api/admin/hot-skus/{sweet_id}", headers=admin_headers)
+
+    def failing_save(db, claim, body):
+        raise OperationalError("INSERT INTO idempotency_keys", {}, Exception("disk I/O error"))
+
+    monkeypatch.setattr("app.routes.inventory_routes.save_result", failing_save)
+    with pytest.raises(OperationalError):
+        purchase(client, admin_headers, sweet_id, "flash-1")
+
+    status = client.get("/api/admin/hot-skus", headers=admin_headers).json()[0]
+    assert (status["available"], status["pending_writeback"]) == (100, 0)
+    assert hot_stock.journal.read() == []
+    hot_stock.flush(db_session)
+    assert stock_of(db_session, sweet_id) == 100
+    assert db_session.query(InventoryMovement).count() == 0
+
+
+def test_release_after_write_back_sells_the_units_back(client, db_session, admin_headers, add_sweet):
+    sweet_id = add_sweet()
+    client.put(f"/api/admin/hot-skus/{sweet_id}", headers=admin_headers)
+    reservation = hot_stock.hold(sweet_id, 3)
+    hot_stock.flush(db_session)
+
+    hot_stock.release(db_session, reservation)
+
+    assert stock_of(db_session, sweet_id) == 100
+    assert client.get("/api/admin/hot-skus", headers=admin_headers).json()[0]["available"] == 100
+    movements = db_session.query(InventoryMovement).order_by(InventoryMovement.movement_id).all()
+    assert [(m.movement_type, m.quantity_delta, m.total_price) for m in movements] == [
+        ("purchase", -3, 30.0), ("release", 3, -30.0)
+    ]
+    daily = db_session.query(SalesRollup).filter(SalesRollup.granularity == "day").all()
+    assert sum(row.units_sold for row in daily) == 0
+    assert sum(row.units_restocked for row in daily) == 0
+    assert sum(row.revenue for row in daily) == 0.0
+    summary = client.get(f"/api/movements/sweets/{sweet_id}/summary", headers=admin_headers).json()
+    assert (summary["units_sold"], summary["units_restocked"], summary["revenue"]) == (0, 0, 0.0)
+
+
+def test_invalid_key_is_rejected(client, admin_headers, add_sweet):
+    sweet_id = add_sweet()
+
+    assert purchase(client, admin_headers, sweet_id, "x" * 256).status_code == 400
+
+
+# ==================== RETRY STORM TESTS ====================
+
+def test_concurrent_retries_of_one_purchase_sell_once(client, file_db, admin_headers, add_sweet):
+    sweet_id = add_sweet(db=file_db)
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        responses = list(pool.map(lambda _: purchase(client, admin_headers, sweet_id, "storm-1"), range(RETRIES)))
+
+    assert {r.status_code for r in responses} == {200}
+    assert len({str(r.json()) for r in responses}) == 1
+    assert sum("Idempotent-Replayed" not in r.headers for r in responses) == 1
+    assert stock_of(file_db, sweet_id) == 98
+    assert file_db.query(InventoryMovement).count() == 1
+
+
+def test_retry_storm_across_many_keys(client, file_db, admin_headers, add_sweet):
+    sweet_id = add_sweet(stock=1000, db=file_db)
+    keys = [f"order-{index % 10}" for index in range(RETRIES * 2)]
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        responses = list(pool.map(lambda key: purchase(client, admin_headers, sweet_id, key, quantity=1), keys))
+
+    assert {r.status_code for r in responses} == {200}
+    assert stock_of(file_db, sweet_id) == 990
+    assert file_db.query(IdempotencyRecord).count() == 10
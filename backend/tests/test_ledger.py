@@ -0,0 +1,226 @@
+"""
+Inventory ledger: movement recording, compaction and history endpoints.
+"""
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+
+from app.inventory.hot_stock import HotStockManager, StockJournal
+from app.inventory.ledger import compact_ledger, purchase_movement, stock_summary
+from app.models import InventoryMovement, StockSnapshot
+
+
+# ==================== HELPER FUNCTIONS ====================
+
+def buy(client, headers, sweet_id, quantity, coupon=None):
+    return client.post(
+        f"/api/sweets/{sweet_id}/purchase",
+        json={"quantity_to_purchase": quantity, "coupon": coupon},
+        headers=headers
+    )
+
+
+def movements(db):
+    db.expire_all()
+    return db.query(InventoryMovement).order_by(InventoryMovement.movement_id).all()
+
+
+# ==================== RECORDING TESTS ====================
+
+def test_purchase_and_restock_are_recorded(client, db_session, admin_headers, auth_headers, add_sweet):
+    customer = auth_headers("customer@example.com")
+    sweet_id = add_sweet()
+
+    assert buy(client, customer, sweet_id, 3, coupon="COUPON").status_code == 200
+    client.post(f"/api/sweets/{sweet_id}/restock", json={"quantity_to_add": 5}, headers=admin_headers)
+
+    sale, restock = movements(db_session)
+    assert (sale.movement_type, sale.quantity_delta, sale.unit_price) == ("purchase", -3, 10.0)
+    assert (sale.total_price, sale.coupon) == (27.0, "COUPON")
+    assert (restock.movement_type, restock.quantity_delta, restock.total_price) == ("restock", 5, None)
+    assert sale.user_id != restock.user_id
+
+
+def test_invalid_coupon_is_charged_in_full(client, db_session, admin_headers, add_sweet):
+    sweet_id = add_sweet()
+
+    buy(client, admin_headers, sweet_id, 2, coupon="NOPE")
+
+    (sale,) = movements(db_session)
+    assert (sale.total_price, sale.coupon) == (20.0, None)
+
+
+def test_failed_purchase_records_nothing(client, db_session, admin_headers, add_sweet):
+    sweet_id = add_sweet(stock=1)
+
+    assert buy(client, admin_headers, sweet_id, 5).status_code == 400
+    assert movements(db_session) == []
+
+
+def test_cart_checkout_records_one_movement_per_line(client, db_session, admin_headers, add_sweet):
+    first = add_sweet(name="Barfi")
+    second = add_sweet(name="Jalebi", price=5.0)
+
+    response = client.post("/api/cart/checkout", json={
+        "lines": [
+            {"sweet_id": first, "quantity_to_purchase": 2},
+            {"sweet_id": second, "quantity_to_purchase": 4}
+        ],
+        "coupon": "COUPON"
+    }, headers=admin_headers)
+    assert response.status_code == 200
+
+    rows = movements(db_session)
+    assert [(row.sweet_id, row.quantity_delta, row.total_price) for row in rows] == [
+        (first, -2, 18.0), (second, -4, 18.0)
+    ]
+
+
+def test_hot_sku_sales_reach_the_ledger_on_flush(client, db_session, admin_headers, add_sweet):
+    sweet_id = add_sweet()
+    client.put(f"/api/admin/hot-skus/{sweet_id}", headers=admin_headers)
+
+    buy(client, admin_headers, sweet_id, 2, coupon="COUPON")
+    assert movements(db_session) == []
+
+    client.post("/api/admin/hot-skus/flush", headers=admin_headers)
+    (sale,) = movements(db_session)
+    assert (sale.quantity_delta, sale.total_price, sale.coupon) == (-2, 18.0, "COUPON")
+
+
+def test_hot_sku_recovery_records_replayed_sales(db_session, tmp_path, add_sweet):
+    sweet_id = add_sweet(stock=50)
+    manager = HotStockManager(StockJournal(str(tmp_path / "hot.journal")), shard_count=2)
+    manager.enable(db_session, sweet_id)
+    manager.reserve(sweet_id, 4, user_id=7)
+    manager.journal.close()
+
+    restarted = HotStockManager(StockJournal(str(tmp_path / "hot.journal")), shard_count=2)
+    restarted.recover(db_session)
+    restarted.journal.close()
+
+    (sale,) = movements(db_session)
+    assert (sale.sweet_id, sale.user_id, sale.quantity_delta, sale.total_price) == (sweet_id, 7, -4, 40.0)
+
+
+# ==================== COMPACTION TESTS ====================
+
+def test_compaction_folds_movements_into_snapshots(client, db_session, admin_headers, add_sweet):
+    sweet_id = add_sweet()
+    buy(client, admin_headers, sweet_id, 3)
+    client.post(f"/api/sweets/{sweet_id}/restock", json={"quantity_to_add": 10}, headers=admin_headers)
+
+    assert compact_ledger(db_session) == 2
+    buy(client, admin_headers, sweet_id, 1)
+
+    snapshot = db_session.get(StockSnapshot, sweet_id)
+    assert (snapshot.units_sold, snapshot.units_restocked, snapshot.revenue) == (3, 10, 30.0)
+
+    summary = stock_summary(db_session, sweet_id)
+    assert summary["quantity_in_stock"] == 106
+    assert (summary["units_sold"], summary["net_quantity_delta"], summary["revenue"]) == (4, 6, 40.0)
+    assert (summary["movement_count"], summary["uncompacted_movements"]) == (3, 1)
+
+    # A second pass only folds the tail
+    assert compact_ledger(db_session) == 1
+    assert stock_summary(db_session, sweet_id)["uncompacted_movements"] == 0
+    assert len(movements(db_session)) == 3
+
+
+def test_compaction_folds_movements_that_commit_late(db_session, add_sweet):
+    sweet_id = add_sweet()
+    # Written back from a journal: old created_at, and id 2 is taken by a transaction still committing
+    sold_at = datetime.now(timezone.utc) - timedelta(hours=1)
+
+    def sale(movement_id):
+        db_session.execute(insert(InventoryMovement), [
+            {**purchase_movement(sweet_id, 1, 10.0, 10.0, None, created_at=sold_at), "movement_id": movement_id}
+        ])
+        db_session.commit()
+
+    sale(1)
+    sale(3)
+    assert compact_ledger(db_session) == 2
+
+    sale(2)
+    summary = stock_summary(db_session, sweet_id)
+    assert (summary["units_sold"], summary["compacted_through"], summary["uncompacted_movements"]) == (3, 3, 1)
+
+    assert compact_ledger(db_session) == 1
+    snapshot = db_session.get(StockSnapshot, sweet_id)
+    assert (snapshot.units_sold, snapshot.movement_count) == (3, 3)
+    assert stock_summary(db_session, sweet_id)["uncompacted_movements"] == 0
+
+
+def test_summary_endpoint(client, admin_headers, add_sweet):
+    sweet_id = add_sweet()
+    buy(client, admin_headers, sweet_id, 2)
+
+    compacted = client.post("/api/admin/ledger/compact", headers=admin_headers)
+    assert compacted.status_code == 200
+
+    response = client.get(f"/api/movements/sweets/{sweet_id}/summary", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["units_sold"] == 2
+    assert response.json()["quantity_in_stock"] == 98
+    assert client.get("/api/movements/sweets/999/summary", headers=admin_headers).status_code == 404
+
+
+# ==================== HISTORY ENDPOINT TESTS ====================
+
+def test_sweet_history_pages_newest_first(client, admin_headers, add_sweet):
+    sweet_id = add_sweet()
+    other_id = add_sweet(name="Rasgulla")
+    for quantity in (1, 2, 3):
+        buy(client, admin_headers, sweet_id, quantity)
+    buy(client, admin_headers, other_id, 9)
+
+    first = client.get(f"/api/movements/sweets/{sweet_id}?limit=2", headers=admin_headers)
+    assert [row["quantity_delta"] for row in first.json()] == [-3, -2]
+
+    second = client.get(
+        f"/api/movements/sweets/{sweet_id}?limit=2&cursor={first.headers['X-Next-Cursor']}",
+        headers=admin_headers
+    )
+    assert [row["quantity_delta"] for row in second.json()] == [-1]
+    assert "X-Next-Cursor" not in second.headers
+
+
+def test_users_see_only_their_own_history(client, admin_headers, auth_headers, add_sweet):
+    customer = auth_headers("customer@example.com")
+    sweet_id = add_sweet()
+    buy(client, admin_headers, sweet_id, 1)
+    buy(client, customer, sweet_id, 2)
+
+    mine = client.get("/api/movements/me", headers=customer).json()
+    assert [row["quantity_delta"] for row in mine] == [-2]
+
+    user_id = mine[0]["user_id"]
+    by_user = client.get(f"/api/movements/users/{user_id}", headers=admin_headers).json()
+    assert [row["quantity_delta"] for row in by_user] == [-2]
+
+    assert client.get("/api/movements", headers=customer).status_code == 403
+    assert client.get(f"/api/movements/users/{user_id}", headers=customer).status_code == 403
+
+
+def test_history_filters_by_time_range_and_type(client, admin_headers, add_sweet):
+    sweet_id = add_sweet()
+    buy(client, admin_headers, sweet_id, 1)
+    client.post(f"/api/sweets/{sweet_id}/restock", json={"quantity_to_add": 4}, headers=admin_headers)
+
+    now = datetime.now(timezone.utc)
+    window = {"since": (now - timedelta(minutes=5)).isoformat(), "until": (now + timedelta(minutes=5)).isoformat()}
+    assert len(client.get("/api/movements", params=window, headers=admin_headers).json()) == 2
+
+    future = {"since": (now + timedelta(minutes=5)).isoformat()}
+    assert client.get("/api/movements", params=future, headers=admin_headers).json() == []
+
+    restocks = client.get("/api/movements", params={"movement_type": "restock"}, headers=admin_headers).json()
+    assert [row["quantity_delta"] for row in restocks] == [4]
+
+
+def test_invalid_history_cursor(client, admin_headers):
+
+    response = client.get("/api/movements?cursor=bogus", headers=admin_headers)
+
+    assert response.status_code == 400
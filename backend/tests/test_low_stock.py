@@ -0,0 +1,185 @@
+"""
+Low-stock alerting: the stock event bus, the debounced watcher, its sinks and threshold management.
+"""
+import asyncio
+
+from app.inventory.events import StockEvent, StockEventBus, stock_events
+from app.inventory.low_stock import (
+    LEVEL_IN_STOCK,
+    LEVEL_LOW,
+    LEVEL_OUT,
+    AlertStream,
+    LowStockWatcher,
+    StockAlert,
+    low_stock_watcher
+)
+from app.models import LowStockThreshold
+
+
+# ==================== HELPER FUNCTIONS ====================
+
+def event(quantity, sweet_id=1):
+    return StockEvent(sweet_id, "Ladoo", quantity, 0.0)
+
+
+class RecordingSink:
+    def __init__(self):
+        self.alerts = []
+
+    async def send(self, alert):
+        self.alerts.append(alert)
+
+
+# ==================== EVENT BUS TESTS ====================
+
+def test_subscription_keeps_latest_event_per_sweet():
+    bus = StockEventBus()
+    subscription = bus.subscribe()
+
+    bus.publish([event(9), event(8), event(5, sweet_id=2), event(7)])
+
+    assert [(e.sweet_id, e.quantity) for e in subscription.drain()] == [(2, 5), (1, 7)]
+    assert subscription.drain() == []
+
+
+def test_slow_subscription_is_dropped():
+    bus = StockEventBus()
+    slow = bus.subscribe(max_pending=2)
+    fast = bus.subscribe()
+
+    bus.publish([event(1, sweet_id=sweet_id) for sweet_id in (1, 2, 3)])
+
+    assert slow.dropped and slow.drain() == []
+    assert bus.subscriber_count == 1
+    assert len(fast.drain()) == 3
+
+
+def test_stock_changes_are_published_after_commit(client, admin_headers, add_sweet):
+    sweet_id = add_sweet(stock=20)
+    other_id = add_sweet(name="Barfi", stock=20)
+    subscription = stock_events.subscribe()
+
+    client.post(f"/api/sweets/{sweet_id}/purchase", json={"quantity_to_purchase": 3}, headers=admin_headers)
+    assert [(e.sweet_id, e.quantity) for e in subscription.drain()] == [(sweet_id, 17)]
+
+    client.post(f"/api/sweets/{sweet_id}/restock", json={"quantity_to_add": 5}, headers=admin_headers)
+    client.post(
+        "/api/cart/checkout", json={"lines": [{"sweet_id": other_id, "quantity_to_purchase": 2}]}, headers=admin_headers
+    )
+    client.put(f"/api/sweets/{other_id}", json={"quantity_in_stock": 4}, headers=admin_headers)
+    assert [(e.sweet_id, e.quantity) for e in subscription.drain()] == [(sweet_id, 22), (other_id, 4)]
+
+
+def test_failed_purchase_publishes_nothing(client, admin_headers, add_sweet):
+    sweet_id = add_sweet(stock=1)
+    subscription = stock_events.subscribe()
+
+    client.post(f"/api/sweets/{sweet_id}/purchase", json={"quantity_to_purchase": 2}, headers=admin_headers)
+
+    assert subscription.drain() == []
+
+
+# ==================== WATCHER TESTS ====================
+
+def test_watcher_alerts_on_level_changes():
+    watcher = LowStockWatcher([], default_threshold=10, debounce=0)
+
+    assert watcher.observe(event(12), 0) == []
+    assert [(a.level, a.quantity, a.threshold) for a in watcher.observe(event(9), 1)] == [(LEVEL_LOW, 9, 10)]
+    # Still low: nothing new to report
+    assert watcher.observe(event(3), 2) == []
+    assert watcher.observe(event(0), 3)[0].level == LEVEL_OUT
+    assert watcher.observe(event(50), 4)[0].level == LEVEL_IN_STOCK
+
+
+def test_watcher_debounces_per_sweet():
+    watcher = LowStockWatcher([], default_threshold=10, debounce=60)
+
+    assert [a.level for a in watcher.observe(event(9), 0)] == [LEVEL_LOW]
+    # A sale spike inside the window is held and collapsed to its latest level
+    assert watcher.observe(event(0), 10) == []
+    assert watcher.observe(event(8, sweet_id=2), 10)[0].sweet_id == 2
+    assert watcher.next_deadline() == 60
+    assert watcher.due(59) == []
+    assert [(a.level, a.quantity) for a in watcher.due(60)] == [(LEVEL_OUT, 0)]
+
+
+def test_watcher_drops_changes_that_flap_back():
+    watcher = LowStockWatcher([], default_threshold=10, debounce=60)
+    watcher.observe(event(9), 0)
+
+    watcher.observe(event(0), 10)
+    watcher.observe(event(5), 20)
+
+    assert watcher.next_deadline() is None
+    assert watcher.due(60) == []
+
+
+def test_watcher_ignores_deleted_sweets():
+    watcher = LowStockWatcher([], default_threshold=10, debounce=60)
+    watcher.observe(event(9), 0)
+    watcher.observe(event(0), 10)
+
+    assert watcher.observe(StockEvent(1, "Ladoo", 0, 0.0, removed=True), 20) == []
+    assert watcher.next_deadline() is None
+
+
+def test_watcher_run_delivers_alerts(db_session, add_sweet):
+    sweet_id = add_sweet(stock=20)
+    db_session.add(LowStockThreshold(sweet_id=sweet_id, threshold=50))
+    db_session.commit()
+    sink = RecordingSink()
+    watcher = LowStockWatcher([sink], debounce=0)
+    bus = StockEventBus()
+
+    async def scenario():
+        task = asyncio.create_task(watcher.run(bus, lambda: db_session))
+        while not bus.subscriber_count:
+            await asyncio.sleep(0.01)
+        bus.publish([event(40, sweet_id=sweet_id)])
+        while not sink.alerts:
+            await asyncio.sleep(0.01)
+        task.cancel()
+
+    asyncio.run(scenario())
+
+    assert [(a.level, a.threshold) for a in sink.alerts] == [(LEVEL_LOW, 50)]
+
+
+# ==================== SINK AND ENDPOINT TESTS ====================
+
+def test_alert_stream_disconnects_slow_clients():
+    stream = AlertStream(queue_size=1)
+    alert = StockAlert(1, "Ladoo", LEVEL_LOW, 3, 10, None)
+
+    async def scenario():
+        queue = stream.connect()
+        await stream.send(alert)
+        await stream.send(alert)
+        return queue.get_nowait()
+
+    assert asyncio.run(scenario()) is None
+    assert len(stream.recent) == 2
+
+
+def test_threshold_endpoints_update_watcher(client, admin_headers, add_sweet):
+    sweet_id = add_sweet(stock=20)
+
+    response = client.put(f"/api/admin/alerts/thresholds/{sweet_id}", json={"threshold": 25}, headers=admin_headers)
+
+    assert response.json() == {"sweet_id": sweet_id, "threshold": 25}
+    assert low_stock_watcher.threshold_for(sweet_id) == 25
+    assert client.get("/api/admin/alerts/thresholds", headers=admin_headers).json() == [response.json()]
+
+    assert client.delete(f"/api/admin/alerts/thresholds/{sweet_id}", headers=admin_headers).status_code == 204
+    assert low_stock_watcher.threshold_for(sweet_id) == low_stock_watcher.default_threshold
+    assert client.delete(f"/api/admin/alerts/thresholds/{sweet_id}", headers=admin_headers).status_code == 404
+    response = client.put("/api/admin/alerts/thresholds/999", json={"threshold": 5}, headers=admin_headers)
+    assert response.status_code == 404
+
+
+def test_alert_routes_require_admin(client, auth_headers):
+    headers = auth_headers("customer@example.com")
+
+    assert client.get("/api/admin/alerts/recent", headers=headers).status_code == 403
+    assert client.get("/api/admin/alerts/stream", headers=headers).status_code == 403
@@ -0,0 +1,134 @@
+"""
+Request metrics: route latency, SQL counts per request, auth timers and /metrics.
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+
+from app.auth.hashing_service import bcrypt_seconds
+from app.auth.token_manager import jwt_seconds
+from app.metrics.middleware import (
+    MetricsMiddleware, request_db_queries, request_seconds, requests_in_progress, requests_total
+)
+from app.metrics.registry import MetricsRegistry
+from app.metrics.timing import record_timing
+
+PURCHASE_ROUTE = "/api/sweets/{sweet_id}/purchase"
+
+
+# ==================== REGISTRY TESTS ====================
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, "/a")
+
+    assert registry.render().splitlines() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a",le="1"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 3.65',
+        'latency_seconds_count{route="/a"} 4',
+    ]
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("hits_total", "Hits.", ("path",)).inc('a"b\\c\nd')
+
+    assert 'hits_total{path="a\\"b\\\\c\\nd"} 1' in registry.render()
+
+
+# ==================== MIDDLEWARE TESTS ====================
+
+def test_requests_are_labelled_by_route_template(client, admin_headers, add_sweet):
+    sweet_id = add_sweet(stock=20)
+
+    for _ in range(2):
+        client.post(f"/api/sweets/{sweet_id}/purchase", json={"quantity_to_purchase": 1}, headers=admin_headers)
+    client.get("/no/such/path")
+
+    assert requests_total.value("POST", PURCHASE_ROUTE, "200") == 2
+    assert request_seconds.count("POST", PURCHASE_ROUTE) == 2
+    assert requests_total.value("GET", "unmatched", "404") == 1
+    assert requests_in_progress.value("POST", PURCHASE_ROUTE) == 0
+
+
+def test_sql_statements_are_counted_per_request(client, db_session, admin_headers, add_sweet):
+    sweet_id = add_sweet(stock=20)
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "after_cursor_execute", count)
+    try:
+        client.post(f"/api/sweets/{sweet_id}/purchase", json={"quantity_to_purchase": 1}, headers=admin_headers)
+    finally:
+        event.remove(engine, "after_cursor_execute", count)
+
+    assert statements
+    assert request_db_queries.count("POST", PURCHASE_ROUTE) == 1
+    assert request_db_queries.sum("POST", PURCHASE_ROUTE) == len(statements)
+
+
+def test_login_records_bcrypt_and_jwt_timers(client, auth_headers):
+    auth_headers()
+
+    assert bcrypt_seconds.count("hash") == 1
+    assert bcrypt_seconds.count("verify") == 1
+    assert jwt_seconds.count("encode") == 1
+
+
+def test_metrics_endpoint_serves_text_exposition(client, admin_headers):
+    client.get("/")
+
+    response = client.get("/metrics", headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/plain; version=0.0.4; charset=utf-8"
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+    assert 'http_requests_total{method="GET",route="/",status="200"} 1' in response.text
+    assert "Server-Timing" not in response.headers
+
+
+def test_metrics_endpoint_is_not_public(client, auth_headers):
+    customer = auth_headers("customer@sweetshop.com")
+
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer not-a-token"}).status_code == 401
+    assert client.get("/metrics", headers=customer).status_code == 403
+
+
+def test_metrics_endpoint_accepts_scrape_token(client, monkeypatch):
+    monkeypatch.setattr("app.routes.metrics_routes.METRICS_TOKEN", "scrape-secret")
+
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+
+    assert response.status_code == 200
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secreT"}).status_code == 401
+
+
+def test_server_timing_header_when_enabled(db_session):
+    engine = db_session.get_bind()
+    app = FastAPI()
+
+    @app.get("/work")
+    def work():
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            connection.execute(text("SELECT 2"))
+        record_timing("jwt", 0.001)
+        return {}
+
+    app.add_middleware(MetricsMiddleware, server_timing=True)
+    response = TestClient(app).get("/work")
+
+    entries = [entry.split(";") for entry in response.headers["Server-Timing"].split(", ")]
+    assert [entry[0] for entry in entries] == ["app", "db", "jwt"]
+    assert entries[1][2] == 'desc="2 queries"'
+    assert entries[2] == ["jwt", "dur=1.00", 'desc="1 calls"']
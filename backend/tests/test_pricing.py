@@ -0,0 +1,217 @@
+"""
+Pricing engine: exact paise arithmetic, rule evaluation, the cached rule table and rule management.
+"""
+from datetime import datetime, timedelta, timezone
+
+from app.models import InventoryMovement, PricingRule
+from app.pricing.engine import CartLine, price_cart
+from app.pricing.money import apportion, percent_of, to_paise, to_rupees
+from app.pricing.rules import BOGO, FIXED, PERCENTAGE, Rule, RuleTable, pricing_rules
+
+
+# ==================== HELPER FUNCTIONS ====================
+
+def rule(rule_id, rule_type=PERCENTAGE, **terms):
+    return Rule(rule_id=rule_id, rule_name=f"rule-{rule_id}", rule_type=rule_type, **terms)
+
+
+def price(lines, rules, coupon=None, now=None):
+    return price_cart(lines, RuleTable(rules).active(coupon, now))
+
+
+# ==================== MONEY TESTS ====================
+
+def test_money_round_trips_through_paise():
+    assert to_paise(59.9) == 5990
+    assert to_paise("0.005") == 1
+    assert to_rupees(5391) == 53.91
+    assert percent_of(5990, 1000) == 599
+    assert percent_of(5, 1000) == 1
+
+
+def test_apportion_sums_exactly():
+    assert apportion(100, [1, 1, 1]) == [34, 33, 33]
+    assert apportion(7, [0, 5, 0]) == [0, 7, 0]
+    assert apportion(5, [0, 0]) == [0, 0]
+
+
+# ==================== ENGINE TESTS ====================
+
+def test_percentage_rule_applies_to_every_line():
+    priced = price(
+        [CartLine(1, "Indian", 1000, 3), CartLine(2, "Western", 333, 1)],
+        [rule(1, percent_off_bps=1000)]
+    )
+
+    assert [line.charged_paise for line in priced.lines] == [2700, 300]
+    assert (priced.list_paise, priced.discount_paise, priced.charged_paise) == (3333, 333, 3000)
+    assert priced.applied_rules == ["rule-1"]
+
+
+def test_best_line_rule_wins_without_stacking():
+    rules = [
+        rule(1, percent_off_bps=1000),
+        rule(2, percent_off_bps=2500, sweet_category="indian"),
+        rule(3, BOGO, buy_quantity=1, free_quantity=1, sweet_id=2),
+    ]
+
+    priced = price([CartLine(1, "Indian", 1000, 2), CartLine(2, "Indian", 1000, 4)], rules)
+
+    assert [(line.discount_paise, line.rule_ids) for line in priced.lines] == [(500, (2,)), (2000, (3,))]
+
+
+def test_bogo_only_counts_whole_bundles():
+    priced = price([CartLine(1, "Indian", 450, 5)], [rule(1, BOGO, buy_quantity=2, free_quantity=1)])
+
+    assert priced.lines[0].discount_paise == 450
+
+
+def test_fixed_rule_is_capped_and_apportioned():
+    rules = [rule(1, FIXED, amount_off_paise=1000, sweet_category="western")]
+
+    priced = price(
+        [CartLine(1, "Western", 200, 1), CartLine(2, "Indian", 5000, 1), CartLine(3, "Western", 100, 1)],
+        rules
+    )
+
+    # Only the Western lines are covered, so the discount stops at their 300 paise
+    assert [line.discount_paise for line in priced.lines] == [200, 0, 100]
+    assert priced.charged_paise == 5000
+
+    priced = price([CartLine(1, "Western", 1000, 1), CartLine(3, "Western", 1000, 2)], rules)
+    assert [line.discount_paise for line in priced.lines] == [333, 667]
+
+
+def test_fixed_rule_comes_off_the_discounted_subtotal():
+    priced = price(
+        [CartLine(1, "Indian", 1000, 1)],
+        [rule(1, percent_off_bps=5000), rule(2, FIXED, amount_off_paise=800)]
+    )
+
+    assert priced.charged_paise == 0
+    assert priced.lines[0].rule_ids == (1, 2)
+
+
+def test_coupon_rules_need_their_code():
+    rules = [rule(1, percent_off_bps=2000, coupon_code="SPRING"), rule(2, percent_off_bps=500)]
+    lines = [CartLine(1, "Indian", 1000, 1)]
+
+    assert price(lines, rules).charged_paise == 950
+    assert price(lines, rules, coupon="WINTER").coupon is None
+    with_code = price(lines, rules, coupon="SPRING")
+    assert (with_code.charged_paise, with_code.coupon) == (800, "SPRING")
+
+
+def test_rules_outside_their_window_do_not_apply():
+    now = datetime(2024, 12, 1, 12, tzinfo=timezone.utc)
+    rules = [
+        rule(1, percent_off_bps=1000, expires_at=now),
+        rule(2, percent_off_bps=2000, starts_at=now + timedelta(hours=1)),
+    ]
+    table = RuleTable(rules)
+    lines = [CartLine(1, "Indian", 1000, 1)]
+
+    assert price_cart(lines, table.active(now=now - timedelta(minutes=1))).charged_paise == 900
+    assert price_cart(lines, table.active(now=now)).charged_paise == 1000
+    assert price_cart(lines, table.active(now=now + timedelta(hours=2))).charged_paise == 800
+
+
+# ==================== RULE TABLE CACHE TESTS ====================
+
+def test_rule_writes_invalidate_the_cached_table(db_session):
+    assert not pricing_rules.table(db_session).has_coupon("SPRING")
+
+    db_session.add(PricingRule(rule_name="Spring", rule_type=PERCENTAGE, coupon_code="SPRING", percent_off_bps=2000))
+    db_session.commit()
+
+    assert pricing_rules.table(db_session).has_coupon("SPRING")
+
+
+def test_stored_rule_replaces_legacy_coupon(db_session):
+    assert pricing_rules.table(db_session).active("COUPON").everywhere[0].percent_off_bps == 1000
+
+    db_session.add(PricingRule(rule_name="Bigger", rule_type=PERCENTAGE, coupon_code="COUPON", percent_off_bps=1500))
+    db_session.commit()
+
+    assert [r.rule_name for r in pricing_rules.table(db_session).active("COUPON").everywhere] == ["Bigger"]
+
+
+# ==================== ENDPOINT TESTS ====================
+
+def test_purchase_applies_stored_rules(client, db_session, admin_headers, add_sweet):
+    sweet_id = add_sweet(name="Rasgulla", price=20.0)
+    created = client.post("/api/admin/pricing/rules", json={
+        "rule_name": "Rasgulla BOGO",
+        "rule_type": "bogo",
+        "buy_quantity": 1,
+        "free_quantity": 1,
+        "sweet_id": sweet_id
+    }, headers=admin_headers)
+    assert created.status_code == 201
+
+    response = client.post(
+        f"/api/sweets/{sweet_id}/purchase", json={"quantity_to_purchase": 3}, headers=admin_headers
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["total_price"], data["discounted_price"], data["applied_rules"]) == (60.0, 40.0, ["Rasgulla BOGO"])
+    movement = db_session.query(InventoryMovement).one()
+    assert (movement.total_price, movement.coupon) == (40.0, None)
+
+
+def test_cart_checkout_apportions_fixed_coupon(client, db_session, admin_headers, add_sweet):
+    first = add_sweet(name="Barfi")
+    second = add_sweet(price=20.0)
+    client.post("/api/admin/pricing/rules", json={
+        "rule_name": "Five off",
+        "rule_type": "fixed",
+        "coupon_code": "FIVE",
+        "amount_off_paise": 500
+    }, headers=admin_headers)
+
+    response = client.post("/api/cart/checkout", json={
+        "lines": [{"sweet_id": first, "quantity_to_purchase": 1}, {"sweet_id": second, "quantity_to_purchase": 1}],
+        "coupon": "FIVE"
+    }, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert (response.json()["total_price"], response.json()["discounted_price"]) == (30.0, 25.0)
+    charged = [m.total_price for m in db_session.query(InventoryMovement).order_by(InventoryMovement.sweet_id)]
+    assert charged == [8.33, 16.67]
+
+
+def test_rule_management_endpoints(client, admin_headers):
+    created = client.post("/api/admin/pricing/rules", json={
+        "rule_name": "Diwali", "rule_type": "percentage", "percent_off_bps": 1500, "sweet_category": "Indian"
+    }, headers=admin_headers).json()
+
+    updated = client.put(f"/api/admin/pricing/rules/{created['rule_id']}", json={
+        "rule_name": "Diwali", "rule_type": "percentage", "percent_off_bps": 2000, "is_active": False
+    }, headers=admin_headers)
+    assert (updated.status_code, updated.json()["percent_off_bps"]) == (200, 2000)
+    assert [r["rule_name"] for r in client.get("/api/admin/pricing/rules", headers=admin_headers).json()] == ["Diwali"]
+
+    assert client.delete(f"/api/admin/pricing/rules/{created['rule_id']}", headers=admin_headers).status_code == 204
+    assert client.delete(f"/api/admin/pricing/rules/{created['rule_id']}", headers=admin_headers).status_code == 404
+
+
+def test_rule_terms_are_validated(client, admin_headers):
+
+    missing_terms = client.post("/api/admin/pricing/rules", json={
+        "rule_name": "Broken", "rule_type": "bogo", "buy_quantity": 2
+    }, headers=admin_headers)
+    bad_window = client.post("/api/admin/pricing/rules", json={
+        "rule_name": "Backwards", "rule_type": "fixed", "amount_off_paise": 100,
+        "starts_at": "2024-12-02T00:00:00", "expires_at": "2024-12-01T00:00:00"
+    }, headers=admin_headers)
+
+    assert (missing_terms.status_code, bad_window.status_code) == (422, 422)
+
+
+def test_rule_management_requires_admin(client, auth_headers):
+    headers = auth_headers("customer@example.com")
+
+    response = client.get("/api/admin/pricing/rules", headers=headers)
+
+    assert response.status_code == 403
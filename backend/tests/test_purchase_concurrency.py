@@ -0,0 +1,99 @@
+"""
+Concurrency stress test for the atomic purchase path.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import DatabaseBaseModel
+from app.models import SweetProduct
+from app.inventory.stock_operations import add_stock, reserve_stock
+
+INITIAL_STOCK = 1500
+PURCHASE_ATTEMPTS = 3000
+WORKERS = 32
+
+
+@pytest.fixture
+def file_session_factory(tmp_path):
+    """A file-backed SQLite database so worker threads get real connections."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'stress.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+        pool_size=WORKERS,
+    )
+    DatabaseBaseModel.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = factory()
+    db.add(SweetProduct(
+        sweet_name="Flash Sale Ladoo",
+        sweet_category="Traditional",
+        sweet_price=10.0,
+        quantity_in_stock=INITIAL_STOCK
+    ))
+    db.commit()
+    db.close()
+
+    yield factory
+    engine.dispose()
+
+
+def attempt(factory, operation, quantity):
+    db = factory()
+    try:
+        change = operation(db, 1, quantity)
+        db.commit()
+        return change
+    except HTTPException as error:
+        db.rollback()
+        return error.status_code
+    finally:
+        db.close()
+
+
+def test_parallel_purchases_never_oversell(file_session_factory):
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = list(pool.map(
+            lambda _: attempt(file_session_factory, reserve_stock, 1),
+            range(PURCHASE_ATTEMPTS)
+        ))
+
+    successes = [r for r in results if not isinstance(r, int)]
+    rejections = [r for r in results if isinstance(r, int)]
+
+    assert len(successes) == INITIAL_STOCK
+    assert set(rejections) == {400}
+    assert all(change.new_quantity >= 0 for change in successes)
+    # Every successful purchase observed a distinct stock level
+    assert sorted(change.new_quantity for change in successes) == list(range(INITIAL_STOCK))
+
+    db = file_session_factory()
+    assert db.get(SweetProduct, 1).quantity_in_stock == 0
+    db.close()
+
+
+def test_parallel_purchases_and_restocks_reconcile(file_session_factory):
+    purchases, restocks = 2000, 500
+
+    def work(index):
+        if index % 5 == 0:
+            return "restock", attempt(file_session_factory, add_stock, 2)
+        return "purchase", attempt(file_session_factory, reserve_stock, 1)
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = list(pool.map(work, range(purchases + restocks)))
+
+    sold = sum(1 for kind, r in results if kind == "purchase" and not isinstance(r, int))
+    added = sum(2 for kind, r in results if kind == "restock" and not isinstance(r, int))
+    assert added == restocks * 2
+
+    db = file_session_factory()
+    final_stock = db.get(SweetProduct, 1).quantity_in_stock
+    db.close()
+
+    assert final_stock >= 0
+    assert final_stock == INITIAL_STOCK + added - sold
@@ -0,0 +1,169 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.metrics.registry import registry
+from app.rate_limit import InMemoryBackend, Rate, parse_rate, rate_limiter
+
+
+# ==================== HELPER FUNCTIONS ====================
+
+def create_sweet(client, headers, quantity=1000):
+    response = client.post("/api/sweets", json={
+        "sweet_name": "Ladoo",
+        "sweet_category": "Indian",
+        "sweet_price": 2.5,
+        "quantity_in_stock": quantity
+    }, headers=headers)
+    return response.json()["sweet_id"]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+# ==================== TOKEN BUCKET TESTS ====================
+
+def test_parse_rate():
+    assert parse_rate("20/minute") == Rate(capacity=20, per_second=20 / 60)
+    assert parse_rate(" 5 / second ") == Rate(capacity=5, per_second=5)
+    for spec in ("20", "0/minute", "20/day", "-1/second"):
+        with pytest.raises(ValueError):
+            parse_rate(spec)
+
+
+def test_bucket_allows_a_burst_then_refills():
+    clock = FakeClock()
+    backend = InMemoryBackend(shards=4, clock=clock)
+    rate = Rate(capacity=3, per_second=0.5)
+
+    assert [backend.consume("k", rate) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert backend.consume("k", rate) == pytest.approx(2.0)
+
+    clock.now += 1.0
+    assert backend.consume("k", rate) == pytest.approx(1.0)
+    clock.now += 1.0
+    assert backend.consume("k", rate) == 0.0
+    # Idle time refills only up to the burst size
+    clock.now += 3600
+    assert [backend.consume("k", rate) for _ in range(4)][-1] > 0
+
+
+def test_keys_have_separate_buckets():
+    backend = InMemoryBackend(clock=FakeClock())
+    rate = Rate(capacity=1, per_second=1)
+
+    assert backend.consume("a", rate) == 0.0
+    assert backend.consume("b", rate) == 0.0
+    assert backend.consume("a", rate) > 0
+
+
+def test_least_recently_used_buckets_are_evicted():
+    backend = InMemoryBackend(shards=1, max_keys=2, clock=FakeClock())
+    rate = Rate(capacity=1, per_second=1)
+
+    backend.consume("a", rate)
+    backend.consume("b", rate)
+    backend.consume("a", rate)
+    backend.consume("c", rate)
+
+    assert len(backend) == 2
+    # "b" was dropped, so it starts from a full bucket again
+    assert backend.consume("b", rate) == 0.0
+
+
+def test_concurrent_consumers_never_overspend():
+    backend = InMemoryBackend(shards=2, clock=FakeClock())
+    rate = Rate(capacity=100, per_second=1)
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda _: backend.consume("k", rate), range(1000)))
+
+    assert results.count(0.0) == 100
+
+
+# ==================== ROUTE TESTS ====================
+
+def test_login_is_limited_per_ip(client, auth_headers):
+    auth_headers("user@ratelimit.com")
+    rate_limiter.reset()
+
+    responses = [
+        client.post("/api/auth/login", data={"username": "user@ratelimit.com", "password": "wrong"})
+        for _ in range(21)
+    ]
+
+    assert {r.status_code for r in responses[:20]} == {401}
+    assert responses[20].status_code == 429
+    assert int(responses[20].headers["retry-after"]) >= 1
+    assert 'rate_limited_requests_total{limit="login"} 1' in registry.render()
+
+
+def test_purchase_is_limited_per_user(client, auth_headers, admin_headers):
+    sweet_id = create_sweet(client, admin_headers)
+    buyer = auth_headers("buyer@ratelimit.com")
+    other = auth_headers("other@ratelimit.com")
+
+    statuses = [
+        client.post(f"/api/sweets/{sweet_id}/purchase", json={"quantity_to_purchase": 1}, headers=buyer).status_code
+        for _ in range(61)
+    ]
+
+    assert statuses[:60] == [200] * 60
+    assert statuses[60] == 429
+    # Another user has a budget of their own
+    response = client.post(f"/api/sweets/{sweet_id}/purchase", json={"quantity_to_purchase": 1}, headers=other)
+    assert response.status_code == 200
+
+
+def test_replayed_purchase_past_the_limit_returns_the_original(client, auth_headers, admin_headers):
+    sweet_id = create_sweet(client, admin_headers)
+    buyer = auth_headers("buyer@ratelimit.com")
+
+    def purchase(key=None):
+        headers = {**buyer, "Idempotency-Key": key} if key else buyer
+        return client.post(f"/api/sweets/{sweet_id}/purchase", json={"quantity_to_purchase": 1}, headers=headers)
+
+    original = purchase("order-1")
+    for _ in range(59):
+        assert purchase().status_code == 200
+    assert purchase().status_code == 429
+
+    replay = purchase("order-1")
+
+    assert replay.status_code == 200
+    assert replay.headers["idempotent-replayed"] == "true"
+    assert replay.json() == original.json()
+
+
+def test_replays_are_not_charged(client, auth_headers, admin_headers):
+    sweet_id = create_sweet(client, admin_headers)
+    buyer = {**auth_headers("buyer@ratelimit.com"), "Idempotency-Key": "order-1"}
+
+    statuses = {
+        client.post(f"/api/sweets/{sweet_id}/purchase", json={"quantity_to_purchase": 1}, headers=buyer).status_code
+        for _ in range(100)
+    }
+
+    assert statuses == {200}
+
+
+def test_unauthenticated_purchase_is_401_not_429(client):
+    response = client.post("/api/sweets/1/purchase", json={"quantity_to_purchase": 1})
+    assert response.status_code == 401
+
+
+def test_disabled_limiter_lets_everything_through(client, monkeypatch, auth_headers):
+    monkeypatch.setattr(rate_limiter, "enabled", False)
+    auth_headers("user@ratelimit.com")
+
+    statuses = {
+        client.post("/api/auth/login", data={"username": "user@ratelimit.com", "password": "wrong"}).status_code
+        for _ in range(30)
+    }
+
+    assert statuses == {401}
@@ -0,0 +1,178 @@
+"""
+Read-replica routing, with two local SQLite files standing in for primary and replica.
+
+Nothing replicates between the files, so each test can tell which
+database served a read from the data it returns.
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import read_replicas
+from app.cache import TTLCache
+from app.catalog.response_cache import catalog_response_cache
+from app.database import DatabaseBaseModel, get_db
+from app.main import app
+from app.models import SweetProduct
+from app.read_replicas import Replica, ReplicaRouter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_database(path, stock):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    DatabaseBaseModel.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = factory()
+    db.add(SweetProduct(sweet_name="Ladoo", sweet_category="Indian", sweet_price=2.0, quantity_in_stock=stock))
+    db.commit()
+    db.close()
+    return engine, factory
+
+
+@pytest.fixture
+def replicated(client, tmp_path, monkeypatch):
+    """Primary (stock 10) and one replica (stock 99) wired into the app."""
+    primary_engine, primary_factory = make_database(tmp_path / "primary.db", stock=10)
+    replica_engine, _ = make_database(tmp_path / "replica.db", stock=99)
+    replica_engine.dispose()
+
+    def override_get_db():
+        db = primary_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    router = read_replicas.replica_router
+    monkeypatch.setattr(router, "replicas", [Replica("replica-1", f"sqlite:///{tmp_path / 'replica.db'}")])
+    # The files never converge, so keep bodies built from one out of the other's reads
+    monkeypatch.setattr(catalog_response_cache, "ttl_seconds", 0)
+    app.dependency_overrides[get_db] = override_get_db
+
+    yield router
+
+    asyncio.run(router.dispose())
+    primary_engine.dispose()
+
+
+def listed_stock(client, headers):
+    return client.get("/api/sweets", headers=headers).json()[0]["quantity_in_stock"]
+
+
+# ==================== ROUTING TESTS ====================
+
+def test_catalog_reads_go_to_the_replica(client, replicated, admin_headers):
+
+    assert listed_stock(client, admin_headers) == 99
+    search = client.get("/api/sweets/search", params={"name": "ladoo"}, headers=admin_headers)
+    assert search.json()[0]["quantity_in_stock"] == 99
+
+
+def test_writes_go_to_the_primary(client, replicated, admin_headers):
+
+    response = client.post("/api/sweets/1/purchase", json={"quantity_to_purchase": 3}, headers=admin_headers)
+
+    assert response.json()["previous_quantity"] == 10
+    assert response.json()["new_quantity"] == 7
+
+
+def test_user_reads_their_own_writes_from_the_primary(client, replicated, auth_headers):
+    buyer = auth_headers("buyer@sweetshop.com")
+    browser = auth_headers("browser@sweetshop.com")
+
+    client.post("/api/sweets/1/purchase", json={"quantity_to_purchase": 3}, headers=buyer)
+
+    assert listed_stock(client, buyer) == 7
+    assert listed_stock(client, browser) == 99
+
+
+def test_failed_write_does_not_make_user_sticky(client, replicated, auth_headers):
+    buyer = auth_headers()
+
+    response = client.post("/api/sweets/1/purchase", json={"quantity_to_purchase": 500}, headers=buyer)
+
+    assert response.status_code == 400
+    assert listed_stock(client, buyer) == 99
+
+
+def test_stickiness_expires(client, replicated, monkeypatch, auth_headers):
+    clock = FakeClock()
+    monkeypatch.setattr(replicated, "sticky_users", TTLCache(max_entries=10, ttl_seconds=5, clock=clock))
+    buyer = auth_headers()
+
+    client.post("/api/sweets/1/purchase", json={"quantity_to_purchase": 1}, headers=buyer)
+    assert listed_stock(client, buyer) == 9
+
+    clock.now += 6
+    assert listed_stock(client, buyer) == 99
+
+
+def test_other_users_writes_do_not_route_readers_to_primary(client, replicated, admin_headers, auth_headers):
+    browser = auth_headers("browser@sweetshop.com")
+
+    client.post("/api/sweets/1/restock", json={"quantity_to_add": 5}, headers=admin_headers)
+
+    assert replicated.choose(999) is not None
+    assert listed_stock(client, browser) == 99
+
+
+def test_replica_page_is_cached_under_the_replicas_own_version(
+    client, replicated, monkeypatch, admin_headers, auth_headers
+):
+    monkeypatch.setattr(catalog_response_cache, "ttl_seconds", 60)
+    browser = auth_headers("browser@sweetshop.com")
+
+    client.post("/api/sweets/1/restock", json={"quantity_to_add": 5}, headers=admin_headers)
+
+    assert listed_stock(client, browser) == 99
+    assert listed_stock(client, admin_headers) == 15
+
+
+def test_requests_round_robin_across_replicas(tmp_path):
+    urls = [f"sqlite:///{tmp_path / name}" for name in ("a.db", "b.db")]
+    router = ReplicaRouter.from_urls(urls)
+
+    chosen = [router.choose().name for _ in range(4)]
+
+    assert chosen == ["replica-1", "replica-2", "replica-1", "replica-2"]
+    asyncio.run(router.dispose())
+
+
+# ==================== HEALTH CHECK TESTS ====================
+
+def test_unreachable_replica_is_taken_out_of_rotation(client, tmp_path, replicated, monkeypatch, admin_headers):
+    broken = Replica("replica-1", f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    monkeypatch.setattr(replicated, "replicas", [broken])
+
+    asyncio.run(replicated.check_health())
+
+    assert replicated.status() == [{"name": "replica-1", "healthy": False, "failures": 1}]
+    assert listed_stock(client, admin_headers) == 10
+    assert client.get("/api/admin/db/replicas", headers=admin_headers).json()[0]["healthy"] is False
+    broken.engine.dispose()
+
+
+def test_recovered_replica_rejoins_rotation(replicated):
+    replica = replicated.replicas[0]
+    replicated.mark_unhealthy(replica)
+    assert replicated.choose() is None
+
+    asyncio.run(replicated.check_health())
+
+    assert replicated.choose() is replica
+
+
+def test_pool_statistics_include_replicas(client, replicated, admin_headers):
+
+    response = client.get("/api/admin/db/pool", headers=admin_headers)
+
+    assert "replica-1" in response.json()
@@ -0,0 +1,170 @@
+import pytest
+
+from app.catalog.search_planner import SearchCriteria, plan_search
+from app.pagination import encode_cursor
+
+
+# ==================== HELPER FUNCTION ====================
+
+CATALOG = [
+    ("Kaju Katli", "Traditional", 450.0, 50),
+    ("Chocolate Truffle", "Chocolate", 299.0, 0),
+    ("Gulab Jamun", "Traditional", 180.0, 75),
+    ("Gummy Bears", "Gummy", 120.0, 200),
+    ("Dairy Milk Silk", "Chocolate", 85.0, 60),
+    ("Motichoor Ladoo", "Traditional", 280.0, 0),
+    ("5 Star Chocolate", "Chocolate", 25.0, 120),
+]
+
+
+@pytest.fixture
+def headers(client, admin_headers):
+    for name, category, price, quantity in CATALOG:
+        client.post("/api/sweets", json={
+            "sweet_name": name,
+            "sweet_category": category,
+            "sweet_price": price,
+            "quantity_in_stock": quantity
+        }, headers=admin_headers)
+    return admin_headers
+
+
+def search(client, headers, query):
+    response = client.get(f"/api/sweets/search?{query}", headers=headers)
+    assert response.status_code == 200, response.text
+    return response
+
+
+def names(response):
+    return [s["sweet_name"] for s in response.json()]
+
+
+def collect_pages(client, headers, query):
+    pages, cursor = [], None
+    while True:
+        suffix = f"&cursor={cursor}" if cursor else ""
+        response = search(client, headers, query + suffix)
+        pages.append(names(response))
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+
+
+# ==================== SORT AND FILTER TESTS ====================
+
+def test_search_sort_by_price(client, headers):
+    response = search(client, headers, "sort=price")
+    assert [s["sweet_price"] for s in response.json()] == sorted(p for _, _, p, _ in CATALOG)
+
+
+def test_search_sort_by_price_descending(client, headers):
+    response = search(client, headers, "sort=price&order=desc")
+    assert [s["sweet_price"] for s in response.json()] == sorted((p for _, _, p, _ in CATALOG), reverse=True)
+
+
+def test_search_sort_by_name(client, headers):
+    assert names(search(client, headers, "sort=name")) == sorted(n for n, _, _, _ in CATALOG)
+
+
+def test_search_sort_by_stock_defaults_to_most_stocked(client, headers):
+    assert names(search(client, headers, "sort=stock&limit=2")) == ["Gummy Bears", "5 Star Chocolate"]
+
+
+def test_search_sort_newest_first(client, headers):
+    assert names(search(client, headers, "sort=newest&limit=2")) == ["5 Star Chocolate", "Motichoor Ladoo"]
+
+
+def test_search_in_stock_only(client, headers):
+    result = names(search(client, headers, "in_stock_only=true"))
+    assert "Chocolate Truffle" not in result
+    assert "Motichoor Ladoo" not in result
+    assert len(result) == 5
+
+
+def test_search_category_is_case_insensitive_equality(client, headers):
+    result = names(search(client, headers, "category=chocolate&sort=price"))
+    assert result == ["5 Star Chocolate", "Dairy Milk Silk", "Chocolate Truffle"]
+
+
+# ==================== KEYSET PAGINATION TESTS ====================
+
+@pytest.mark.parametrize("query", [
+    "sort=price", "sort=price&order=desc", "sort=name", "sort=stock", "sort=newest",
+    "category=traditional&sort=price", "in_stock_only=true&sort=stock", "min_price=100",
+])
+def test_search_keyset_pages_cover_every_row_once(client, headers, query):
+    full = names(search(client, headers, query))
+    pages = collect_pages(client, headers, query + "&limit=2")
+    assert all(len(page) <= 2 for page in pages)
+    assert [name for page in pages for name in page] == full
+
+
+def test_search_relevance_pages(client, headers):
+    full = names(search(client, headers, "q=chocolate"))
+    pages = collect_pages(client, headers, "q=chocolate&limit=1")
+    assert [name for page in pages for name in page] == full
+    assert len(full) == 2
+
+
+def test_search_cursor_must_match_sort(client, headers):
+    cursor = search(client, headers, "sort=price&limit=1").headers["X-Next-Cursor"]
+    response = client.get(f"/api/sweets/search?sort=name&cursor={cursor}", headers=headers)
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("sort, keys", [
+    ("price", ["cheap", 1]),
+    ("price", [2.5, "1"]),
+    ("name", [5, 1]),
+    ("stock", [1.5, 1]),
+    ("stock", [True, 1]),
+    ("newest", [2 ** 64]),
+    ("newest", ["2024-01-01T00:00:00"]),
+])
+def test_search_rejects_cursor_keys_of_the_wrong_type(client, headers, sort, keys):
+    cursor = encode_cursor({"s": sort, "k": keys})
+
+    response = client.get(f"/api/sweets/search?sort={sort}&cursor={cursor}", headers=headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid pagination cursor"
+
+
+def test_search_rejects_unknown_sort(client, headers):
+    response = client.get("/api/sweets/search?sort=popularity", headers=headers)
+    assert response.status_code == 422
+
+
+# ==================== QUERY PLAN TESTS ====================
+
+def query_plan(db, criteria):
+    plan = plan_search(db, criteria, page_size=20)
+    sql = str(plan.query.statement.compile(
+        dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True}
+    ))
+    rows = db.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + sql).fetchall()
+    return " | ".join(row[-1] for row in rows)
+
+
+@pytest.mark.parametrize("criteria, index", [
+    (SearchCriteria(category="Chocolate", min_price=10, max_price=100, sort="price"),
+     "ix_sweet_products_category_price"),
+    (SearchCriteria(min_price=10, max_price=100, sort="price"), "ix_sweet_products_price_id"),
+    (SearchCriteria(sort="name"), "ix_sweet_products_sweet_name"),
+    (SearchCriteria(in_stock_only=True, sort="stock"), "ix_sweet_products_quantity_in_stock"),
+])
+def test_search_query_uses_index(client, headers, db_session, criteria, index):
+    plan = query_plan(db_session, criteria)
+    assert f"USING INDEX {index}" in plan or f"USING COVERING INDEX {index}" in plan, plan
+    assert "USE TEMP B-TREE FOR ORDER BY" not in plan, plan
+
+
+def test_search_newest_walks_primary_key(client, headers, db_session):
+    plan = query_plan(db_session, SearchCriteria(sort="newest"))
+    assert "SCAN sweet_products" in plan
+    assert "TEMP B-TREE" not in plan, plan
+
+
+def test_search_text_query_uses_fts_index(client, headers, db_session):
+    plan = query_plan(db_session, SearchCriteria(q="chocolate"))
+    assert "VIRTUAL TABLE INDEX" in plan, plan
@@ -0,0 +1,130 @@
+"""
+Live stock deltas over Server-Sent Events and WebSocket.
+"""
+import asyncio
+import time
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.inventory.events import StockEvent, StockEventBus, stock_events
+from app.inventory.stock_stream import sse_stock_events
+
+
+# ==================== HELPER FUNCTIONS ====================
+
+def wait_for_subscriber():
+    deadline = time.monotonic() + 5
+    while not stock_events.subscriber_count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def collect(chunks, subscription, publish, checks=2):
+    """Run the SSE generator until ``checks`` disconnect checks have passed."""
+    remaining = [checks]
+
+    async def is_disconnected():
+        remaining[0] -= 1
+        return remaining[0] < 0
+
+    async def scenario():
+        publish()
+        async for chunk in sse_stock_events(subscription, is_disconnected, keepalive=0.01):
+            chunks.append(chunk)
+
+    asyncio.run(scenario())
+    return chunks
+
+
+# ==================== SSE TESTS ====================
+
+def test_sse_stream_sends_coalesced_deltas_then_keepalives():
+    bus = StockEventBus()
+    subscription = bus.subscribe(max_pending=10)
+
+    chunks = collect([], subscription, lambda: bus.publish([
+        StockEvent(1, "Ladoo", 9, 0.0), StockEvent(2, "Barfi", 4, 0.0), StockEvent(1, "Ladoo", 8, 0.0)
+    ]))
+
+    assert chunks == [
+        'event: stock\ndata: {"sweet_id":2,"quantity":4}\n\n'
+        'event: stock\ndata: {"sweet_id":1,"quantity":8}\n\n',
+        ": keep-alive\n\n",
+    ]
+
+
+def test_sse_stream_resets_slow_clients():
+    bus = StockEventBus()
+    subscription = bus.subscribe(max_pending=1)
+
+    chunks = collect([], subscription, lambda: bus.publish([
+        StockEvent(1, "Ladoo", 9, 0.0), StockEvent(2, "Barfi", 4, 0.0)
+    ]))
+
+    assert chunks == ["event: reset\ndata: {}\n\n"]
+    assert bus.subscriber_count == 0
+
+
+def test_sse_stream_requires_authentication(client):
+    response = client.get("/api/sweets/stream")
+
+    assert response.status_code == 401
+
+
+# ==================== WEBSOCKET TESTS ====================
+
+def test_websocket_receives_committed_changes(client, admin_headers, add_sweet):
+    sweet_id = add_sweet(stock=20)
+    token = admin_headers["Authorization"].split()[1]
+
+    with client.websocket_connect(f"/api/sweets/stream/ws?token={token}") as websocket:
+        wait_for_subscriber()
+        client.post(f"/api/sweets/{sweet_id}/purchase", json={"quantity_to_purchase": 3}, headers=admin_headers)
+        assert websocket.receive_json() == {"sweet_id": sweet_id, "quantity": 17}
+
+        client.put(f"/api/sweets/{sweet_id}", json={"quantity_in_stock": 40}, headers=admin_headers)
+        assert websocket.receive_json() == {"sweet_id": sweet_id, "quantity": 40}
+
+
+def test_websocket_receives_deletions_and_bulk_imports(client, admin_headers, add_sweet):
+    sweet_id = add_sweet(name="Ladoo")
+    token = admin_headers["Authorization"].split()[1]
+
+    with client.websocket_connect(f"/api/sweets/stream/ws?token={token}") as websocket:
+        wait_for_subscriber()
+        client.delete(f"/api/sweets/{sweet_id}", headers=admin_headers)
+        assert websocket.receive_json() == {"sweet_id": sweet_id, "quantity": 0, "removed": True}
+
+        client.post("/api/sweets/bulk", content='{"sweet_id": 90, "sweet_name": "Barfi", '
+                    '"sweet_category": "Indian", "sweet_price": 2, "quantity_in_stock": 7}\n',
+                    headers={**admin_headers, "Content-Type": "application/x-ndjson"})
+        assert websocket.receive_json() == {"sweet_id": 90, "quantity": 7}
+
+
+def test_websocket_accepts_bearer_header(client, admin_headers, add_sweet):
+    sweet_id = add_sweet(stock=20)
+
+    with client.websocket_connect("/api/sweets/stream/ws", headers=admin_headers) as websocket:
+        wait_for_subscriber()
+        client.post(f"/api/sweets/{sweet_id}/restock", json={"quantity_to_add": 5}, headers=admin_headers)
+        assert websocket.receive_json() == {"sweet_id": sweet_id, "quantity": 25}
+
+
+def test_websocket_rejects_missing_or_bad_tokens(client):
+    for path in ("/api/sweets/stream/ws", "/api/sweets/stream/ws?token=not-a-token"):
+        with pytest.raises(WebSocketDisconnect) as closed:
+            with client.websocket_connect(path) as websocket:
+                websocket.receive_json()
+        assert closed.value.code == 1008
+
+
+def test_disconnected_websocket_unsubscribes(client, admin_headers):
+
+    with client.websocket_connect("/api/sweets/stream/ws", headers=admin_headers):
+        wait_for_subscriber()
+        assert stock_events.subscriber_count == 1
+
+    deadline = time.monotonic() + 5
+    while stock_events.subscriber_count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert stock_events.subscriber_count == 0
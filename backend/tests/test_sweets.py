@@ -1,4 +1,11 @@
+from typing import List
+
 import pytest
+from pydantic import TypeAdapter
+
+from app.catalog.serialization import serialize_sweet_rows, sweet_columns
+from app.models import SweetProduct
+from app.schemas import SweetProductResponse
 
 
 # ==================== HELPER FUNCTION ====================
@@ -279,4 +286,169 @@ def test_delete_sweet_not_found(client):
 
 def test_delete_sweet_requires_authentication(client):
     response = client.delete("/api/sweets/1")
-    assert response.status_code == 401
\ No newline at end of file
+    assert response.status_code == 401
+
+# ==================== PAGINATION TESTS ====================
+
+def create_many_sweets(client, headers, count):
+    for index in range(count):
+        client.post("/api/sweets", json={
+            "sweet_name": f"Sweet {index}",
+            "sweet_category": "Paged",
+            "sweet_price": 1.00 + index,
+            "quantity_in_stock": index,
+            "sweet_description": f"Description {index}"
+        }, headers=headers)
+
+
+def test_get_all_sweets_paginates_with_cursor(client):
+    headers = get_auth_header(client)
+    create_many_sweets(client, headers, 5)
+
+    first = client.get("/api/sweets?limit=2", headers=headers)
+    assert first.status_code == 200
+    assert [s["sweet_name"] for s in first.json()] == ["Sweet 0", "Sweet 1"]
+    cursor = first.headers["X-Next-Cursor"]
+
+    second = client.get(f"/api/sweets?limit=2&cursor={cursor}", headers=headers)
+    assert [s["sweet_name"] for s in second.json()] == ["Sweet 2", "Sweet 3"]
+
+    third = client.get(
+        f"/api/sweets?limit=2&cursor={second.headers['X-Next-Cursor']}", headers=headers
+    )
+    assert [s["sweet_name"] for s in third.json()] == ["Sweet 4"]
+    assert "X-Next-Cursor" not in third.headers
+
+
+def test_get_all_sweets_page_size_is_capped(client, monkeypatch):
+    monkeypatch.setattr("app.pagination.SWEETS_PAGE_SIZE_MAX", 3)
+    headers = get_auth_header(client)
+    create_many_sweets(client, headers, 5)
+
+    response = client.get("/api/sweets?limit=100", headers=headers)
+    assert len(response.json()) == 3
+    assert "X-Next-Cursor" in response.headers
+
+
+def test_get_all_sweets_invalid_cursor(client):
+    headers = get_auth_header(client)
+    response = client.get("/api/sweets?cursor=not-a-cursor", headers=headers)
+    assert response.status_code == 400
+
+
+def test_get_all_sweets_field_projection(client):
+    headers = get_auth_header(client)
+    create_many_sweets(client, headers, 2)
+
+    response = client.get("/api/sweets?fields=sweet_name,sweet_price", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == [
+        {"sweet_id": 1, "sweet_name": "Sweet 0", "sweet_price": 1.0},
+        {"sweet_id": 2, "sweet_name": "Sweet 1", "sweet_price": 2.0},
+    ]
+
+
+def test_get_all_sweets_unknown_field(client):
+    headers = get_auth_header(client)
+    response = client.get("/api/sweets?fields=sweet_name,hashed_password", headers=headers)
+    assert response.status_code == 400
+
+
+# ==================== FULL-TEXT SEARCH TESTS ====================
+
+def create_searchable_sweets(client, headers):
+    for name, description in [
+        ("Chocolate Truffle", "Rich dark cocoa centre"),
+        ("Dark Chocolate Bar", "Bitter and smooth"),
+        ("Kaju Katli", "Cashew fudge with chocolate drizzle"),
+        ("Rasgulla", "Spongy cottage cheese balls"),
+    ]:
+        client.post("/api/sweets", json={
+            "sweet_name": name,
+            "sweet_category": "Test",
+            "sweet_price": 5.0,
+            "quantity_in_stock": 10,
+            "sweet_description": description
+        }, headers=headers)
+
+
+def test_search_sweets_by_name_prefix(client):
+    headers = get_auth_header(client)
+    create_searchable_sweets(client, headers)
+
+    response = client.get("/api/sweets/search?name=choc", headers=headers)
+    assert response.status_code == 200
+    assert {s["sweet_name"] for s in response.json()} == {"Chocolate Truffle", "Dark Chocolate Bar"}
+
+
+def test_search_sweets_name_requires_every_word(client):
+    headers = get_auth_header(client)
+    create_searchable_sweets(client, headers)
+
+    response = client.get("/api/sweets/search?name=dark choc", headers=headers)
+    assert [s["sweet_name"] for s in response.json()] == ["Dark Chocolate Bar"]
+
+
+def test_search_sweets_full_text_ranks_name_hits_first(client):
+    headers = get_auth_header(client)
+    create_searchable_sweets(client, headers)
+
+    response = client.get("/api/sweets/search?q=chocolate", headers=headers)
+    names = [s["sweet_name"] for s in response.json()]
+    assert set(names) == {"Chocolate Truffle", "Dark Chocolate Bar", "Kaju Katli"}
+    assert names[-1] == "Kaju Katli"
+
+
+def test_search_sweets_full_text_matches_description(client):
+    headers = get_auth_header(client)
+    create_searchable_sweets(client, headers)
+
+    response = client.get("/api/sweets/search?q=cottage", headers=headers)
+    assert [s["sweet_name"] for s in response.json()] == ["Rasgulla"]
+
+
+def test_search_index_follows_updates_and_deletes(client):
+    headers = get_auth_header(client)
+    create_searchable_sweets(client, headers)
+
+    client.put("/api/sweets/4", json={"sweet_name": "Rosogolla"}, headers=headers)
+    client.delete("/api/sweets/1", headers=headers)
+
+    assert client.get("/api/sweets/search?name=rasgulla", headers=headers).json() == []
+    assert [s["sweet_id"] for s in client.get("/api/sweets/search?name=rosog", headers=headers).json()] == [4]
+    assert [s["sweet_id"] for s in client.get("/api/sweets/search?name=truffle", headers=headers).json()] == []
+
+
+def test_search_sweets_ignores_fts_operators(client):
+    headers = get_auth_header(client)
+    create_searchable_sweets(client, headers)
+
+    response = client.get('/api/sweets/search?q="chocolate" OR NEAR(', headers=headers)
+    assert response.status_code == 200
+
+
+# ==================== SERIALIZATION TESTS ====================
+
+def test_catalog_rows_encode_exactly_like_the_response_model(client, db_session):
+    headers = get_auth_header(client)
+    create_many_sweets(client, headers, 3)
+    client.put("/api/sweets/2", json={"sweet_description": None, "quantity_in_stock": 9}, headers=headers)
+
+    rows = db_session.query(*sweet_columns()).order_by(SweetProduct.sweet_id).all()
+    sweets = db_session.query(SweetProduct).order_by(SweetProduct.sweet_id).all()
+    adapter = TypeAdapter(List[SweetProductResponse])
+
+    assert serialize_sweet_rows(rows) == adapter.dump_json(adapter.validate_python(sweets, from_attributes=True))
+    assert client.get("/api/sweets", headers=headers).content == serialize_sweet_rows(rows)
+
+
+def test_catalog_reads_keep_their_openapi_schema(client):
+    paths = client.get("/openapi.json").json()["paths"]
+
+    for path in ("/api/sweets", "/api/sweets/search"):
+        schema = paths[path]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+        assert schema == {
+            "type": "array",
+            "items": {"$ref": "#/components/schemas/SweetProductResponse"},
+            "title": schema["title"],
+        }
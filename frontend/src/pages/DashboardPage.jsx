@@ -14,6 +14,7 @@ const DashboardPage = () => {
   const [showForm, setShowForm] = useState(false);
   const [editingSweet, setEditingSweet] = useState(null);
   const [searchParams, setSearchParams] = useState({});
+  const [resyncCount, setResyncCount] = useState(0);
 
   const fetchSweets = async () => {
     setLoading(true);
@@ -31,7 +32,23 @@ const DashboardPage = () => {
 
   useEffect(() => {
     fetchSweets();
-  }, [searchParams]);
+  }, [searchParams, resyncCount]);
+
+  const applyStock = (sweetId, quantity) => {
+    setSweets((current) => current.map((sweet) => (
+      sweet.sweet_id === sweetId ? { ...sweet, quantity_in_stock: quantity } : sweet
+    )));
+  };
+
+  const removeSweet = (sweetId) => {
+    setSweets((current) => current.filter((sweet) => sweet.sweet_id !== sweetId));
+  };
+
+  // Stock changes made by anyone arrive as deltas instead of re-fetching the list
+  useEffect(() => sweetService.subscribeToStock(
+    ({ sweet_id, quantity, removed }) => (removed ? removeSweet(sweet_id) : applyStock(sweet_id, quantity)),
+    () => setResyncCount((count) => count + 1)
+  ), []);
 
   const handleSearch = (params) => {
     setSearchParams(params);
@@ -70,8 +87,8 @@ const DashboardPage = () => {
 
   const handlePurchase = async (id, quantity) => {
     try {
-      await sweetService.purchaseSweet(id, quantity);
-      fetchSweets();
+      const result = await sweetService.purchaseSweet(id, quantity);
+      applyStock(result.sweet_id, result.new_quantity);
     } catch (error) {
       alert(error.response?.data?.detail || 'Purchase failed');
     }
@@ -79,8 +96,8 @@ const DashboardPage = () => {
 
   const handleRestock = async (id, quantity) => {
     try {
-      await sweetService.restockSweet(id, quantity);
-      fetchSweets();
+      const result = await sweetService.restockSweet(id, quantity);
+      applyStock(result.sweet_id, result.new_quantity);
     } catch (error) {
       alert(error.response?.data?.detail || 'Restock failed');
     }
@@ -1,16 +1,28 @@
 import api from './api';
 
+// Collect every page of a cursor-paginated listing
+async function getAllPages(url, params = {}) {
+  const items = [];
+  let cursor = null;
+  do {
+    const response = await api.get(url, {
+      params: cursor ? { ...params, cursor } : params,
+    });
+    items.push(...response.data);
+    cursor = response.headers['x-next-cursor'];
+  } while (cursor);
+  return items;
+}
+
 const sweetService = {
   // Get all sweets
   async getAllSweets() {
-    const response = await api.get('/api/sweets');
-    return response.data;
+    return getAllPages('/api/sweets');
   },
 
   // Search sweets
   async searchSweets(params) {
-    const response = await api.get('/api/sweets/search', { params });
-    return response.data;
+    return getAllPages('/api/sweets/search', params);
   },
 
   // Create sweet
@@ -46,6 +58,37 @@ const sweetService = {
     });
     return response.data;
   },
+
+  // Live stock deltas over WebSocket; returns a function that closes the stream.
+  // onResync runs whenever deltas may have been missed (reconnects, slow-client drops).
+  subscribeToStock(onDelta, onResync) {
+    const token = localStorage.getItem('access_token');
+    const url = `${api.defaults.baseURL.replace(/^http/, 'ws')}/api/sweets/stream/ws?token=${encodeURIComponent(token)}`;
+    let socket;
+    let retry;
+    let stopped = false;
+    let reconnecting = false;
+
+    const connect = () => {
+      socket = new WebSocket(url);
+      socket.onopen = () => {
+        if (reconnecting) onResync();
+      };
+      socket.onmessage = (message) => onDelta(JSON.parse(message.data));
+      socket.onclose = () => {
+        if (stopped) return;
+        reconnecting = true;
+        retry = setTimeout(connect, 2000);
+      };
+    };
+
+    connect();
+    return () => {
+      stopped = true;
+      clearTimeout(retry);
+      socket.close();
+    };
+  },
 };
 
 export default sweetService;
\ No newline at end of file